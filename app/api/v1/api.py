@@ -2,85 +2,96 @@
 API v1 router configuration
 """
 from fastapi import APIRouter
-from .endpoints import chat, stocks, sentiment, speech, monitoring, rag, aapl_analysis
-from .endpoints.futurequant import (
-    data_router, features_router, models_router, 
-    signals_router, backtests_router, paper_trading_router
-)
-from .endpoints.futureexploratorium import (
-    core_router, dashboard_router, analytics_router, strategy_router
-)
-from .endpoints.futureexploratorium.event_analysis import router as event_analysis_router
-from .endpoints.minigolfstrategy import (
-    core_router as minigolf_core_router,
-    courses_router as minigolf_courses,
-    strategy_router as minigolf_strategy,
-    factor_analysis_router
-)
-from .endpoints.consumeroptions import (
-    chain_router, analytics_router as consumeroptions_analytics_router, 
-    dashboard_router as consumeroptions_dashboard_router
-)
-from .endpoints.consumeroptions import simulation as consumeroptions_simulation
-from .endpoints import quantitative_analysis, websocket, simulation, etf, decision_reflection, market_pulse
+from ...core.lazy_routers import LazyRouter, LazyRouterGroup
+from .endpoints import chat, stocks, sentiment, speech, monitoring, websocket
 
 # Create main API router
 api_router = APIRouter()
 
-# Include all endpoint routers
+# Core endpoints are light and always loaded
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(stocks.router, prefix="/stocks", tags=["stocks"])
 api_router.include_router(sentiment.router, prefix="/sentiment", tags=["sentiment"])
 api_router.include_router(speech.router, prefix="/speech", tags=["speech"])
 api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
-api_router.include_router(rag.router, prefix="/rag", tags=["rag"])
-api_router.include_router(aapl_analysis.router, prefix="/aapl-analysis", tags=["aapl_analysis"])
-
-
-# Include FutureQuant Trader endpoints
-api_router.include_router(data_router, prefix="/futurequant/data", tags=["futurequant_data"])
-api_router.include_router(features_router, prefix="/futurequant/features", tags=["futurequant_features"])
-api_router.include_router(models_router, prefix="/futurequant/models", tags=["futurequant_models"])
-api_router.include_router(signals_router, prefix="/futurequant/signals", tags=["futurequant_signals"])
-api_router.include_router(backtests_router, prefix="/futurequant/backtests", tags=["futurequant_backtests"])
-api_router.include_router(paper_trading_router, prefix="/futurequant/paper-trading", tags=["futurequant_paper_trading"])
-
-# Include FutureExploratorium endpoints (separate service)
-api_router.include_router(core_router, prefix="/futureexploratorium/core", tags=["futureexploratorium_core"])
-api_router.include_router(dashboard_router, prefix="/futureexploratorium/dashboard", tags=["futureexploratorium_dashboard"])
-api_router.include_router(analytics_router, prefix="/futureexploratorium/analytics", tags=["futureexploratorium_analytics"])
-api_router.include_router(strategy_router, prefix="/futureexploratorium/strategy", tags=["futureexploratorium_strategy"])
-api_router.include_router(event_analysis_router, prefix="/futureexploratorium/events", tags=["futureexploratorium_events"])
-
-# Include Mini Golf Strategy endpoints
-api_router.include_router(minigolf_core_router, prefix="/minigolfstrategy/core", tags=["minigolfstrategy_core"])
-api_router.include_router(minigolf_strategy, prefix="/minigolfstrategy", tags=["minigolfstrategy_strategy"])
-api_router.include_router(minigolf_courses, prefix="/minigolfstrategy", tags=["minigolfstrategy_courses"])
-api_router.include_router(factor_analysis_router, prefix="/minigolfstrategy/factor-analysis", tags=["minigolfstrategy_factor_analysis"])
-
-# Include Consumer Options Sentiment endpoints
-api_router.include_router(chain_router, prefix="/consumeroptions/chain", tags=["consumeroptions_chain"])
-api_router.include_router(consumeroptions_analytics_router, prefix="/consumeroptions/analytics", tags=["consumeroptions_analytics"])
-api_router.include_router(consumeroptions_dashboard_router, prefix="/consumeroptions/dashboard", tags=["consumeroptions_dashboard"])
-api_router.include_router(consumeroptions_simulation.router, prefix="/consumeroptions", tags=["consumeroptions_simulation"])
-
-# Include ETF Dashboard endpoints
-api_router.include_router(etf.router, prefix="/etf", tags=["etf"])
-
-# Include Quantitative Analysis endpoints
-api_router.include_router(quantitative_analysis.router, prefix="/quantitative-analysis", tags=["quantitative_analysis"])
 
 # Include WebSocket endpoints
 api_router.include_router(websocket.router, tags=["websocket"])
 
-# Include Simulation endpoints
-api_router.include_router(simulation.router, prefix="/simulation", tags=["simulation"])
-
-# Include Decision Reflection endpoints
-api_router.include_router(decision_reflection.router, prefix="/decision-reflection", tags=["decision_reflection"])
-
-# Include Market Pulse endpoints
-api_router.include_router(market_pulse.router, prefix="/market-pulse", tags=["market_pulse"])
+# Feature areas pull in torch, vectorbt, qf-lib, mlflow, langchain, ... through their
+# services. They are registered by prefix and imported on first request or during the
+# background warm-up (see app.core.lazy_routers), keeping cold start fast.
+_ENDPOINTS = "app.api.v1.endpoints"
+
+LAZY_ROUTER_GROUPS = [
+    LazyRouterGroup("rag", "/rag", [
+        LazyRouter(f"{_ENDPOINTS}.rag", prefix="/rag", tags=["rag"]),
+    ]),
+    LazyRouterGroup("aapl_analysis", "/aapl-analysis", [
+        LazyRouter(f"{_ENDPOINTS}.aapl_analysis", prefix="/aapl-analysis", tags=["aapl_analysis"]),
+    ]),
+
+    # FutureQuant Trader endpoints
+    LazyRouterGroup("futurequant", "/futurequant", [
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "data_router", "/futurequant/data", ["futurequant_data"]),
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "features_router", "/futurequant/features", ["futurequant_features"]),
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "models_router", "/futurequant/models", ["futurequant_models"]),
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "signals_router", "/futurequant/signals", ["futurequant_signals"]),
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "backtests_router", "/futurequant/backtests", ["futurequant_backtests"]),
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "paper_trading_router", "/futurequant/paper-trading", ["futurequant_paper_trading"]),
+        LazyRouter(f"{_ENDPOINTS}.futurequant", "jobs_router", "/futurequant/jobs", ["futurequant_jobs"]),
+    ]),
+
+    # FutureExploratorium endpoints (separate service)
+    LazyRouterGroup("futureexploratorium", "/futureexploratorium", [
+        LazyRouter(f"{_ENDPOINTS}.futureexploratorium", "core_router", "/futureexploratorium/core", ["futureexploratorium_core"]),
+        LazyRouter(f"{_ENDPOINTS}.futureexploratorium", "dashboard_router", "/futureexploratorium/dashboard", ["futureexploratorium_dashboard"]),
+        LazyRouter(f"{_ENDPOINTS}.futureexploratorium", "analytics_router", "/futureexploratorium/analytics", ["futureexploratorium_analytics"]),
+        LazyRouter(f"{_ENDPOINTS}.futureexploratorium", "strategy_router", "/futureexploratorium/strategy", ["futureexploratorium_strategy"]),
+        LazyRouter(f"{_ENDPOINTS}.futureexploratorium.event_analysis", "router", "/futureexploratorium/events", ["futureexploratorium_events"]),
+    ]),
+
+    # Mini Golf Strategy endpoints
+    LazyRouterGroup("minigolfstrategy", "/minigolfstrategy", [
+        LazyRouter(f"{_ENDPOINTS}.minigolfstrategy", "core_router", "/minigolfstrategy/core", ["minigolfstrategy_core"]),
+        LazyRouter(f"{_ENDPOINTS}.minigolfstrategy", "strategy_router", "/minigolfstrategy", ["minigolfstrategy_strategy"]),
+        LazyRouter(f"{_ENDPOINTS}.minigolfstrategy", "courses_router", "/minigolfstrategy", ["minigolfstrategy_courses"]),
+        LazyRouter(f"{_ENDPOINTS}.minigolfstrategy", "factor_analysis_router", "/minigolfstrategy/factor-analysis", ["minigolfstrategy_factor_analysis"]),
+    ]),
+
+    # Consumer Options Sentiment endpoints
+    LazyRouterGroup("consumeroptions", "/consumeroptions", [
+        LazyRouter(f"{_ENDPOINTS}.consumeroptions", "chain_router", "/consumeroptions/chain", ["consumeroptions_chain"]),
+        LazyRouter(f"{_ENDPOINTS}.consumeroptions", "analytics_router", "/consumeroptions/analytics", ["consumeroptions_analytics"]),
+        LazyRouter(f"{_ENDPOINTS}.consumeroptions", "dashboard_router", "/consumeroptions/dashboard", ["consumeroptions_dashboard"]),
+        LazyRouter(f"{_ENDPOINTS}.consumeroptions.simulation", "router", "/consumeroptions", ["consumeroptions_simulation"]),
+    ]),
+
+    # ETF Dashboard endpoints
+    LazyRouterGroup("etf", "/etf", [
+        LazyRouter(f"{_ENDPOINTS}.etf", prefix="/etf", tags=["etf"]),
+    ]),
+
+    # Quantitative Analysis endpoints
+    LazyRouterGroup("quantitative_analysis", "/quantitative-analysis", [
+        LazyRouter(f"{_ENDPOINTS}.quantitative_analysis", prefix="/quantitative-analysis", tags=["quantitative_analysis"]),
+    ]),
+
+    # Simulation endpoints
+    LazyRouterGroup("simulation", "/simulation", [
+        LazyRouter(f"{_ENDPOINTS}.simulation", prefix="/simulation", tags=["simulation"]),
+    ]),
+
+    # Decision Reflection endpoints
+    LazyRouterGroup("decision_reflection", "/decision-reflection", [
+        LazyRouter(f"{_ENDPOINTS}.decision_reflection", prefix="/decision-reflection", tags=["decision_reflection"]),
+    ]),
+
+    # Market Pulse endpoints
+    LazyRouterGroup("market_pulse", "/market-pulse", [
+        LazyRouter(f"{_ENDPOINTS}.market_pulse", prefix="/market-pulse", tags=["market_pulse"]),
+    ]),
+]
 
 # Add API version info
 @api_router.get("/")
@@ -104,7 +115,8 @@ async def api_info():
                 "models": "/futurequant/models",
                 "signals": "/futurequant/signals",
                 "backtests": "/futurequant/backtests",
-                "paper_trading": "/futurequant/paper-trading"
+                "paper_trading": "/futurequant/paper-trading",
+                "jobs": "/futurequant/jobs"
             },
             "futureexploratorium": {
                 "core": "/futureexploratorium/core",
@@ -7,6 +7,7 @@ from .models import router as models_router
 from .signals import router as signals_router
 from .backtests import router as backtests_router
 from .paper_trading import router as paper_trading_router
+from .jobs import router as jobs_router
 
 __all__ = [
     "data_router",
@@ -14,5 +15,6 @@ __all__ = [
     "models_router",
     "signals_router",
     "backtests_router",
-    "paper_trading_router"
+    "paper_trading_router",
+    "jobs_router"
 ]
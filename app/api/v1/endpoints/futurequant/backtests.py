@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 
 from app.services.futurequant.backtest_service import FutureQuantBacktestService
+from app.services.futurequant.job_runner import get_job_runner, PRIORITY_NORMAL
 from app.services.usage_service import AsyncUsageService
 from app.core.dependencies import get_usage_service
 
@@ -21,45 +22,44 @@ class BacktestRequest(BaseModel):
     end_date: str = Field(..., description="End date (YYYY-MM-DD)")
     symbols: Optional[List[str]] = Field(None, description="List of symbols to backtest")
     initial_capital: float = Field(default=100000, description="Initial capital")
-    config: Optional[dict] = Field(None, description="Backtest configuration")
+    config_name: str = Field(default="moderate", description="Preset configuration (conservative, moderate, aggressive)")
+    config: Optional[dict] = Field(None, description="Backtest configuration overrides")
+    priority: int = Field(default=PRIORITY_NORMAL, ge=0, le=9, description="Job priority (0 = highest)")
 
 @router.post("/run", response_model=dict)
 async def run_backtest(
     request: BacktestRequest,
     usage_service: AsyncUsageService = Depends(get_usage_service)
 ):
-    """Run a backtest for a strategy"""
+    """Queue a backtest for a strategy; progress is pushed on /ws/jobs"""
     try:
-        # Create backtest service
-        backtest_service = FutureQuantBacktestService()
-        
-        # Run backtest
-        result = await backtest_service.run_backtest(
-            strategy_id=request.strategy_id,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            symbols=request.symbols,
-            initial_capital=request.initial_capital,
-            config=request.config
+        job_id = await get_job_runner().submit(
+            "backtest",
+            {
+                "strategy_id": request.strategy_id,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "symbols": request.symbols,
+                "initial_capital": request.initial_capital,
+                "config_name": request.config_name,
+                "config": request.config
+            },
+            priority=request.priority
         )
         
-        if result["success"]:
-            # Track successful request
-            await usage_service.track_request(
-                endpoint="futurequant_run_backtest",
-                response_time=0.0,  # Placeholder
-                success=True
-            )
-        else:
-            # Track failed request
-            await usage_service.track_request(
-                endpoint="futurequant_run_backtest",
-                response_time=0.0,  # Placeholder
-                success=False,
-                error=result.get("error", "Unknown error")
-            )
+        # Track successful request
+        await usage_service.track_request(
+            endpoint="futurequant_run_backtest",
+            response_time=0.0,  # Placeholder
+            success=True
+        )
         
-        return result
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "pending",
+            "strategy_id": request.strategy_id
+        }
         
     except Exception as e:
         logger.error(f"Backtest error: {str(e)}")
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Path, Qu
 from pydantic import BaseModel, Field
 
 from app.services.futurequant.data_service import FutureQuantDataService
+from app.services.futurequant.job_runner import get_job_runner, PRIORITY_NORMAL
 from app.services.usage_service import AsyncUsageService
 from app.core.dependencies import get_usage_service
 
@@ -20,6 +21,8 @@ class DataIngestRequest(BaseModel):
     start_date: str = Field(..., description="Start date (YYYY-MM-DD)")
     end_date: str = Field(..., description="End date (YYYY-MM-DD)")
     interval: str = Field(default="1d", description="Data interval (1m, 5m, 15m, 30m, 1h, 1d)")
+    full_refresh: bool = Field(default=False, description="Re-download the whole range instead of only bars after the last stored one")
+    priority: int = Field(default=PRIORITY_NORMAL, ge=0, le=9, description="Job priority (0 = highest)")
 
 class SymbolInfoResponse(BaseModel):
     id: int
@@ -32,7 +35,8 @@ class SymbolInfoResponse(BaseModel):
 
 class DataIngestResponse(BaseModel):
     success: bool
-    results: dict
+    job_id: int
+    status: str
     total_symbols: int
     interval: str
 
@@ -51,36 +55,34 @@ async def ingest_futures_data(
     background_tasks: BackgroundTasks,
     usage_service: AsyncUsageService = Depends(get_usage_service)
 ):
-    """Ingest historical futures data for specified symbols"""
+    """Queue ingestion of historical futures data; progress is pushed on /ws/jobs"""
     try:
-        # Create data service
-        data_service = FutureQuantDataService()
-        
-        # Ingest data
-        result = await data_service.ingest_data(
-            symbols=request.symbols,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            interval=request.interval
+        job_id = await get_job_runner().submit(
+            "ingest",
+            {
+                "symbols": request.symbols,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "interval": request.interval,
+                "full_refresh": request.full_refresh
+            },
+            priority=request.priority
         )
         
-        if result["success"]:
-            # Track successful request
-            await usage_service.track_request(
-                endpoint="futurequant_data_ingest",
-                response_time=0.0,  # Placeholder
-                success=True
-            )
-        else:
-            # Track failed request
-            await usage_service.track_request(
-                endpoint="futurequant_data_ingest",
-                response_time=0.0,  # Placeholder
-                success=False,
-                error=result.get("error", "Unknown error")
-            )
+        # Track successful request
+        await usage_service.track_request(
+            endpoint="futurequant_data_ingest",
+            response_time=0.0,  # Placeholder
+            success=True
+        )
         
-        return result
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "pending",
+            "total_symbols": len(request.symbols),
+            "interval": request.interval
+        }
         
     except Exception as e:
         logger.error(f"Data ingestion error: {str(e)}")
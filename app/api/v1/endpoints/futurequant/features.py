@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Path
 from pydantic import BaseModel, Field
 
 from app.services.futurequant.feature_service import FutureQuantFeatureService
+from app.services.futurequant.job_runner import get_job_runner, PRIORITY_NORMAL
 from app.services.usage_service import AsyncUsageService
 from app.core.dependencies import get_usage_service
 
@@ -21,6 +22,8 @@ class FeatureComputeRequest(BaseModel):
     end_date: str = Field(..., description="End date (YYYY-MM-DD)")
     recipe: str = Field(default="basic", description="Feature recipe (basic, momentum, trend, volatility, regime, full)")
     interval: str = Field(default="1d", description="Data interval")
+    full_refresh: bool = Field(default=False, description="Recompute the whole range instead of only bars after the last computed one")
+    priority: int = Field(default=PRIORITY_NORMAL, ge=0, le=9, description="Job priority (0 = highest)")
 
 class FeatureRecipeResponse(BaseModel):
     name: str
@@ -29,9 +32,10 @@ class FeatureRecipeResponse(BaseModel):
 
 class FeatureComputeResponse(BaseModel):
     success: bool
+    job_id: int
+    status: str
     symbol: str
     recipe: str
-    features_count: int
     start_date: str
     end_date: str
     interval: str
@@ -42,6 +46,8 @@ class FeatureBatchRequest(BaseModel):
     end_date: str = Field(..., description="End date (YYYY-MM-DD)")
     recipe: str = Field(default="basic", description="Feature recipe")
     interval: str = Field(default="1d", description="Data interval")
+    full_refresh: bool = Field(default=False, description="Recompute the whole range instead of only bars after the last computed one")
+    priority: int = Field(default=PRIORITY_NORMAL, ge=0, le=9, description="Job priority (0 = highest)")
 
 @router.post("/compute", response_model=FeatureComputeResponse)
 async def compute_features(
@@ -49,37 +55,38 @@ async def compute_features(
     background_tasks: BackgroundTasks,
     usage_service: AsyncUsageService = Depends(get_usage_service)
 ):
-    """Compute technical features for a futures symbol"""
+    """Queue technical feature computation for a futures symbol; progress is pushed on /ws/jobs"""
     try:
-        # Create feature service
-        feature_service = FutureQuantFeatureService()
-        
-        # Compute features
-        result = await feature_service.compute_features(
-            symbol=request.symbol,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            recipe=request.recipe,
-            interval=request.interval
+        job_id = await get_job_runner().submit(
+            "features",
+            {
+                "symbol": request.symbol,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "recipe": request.recipe,
+                "interval": request.interval,
+                "full_refresh": request.full_refresh
+            },
+            priority=request.priority
         )
         
-        if result["success"]:
-            # Track successful request
-            await usage_service.track_request(
-                endpoint="futurequant_compute_features",
-                response_time=0.0,  # Placeholder
-                success=True
-            )
-        else:
-            # Track failed request
-            await usage_service.track_request(
-                endpoint="futurequant_compute_features",
-                response_time=0.0,  # Placeholder
-                success=False,
-                error=result.get("error", "Unknown error")
-            )
+        # Track successful request
+        await usage_service.track_request(
+            endpoint="futurequant_compute_features",
+            response_time=0.0,  # Placeholder
+            success=True
+        )
         
-        return result
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "pending",
+            "symbol": request.symbol,
+            "recipe": request.recipe,
+            "start_date": request.start_date,
+            "end_date": request.end_date,
+            "interval": request.interval
+        }
         
     except Exception as e:
         logger.error(f"Feature computation error: {str(e)}")
@@ -231,50 +238,20 @@ async def compute_features_batch(
     request: FeatureBatchRequest,
     usage_service: AsyncUsageService = Depends(get_usage_service)
 ):
-    """Compute features for multiple symbols in batch"""
+    """Queue feature computation for many symbols, computed in parallel; per-symbol progress is pushed on /ws/jobs"""
     try:
-        # Create feature service
-        feature_service = FutureQuantFeatureService()
-        
-        results = {}
-        total_features = 0
-        
-        for symbol in request.symbols:
-            try:
-                result = await feature_service.compute_features(
-                    symbol=symbol,
-                    start_date=request.start_date,
-                    end_date=request.end_date,
-                    recipe=request.recipe,
-                    interval=request.interval
-                )
-                
-                results[symbol] = result
-                if result["success"]:
-                    total_features += result["features_count"]
-                    
-            except Exception as e:
-                results[symbol] = {
-                    "success": False,
-                    "error": str(e)
-                }
-        
-        # Calculate summary
-        successful_symbols = [s for s, r in results.items() if r["success"]]
-        failed_symbols = [s for s, r in results.items() if not r["success"]]
-        
-        summary = {
-            "success": True,
-            "total_symbols": len(request.symbols),
-            "successful_symbols": len(successful_symbols),
-            "failed_symbols": len(failed_symbols),
-            "total_features_computed": total_features,
-            "recipe": request.recipe,
-            "interval": request.interval,
-            "start_date": request.start_date,
-            "end_date": request.end_date,
-            "results": results
-        }
+        job_id = await get_job_runner().submit(
+            "features_batch",
+            {
+                "symbols": request.symbols,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "recipe": request.recipe,
+                "interval": request.interval,
+                "full_refresh": request.full_refresh
+            },
+            priority=request.priority
+        )
         
         # Track successful request
         await usage_service.track_request(
@@ -283,7 +260,16 @@ async def compute_features_batch(
             success=True
         )
         
-        return summary
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "pending",
+            "total_symbols": len(request.symbols),
+            "recipe": request.recipe,
+            "interval": request.interval,
+            "start_date": request.start_date,
+            "end_date": request.end_date
+        }
         
     except Exception as e:
         logger.error(f"Batch feature computation error: {str(e)}")
@@ -0,0 +1,47 @@
+"""
+FutureQuant Trader Background Job Endpoints
+"""
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services.futurequant.job_runner import get_job_runner
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/", response_model=dict)
+async def list_jobs(
+    kind: Optional[str] = Query(None, description="Filter by kind (ingest, features, features_batch, train, backtest)"),
+    status: Optional[str] = Query(None, description="Filter by status (pending, running, completed, failed, cancelled)"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """List recent background jobs, newest first"""
+    runner = get_job_runner()
+    return {
+        "success": True,
+        "jobs": runner.list_jobs(kind=kind, status=status, limit=limit),
+        "runner": runner.get_stats()
+    }
+
+@router.get("/{job_id}", response_model=dict)
+async def get_job(
+    job_id: int,
+    wait: float = Query(0, ge=0, le=300, description="Seconds to wait for the job to finish before answering")
+):
+    """Get a job's status, progress and result"""
+    runner = get_job_runner()
+    job = await runner.wait(job_id, timeout=wait) if wait else runner.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"success": True, "job": job}
+
+@router.post("/{job_id}/cancel", response_model=dict)
+async def cancel_job(job_id: int):
+    """Cancel a pending or running job"""
+    runner = get_job_runner()
+    if runner.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    cancelled = await runner.cancel(job_id)
+    return {"success": cancelled, "job_id": job_id, "job": runner.get_job(job_id)}
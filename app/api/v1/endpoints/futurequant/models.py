@@ -7,6 +7,9 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
 
 from app.services.futurequant.model_service import FutureQuantModelService
+from app.services.futurequant.model_cache import get_model_cache
+from app.services.futurequant.hyperparam_sweep import STRATEGIES, validate_space
+from app.services.futurequant.job_runner import get_job_runner, PRIORITY_NORMAL
 from app.services.usage_service import AsyncUsageService
 from app.core.dependencies import get_usage_service
 from app.models.database import get_db
@@ -24,6 +27,27 @@ class ModelTrainRequest(BaseModel):
     start_date: Optional[str] = Field(None, description="Start date (YYYY-MM-DD)")
     end_date: Optional[str] = Field(None, description="End date (YYYY-MM-DD)")
     test_size: float = Field(default=0.2, ge=0.1, le=0.5, description="Test set size")
+    priority: int = Field(default=PRIORITY_NORMAL, ge=0, le=9, description="Job priority (0 = highest)")
+
+class ModelSweepRequest(BaseModel):
+    symbol: str = Field(..., description="Futures symbol to tune the model for")
+    model_type: str = Field(default="quantile_regression", description="Model type")
+    space: Dict[str, Any] = Field(..., description="Hyperparameter -> list of values or {low, high, log, type} range")
+    strategy: str = Field(default="random", description=f"One of {', '.join(STRATEGIES)}")
+    n_trials: int = Field(default=20, ge=1, le=500, description="Sampled configurations (random, successive_halving)")
+    eta: int = Field(default=3, ge=2, le=10, description="Successive-halving reduction factor")
+    horizon_minutes: float = Field(default=1440, description="Forecast horizon in minutes")
+    start_date: Optional[str] = Field(None, description="Start date (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="End date (YYYY-MM-DD)")
+    test_size: float = Field(default=0.2, ge=0.1, le=0.5, description="Test set size")
+    val_fraction: float = Field(default=0.2, ge=0.05, le=0.5, description="Share of the training rows trials are scored on")
+    base_params: Optional[Dict[str, Any]] = Field(None, description="Hyperparameters fixed for every trial")
+    max_parallel: Optional[int] = Field(None, ge=1, description="Trials running at once")
+    trial_timeout: Optional[float] = Field(None, gt=0, description="Seconds per trial")
+    trial_threads: Optional[int] = Field(None, ge=1, description="Native threads per trial")
+    trial_max_memory_mb: Optional[int] = Field(None, ge=64, description="Address-space cap per trial")
+    seed: Optional[int] = Field(None, description="Seed for sampling configurations")
+    priority: int = Field(default=PRIORITY_NORMAL, ge=0, le=9, description="Job priority (0 = highest)")
 
 class ModelPredictRequest(BaseModel):
     model_id: int = Field(..., description="Trained model ID")
@@ -31,6 +55,15 @@ class ModelPredictRequest(BaseModel):
     start_date: str = Field(..., description="Start date (YYYY-MM-DD)")
     end_date: str = Field(..., description="End date (YYYY-MM-DD)")
 
+class PredictionTarget(BaseModel):
+    symbol: str = Field(..., description="Futures symbol")
+    model_id: int = Field(..., description="Trained model ID")
+
+class ModelBatchPredictRequest(BaseModel):
+    targets: List[PredictionTarget] = Field(..., min_items=1, description="(symbol, model) pairs to forecast")
+    start_date: str = Field(..., description="Start date (YYYY-MM-DD)")
+    end_date: str = Field(..., description="End date (YYYY-MM-DD)")
+
 class ModelInfoResponse(BaseModel):
     id: int
     name: str
@@ -47,38 +80,36 @@ async def train_model(
     background_tasks: BackgroundTasks,
     usage_service: AsyncUsageService = Depends(get_usage_service)
 ):
-    """Train a new ML model for futures prediction"""
+    """Queue training of a new ML model for futures prediction; progress is pushed on /ws/jobs"""
     try:
-        # Create model service
-        model_service = FutureQuantModelService()
-        
-        # Train model
-        result = await model_service.train_model(
-            symbol=request.symbol,
-            model_type=request.model_type,
-            horizon_minutes=request.horizon_minutes,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            test_size=request.test_size
+        job_id = await get_job_runner().submit(
+            "train",
+            {
+                "symbol": request.symbol,
+                "model_type": request.model_type,
+                "horizon_minutes": request.horizon_minutes,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "test_size": request.test_size
+            },
+            priority=request.priority
         )
         
-        if result["success"]:
-            # Track successful request
-            await usage_service.track_request(
-                endpoint="futurequant_train_model",
-                response_time=0.0,  # Placeholder
-                success=True
-            )
-        else:
-            # Track failed request
-            await usage_service.track_request(
-                endpoint="futurequant_train_model",
-                response_time=0.0,  # Placeholder
-                success=False,
-                error=result.get("error", "Unknown error")
-            )
+        # Track successful request
+        await usage_service.track_request(
+            endpoint="futurequant_train_model",
+            response_time=0.0,  # Placeholder
+            success=True
+        )
         
-        return result
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "pending",
+            "symbol": request.symbol,
+            "model_type": request.model_type,
+            "horizon_minutes": request.horizon_minutes
+        }
         
     except Exception as e:
         logger.error(f"Model training error: {str(e)}")
@@ -90,6 +121,45 @@ async def train_model(
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/sweep", response_model=dict)
+async def sweep_hyperparameters(
+    request: ModelSweepRequest,
+    usage_service: AsyncUsageService = Depends(get_usage_service)
+):
+    """Queue a hyperparameter sweep; each finished trial is pushed on /ws/jobs"""
+    try:
+        validate_space(request.space, request.strategy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        params = request.model_dump(exclude={"priority"})
+        job_id = await get_job_runner().submit("sweep", params, priority=request.priority)
+        
+        await usage_service.track_request(
+            endpoint="futurequant_sweep_model",
+            response_time=0.0,  # Placeholder
+            success=True
+        )
+        
+        return {
+            "success": True,
+            "job_id": job_id,
+            "status": "pending",
+            "symbol": request.symbol,
+            "model_type": request.model_type,
+            "strategy": request.strategy
+        }
+        
+    except Exception as e:
+        logger.error(f"Hyperparameter sweep error: {str(e)}")
+        await usage_service.track_request(
+            endpoint="futurequant_sweep_model",
+            response_time=0.0,  # Placeholder
+            success=False,
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/predict", response_model=dict)
 async def predict_with_model(
     request: ModelPredictRequest,
@@ -136,6 +206,39 @@ async def predict_with_model(
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/predict-batch", response_model=dict)
+async def predict_batch(
+    request: ModelBatchPredictRequest,
+    usage_service: AsyncUsageService = Depends(get_usage_service)
+):
+    """Forecast many (symbol, model) pairs with one forward pass per model and one forecast insert"""
+    try:
+        model_service = FutureQuantModelService()
+        result = await model_service.predict_batch(
+            [(target.symbol, target.model_id) for target in request.targets],
+            start_date=request.start_date,
+            end_date=request.end_date
+        )
+        
+        await usage_service.track_request(
+            endpoint="futurequant_predict_batch",
+            response_time=0.0,  # Placeholder
+            success=result["success"],
+            error=None if result["success"] else result.get("error", "Unknown error")
+        )
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}")
+        await usage_service.track_request(
+            endpoint="futurequant_predict_batch",
+            response_time=0.0,  # Placeholder
+            success=False,
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/types")
 async def get_model_types(
     usage_service: AsyncUsageService = Depends(get_usage_service)
@@ -248,6 +351,9 @@ async def get_model_status(
                 "gradient_boosting": "Ensemble learning with regularization"
             }
         }
+        model_cache = get_model_cache()
+        if model_cache is not None:
+            status["model_cache"] = model_cache.get_stats()
         
         # Track successful request
         await usage_service.track_request(
@@ -3,9 +3,19 @@ Monitoring endpoints
 """
 import time
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from ....core.dependencies import get_ai_service
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse
+from ....core.dependencies import get_ai_service, require_admin
 from ....services.ai_service import AsyncAIService
+from ....core.lazy_routers import get_lazy_router_loader
+from ....core.metrics import get_metrics_registry
+from ....core.profiler import (
+    get_profiler, collapsed_text, summarize, ProfilerBusyError,
+    THREAD_MODES, THREADS_LOOP_AND_EXECUTORS, MAX_DURATION_SECONDS, MAX_SAMPLE_RATE_HZ
+)
+from ....core.redis_pool import get_redis_pool
+from ....core.compute import get_compute_executor
+from ....services.cache_service import get_shared_cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +30,83 @@ async def health_check():
         "timestamp": time.time()
     }
 
+@router.get("/cache/stats")
+async def cache_stats():
+    """Per-namespace hit/miss/eviction counters for this worker's cache"""
+    pool = get_redis_pool()
+    return {
+        "success": True,
+        "stats": get_shared_cache_service().get_stats(),
+        "redis_pool": pool.get_stats() if pool is not None else None,
+        "timestamp": time.time()
+    }
+
+@router.get("/metrics")
+async def metrics_summary(min_requests: int = 0):
+    """Per-route request counts, status classes, in-flight requests and latency percentiles"""
+    return {
+        "success": True,
+        "metrics": get_metrics_registry().summary(min_requests=min_requests),
+        "timestamp": time.time()
+    }
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def profile_worker(
+    duration: float = Query(5.0, gt=0, le=MAX_DURATION_SECONDS, description="Seconds to sample"),
+    rate_hz: int = Query(100, ge=1, le=MAX_SAMPLE_RATE_HZ, description="Samples per second"),
+    threads: str = Query(THREADS_LOOP_AND_EXECUTORS, description="loop | executors | all"),
+    format: str = Query("collapsed", description="collapsed (flamegraph input) | json"),
+    include_lines: bool = Query(False, description="Keep line numbers in frame labels"),
+    top: int = Query(30, ge=1, le=500, description="Rows per table in json format")
+):
+    """Sample this worker's stacks (event loop and executor threads) for a few seconds.
+
+    Event loop samples are tagged with the route of the request running at that
+    moment. The collapsed output can be fed to flamegraph.pl or speedscope.
+    """
+    if threads not in THREAD_MODES:
+        raise HTTPException(status_code=400, detail=f"threads must be one of {', '.join(THREAD_MODES)}")
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+
+    try:
+        result = await get_profiler().profile(
+            duration=duration, rate_hz=rate_hz, threads=threads, include_lines=include_lines
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(collapsed_text(result["stacks"]), headers={
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Duration": str(result["duration_seconds"])
+        })
+    stacks = result.pop("stacks")
+    return {
+        "success": True,
+        "profile": {**result, **summarize(stacks, top=top)},
+        "timestamp": time.time()
+    }
+
+@router.get("/routers")
+async def router_status():
+    """Which lazily loaded feature routers are loaded, and how long each import took"""
+    loader = get_lazy_router_loader()
+    return {
+        "success": True,
+        "routers": loader.get_status() if loader is not None else {},
+        "timestamp": time.time()
+    }
+
+@router.get("/compute")
+async def compute_stats():
+    """Queue depth, wait and run times of the shared compute pools"""
+    return {
+        "success": True,
+        "compute": get_compute_executor().get_stats(),
+        "timestamp": time.time()
+    }
+
 @router.get("/test")
 async def test():
     """Basic test endpoint"""
@@ -0,0 +1,367 @@
+"""
+Shared compute executor for work that must not run on the event loop.
+
+- CPU-bound jobs (model training, feature sets, backtests, TF-IDF fits) run in a
+  process pool so they neither block the loop nor hold the GIL.
+- Blocking I/O and GIL-releasing native calls (HTTP SDKs, embeddings) run in a
+  bounded thread pool.
+
+Every job gets an optional timeout; awaiting callers that are cancelled or time
+out cancel the job if it has not started yet. Queue depth, wait time and run
+time per pool are exported through ``get_stats`` and the Prometheus endpoint.
+
+Process-pool jobs must be picklable: pass module-level functions, or use
+``run_method_cpu`` to run a method of a service class inside the worker.
+``run_cpu_with_events`` hands the job a queue for progress events (e.g. one
+per training epoch) that the caller receives while the job is still running.
+"""
+import os
+import sys
+import time
+import queue
+import asyncio
+import logging
+import inspect
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CPU_POOL = "cpu"
+IO_POOL = "io"
+
+
+class ComputeError(Exception):
+    """Base class for compute executor errors"""
+    pass
+
+
+class ComputeTimeoutError(ComputeError):
+    """Raised when a job does not finish within its timeout"""
+    pass
+
+
+class ComputeQueueFullError(ComputeError):
+    """Raised when a pool already has ``max_queue`` jobs waiting"""
+    pass
+
+
+def _init_worker(threads_per_worker: int):
+    """Process-pool initializer: keep native thread pools from oversubscribing cores"""
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ.setdefault(variable, str(threads_per_worker))
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads_per_worker)
+
+
+def _timed_call(fn: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[float, float, Any]:
+    """Run ``fn`` and report wall-clock start/finish so the parent can measure queue wait"""
+    started_at = time.time()
+    if "torch" in sys.modules and os.environ.get("OMP_NUM_THREADS"):
+        # torch may have been imported by the job itself after the initializer ran
+        torch = sys.modules["torch"]
+        threads = int(os.environ["OMP_NUM_THREADS"])
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+    result = fn(*args, **kwargs)
+    return started_at, time.time(), result
+
+
+def call_service_method(service_cls: type, method: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    """Worker entry point: build ``service_cls()`` and run one of its methods.
+
+    Coroutine methods are driven with ``asyncio.run`` since the worker has no loop.
+    """
+    result = getattr(service_cls(), method)(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+class PoolStats:
+    """Counters and timings for one pool"""
+
+    def __init__(self, kind: str, workers: int):
+        self.kind = kind
+        self.workers = workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+        self.active: Set[Future] = set()
+
+    def record_timing(self, submitted_at: float, started_at: float, finished_at: float):
+        wait = max(started_at - submitted_at, 0.0)
+        run = max(finished_at - started_at, 0.0)
+        self.wait_total += wait
+        self.run_total += run
+        self.wait_max = max(self.wait_max, wait)
+        self.run_max = max(self.run_max, run)
+
+    @property
+    def running(self) -> int:
+        return sum(1 for future in self.active if future.running())
+
+    @property
+    def queued(self) -> int:
+        return len(self.active) - self.running
+
+    def to_dict(self) -> Dict[str, Any]:
+        timed = self.completed + self.failed
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_total / timed * 1000, 2) if timed else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 2),
+            "avg_run_ms": round(self.run_total / timed * 1000, 2) if timed else 0.0,
+            "max_run_ms": round(self.run_max * 1000, 2),
+        }
+
+
+class ComputeExecutor:
+    """Process pool for CPU-bound jobs plus a bounded thread pool for blocking I/O"""
+
+    def __init__(self, cpu_workers: int = 0, io_workers: int = 16, max_queue: int = 64,
+                 use_processes: bool = True, start_method: str = "spawn",
+                 default_timeout: Optional[float] = None):
+        if cpu_workers <= 0:
+            cpu_workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self.start_method = start_method
+        self.default_timeout = default_timeout
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // cpu_workers)
+        self._executors: Dict[str, Any] = {}
+        self._stats = {CPU_POOL: PoolStats(CPU_POOL, cpu_workers), IO_POOL: PoolStats(IO_POOL, io_workers)}
+        self._lock = threading.Lock()
+
+    def _executor(self, pool: str):
+        with self._lock:
+            executor = self._executors.get(pool)
+            if executor is None:
+                if pool == CPU_POOL and self.use_processes:
+                    executor = ProcessPoolExecutor(
+                        max_workers=self.cpu_workers,
+                        mp_context=multiprocessing.get_context(self.start_method),
+                        initializer=_init_worker,
+                        initargs=(self.threads_per_worker,)
+                    )
+                    logger.info(f"Started compute process pool with {self.cpu_workers} workers")
+                else:
+                    workers = self.cpu_workers if pool == CPU_POOL else self.io_workers
+                    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"compute-{pool}")
+                self._executors[pool] = executor
+            return executor
+
+    def _reset_executor(self, pool: str):
+        """Drop a broken pool (e.g. a worker was OOM-killed); the next job starts a new one"""
+        with self._lock:
+            executor = self._executors.pop(pool, None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.warning(f"Compute {pool} pool was broken and has been reset")
+
+    async def run_cpu(self, fn: Callable, *args, timeout: Optional[float] = None, name: Optional[str] = None,
+                      **kwargs) -> Any:
+        """Run a CPU-bound function in the process pool"""
+        return await self._run(CPU_POOL, fn, args, kwargs, timeout, name)
+
+    async def run_io(self, fn: Callable, *args, timeout: Optional[float] = None, name: Optional[str] = None,
+                     **kwargs) -> Any:
+        """Run a blocking function in the bounded I/O thread pool"""
+        return await self._run(IO_POOL, fn, args, kwargs, timeout, name)
+
+    async def run_method_cpu(self, service_cls: type, method: str, *args, timeout: Optional[float] = None,
+                             name: Optional[str] = None, **kwargs) -> Any:
+        """Run ``service_cls().method(*args, **kwargs)`` in the process pool"""
+        return await self._run(
+            CPU_POOL, call_service_method, (service_cls, method, args, kwargs), {}, timeout,
+            name or f"{service_cls.__name__}.{method}"
+        )
+
+    async def run_cpu_with_events(self, fn: Callable, *args, on_event: Callable[[Any], Awaitable[None]],
+                                  timeout: Optional[float] = None, name: Optional[str] = None,
+                                  poll_interval: float = 0.25, **kwargs) -> Any:
+        """Run ``fn(*args, events=queue, **kwargs)`` in the process pool.
+
+        Items the job puts on ``events`` are handed to ``on_event`` in order while it runs;
+        every item is delivered before the result is returned.
+        """
+        manager = None
+        if self.use_processes:
+            # A plain multiprocessing queue cannot be pickled into a pool job; a manager queue can
+            manager = await self.run_io(multiprocessing.get_context(self.start_method).Manager,
+                                        name="events-manager")
+            events = manager.Queue()
+        else:
+            events = queue.Queue()
+
+        job = asyncio.ensure_future(self.run_cpu(fn, *args, events=events, timeout=timeout, name=name, **kwargs))
+        try:
+            while True:
+                finished = job.done()
+                while True:
+                    try:
+                        item = events.get_nowait()
+                    except queue.Empty:
+                        break
+                    await on_event(item)
+                if finished:
+                    return job.result()
+                await asyncio.wait({job}, timeout=poll_interval)
+        finally:
+            if not job.done():
+                job.cancel()
+            if manager is not None:
+                manager.shutdown()
+
+    async def _run(self, pool: str, fn: Callable, args: Tuple, kwargs: Dict[str, Any],
+                   timeout: Optional[float], name: Optional[str]) -> Any:
+        stats = self._stats[pool]
+        name = name or getattr(fn, "__name__", "job")
+        if stats.queued >= self.max_queue:
+            stats.rejected += 1
+            raise ComputeQueueFullError(f"Compute {pool} queue is full ({self.max_queue} jobs waiting)")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+        submitted_at = time.time()
+        future = self._executor(pool).submit(_timed_call, fn, args, kwargs)
+        stats.submitted += 1
+        stats.active.add(future)
+        future.add_done_callback(stats.active.discard)
+
+        try:
+            started_at, finished_at, result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            stats.timed_out += 1
+            if future.running():
+                logger.warning(f"Compute job {name} timed out after {timeout}s; worker will finish it in the background")
+            raise ComputeTimeoutError(f"{name} did not finish within {timeout}s")
+        except asyncio.CancelledError:
+            # Caller went away; drop the job if it has not started yet
+            future.cancel()
+            stats.cancelled += 1
+            raise
+        except BrokenProcessPool:
+            stats.failed += 1
+            self._reset_executor(pool)
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+
+        stats.completed += 1
+        stats.record_timing(submitted_at, started_at, finished_at)
+        logger.debug(f"Compute job {name} ran {finished_at - started_at:.3f}s "
+                     f"after waiting {started_at - submitted_at:.3f}s")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "use_processes": self.use_processes,
+            "start_method": self.start_method if self.use_processes else None,
+            "max_queue": self.max_queue,
+            "pools": {pool: stats.to_dict() for pool, stats in self._stats.items()},
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        """Queue depth gauges and job counters in Prometheus text format"""
+        lines = [
+            "# HELP compute_jobs_queued Jobs waiting for a compute worker.",
+            "# TYPE compute_jobs_queued gauge",
+        ]
+        pools = self.get_stats()["pools"]
+        lines += [f'compute_jobs_queued{{pool="{pool}"}} {stats["queued"]}' for pool, stats in pools.items()]
+        lines += [
+            "# HELP compute_jobs_running Jobs currently running on a compute worker.",
+            "# TYPE compute_jobs_running gauge",
+        ]
+        lines += [f'compute_jobs_running{{pool="{pool}"}} {stats["running"]}' for pool, stats in pools.items()]
+        lines += [
+            "# HELP compute_jobs_total Finished compute jobs by outcome.",
+            "# TYPE compute_jobs_total counter",
+        ]
+        for pool, stats in pools.items():
+            for outcome in ("completed", "failed", "cancelled", "timed_out", "rejected"):
+                lines.append(f'compute_jobs_total{{pool="{pool}",outcome="{outcome}"}} {stats[outcome]}')
+        return lines
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_compute_executor: Optional[ComputeExecutor] = None
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """Return the process-wide compute executor configured from settings"""
+    global _compute_executor
+    if _compute_executor is None:
+        _compute_executor = ComputeExecutor(
+            cpu_workers=settings.compute_cpu_workers,
+            io_workers=settings.compute_io_workers,
+            max_queue=settings.compute_max_queue,
+            use_processes=settings.compute_use_processes,
+            start_method=settings.compute_start_method,
+            default_timeout=settings.compute_default_timeout
+        )
+    return _compute_executor
+
+
+async def run_cpu(fn: Callable, *args, timeout: Optional[float] = None, name: Optional[str] = None, **kwargs) -> Any:
+    """Shortcut for ``get_compute_executor().run_cpu(...)``"""
+    return await get_compute_executor().run_cpu(fn, *args, timeout=timeout, name=name, **kwargs)
+
+
+async def run_cpu_with_events(fn: Callable, *args, on_event: Callable[[Any], Awaitable[None]],
+                              timeout: Optional[float] = None, name: Optional[str] = None, **kwargs) -> Any:
+    """Shortcut for ``get_compute_executor().run_cpu_with_events(...)``"""
+    return await get_compute_executor().run_cpu_with_events(
+        fn, *args, on_event=on_event, timeout=timeout, name=name, **kwargs
+    )
+
+
+async def run_io(fn: Callable, *args, timeout: Optional[float] = None, name: Optional[str] = None, **kwargs) -> Any:
+    """Shortcut for ``get_compute_executor().run_io(...)``"""
+    return await get_compute_executor().run_io(fn, *args, timeout=timeout, name=name, **kwargs)
+
+
+async def run_method_cpu(service_cls: type, method: str, *args, timeout: Optional[float] = None,
+                         name: Optional[str] = None, **kwargs) -> Any:
+    """Shortcut for ``get_compute_executor().run_method_cpu(...)``"""
+    return await get_compute_executor().run_method_cpu(
+        service_cls, method, *args, timeout=timeout, name=name, **kwargs
+    )
+
+
+def shutdown_compute_executor():
+    """Stop the pools on application shutdown"""
+    global _compute_executor
+    if _compute_executor is not None:
+        _compute_executor.shutdown(wait=False)
+        _compute_executor = None
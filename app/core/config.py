@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Optional, Dict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -17,6 +17,78 @@ class Settings(BaseSettings):
     redis_url: Optional[str] = None
     cache_enabled: bool = True
     cache_ttl: int = 300  # 5 minutes
+    cache_l1_max_entries: int = 2048  # in-process LRU in front of Redis
+    cache_l1_max_bytes: int = 64 * 1024 * 1024  # 64 MB per worker
+    cache_compression: str = "auto"  # auto | zstd | lz4 | zlib | none
+    cache_compress_min_bytes: int = 4096
+    redis_max_connections: int = 50  # shared pool per worker
+    redis_socket_timeout: float = 1.0  # seconds; keep short so a stuck Redis falls back to L1 fast
+    redis_connect_timeout: float = 1.0
+    redis_health_check_interval: int = 15  # seconds between background pings
+    redis_breaker_failure_threshold: int = 3  # consecutive failures before skipping Redis
+    redis_breaker_reset_timeout: float = 30.0  # seconds before probing Redis again
+    
+    # Startup
+    lazy_routers: bool = True  # import feature routers on first use instead of at startup
+    router_warmup: bool = True  # load lazy routers in the background after startup
+    router_warmup_delay: float = 2.0  # seconds after startup before warm-up begins
+    
+    # Monitoring
+    slow_request_log_seconds: float = 2.0  # requests slower than this are logged as warnings
+    admin_token: Optional[str] = os.getenv("ADMIN_TOKEN")  # required for admin-only endpoints (profiler)
+    
+    # Compute executor
+    compute_use_processes: bool = True  # False runs CPU jobs in threads (useful in tests)
+    compute_start_method: str = "spawn"  # fork is unsafe with torch/threads already running
+    compute_cpu_workers: int = 0  # 0 = min(4, cpu_count - 1)
+    compute_io_workers: int = 16
+    compute_max_queue: int = 64  # jobs waiting per pool before new ones are rejected
+    compute_default_timeout: Optional[float] = 600.0  # seconds
+    compute_training_timeout: float = 3600.0  # seconds for model training jobs
+    feature_batch_workers: int = 0  # symbols batch_compute_features computes at once; 0 = compute_cpu_workers
+    
+    # Model training
+    training_intra_op_threads: int = 0  # torch intra-op threads per training job; 0 = compute pool's share per worker
+    training_inter_op_threads: int = 1  # torch inter-op threads per training job; 0 = torch default
+    training_mlflow_logging: bool = True  # log per-epoch training history to MLflow when it is installed
+    transformer_export_format: str = "auto"  # auto (onnx if onnxruntime is installed, else torchscript) | torchscript | onnx | none
+    training_keep_models: int = 0  # newest completed models kept per symbol/type/horizon; older ones are archived and their files deleted; 0 = keep all
+    
+    # Hyperparameter sweeps
+    sweep_max_parallel: int = 0  # trials running at once; 0 = compute_cpu_workers
+    sweep_trial_timeout: float = 900.0  # seconds per trial, counted from its start in the worker
+    sweep_trial_threads: int = 0  # BLAS/OpenMP/torch threads per trial; 0 = compute pool's share per worker
+    sweep_trial_max_memory_mb: int = 0  # address-space cap per trial (Linux process pool only); 0 = none
+    
+    # Loaded-model cache (prediction paths)
+    serving_cache_enabled: bool = True
+    serving_cache_max_bytes: int = 512 * 1024 * 1024  # artifact bytes kept loaded per worker
+    serving_cache_max_entries: int = 32
+    serving_cache_warmup: bool = True  # load active models in the background after startup
+    
+    # Background jobs (futurequant_jobs table, no external broker)
+    job_runner_enabled: bool = True
+    job_workers: int = 4  # jobs running at once across all kinds
+    job_concurrency: Dict[str, int] = {"ingest": 2, "features": 2, "features_batch": 1, "train": 2, "sweep": 1, "backtest": 2}
+    job_max_retries: int = 2
+    job_retry_backoff: float = 5.0  # seconds before the first retry, doubled per attempt
+    
+    # Bar ingestion (only the missing tail per symbol is fetched)
+    ingest_concurrency: int = 4  # provider requests in flight at once
+    ingest_requests_per_second: float = 2.0  # provider rate budget; 0 = unlimited
+    ingest_batch_size: int = 20  # symbols per request, capped by what the provider allows
+    
+    # Symbol registry (in-memory futurequant_symbols map)
+    symbol_registry_miss_reload_seconds: float = 5.0  # least time between reloads triggered by unknown tickers/ids
+    
+    # Columnar bar store (Parquet history next to futurequant_bars)
+    bar_store_enabled: bool = True
+    bar_store_path: str = "./data/bar_store"
+    rollup_cache_ttl: int = 3600  # coarser bars rolled up from finer stored ones
+    
+    # Columnar feature store (Parquet feature matrices instead of JSON futurequant_features rows)
+    feature_store_enabled: bool = True
+    feature_store_path: str = "./data/feature_store"
     
     # Rate limiting
     rate_limit_per_hour: int = 50
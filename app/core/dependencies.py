@@ -1,8 +1,10 @@
-from fastapi import Depends
-from typing import AsyncGenerator
+import secrets
+from fastapi import Depends, Header, HTTPException
+from typing import Optional
 import httpx
 import redis.asyncio as redis
 from .config import settings
+from .redis_pool import get_redis_pool
 
 # Global HTTP client variable
 _http_client = None
@@ -38,23 +40,30 @@ async def cleanup_http_client():
         _http_client = None
 
 # Redis client dependency
-async def get_redis_client() -> AsyncGenerator[redis.Redis, None]:
-    """Dependency for Redis client"""
-    if settings.redis_url:
-        redis_client = redis.from_url(settings.redis_url)
-        try:
-            await redis_client.ping()
-            yield redis_client
-        finally:
-            await redis_client.close()
-    else:
-        yield None
+async def get_redis_client() -> Optional[redis.Redis]:
+    """Dependency for the process-wide pooled Redis client (None when not configured)"""
+    pool = get_redis_pool()
+    return pool.client if pool is not None else None
+
+# Admin-only endpoints
+async def require_admin(
+    x_admin_token: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None)
+):
+    """Require the configured ADMIN_TOKEN as X-Admin-Token or a Bearer token"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    token = x_admin_token
+    if token is None and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token or not secrets.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
 
 # Cache service dependency
-async def get_cache_service(redis_client: redis.Redis = Depends(get_redis_client)):
-    """Dependency for cache service"""
-    from ..services.cache_service import AsyncCacheService
-    return AsyncCacheService(redis_client)
+async def get_cache_service():
+    """Dependency for cache service, shared by all requests and backed by the Redis pool"""
+    from ..services.cache_service import get_shared_cache_service
+    return get_shared_cache_service()
 
 # Usage tracking service dependency
 async def get_usage_service():
@@ -0,0 +1,177 @@
+"""
+Lazy loading for feature routers.
+
+Feature areas (FutureQuant, FutureExploratorium, RAG, ...) import torch,
+vectorbt, qf-lib, mlflow and friends through their service modules. Instead of
+importing them while the app is created, each area registers a cheap
+placeholder route on its URL prefix. The first request under that prefix (or
+the background warm-up after startup) imports the endpoint modules in a worker
+thread, includes the real routers into the app and removes the placeholder.
+"""
+import time
+import asyncio
+import logging
+import importlib
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope, Receive, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LazyRouter:
+    """One router attribute of an endpoint module, included at ``prefix``"""
+    module: str
+    attribute: str = "router"
+    prefix: str = ""
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class LazyRouterGroup:
+    """Routers that share a URL prefix and are loaded together"""
+    name: str
+    prefix: str
+    routers: List[LazyRouter]
+
+
+class LazyRouterRoute(BaseRoute):
+    """Placeholder matching every path under a group's prefix until it is loaded"""
+
+    def __init__(self, loader: "LazyRouterLoader", group: LazyRouterGroup, path_prefix: str):
+        self.loader = loader
+        self.group = group
+        self.path_prefix = path_prefix.rstrip("/")
+        # Routes expose these for introspection (e.g. ``[r.path for r in app.routes]``)
+        self.path = f"{self.path_prefix}/{{path:path}}"
+        self.name = f"lazy:{group.name}"
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if scope["type"] not in ("http", "websocket"):
+            return Match.NONE, {}
+        path = scope["path"]
+        if path == self.path_prefix or path.startswith(self.path_prefix + "/"):
+            return Match.FULL, {}
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.loader.load(self.group.name)
+        # The real routes have replaced this placeholder; dispatch again
+        await self.loader.app.router(scope, receive, send)
+
+
+class LazyRouterLoader:
+    """Registry of lazily loaded router groups for one FastAPI app"""
+
+    def __init__(self, app: FastAPI, groups: List[LazyRouterGroup], prefix: str = ""):
+        self.app = app
+        self.prefix = prefix
+        self.groups = {group.name: group for group in groups}
+        self.placeholders: Dict[str, LazyRouterRoute] = {}
+        self.load_times: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def install(self):
+        """Register a placeholder route per group"""
+        for group in self.groups.values():
+            placeholder = LazyRouterRoute(self, group, self.prefix + group.prefix)
+            self.placeholders[group.name] = placeholder
+            self.app.router.routes.append(placeholder)
+
+        # OpenAPI must describe every route, so generating it loads whatever is still pending
+        original_openapi = self.app.openapi
+
+        def openapi():
+            if self.app.openapi_schema is None:
+                self.load_all_sync()
+            return original_openapi()
+
+        self.app.openapi = openapi
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self.load_times
+
+    async def load(self, name: str):
+        """Import a group's modules off the event loop, then include its routers"""
+        if self.is_loaded(name):
+            return
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if self.is_loaded(name):
+                return
+            group = self.groups[name]
+            started = time.perf_counter()
+            modules = await asyncio.to_thread(self._import_modules, group)
+            self._include(group, modules, started)
+
+    def load_all_sync(self):
+        """Load every pending group in the calling thread"""
+        for name, group in self.groups.items():
+            if not self.is_loaded(name):
+                started = time.perf_counter()
+                self._include(group, self._import_modules(group), started)
+
+    async def warm_up(self, delay: float = 0.0):
+        """Load every group in the background, one at a time, after ``delay`` seconds"""
+        if delay:
+            await asyncio.sleep(delay)
+        for name in list(self.groups):
+            try:
+                await self.load(name)
+            except Exception as e:
+                logger.warning(f"Router warm-up failed for {name}: {e}")
+        logger.info(
+            "Router warm-up finished: "
+            + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.load_times.items())
+        )
+
+    @staticmethod
+    def _import_modules(group: LazyRouterGroup) -> Dict[str, Any]:
+        return {router.module: importlib.import_module(router.module) for router in group.routers}
+
+    def _include(self, group: LazyRouterGroup, modules: Dict[str, Any], started: float):
+        for router in group.routers:
+            self.app.include_router(
+                getattr(modules[router.module], router.attribute),
+                prefix=self.prefix + router.prefix,
+                tags=router.tags or None
+            )
+        placeholder = self.placeholders.pop(group.name, None)
+        if placeholder is not None and placeholder in self.app.router.routes:
+            self.app.router.routes.remove(placeholder)
+        self.app.openapi_schema = None
+        self.load_times[group.name] = time.perf_counter() - started
+        logger.info(f"Loaded {group.name} routers in {self.load_times[group.name]:.2f}s")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "prefix": self.prefix + group.prefix,
+                "loaded": self.is_loaded(name),
+                "load_seconds": round(self.load_times[name], 3) if self.is_loaded(name) else None
+            }
+            for name, group in self.groups.items()
+        }
+
+
+_loader: Optional[LazyRouterLoader] = None
+
+
+def install_lazy_routers(app: FastAPI, groups: List[LazyRouterGroup], prefix: str = "",
+                         lazy: bool = True) -> LazyRouterLoader:
+    """Register the groups on ``app``; with ``lazy=False`` they are loaded immediately"""
+    global _loader
+    _loader = LazyRouterLoader(app, groups, prefix)
+    _loader.install()
+    if not lazy:
+        _loader.load_all_sync()
+    return _loader
+
+
+def get_lazy_router_loader() -> Optional[LazyRouterLoader]:
+    return _loader
@@ -0,0 +1,190 @@
+"""
+In-process request metrics: per-route counts, status classes, in-flight gauges
+and latency histograms.
+
+Routes are keyed by their templated path (``/api/v1/etf/info/{symbol}``), not the
+raw URL, so cardinality stays bounded. Metrics are per worker process and are
+rendered in Prometheus text exposition format by ``render_prometheus``.
+"""
+import time
+import bisect
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# Latency bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram (non-cumulative counts; the last slot is +Inf)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for position, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[position - 1] if position > 0 else 0.0
+                upper = self.buckets[position] if position < len(self.buckets) else self.max
+                return lower + (upper - lower) * ((rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+
+class RouteMetrics:
+    """Counters for one (method, route template) pair"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.requests = 0
+        self.in_flight = 0
+        self.status_classes: Dict[str, int] = {}
+        self.latency = LatencyHistogram(buckets)
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.latency
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "status": dict(self.status_classes),
+            "latency_ms": {
+                "mean": round(latency.total / latency.count * 1000, 2) if latency.count else 0.0,
+                "p50": round(latency.quantile(0.50) * 1000, 2),
+                "p95": round(latency.quantile(0.95) * 1000, 2),
+                "p99": round(latency.quantile(0.99) * 1000, 2),
+                "max": round(latency.max * 1000, 2),
+            },
+        }
+
+
+class MetricsRegistry:
+    """Process-wide request metrics, updated by the instrumentation middleware"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started_at = time.time()
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes.setdefault(key, RouteMetrics(self.buckets))
+        return metrics
+
+    def request_started(self, method: str, route: str):
+        with self._lock:
+            self._route(method, route).in_flight += 1
+
+    def request_finished(self, method: str, started_route: str, route: str, status_code: int, seconds: float):
+        """Record a finished request.
+
+        ``started_route`` is the key the in-flight gauge was raised under; the
+        final ``route`` is only known once routing has happened.
+        """
+        status_class = f"{status_code // 100}xx"
+        with self._lock:
+            self._route(method, started_route).in_flight -= 1
+            metrics = self._route(method, route)
+            metrics.requests += 1
+            metrics.status_classes[status_class] = metrics.status_classes.get(status_class, 0) + 1
+            metrics.latency.observe(seconds)
+
+    def summary(self, min_requests: int = 0) -> Dict[str, Any]:
+        """JSON-friendly per-route summary, slowest p95 first"""
+        with self._lock:
+            routes = [
+                {"method": method, "route": route, **metrics.to_dict()}
+                for (method, route), metrics in self._routes.items()
+                if metrics.requests >= min_requests or metrics.in_flight
+            ]
+        routes.sort(key=lambda r: r["latency_ms"]["p95"], reverse=True)
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "total_requests": sum(r["requests"] for r in routes),
+            "in_flight": sum(r["in_flight"] for r in routes),
+            "routes": routes,
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = [
+            "# HELP http_requests_total Requests handled, by route template and status class.",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            snapshot = [
+                (method, route, metrics.in_flight, dict(metrics.status_classes),
+                 list(metrics.latency.counts), metrics.latency.total, metrics.latency.count)
+                for (method, route), metrics in sorted(self._routes.items())
+            ]
+
+        for method, route, _, status_classes, _, _, _ in snapshot:
+            for status_class, count in sorted(status_classes.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{_escape(route)}",'
+                    f'status="{status_class}"}} {count}'
+                )
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for method, route, in_flight, _, _, _, _ in snapshot:
+            lines.append(f'http_requests_in_flight{{method="{method}",route="{_escape(route)}"}} {in_flight}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for method, route, _, _, counts, total, count in snapshot:
+            if not count:
+                continue
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for upper, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{upper}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self.started_at = time.time()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide metrics registry"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -1,13 +1,21 @@
 """
 Middleware configuration for FastAPI application
 """
-from fastapi import Request, Response
+from typing import Optional, Dict, Tuple
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match, Mount, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 import logging
 
+from .config import settings
+from .metrics import MetricsRegistry, UNMATCHED_ROUTE, get_metrics_registry
+from .profiler import get_profiler
+
 logger = logging.getLogger(__name__)
 
 def setup_middleware(app):
@@ -26,26 +34,100 @@ def setup_middleware(app):
     limiter = Limiter(key_func=get_remote_address)
     app.state.limiter = limiter
     
-    # Request timing middleware
-    @app.middleware("http")
-    async def add_process_time_header(request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
-    
-    # Logging middleware
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        logger.info(
-            f"{request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
-            f"Time: {process_time:.3f}s"
-        )
-        
-        return response 
\ No newline at end of file
+    # Request metrics (also sets X-Process-Time)
+    app.add_middleware(InstrumentationMiddleware)
+
+
+class InstrumentationMiddleware:
+    """Pure ASGI middleware recording per-route request metrics.
+
+    Requests are keyed by route template once routing has happened. Only
+    requests slower than ``settings.slow_request_log_seconds`` are logged
+    above DEBUG.
+    """
+
+    # Bound on remembered (method, path) -> route template lookups
+    MAX_RESOLVED_PATHS = 10000
+
+    def __init__(self, app: ASGIApp, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or get_metrics_registry()
+        self._resolved: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+            await send(message)
+
+        # The in-flight gauge needs the route before the router has run
+        started_route = self._resolve_route(scope)
+        self.registry.request_started(method, started_route)
+        profiler = get_profiler()
+        profiled_task = profiler.register_task(f"{method} {started_route}") if profiler.active else None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.unregister_task(profiled_task)
+            process_time = time.perf_counter() - start_time
+            route = _route_template(scope, root_path)
+            self.registry.request_finished(method, started_route, route, status_code, process_time)
+            if process_time >= settings.slow_request_log_seconds:
+                logger.warning(f"Slow request: {method} {route} - Status: {status_code} - Time: {process_time:.3f}s")
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"{method} {scope['path']} - Status: {status_code} - Time: {process_time:.3f}s")
+
+
+    def _resolve_route(self, scope: Scope) -> str:
+        """Match the request against the app's routes, remembering the answer per path"""
+        key = (scope["method"], scope["path"])
+        template = self._resolved.get(key)
+        if template is not None:
+            return template
+
+        template = UNMATCHED_ROUTE
+        cacheable = True
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.NONE:
+                continue
+            if isinstance(route, Mount):
+                template = route.path + "/{path:path}"
+            elif isinstance(route, (APIRoute, Route)):
+                template = route.path
+            else:
+                # e.g. a lazy router placeholder; the real route is not registered yet
+                cacheable = False
+            if match == Match.FULL:
+                break
+
+        if cacheable:
+            if len(self._resolved) >= self.MAX_RESOLVED_PATHS:
+                self._resolved.clear()
+            self._resolved[key] = template
+        return template
+
+
+def _route_template(scope: Scope, root_path: str) -> str:
+    """Templated path of the route that handled the request, e.g. /api/v1/etf/info/{symbol}"""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    mounted = scope.get("root_path", "")
+    if mounted != root_path:
+        # Mounted sub-application such as /static
+        return mounted[len(root_path):] + "/{path:path}"
+    return UNMATCHED_ROUTE
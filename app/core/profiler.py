@@ -0,0 +1,235 @@
+"""
+On-demand sampling profiler for a live worker.
+
+A background thread snapshots every thread's Python stack (``sys._current_frames``)
+at a fixed rate for a bounded duration. Samples from the event loop thread are
+tagged with the route of the request whose task was running at that moment
+(tasks are registered by the instrumentation middleware while a profile is
+active). Output is collapsed stacks (``frame;frame;frame count``), which
+flamegraph.pl, speedscope and similar tools read directly.
+
+Profiles cover the current worker process only.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+MAX_DURATION_SECONDS = 60.0
+MAX_SAMPLE_RATE_HZ = 1000
+
+THREADS_LOOP = "loop"
+THREADS_LOOP_AND_EXECUTORS = "executors"  # event loop plus executor threads
+THREADS_ALL = "all"
+THREAD_MODES = (THREADS_LOOP, THREADS_LOOP_AND_EXECUTORS, THREADS_ALL)
+
+# Thread name prefixes used by concurrent.futures / asyncio default executors
+EXECUTOR_THREAD_PREFIXES = ("ThreadPoolExecutor", "asyncio_", "AnyIO worker thread", "compute-")
+
+_SITE_MARKERS = ("site-packages" + os.sep, "dist-packages" + os.sep)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+    pass
+
+
+def _short_filename(filename: str) -> str:
+    for marker in _SITE_MARKERS:
+        position = filename.rfind(marker)
+        if position != -1:
+            return filename[position + len(marker):]
+    if filename.startswith(_PROJECT_ROOT):
+        return filename[len(_PROJECT_ROOT):]
+    return os.path.basename(filename)
+
+
+class SamplingProfiler:
+    """Collect collapsed stacks from the running process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = False
+        # id(task) -> "METHOD /route/template", filled only while profiling
+        self._task_routes: Dict[int, str] = {}
+
+    @property
+    def active(self) -> bool:
+        return self._running
+
+    # Route tagging, called by the instrumentation middleware
+
+    def register_task(self, route: str) -> Optional[int]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        key = id(task)
+        self._task_routes[key] = route
+        return key
+
+    def unregister_task(self, key: Optional[int]):
+        if key is not None:
+            self._task_routes.pop(key, None)
+
+    # Profiling
+
+    async def profile(self, duration: float = 5.0, rate_hz: int = 100, threads: str = THREADS_LOOP_AND_EXECUTORS,
+                      include_lines: bool = False) -> Dict[str, Any]:
+        """Sample for ``duration`` seconds without blocking the event loop"""
+        if threads not in THREAD_MODES:
+            raise ValueError(f"threads must be one of {', '.join(THREAD_MODES)}")
+        duration = min(max(duration, 0.1), MAX_DURATION_SECONDS)
+        rate_hz = min(max(rate_hz, 1), MAX_SAMPLE_RATE_HZ)
+
+        with self._lock:
+            if self._running:
+                raise ProfilerBusyError("A profile is already running in this worker")
+            self._running = True
+
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        result: Dict[str, Any] = {}
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(loop, threading.get_ident(), stop, 1.0 / rate_hz, threads, include_lines, result),
+            name="tokimeki-profiler",
+            daemon=True
+        )
+        started = time.perf_counter()
+        try:
+            sampler.start()
+            await asyncio.sleep(duration)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+            self._task_routes.clear()
+            self._running = False
+
+        elapsed = time.perf_counter() - started
+        stacks: Counter = result.get("stacks", Counter())
+        samples = result.get("samples", 0)
+        return {
+            "duration_seconds": round(elapsed, 3),
+            "requested_rate_hz": rate_hz,
+            "effective_rate_hz": round(samples / elapsed, 1) if elapsed else 0.0,
+            "samples": samples,
+            "threads": threads,
+            "stacks": stacks,
+        }
+
+    def _sample(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int, stop: threading.Event,
+                interval: float, threads: str, include_lines: bool, result: Dict[str, Any]):
+        stacks: Counter = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        current_tasks = getattr(asyncio.tasks, "_current_tasks", {})
+        next_tick = time.perf_counter()
+
+        while not stop.is_set():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                label = self._thread_label(thread_id, names.get(thread_id, f"thread-{thread_id}"),
+                                           loop_thread_id, threads)
+                if label is None:
+                    continue
+                parts = [label]
+                if thread_id == loop_thread_id:
+                    task = current_tasks.get(loop)
+                    if task is None:
+                        parts.append("<idle>")
+                    else:
+                        parts.append(self._task_routes.get(id(task)) or "<background task>")
+                parts.extend(self._frames(frame, include_lines))
+                stacks[";".join(parts)] += 1
+            samples += 1
+
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                # Fell behind (GIL contention); resync instead of bursting
+                next_tick = time.perf_counter()
+
+        result["stacks"] = stacks
+        result["samples"] = samples
+
+    @staticmethod
+    def _thread_label(thread_id: int, name: str, loop_thread_id: int, threads: str) -> Optional[str]:
+        if thread_id == loop_thread_id:
+            return "event_loop"
+        if threads == THREADS_LOOP:
+            return None
+        is_executor = name.startswith(EXECUTOR_THREAD_PREFIXES)
+        if threads == THREADS_LOOP_AND_EXECUTORS and not is_executor:
+            return None
+        return f"executor:{name}" if is_executor else f"thread:{name}"
+
+    @staticmethod
+    def _frames(frame, include_lines: bool) -> List[str]:
+        """Root-first frame labels for one stack"""
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            location = _short_filename(code.co_filename)
+            if include_lines:
+                location = f"{location}:{frame.f_lineno}"
+            labels.append(f"{code.co_name} ({location})")
+            frame = frame.f_back
+        labels.reverse()
+        return labels
+
+
+def collapsed_text(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format: one ``frame;frame;frame count`` line per stack"""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+
+def summarize(stacks: Counter, top: int = 30) -> Dict[str, Any]:
+    """Top functions by self and total samples, plus samples per route tag"""
+    total = sum(stacks.values())
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    routes: Counter = Counter()
+    for stack, count in stacks.items():
+        parts = stack.split(";")
+        if parts[0] == "event_loop" and len(parts) > 1:
+            routes[parts[1]] += count
+        frames = [p for p in parts[1:] if " (" in p]
+        if frames:
+            self_counts[frames[-1]] += count
+        for frame in set(frames):
+            total_counts[frame] += count
+
+    def rows(counter: Counter) -> List[Dict[str, Any]]:
+        return [
+            {"frame": frame, "samples": count, "percent": round(100.0 * count / total, 2) if total else 0.0}
+            for frame, count in counter.most_common(top)
+        ]
+
+    return {
+        "total_samples": total,
+        "top_self": rows(self_counts),
+        "top_total": rows(total_counts),
+        "routes": dict(routes.most_common()),
+    }
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """Return the process-wide profiler"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
@@ -0,0 +1,195 @@
+"""
+Process-wide Redis connection pool with health checking and a circuit breaker.
+
+The pool is created once per worker (on startup, or lazily on first use) and
+shared by every cache service. When Redis stops answering, the breaker opens and
+callers skip the Redis tier entirely, so caching degrades to the in-process L1
+instead of paying a timeout on every request.
+"""
+import time
+import asyncio
+import logging
+import threading
+from typing import Optional, Dict, Any
+
+import redis.asyncio as redis
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow()`` returns False for ``reset_timeout`` seconds. After that a single
+    probe is let through (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one probe through
+                self.state = HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Redis circuit breaker closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                logger.warning(
+                    f"Redis circuit breaker opened after {self.consecutive_failures} failures; "
+                    f"using L1 cache only for {self.reset_timeout}s"
+                )
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+
+class RedisPool:
+    """Shared ``redis.asyncio`` client backed by one connection pool"""
+
+    def __init__(self, url: str, breaker: Optional[CircuitBreaker] = None):
+        self.url = url
+        self.connection_pool = redis.ConnectionPool.from_url(
+            url,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_connect_timeout,
+            health_check_interval=settings.redis_health_check_interval
+        )
+        self.client = redis.Redis(connection_pool=self.connection_pool)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.redis_breaker_failure_threshold,
+            reset_timeout=settings.redis_breaker_reset_timeout
+        )
+        self.last_ping_ms: Optional[float] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def ping(self) -> bool:
+        """Ping Redis and feed the result to the circuit breaker"""
+        started = time.perf_counter()
+        try:
+            await self.client.ping()
+            self.last_ping_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.breaker.record_success()
+            return True
+        except Exception as e:
+            logger.warning(f"Redis health check failed: {e}")
+            self.breaker.record_failure()
+            return False
+
+    def start_health_checks(self, interval: float):
+        """Ping periodically so an open breaker closes as soon as Redis is back"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.ensure_future(self._health_loop(interval))
+
+    async def _health_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.ping()
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._health_task = None
+        await self.client.close()
+        await self.connection_pool.disconnect()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.connection_pool.max_connections,
+            "in_use_connections": len(getattr(self.connection_pool, "_in_use_connections", ())),
+            "idle_connections": len(getattr(self.connection_pool, "_available_connections", ())),
+            "last_ping_ms": self.last_ping_ms,
+            "breaker": self.breaker.to_dict()
+        }
+
+
+# Process-wide pool, one per worker
+_redis_pool: Optional[RedisPool] = None
+
+
+def get_redis_pool() -> Optional[RedisPool]:
+    """Return the shared pool, creating it lazily; None when Redis is not configured"""
+    global _redis_pool
+    if _redis_pool is None and settings.cache_enabled and settings.redis_url:
+        try:
+            _redis_pool = RedisPool(settings.redis_url)
+        except Exception as e:
+            logger.warning(f"Could not create Redis connection pool, using L1 cache only: {e}")
+    return _redis_pool
+
+
+async def init_redis_pool() -> Optional[RedisPool]:
+    """Create the pool on startup, check connectivity and start background health checks"""
+    pool = get_redis_pool()
+    if pool is None:
+        logger.info("Redis not configured; caching is in-process only")
+        return None
+    if await pool.ping():
+        logger.info(f"Redis connection pool ready (max {pool.connection_pool.max_connections} connections)")
+    else:
+        logger.warning("Redis unreachable on startup; cache will serve from L1 until it recovers")
+    pool.start_health_checks(settings.redis_health_check_interval)
+    return pool
+
+
+async def close_redis_pool():
+    """Stop health checks and drop pooled connections on shutdown.
+
+    The pool object itself is kept: cache services hold its client, and it
+    reconnects on demand if the app is started again in the same process.
+    """
+    if _redis_pool is not None:
+        try:
+            await _redis_pool.close()
+        except Exception as e:
+            logger.warning(f"Error closing Redis connection pool: {e}")
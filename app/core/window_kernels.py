@@ -0,0 +1,122 @@
+"""
+Vectorized sliding-window kernels.
+
+Drop-in replacements for ``Series.rolling(window).apply(fn)`` callbacks, which
+call back into Python once per row. Every kernel takes a 1-D float array and
+returns an array of the same length, aligned like pandas: the first
+``window - 1`` entries are NaN and so is any window containing a NaN (pandas'
+default ``min_periods=window``).
+
+- MAD, quantile and CVaR work on a strided ``sliding_window_view`` of the input
+  (no copy), evaluated in row blocks so the temporaries stay bounded
+- min/max use doubling (a sparse table): ``log2(window)`` elementwise passes
+  instead of one pass per window
+- percentile rank counts, per row, how many of the trailing values are at or
+  below the current one, ignoring NaNs
+"""
+from typing import Callable, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Upper bound on elements materialized per block by the strided kernels
+BLOCK_ELEMENTS = 1 << 20
+
+
+def _as_float(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _blocked(values: np.ndarray, window: int, kernel: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Apply ``kernel`` to blocks of the (rows, window) view; pad to ``len(values)``"""
+    out = np.full(len(values), np.nan)
+    if window < 1 or len(values) < window:
+        return out
+    windows = sliding_window_view(values, window)
+    step = max(1, BLOCK_ELEMENTS // window)
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        out[window - 1 + start:window - 1 + start + len(block)] = kernel(block)
+    return out
+
+
+def rolling_mad(values, window: int) -> np.ndarray:
+    """Mean absolute deviation from the window mean"""
+    def kernel(block):
+        return np.abs(block - block.mean(axis=1, keepdims=True)).mean(axis=1)
+    return _blocked(_as_float(values), window, kernel)
+
+
+def rolling_quantile(values, window: int, q: float) -> np.ndarray:
+    """Window quantile with linear interpolation (pandas' default)"""
+    return _blocked(_as_float(values), window, lambda block: np.quantile(block, q, axis=1))
+
+
+def rolling_cvar(values, window: int, q: float) -> np.ndarray:
+    """Expected shortfall: mean of the window values at or below its ``q`` quantile"""
+    def kernel(block):
+        threshold = np.quantile(block, q, axis=1, keepdims=True)
+        tail = block <= threshold
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(tail, block, 0.0).sum(axis=1) / tail.sum(axis=1)
+    return _blocked(_as_float(values), window, kernel)
+
+
+def _rolling_extreme(values, window: int, reduce: Callable) -> np.ndarray:
+    values = _as_float(values)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 1 or n < window:
+        return out
+    # table[i] = reduce(values[i:i + span]) for the largest power of two span <= window
+    table, span = values, 1
+    while span * 2 <= window:
+        table = reduce(table[:-span], table[span:])
+        span *= 2
+    # Two overlapping power-of-two spans cover each window exactly
+    rows = n - window + 1
+    out[window - 1:] = reduce(table[:rows], table[window - span:window - span + rows])
+    return out
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    return _rolling_extreme(values, window, np.minimum)
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def rolling_percentile_rank(
+    values,
+    window: int,
+    min_periods: Optional[int] = None,
+    include_current: bool = True
+) -> np.ndarray:
+    """Percent (0-100) of the trailing values at or below each value.
+
+    The trailing window is ``values[i - window + 1:i + 1]``, or the ``window``
+    values strictly before ``i`` when ``include_current`` is False (a no-lookahead
+    rank against history). NaNs are ignored; rows with fewer than ``min_periods``
+    (default ``window``) valid trailing values, or a NaN current value, are NaN.
+    """
+    values = _as_float(values)
+    min_periods = max(window if min_periods is None else min_periods, 1)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 1 or n == 0:
+        return out
+    if include_current:
+        history = np.concatenate([np.full(window - 1, np.nan), values])
+    else:
+        history = np.concatenate([np.full(window, np.nan), values[:-1]])
+    windows = sliding_window_view(history, window)
+    step = max(1, BLOCK_ELEMENTS // window)
+    for start in range(0, n, step):
+        block, current = windows[start:start + step], values[start:start + step]
+        count = (~np.isnan(block)).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pct = (block <= current[:, None]).sum(axis=1) / count * 100.0
+        pct[(count < min_periods) | np.isnan(current)] = np.nan
+        out[start:start + step] = pct
+    return out
@@ -1,18 +1,24 @@
 import os
+import sys
+import asyncio
 import logging
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import time
+from typing import Any, Awaitable, Set
 
 from app.core.config import settings
 from app.core.middleware import setup_middleware
+from app.core.metrics import get_metrics_registry
+from app.core.compute import get_compute_executor, shutdown_compute_executor
 from app.core.dependencies import get_cache_service, get_usage_service, get_ai_service, get_stock_service
-from app.api.v1.api import api_router
+from app.api.v1.api import api_router, LAZY_ROUTER_GROUPS
+from app.core.lazy_routers import install_lazy_routers, get_lazy_router_loader
 from app.services.ai_service import AsyncAIService
 from app.services.stock_service import AsyncStockService
 from app.services.usage_service import AsyncUsageService
@@ -22,6 +28,17 @@ from app.services.cache_service import AsyncCacheService
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Background work started at startup; the event loop only keeps weak references to tasks
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _start_background_task(coro: Awaitable[Any]) -> asyncio.Task:
+    """Run ``coro`` as a task that is referenced until it finishes and cancelled on shutdown"""
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
 async def auto_cleanup_models():
     """Automatically clean up old model files on server startup"""
     try:
@@ -103,6 +120,10 @@ async def auto_cleanup_models():
                 for old_model in older_models:
                     try:
                         os.remove(old_model['file'])
+                        # Compiled TorchScript/ONNX copies of transformer models
+                        for compiled in (old_model['file'].with_suffix(".pt"), old_model['file'].with_suffix(".onnx")):
+                            if compiled.exists():
+                                os.remove(compiled)
                         logger.info(f"Removed old model: {old_model['filename']}")
                         total_removed += 1
                     except OSError as e:
@@ -165,12 +186,40 @@ async def startup_event():
         logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
         logger.info(f"Port: {os.getenv('PORT', '8000')}")
         
+        # Shared Redis connection pool (cache degrades to in-process L1 if Redis is down)
+        try:
+            from app.core.redis_pool import init_redis_pool
+            await init_redis_pool()
+        except Exception as redis_error:
+            logger.warning(f"Redis pool initialization failed (non-critical): {redis_error}")
+        
+        # Import feature routers and their heavy dependencies in the background
+        loader = get_lazy_router_loader()
+        if loader is not None and settings.router_warmup:
+            _start_background_task(loader.warm_up(delay=settings.router_warmup_delay))
+        
+        # Background job runner: resume jobs left pending or interrupted by the last shutdown
+        if settings.job_runner_enabled:
+            try:
+                from app.services.futurequant.job_runner import get_job_runner
+                await get_job_runner().start()
+            except Exception as job_error:
+                logger.warning(f"Job runner start failed (non-critical): {job_error}")
+        
         # Auto-cleanup old models on startup (non-blocking)
         try:
             await auto_cleanup_models()
         except Exception as cleanup_error:
             logger.warning(f"Model cleanup failed (non-critical): {cleanup_error}")
         
+        # Load serving models into the prediction model cache in the background
+        if settings.serving_cache_enabled and settings.serving_cache_warmup:
+            try:
+                from app.services.futurequant.model_cache import get_model_cache
+                _start_background_task(get_model_cache().warm_up())
+            except Exception as cache_error:
+                logger.warning(f"Model cache warm-up failed (non-critical): {cache_error}")
+        
         # Market Pulse: data collector is NOT auto-started (saves WebSocket cost).
         # Start explicitly via POST /api/v1/market-pulse/collector/start when needed.
         try:
@@ -192,9 +241,16 @@ async def shutdown_event():
     """Cleanup services on shutdown"""
     logger.info("Shutting down Tokimeki FastAPI application...")
     
+    # Cancel background startup work that is still running
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    
     # Stop Market Pulse service
     try:
-        from app.api.v1.endpoints.market_pulse import _pulse_service_instance
+        # Only if the market pulse routers were ever loaded
+        market_pulse = sys.modules.get("app.api.v1.endpoints.market_pulse")
+        _pulse_service_instance = getattr(market_pulse, "_pulse_service_instance", None)
         if _pulse_service_instance and _pulse_service_instance.started:
             _pulse_service_instance.stop()
             logger.info("Market Pulse service stopped")
@@ -204,6 +260,18 @@ async def shutdown_event():
     # Cleanup HTTP client
     from .core.dependencies import cleanup_http_client
     await cleanup_http_client()
+    
+    # Close Redis connection pool
+    from .core.redis_pool import close_redis_pool
+    await close_redis_pool()
+    
+    # Stop the job runner; running jobs go back to pending and resume on next start
+    job_runner = sys.modules.get("app.services.futurequant.job_runner")
+    if job_runner is not None:
+        await job_runner.get_job_runner().stop()
+    
+    # Stop compute pools (queued jobs are cancelled)
+    shutdown_compute_executor()
 
 # Mount static files with cache busting
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -239,6 +307,14 @@ async def health_check():
         logger.error(f"Health check error: {e}")
         return {"status": "unhealthy", "error": str(e), "timestamp": time.time()}
 
+# Prometheus scrape endpoint (per-worker request metrics)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        get_metrics_registry().render_prometheus() + "\n".join(get_compute_executor().prometheus_lines()) + "\n",
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Error handlers
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc: Exception):
@@ -258,6 +334,9 @@ async def not_found_handler(request: Request, exc: Exception):
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# Feature routers load on first use (or during startup warm-up) to keep cold start fast
+install_lazy_routers(app, LAZY_ROUTER_GROUPS, prefix="/api/v1", lazy=settings.lazy_routers)
+
 
 # Root endpoint - serve the main HTML page (using absolute path)
 @app.get("/")
@@ -3,12 +3,12 @@ Database models for FutureQuant Trader
 """
 from .database import Base, engine, get_db, init_db
 from .trading_models import (
-    Symbol, Bar, Feature, Forecast, Strategy, Backtest, 
+    Symbol, Bar, Feature, FeatureState, Forecast, Strategy, Backtest, 
     Trade, Model, Job, User
 )
 
 __all__ = [
     "Base", "engine", "get_db", "init_db",
-    "Symbol", "Bar", "Feature", "Forecast", "Strategy", 
+    "Symbol", "Bar", "Feature", "FeatureState", "Forecast", "Strategy", 
     "Backtest", "Trade", "Model", "Job", "User"
 ]
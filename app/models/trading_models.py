@@ -47,9 +47,10 @@ class Bar(Base):
     # Relationships
     symbol = relationship("Symbol", back_populates="bars")
     
-    # Indexes for performance
+    # Indexes for performance; one bar per symbol, interval and timestamp
     __table_args__ = (
         Index('idx_bars_symbol_timestamp', 'symbol_id', 'timestamp'),
+        Index('uq_bars_symbol_interval_timestamp', 'symbol_id', 'interval', 'timestamp', unique=True),
     )
 
 class Feature(Base):
@@ -70,6 +71,23 @@ class Feature(Base):
         Index('idx_features_symbol_timestamp', 'symbol_id', 'timestamp'),
     )
 
+class FeatureState(Base):
+    """Where incremental feature computation resumes for a symbol, recipe and interval"""
+    __tablename__ = "futurequant_feature_states"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    symbol_id = Column(Integer, ForeignKey("futurequant_symbols.id"), nullable=False)
+    recipe_name = Column(String(50), nullable=False)
+    # Not NULL: NULLs are distinct in the unique index, so "finest stored interval" is stored as "native"
+    interval = Column(String(10), nullable=False, default="native")
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)  # Last bar with stored features
+    state = Column(JSON, nullable=False)  # Warm-up, anchors and normalization statistics
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('uq_feature_states_symbol_recipe_interval', 'symbol_id', 'recipe_name', 'interval', unique=True),
+    )
+
 class Forecast(Base):
     """Model predictions and forecasts"""
     __tablename__ = "futurequant_forecasts"
@@ -14,6 +14,7 @@ from ...models.aapl_analysis_models import (
     OHLCData, StockPriceResponse, OptionContract, OptionChainResponse,
     OptionOHLCResponse, OptionType, DataDiagnostics, PolygonConfig
 )
+from ..cache_service import cache_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -23,72 +24,6 @@ class PolygonAPIError(Exception):
     pass
 
 
-class CacheManager:
-    """In-memory cache manager with TTL support"""
-    
-    def __init__(self, default_ttl: int = 3600, max_size: int = 1000):
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.default_ttl = default_ttl
-        self.max_size = max_size
-        self.hits = 0
-        self.misses = 0
-    
-    def _is_expired(self, entry: Dict[str, Any]) -> bool:
-        return time.time() > entry['expires_at']
-    
-    def _cleanup_expired(self):
-        """Remove expired entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, entry in self.cache.items()
-            if current_time > entry['expires_at']
-        ]
-        for key in expired_keys:
-            del self.cache[key]
-    
-    def _evict_oldest(self):
-        """Evict oldest entries if cache is full"""
-        if len(self.cache) >= self.max_size:
-            # Remove 10% of oldest entries
-            sorted_items = sorted(
-                self.cache.items(),
-                key=lambda x: x[1]['created_at']
-            )
-            to_remove = len(sorted_items) // 10 + 1
-            for key, _ in sorted_items[:to_remove]:
-                del self.cache[key]
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        self._cleanup_expired()
-        
-        if key in self.cache and not self._is_expired(self.cache[key]):
-            self.hits += 1
-            return self.cache[key]['data']
-        
-        self.misses += 1
-        return None
-    
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache"""
-        self._evict_oldest()
-        
-        ttl = ttl or self.default_ttl
-        self.cache[key] = {
-            'data': value,
-            'created_at': time.time(),
-            'expires_at': time.time() + ttl
-        }
-    
-    def get_stats(self) -> Dict[str, int]:
-        """Get cache statistics"""
-        return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'size': len(self.cache)
-        }
-
-
 def retry_with_backoff(max_retries: int = 3, base_delay: float = 1.0):
     """Decorator for retrying API calls with exponential backoff"""
     def decorator(func):
@@ -119,7 +54,7 @@ class PolygonService:
     
     def __init__(self, config: PolygonConfig):
         self.config = config
-        self.cache = CacheManager()
+        self.cache = cache_namespace("aapl_polygon", ttl=3600)
         self.client = None
         self.api_calls = 0
         self.total_latency = 0.0
@@ -202,7 +137,7 @@ class PolygonService:
         )
         
         # Check cache first
-        cached_data = self.cache.get(cache_key)
+        cached_data = await self.cache.get(cache_key)
         if cached_data:
             return StockPriceResponse(**cached_data)
         
@@ -240,7 +175,7 @@ class PolygonService:
         )
         
         # Cache the response
-        self.cache.set(cache_key, stock_response.dict())
+        await self.cache.set(cache_key, stock_response.dict())
         
         return stock_response
     
@@ -261,7 +196,7 @@ class PolygonService:
         )
         
         # Check cache first
-        cached_data = self.cache.get(cache_key)
+        cached_data = await self.cache.get(cache_key)
         if cached_data:
             return OptionChainResponse(**cached_data)
         
@@ -323,7 +258,7 @@ class PolygonService:
         )
         
         # Cache the response
-        self.cache.set(cache_key, option_chain.dict())
+        await self.cache.set(cache_key, option_chain.dict())
         
         return option_chain
     
@@ -343,7 +278,7 @@ class PolygonService:
         )
         
         # Check cache first
-        cached_data = self.cache.get(cache_key)
+        cached_data = await self.cache.get(cache_key)
         if cached_data:
             return OptionOHLCResponse(**cached_data)
         
@@ -391,7 +326,7 @@ class PolygonService:
         )
         
         # Cache the response
-        self.cache.set(cache_key, option_ohlc.dict())
+        await self.cache.set(cache_key, option_ohlc.dict())
         
         return option_ohlc
     
@@ -403,7 +338,7 @@ class PolygonService:
         return DataDiagnostics(
             polygon_api_calls=self.api_calls,
             polygon_avg_latency_ms=avg_latency,
-            cache_hits=cache_stats['hits'],
+            cache_hits=cache_stats['hits'] + cache_stats['l2_hits'],
             cache_misses=cache_stats['misses'],
             missing_stock_data_days=0,  # Would be calculated during backtest
             missing_option_contracts=0,  # Would be calculated during backtest
@@ -0,0 +1,305 @@
+"""
+Binary serialization for values stored in the Redis cache tier.
+
+Encoded payloads start with a 5-byte header: a 3-byte magic marker, the codec
+id and the compression id. Payloads without the header are legacy JSON entries
+written before codecs existed and still decode.
+
+- DataFrames / Series: Arrow IPC stream when pyarrow is installed, otherwise
+  per-column NumPy buffers
+- NumPy arrays: raw ``.npy`` buffers
+- everything else: msgpack when installed, otherwise JSON
+"""
+import io
+import json
+import zlib
+import logging
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    PYARROW_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame as lz4_frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    lz4_frame = None
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\x00TK"
+HEADER_SIZE = len(MAGIC) + 2
+
+CODEC_JSON = 1
+CODEC_MSGPACK = 2
+CODEC_ARROW = 3
+CODEC_NUMPY = 4
+CODEC_FRAME_NPZ = 5
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+COMPRESSION_NAMES = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+    "lz4": COMPRESSION_LZ4,
+}
+
+_SERIES_MARKER = b"tokimeki.series"
+
+
+class CacheCodecError(Exception):
+    """Raised when a cached payload cannot be decoded"""
+    pass
+
+
+def _plain_default(obj: Any) -> Any:
+    """Fallback conversion for values msgpack/JSON cannot represent natively"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _to_plain_array(values: Any) -> Tuple[np.ndarray, Optional[str]]:
+    """Convert an Index/Series to a pickle-free array plus its timezone, if any"""
+    tz = None
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.DatetimeTZDtype):
+        tz = str(values.dt.tz)
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    elif isinstance(values, pd.DatetimeIndex) and values.tz is not None:
+        tz = str(values.tz)
+        values = values.tz_convert("UTC").tz_localize(None)
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = array.astype(str)
+    return array, tz
+
+
+def _resolve_compression(name: str) -> int:
+    if name == "auto":
+        if ZSTD_AVAILABLE:
+            return COMPRESSION_ZSTD
+        if LZ4_AVAILABLE:
+            return COMPRESSION_LZ4
+        return COMPRESSION_ZLIB
+    compression = COMPRESSION_NAMES.get(name)
+    if compression is None:
+        raise ValueError(f"Unknown cache compression: {name}")
+    if compression == COMPRESSION_ZSTD and not ZSTD_AVAILABLE:
+        logger.warning("zstandard not installed, falling back to zlib cache compression")
+        return COMPRESSION_ZLIB
+    if compression == COMPRESSION_LZ4 and not LZ4_AVAILABLE:
+        logger.warning("lz4 not installed, falling back to zlib cache compression")
+        return COMPRESSION_ZLIB
+    return compression
+
+
+class CacheCodec:
+    """Encode cache values to bytes and back, recording the codec in a header"""
+
+    def __init__(self, compression: str = "auto", compress_min_bytes: int = 4096):
+        self.compression = _resolve_compression(compression)
+        self.compress_min_bytes = compress_min_bytes
+
+    # Encoding
+
+    def encode(self, value: Any) -> bytes:
+        codec, body = self._encode_body(value)
+        compression = COMPRESSION_NONE
+        if self.compression != COMPRESSION_NONE and len(body) >= self.compress_min_bytes:
+            compressed = self._compress(body, self.compression)
+            if len(compressed) < len(body):
+                body, compression = compressed, self.compression
+        return MAGIC + bytes((codec, compression)) + body
+
+    def _encode_body(self, value: Any) -> Tuple[int, bytes]:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            if PYARROW_AVAILABLE:
+                try:
+                    return CODEC_ARROW, self._encode_arrow(value)
+                except Exception as e:
+                    logger.debug(f"Arrow encoding failed, using NumPy buffers: {e}")
+            return CODEC_FRAME_NPZ, self._encode_frame_npz(value)
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            buffer = io.BytesIO()
+            np.save(buffer, value, allow_pickle=False)
+            return CODEC_NUMPY, buffer.getvalue()
+        if MSGPACK_AVAILABLE:
+            return CODEC_MSGPACK, msgpack.packb(value, default=_plain_default, use_bin_type=True)
+        return CODEC_JSON, json.dumps(value, default=_plain_default).encode("utf-8")
+
+    @staticmethod
+    def _encode_arrow(value: Any) -> bytes:
+        is_series = isinstance(value, pd.Series)
+        frame = value.to_frame(name="__series__") if is_series else value
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        if is_series:
+            # Arrow column names must be strings; keep the original Series name aside
+            metadata = dict(table.schema.metadata or {})
+            metadata[_SERIES_MARKER] = json.dumps(value.name, default=_plain_default).encode("utf-8")
+            table = table.replace_schema_metadata(metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def _encode_frame_npz(value: Any) -> bytes:
+        """Store each column as a NumPy buffer; object columns are stored as strings"""
+        is_series = isinstance(value, pd.Series)
+        frame = value.to_frame() if is_series else value
+        arrays: Dict[str, np.ndarray] = {}
+        meta: Dict[str, Any] = {
+            "series": is_series,
+            "columns": [],
+            "index_name": frame.index.name,
+            "index_tz": None,
+        }
+
+        arrays["__index__"], meta["index_tz"] = _to_plain_array(frame.index)
+        for position, column in enumerate(frame.columns):
+            arrays[f"c{position}"], tz = _to_plain_array(frame.iloc[:, position])
+            meta["columns"].append({"name": column, "tz": tz})
+
+        buffer = io.BytesIO()
+        meta_bytes = json.dumps(meta, default=_plain_default).encode("utf-8")
+        np.savez(buffer, __meta__=np.frombuffer(meta_bytes, dtype=np.uint8), **arrays)
+        return buffer.getvalue()
+
+    # Decoding
+
+    def decode(self, raw: Any) -> Any:
+        if raw is None:
+            return None
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        if not raw.startswith(MAGIC):
+            # Legacy entry written as bare JSON
+            return json.loads(raw)
+        if len(raw) < HEADER_SIZE:
+            raise CacheCodecError("Truncated cache payload")
+
+        codec, compression = raw[len(MAGIC)], raw[len(MAGIC) + 1]
+        body = self._decompress(raw[HEADER_SIZE:], compression)
+
+        if codec == CODEC_JSON:
+            return json.loads(body)
+        if codec == CODEC_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise CacheCodecError("msgpack payload found but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        if codec == CODEC_ARROW:
+            if not PYARROW_AVAILABLE:
+                raise CacheCodecError("Arrow payload found but pyarrow is not installed")
+            return self._decode_arrow(body)
+        if codec == CODEC_NUMPY:
+            return np.load(io.BytesIO(body), allow_pickle=False)
+        if codec == CODEC_FRAME_NPZ:
+            return self._decode_frame_npz(body)
+        raise CacheCodecError(f"Unknown cache codec id {codec}")
+
+    @staticmethod
+    def _decode_arrow(body: bytes) -> Any:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        series_name = (table.schema.metadata or {}).get(_SERIES_MARKER)
+        frame = table.to_pandas()
+        if series_name is not None:
+            return frame.iloc[:, 0].rename(json.loads(series_name))
+        return frame
+
+    @staticmethod
+    def _decode_frame_npz(body: bytes) -> Any:
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            meta = json.loads(archive["__meta__"].tobytes().decode("utf-8"))
+            index = pd.Index(archive["__index__"], name=meta["index_name"])
+            if meta["index_tz"]:
+                index = pd.DatetimeIndex(index).tz_localize("UTC").tz_convert(meta["index_tz"])
+            data = {}
+            for position, column in enumerate(meta["columns"]):
+                values = pd.Series(archive[f"c{position}"], index=index)
+                if column["tz"]:
+                    values = values.dt.tz_localize("UTC").dt.tz_convert(column["tz"])
+                data[position] = values
+        frame = pd.DataFrame(data, index=index)
+        frame.columns = [column["name"] for column in meta["columns"]]
+        if meta["series"]:
+            return frame.iloc[:, 0]
+        return frame
+
+    # Compression
+
+    @staticmethod
+    def _compress(body: bytes, compression: int) -> bytes:
+        if compression == COMPRESSION_ZSTD:
+            return zstandard.ZstdCompressor(level=3).compress(body)
+        if compression == COMPRESSION_LZ4:
+            return lz4_frame.compress(body)
+        if compression == COMPRESSION_ZLIB:
+            return zlib.compress(body, 6)
+        return body
+
+    @staticmethod
+    def _decompress(body: bytes, compression: int) -> bytes:
+        if compression == COMPRESSION_NONE:
+            return body
+        if compression == COMPRESSION_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise CacheCodecError("zstd payload found but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(body)
+        if compression == COMPRESSION_LZ4:
+            if not LZ4_AVAILABLE:
+                raise CacheCodecError("lz4 payload found but lz4 is not installed")
+            return lz4_frame.decompress(body)
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        raise CacheCodecError(f"Unknown cache compression id {compression}")
+
+
+_default_codec: Optional[CacheCodec] = None
+
+
+def get_default_codec() -> CacheCodec:
+    """Return the process-wide codec configured from settings"""
+    global _default_codec
+    if _default_codec is None:
+        from ..core.config import settings
+        _default_codec = CacheCodec(
+            compression=settings.cache_compression,
+            compress_min_bytes=settings.cache_compress_min_bytes
+        )
+    return _default_codec
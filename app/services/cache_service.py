@@ -1,109 +1,585 @@
-import json
+import sys
+import time
+import asyncio
 import hashlib
+import itertools
 import logging
-from typing import Optional, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List, Set, Tuple, Callable, Awaitable
 from functools import wraps
 import redis.asyncio as redis
 from ..core.config import settings
+from ..core.redis_pool import CircuitBreaker, get_redis_pool
+from .cache_codecs import CacheCodec, get_default_codec
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_NAMESPACE = "default"
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+# Container items sized per level of nesting; the rest are assumed to be alike
+_SIZE_SAMPLE_ITEMS = 8
+_SIZE_MAX_DEPTH = 2
+
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """Approximate the in-memory footprint of a cached value in bytes.
+
+    Runs on every L1 set, so nothing is serialized: containers are sized from
+    a sample of their items.
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if hasattr(value, "memory_usage"):
+        # pandas DataFrame / Series
+        try:
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except Exception:
+            pass
+    if hasattr(value, "nbytes"):
+        # numpy arrays
+        return int(value.nbytes)
+    if isinstance(value, (dict, list, tuple, set, frozenset)) and value and depth < _SIZE_MAX_DEPTH:
+        items = value.items() if isinstance(value, dict) else ((item,) for item in value)
+        sample = list(itertools.islice(items, _SIZE_SAMPLE_ITEMS))
+        per_item = sum(_estimate_size(part, depth + 1) for item in sample for part in item) / len(sample)
+        return sys.getsizeof(value) + int(per_item * len(value))
+    return sys.getsizeof(value)
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for one cache namespace"""
+
+    def __init__(self):
+        self.hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.l2_hits + self.misses
+        return {
+            "hits": self.hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            "hit_rate": round((self.hits + self.l2_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+class LRUCache:
+    """Bounded in-process LRU cache with per-entry TTL and a byte budget (L1)"""
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        # key -> (fresh_until, expires_at, size, namespace, value)
+        self._entries: "OrderedDict[str, Tuple[float, float, int, str, Any]]" = OrderedDict()
+        self._stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def stats_for(self, namespace: str) -> CacheStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats.setdefault(namespace, CacheStats())
+        return stats
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for fresh entries only"""
+        state, value = self.lookup(key)
+        if state == FRESH:
+            return True, value
+        return False, None
+
+    def lookup(self, key: str) -> Tuple[Optional[str], Any]:
+        """Return (FRESH | STALE | None, value); fully expired entries are dropped on access"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            fresh_until, expires_at, _, entry_ns, value = entry
+            now = time.time()
+            if expires_at <= now:
+                self._remove(key)
+                self.stats_for(entry_ns).expirations += 1
+                return None, None
+            self._entries.move_to_end(key)
+            return (FRESH if fresh_until > now else STALE), value
+
+    def set(self, key: str, value: Any, ttl: int, namespace: str = DEFAULT_NAMESPACE, stale_ttl: int = 0,
+            size: Optional[int] = None) -> bool:
+        """Store a value, evicting least-recently-used entries to stay within budget.
+
+        Entries stay servable as stale for ``stale_ttl`` seconds after ``ttl`` elapses.
+        ``size`` overrides the estimated footprint for values it cannot measure.
+        """
+        size = _estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            logger.debug(f"Value for {key} ({size} bytes) exceeds L1 budget, not cached locally")
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            now = time.time()
+            self._entries[key] = (now + ttl, now + ttl + stale_ttl, size, namespace, value)
+            self.current_bytes += size
+            self.stats_for(namespace).sets += 1
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes
+            ):
+                evicted_key, (_, _, _, evicted_ns, _) = next(iter(self._entries.items()))
+                self._remove(evicted_key)
+                self.stats_for(evicted_ns).evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self, namespace: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        """Drop every entry, or only those in one namespace (optionally with a key prefix)"""
+        with self._lock:
+            if namespace is None and prefix is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self.current_bytes = 0
+                return removed
+            keys = [
+                k for k, entry in self._entries.items()
+                if (namespace is None or entry[3] == namespace) and (prefix is None or k.startswith(prefix))
+            ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        with self._lock:
+            if namespace is None:
+                return len(self._entries)
+            return sum(1 for entry in self._entries.values() if entry[3] == namespace)
+
+    def _remove(self, key: str):
+        _, _, size, _, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries_by_ns: Dict[str, int] = {}
+            for entry in self._entries.values():
+                entries_by_ns[entry[3]] = entries_by_ns.get(entry[3], 0) + 1
+            namespaces = {}
+            for name, stats in self._stats.items():
+                namespaces[name] = {**stats.to_dict(), "entries": entries_by_ns.get(name, 0)}
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "namespaces": namespaces
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` unless a call for ``key`` is already running, then await its result"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        # Shield so one cancelled caller does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+# Process-wide so coalescing works across per-request AsyncCacheService instances
+_single_flight = SingleFlight()
+
+# Process-wide L1 shared by every AsyncCacheService instance in this worker
+_local_cache: Optional[LRUCache] = None
+
+
+def get_local_cache() -> LRUCache:
+    """Return the process-wide L1 cache"""
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = LRUCache(
+            max_entries=settings.cache_l1_max_entries,
+            max_bytes=settings.cache_l1_max_bytes
+        )
+    return _local_cache
+
+
 class AsyncCacheService:
-    def __init__(self, redis_client: Optional[redis.Redis] = None):
+    def __init__(self, redis_client: Optional[redis.Redis] = None, local_cache: Optional[LRUCache] = None,
+                 codec: Optional[CacheCodec] = None, breaker: Optional[CircuitBreaker] = None):
         self.redis_client = redis_client
-        self.cache_enabled = settings.cache_enabled and redis_client is not None
+        self.breaker = breaker
+        self.cache_enabled = settings.cache_enabled
+        self.redis_enabled = self.cache_enabled and redis_client is not None
         self.default_ttl = settings.cache_ttl
-        
-        if self.cache_enabled:
-            logger.info("Async cache service initialized with Redis")
+        self.local_cache = local_cache or get_local_cache()
+        self.single_flight = _single_flight
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.codec = codec or get_default_codec()
+
+        if self.redis_enabled:
+            logger.debug("Async cache service initialized with L1 + Redis")
         else:
-            logger.warning("Async cache service initialized without Redis")
-    
+            logger.debug("Async cache service initialized with L1 only")
+
     def generate_cache_key(self, *args, **kwargs) -> str:
         """Generate a unique cache key from function arguments"""
         key_data = str(args) + str(sorted(kwargs.items()))
         return hashlib.md5(key_data.encode()).hexdigest()
-    
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache asynchronously"""
-        if not self.cache_enabled or not self.redis_client:
-            return None
-        
+
+    def namespace(self, name: str, ttl: int = None, local_only: bool = False,
+                  stale_ttl: int = 0) -> "CacheNamespace":
+        """Return a namespaced view of this cache with its own default TTL and counters"""
+        return CacheNamespace(self, name, ttl or self.default_ttl, local_only, stale_ttl)
+
+    @staticmethod
+    def _redis_key(key: str, namespace: Optional[str]) -> str:
+        return f"{namespace}:{key}" if namespace else key
+
+    def _redis_available(self) -> bool:
+        """False when Redis is not configured or the circuit breaker is open"""
+        if not self.redis_enabled:
+            return False
+        return self.breaker is None or self.breaker.allow()
+
+    def _redis_succeeded(self):
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _redis_failed(self, action: str, error: Exception):
+        logger.error(f"Error {action} cache: {error}")
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+    def _encode(self, full_key: str, value: Any) -> Optional[bytes]:
+        """Codec bytes for Redis, or None for a value the codec cannot encode.
+
+        Encoding errors say nothing about Redis, so they never reach the breaker.
+        """
         try:
-            value = await self.redis_client.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            return self.codec.encode(value)
         except Exception as e:
-            logger.error(f"Error getting from cache: {e}")
+            logger.warning(f"Cannot encode {full_key} for the Redis cache; kept in L1 only: {e}")
             return None
-    
-    async def set(self, key: str, value: Any, ttl: int = None) -> bool:
-        """Set value in cache asynchronously"""
-        if not self.cache_enabled or not self.redis_client:
+
+    async def get(self, key: str, namespace: Optional[str] = None, local_only: bool = False,
+                  stale_ttl: int = 0) -> Optional[Any]:
+        """Get value from L1, falling back to Redis and back-filling L1 on a Redis hit
+
+        ``stale_ttl`` must match what the value was set with, so the stale tail of
+        its Redis lifetime is not taken for fresh.
+        """
+        state, value = await self._lookup(key, namespace, local_only, stale_ttl)
+        return value if state == FRESH else None
+
+    async def _lookup(self, key: str, namespace: Optional[str], local_only: bool,
+                      stale_ttl: int = 0) -> Tuple[Optional[str], Any]:
+        """Return (FRESH | STALE | None, value) across L1 and Redis"""
+        if not self.cache_enabled:
+            return None, None
+
+        full_key = self._redis_key(key, namespace)
+        ns = namespace or DEFAULT_NAMESPACE
+        stats = self.local_cache.stats_for(ns)
+        state, value = self.local_cache.lookup(full_key)
+        if state == FRESH:
+            stats.hits += 1
+            return state, value
+        if state == STALE or local_only or not self._redis_available():
+            if state is None:
+                stats.misses += 1
+            return state, value
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                raw, remaining = await pipe.get(full_key).ttl(full_key).execute()
+            self._redis_succeeded()
+        except Exception as e:
+            self._redis_failed("getting from", e)
+            stats.misses += 1
+            return None, None
+        return self._accept_l2(full_key, ns, raw, remaining, stale_ttl)
+
+    def _accept_l2(self, full_key: str, ns: str, raw: Any, remaining: Optional[int],
+                   stale_ttl: int) -> Tuple[Optional[str], Any]:
+        """Decode a Redis payload, back-fill L1 and classify it as fresh or stale"""
+        stats = self.local_cache.stats_for(ns)
+        if not raw:
+            stats.misses += 1
+            return None, None
+        try:
+            value = self.codec.decode(raw)
+        except Exception as e:
+            logger.error(f"Error decoding cached value for {full_key}: {e}")
+            stats.misses += 1
+            return None, None
+        # Redis keeps entries for ttl + stale_ttl; the tail of that window is stale
+        fresh_remaining = (remaining or 0) - stale_ttl
+        if remaining and remaining > 0:
+            self.local_cache.set(
+                full_key, value, max(fresh_remaining, 0), ns,
+                stale_ttl=min(stale_ttl, remaining)
+            )
+        if fresh_remaining > 0 or remaining == -1:
+            stats.l2_hits += 1
+            return FRESH, value
+        return STALE, value
+
+    async def set(self, key: str, value: Any, ttl: int = None, namespace: Optional[str] = None,
+                  local_only: bool = False, stale_ttl: int = 0) -> bool:
+        """Set value in L1 and (unless local_only) in Redis"""
+        if not self.cache_enabled:
             return False
-        
+
+        ttl = ttl or self.default_ttl
+        full_key = self._redis_key(key, namespace)
+        stored = self.local_cache.set(full_key, value, ttl, namespace or DEFAULT_NAMESPACE, stale_ttl=stale_ttl)
+        if local_only or not self._redis_available():
+            return stored
+
+        serialized_value = self._encode(full_key, value)
+        if serialized_value is None:
+            return stored
         try:
-            ttl = ttl or self.default_ttl
-            serialized_value = json.dumps(value)
-            await self.redis_client.setex(key, ttl, serialized_value)
+            await self.redis_client.setex(full_key, ttl + stale_ttl, serialized_value)
+            self._redis_succeeded()
             return True
         except Exception as e:
-            logger.error(f"Error setting cache: {e}")
-            return False
-    
-    async def delete(self, key: str) -> bool:
-        """Delete value from cache asynchronously"""
-        if not self.cache_enabled or not self.redis_client:
+            self._redis_failed("setting", e)
+            return stored
+
+    async def mget(self, keys: List[str], namespace: Optional[str] = None, local_only: bool = False,
+                   stale_ttl: int = 0) -> Dict[str, Any]:
+        """Fetch many keys at once; L1 misses are read from Redis in one pipelined round trip.
+
+        Returns a dict of the keys that were found fresh; missing keys are omitted.
+        """
+        if not self.cache_enabled:
+            return {}
+
+        ns = namespace or DEFAULT_NAMESPACE
+        stats = self.local_cache.stats_for(ns)
+        found: Dict[str, Any] = {}
+        pending: List[str] = []
+        for key in keys:
+            hit, value = self.local_cache.get(self._redis_key(key, namespace))
+            if hit:
+                stats.hits += 1
+                found[key] = value
+            else:
+                pending.append(key)
+
+        if not pending:
+            return found
+        if local_only or not self._redis_available():
+            stats.misses += len(pending)
+            return found
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in pending:
+                    full_key = self._redis_key(key, namespace)
+                    pipe.get(full_key).ttl(full_key)
+                results = await pipe.execute()
+            self._redis_succeeded()
+        except Exception as e:
+            self._redis_failed("batch getting from", e)
+            stats.misses += len(pending)
+            return found
+
+        for position, key in enumerate(pending):
+            raw, remaining = results[2 * position], results[2 * position + 1]
+            state, value = self._accept_l2(self._redis_key(key, namespace), ns, raw, remaining, stale_ttl)
+            if state == FRESH:
+                found[key] = value
+        return found
+
+    async def mset(self, items: Dict[str, Any], ttl: int = None, namespace: Optional[str] = None,
+                   local_only: bool = False, stale_ttl: int = 0) -> bool:
+        """Store many values at once, writing them to Redis in one pipelined round trip"""
+        if not self.cache_enabled or not items:
             return False
-        
+
+        ttl = ttl or self.default_ttl
+        ns = namespace or DEFAULT_NAMESPACE
+        stored = True
+        for key, value in items.items():
+            stored = self.local_cache.set(self._redis_key(key, namespace), value, ttl, ns,
+                                          stale_ttl=stale_ttl) and stored
+        if local_only or not self._redis_available():
+            return stored
+
+        encoded = {}
+        for key, value in items.items():
+            full_key = self._redis_key(key, namespace)
+            serialized_value = self._encode(full_key, value)
+            if serialized_value is not None:
+                encoded[full_key] = serialized_value
+        if not encoded:
+            return stored
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for full_key, serialized_value in encoded.items():
+                    pipe.setex(full_key, ttl + stale_ttl, serialized_value)
+                await pipe.execute()
+            self._redis_succeeded()
+            return True if len(encoded) == len(items) else stored
+        except Exception as e:
+            self._redis_failed("batch setting", e)
+            return stored
+
+    async def get_or_set(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int = None,
+                         namespace: Optional[str] = None, local_only: bool = False,
+                         stale_ttl: int = 0) -> Any:
+        """Return the cached value or compute it once for all concurrent callers.
+
+        Concurrent misses for the same key await a single ``loader`` call. With
+        ``stale_ttl`` an expired value is served for that many extra seconds while
+        one background task refreshes it. ``None`` results are not cached.
+        """
+        state, value = await self._lookup(key, namespace, local_only, stale_ttl)
+        if state == FRESH:
+            return value
+
+        full_key = self._redis_key(key, namespace)
+        stats = self.local_cache.stats_for(namespace or DEFAULT_NAMESPACE)
+
+        async def load_and_store():
+            result = await loader()
+            if result is not None:
+                await self.set(key, result, ttl, namespace=namespace, local_only=local_only, stale_ttl=stale_ttl)
+            return result
+
+        if state == STALE:
+            stats.stale_served += 1
+            if not self.single_flight.in_flight(full_key):
+                # The loop only keeps weak references to tasks
+                task = asyncio.ensure_future(self._refresh_in_background(full_key, load_and_store))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+
+        if self.single_flight.in_flight(full_key):
+            stats.coalesced += 1
+        return await self.single_flight.do(full_key, load_and_store)
+
+    async def coalesce(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Deduplicate concurrent identical calls without caching the result"""
+        return await self.single_flight.do(f"coalesce:{key}", loader)
+
+    async def _refresh_in_background(self, full_key: str, load_and_store: Callable[[], Awaitable[Any]]):
         try:
-            await self.redis_client.delete(key)
+            await self.single_flight.do(full_key, load_and_store)
+        except Exception as e:
+            logger.warning(f"Background cache refresh failed for {full_key}: {e}")
+
+    async def delete(self, key: str, namespace: Optional[str] = None) -> bool:
+        """Delete value from L1 and Redis"""
+        full_key = self._redis_key(key, namespace)
+        deleted = self.local_cache.delete(full_key)
+        if not self._redis_available():
+            return deleted
+
+        try:
+            await self.redis_client.delete(full_key)
+            self._redis_succeeded()
             return True
         except Exception as e:
-            logger.error(f"Error deleting from cache: {e}")
-            return False
-    
+            self._redis_failed("deleting from", e)
+            return deleted
+
     async def clear_all(self) -> bool:
         """Clear all cache asynchronously"""
-        if not self.cache_enabled or not self.redis_client:
-            return False
-        
+        self.local_cache.clear()
+        if not self._redis_available():
+            return True
+
         try:
             await self.redis_client.flushdb()
+            self._redis_succeeded()
             return True
         except Exception as e:
-            logger.error(f"Error clearing cache: {e}")
+            self._redis_failed("clearing", e)
             return False
-    
+
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache asynchronously"""
-        if not self.cache_enabled or not self.redis_client:
+        found, _ = self.local_cache.get(key)
+        if found:
+            return True
+        if not self._redis_available():
             return False
-        
+
         try:
-            return await self.redis_client.exists(key)
+            exists = await self.redis_client.exists(key)
+            self._redis_succeeded()
+            return exists
         except Exception as e:
-            logger.error(f"Error checking cache existence: {e}")
+            self._redis_failed("checking existence in", e)
             return False
-    
+
+    def get_stats(self) -> Dict[str, Any]:
+        """L1 usage and per-namespace hit/miss/eviction counters"""
+        stats = {
+            "cache_enabled": self.cache_enabled,
+            "redis_enabled": self.redis_enabled,
+            "l1": self.local_cache.get_stats()
+        }
+        if self.breaker is not None:
+            stats["redis_breaker"] = self.breaker.to_dict()
+        return stats
+
     async def is_redis_connected(self) -> bool:
         """Check if Redis is connected"""
         if not self.redis_client:
             return False
-        
+
         try:
             await self.redis_client.ping()
             return True
         except Exception as e:
             logger.error(f"Redis connection check failed: {e}")
             return False
-    
+
     async def test_connection(self) -> bool:
         """Test Redis connection with a simple operation"""
         if not self.redis_client:
             return False
-        
+
         try:
             # Test with a simple set/get operation
             test_key = "test_connection"
@@ -116,28 +592,116 @@ class AsyncCacheService:
             logger.error(f"Redis connection test failed: {e}")
             return False
 
-def async_cached_response(ttl: int = None, key_prefix: str = ""):
-    """Async cache decorator for function responses"""
+
+class CacheNamespace:
+    """Namespaced view over AsyncCacheService used by the data services.
+
+    ``local_only`` namespaces never touch Redis, which is what callers holding
+    values the codecs cannot serialize (model objects, open handles) need.
+    """
+
+    def __init__(self, cache_service: AsyncCacheService, name: str, ttl: int, local_only: bool = False,
+                 stale_ttl: int = 0):
+        self.cache_service = cache_service
+        self.name = name
+        self.ttl = ttl
+        self.local_only = local_only
+        self.stale_ttl = stale_ttl
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await self.cache_service.get(
+            key, namespace=self.name, local_only=self.local_only, stale_ttl=self.stale_ttl
+        )
+
+    async def set(self, key: str, value: Any, ttl: int = None) -> bool:
+        return await self.cache_service.set(
+            key, value, ttl or self.ttl, namespace=self.name, local_only=self.local_only,
+            stale_ttl=self.stale_ttl
+        )
+
+    async def get_or_set(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int = None) -> Any:
+        return await self.cache_service.get_or_set(
+            key, loader, ttl or self.ttl, namespace=self.name, local_only=self.local_only,
+            stale_ttl=self.stale_ttl
+        )
+
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        return await self.cache_service.mget(
+            keys, namespace=self.name, local_only=self.local_only, stale_ttl=self.stale_ttl
+        )
+
+    async def mset(self, items: Dict[str, Any], ttl: int = None) -> bool:
+        return await self.cache_service.mset(
+            items, ttl or self.ttl, namespace=self.name, local_only=self.local_only,
+            stale_ttl=self.stale_ttl
+        )
+
+    async def coalesce(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        return await self.cache_service.coalesce(self.cache_service._redis_key(key, self.name), loader)
+
+    async def delete(self, key: str) -> bool:
+        return await self.cache_service.delete(key, namespace=self.name)
+
+    def clear(self, prefix: Optional[str] = None) -> int:
+        """Drop this namespace's L1 entries; Redis entries expire on their own TTL"""
+        if prefix is not None:
+            prefix = self.cache_service._redis_key(prefix, self.name)
+        return self.cache_service.local_cache.clear(self.name, prefix=prefix)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.cache_service.local_cache.stats_for(self.name).to_dict()
+        stats["size"] = len(self)
+        stats["ttl"] = self.ttl
+        return stats
+
+    def __len__(self) -> int:
+        return self.cache_service.local_cache.count(self.name)
+
+
+# Process-wide cache service for singletons that live outside request scope
+_shared_cache_service: Optional[AsyncCacheService] = None
+
+
+def get_shared_cache_service() -> AsyncCacheService:
+    """Return the process-wide AsyncCacheService (shared L1, Redis L2 when configured)"""
+    global _shared_cache_service
+    if _shared_cache_service is None:
+        pool = get_redis_pool()
+        if pool is not None:
+            _shared_cache_service = AsyncCacheService(pool.client, breaker=pool.breaker)
+        else:
+            _shared_cache_service = AsyncCacheService(None)
+    return _shared_cache_service
+
+
+def cache_namespace(name: str, ttl: int = None, local_only: bool = False, stale_ttl: int = 0) -> CacheNamespace:
+    """Shortcut for ``get_shared_cache_service().namespace(...)``"""
+    return get_shared_cache_service().namespace(name, ttl=ttl, local_only=local_only, stale_ttl=stale_ttl)
+
+
+def async_cached_response(ttl: int = None, key_prefix: str = "", stale_ttl: int = 0):
+    """Async cache decorator for function responses.
+
+    Concurrent misses share one call to the wrapped function, and with
+    ``stale_ttl`` an expired result is served while it refreshes in the background.
+    """
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            cache_service = wrapper.cache_service or get_shared_cache_service()
+
             # Generate cache key
-            cache_key = f"{key_prefix}:{func.__name__}:{hashlib.md5(str(args) + str(kwargs).encode()).hexdigest()}"
-            
-            # Try to get from cache
-            cached_result = await wrapper.cache_service.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function
-            result = await func(*args, **kwargs)
-            
-            # Cache result
-            await wrapper.cache_service.set(cache_key, result, ttl or wrapper.cache_service.default_ttl)
-            
-            return result
-        
+            arg_hash = hashlib.md5((str(args) + str(sorted(kwargs.items()))).encode()).hexdigest()
+            cache_key = f"{key_prefix}:{func.__name__}:{arg_hash}"
+
+            return await cache_service.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl or cache_service.default_ttl,
+                stale_ttl=stale_ttl
+            )
+
         # Add cache service attribute
         wrapper.cache_service = None
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
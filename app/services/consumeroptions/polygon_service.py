@@ -22,6 +22,7 @@ except ImportError:
 from app.models.options_models import (
     OptionContract, UnderlyingData, ContractBars, ContractType
 )
+from app.services.cache_service import cache_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -90,9 +91,9 @@ class ConsumerOptionsPolygonService:
         # Thread pool executor for running synchronous RESTClient calls
         self.executor = ThreadPoolExecutor(max_workers=5)
         
-        # Simple in-memory cache with longer TTL to reduce API calls
-        self.cache: Dict[str, tuple[float, Any]] = {}
+        # Shared two-tier cache (process L1 + Redis) with longer TTL to reduce API calls
         self.cache_ttl = 1800  # 30 minutes default (increased from 5 minutes)
+        self.cache = cache_namespace("consumeroptions_polygon", ttl=self.cache_ttl, stale_ttl=300)
         
         # Statistics
         self.api_calls = 0
@@ -193,30 +194,27 @@ class ConsumerOptionsPolygonService:
         except (ValueError, TypeError):
             return None
     
-    def _get_cached_data(self, cache_key: str) -> Optional[Any]:
-        """Get cached data if not expired - DISABLED for live data"""
-        # Disable caching for live/real-time data to ensure freshness
-        # For snapshot endpoints, always fetch fresh data
-        if 'snapshot' in cache_key.lower():
-            return None
-        if cache_key in self.cache:
-            timestamp, data = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return data
-            else:
-                del self.cache[cache_key]
-        return None
-    
-    def _cache_data(self, cache_key: str, data: Any):
-        """Cache data with current timestamp"""
-        self.cache[cache_key] = (time.time(), data)
-    
-    @retry_with_backoff()
     async def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make HTTP request to Polygon API with caching, rate limiting, and error handling"""
+        """Make HTTP request to Polygon API with caching, rate limiting, and error handling
+        
+        Concurrent requests for the same endpoint/params share one upstream call.
+        Snapshot (live) endpoints are coalesced but never cached.
+        """
         if params is None:
             params = {}
         
+        cache_key = self._get_cache_key(endpoint, params)
+        if 'snapshot' in cache_key.lower():
+            return await self.cache.coalesce(
+                cache_key, lambda: self._request_uncached(endpoint, dict(params))
+            )
+        return await self.cache.get_or_set(
+            cache_key, lambda: self._request_uncached(endpoint, dict(params))
+        )
+    
+    @retry_with_backoff()
+    async def _request_uncached(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the Polygon API directly, bypassing the cache"""
         # Rate limiting - ensure minimum interval between requests
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
@@ -227,13 +225,6 @@ class ConsumerOptionsPolygonService:
         
         self.last_request_time = time.time()
         
-        # Check cache first
-        cache_key = self._get_cache_key(endpoint, params)
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data is not None:
-            logger.debug(f"Cache hit for {endpoint}")
-            return cached_data
-        
         # Require API key for all requests
         if not self.api_key:
             raise ValueError("POLYGON_API_KEY is required but not set")
@@ -279,9 +270,6 @@ class ConsumerOptionsPolygonService:
                 logger.error(f"{error_msg} for {endpoint}")
                 raise PolygonAPIError(error_msg)
             
-            # Cache successful response
-            self._cache_data(cache_key, result)
-            
             logger.debug(f"API call successful: {endpoint}")
             return result
             
@@ -1014,6 +1002,7 @@ class ConsumerOptionsPolygonService:
             "api_calls": self.api_calls,
             "errors": self.errors[-10:],  # Last 10 errors
             "cache_size": len(self.cache),
+            "cache_stats": self.cache.get_stats(),
             "has_api_key": bool(self.api_key)
         }
     
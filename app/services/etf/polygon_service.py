@@ -22,6 +22,7 @@ except ImportError:
 from app.models.etf_models import (
     ETFBasicInfo, ETFPriceData
 )
+from app.services.cache_service import cache_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -86,9 +87,9 @@ class ETFPolygonService:
         # Thread pool executor for running synchronous RESTClient calls
         self.executor = ThreadPoolExecutor(max_workers=5)
         
-        # Simple in-memory cache
-        self.cache: Dict[str, tuple[float, Any]] = {}
+        # Shared two-tier cache (process L1 + Redis)
         self.cache_ttl = 1800  # 30 minutes
+        self.cache = cache_namespace("etf_polygon", ttl=self.cache_ttl, stale_ttl=300)
         
         # Statistics
         self.api_calls = 0
@@ -126,29 +127,26 @@ class ETFPolygonService:
         param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()) if k != "apikey")
         return f"{endpoint}?{param_str}"
     
-    def _get_cached_data(self, cache_key: str) -> Optional[Any]:
-        """Get cached data if not expired"""
-        if cache_key in self.cache:
-            timestamp, data = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return data
-            else:
-                del self.cache[cache_key]
-        return None
-    
-    def _cache_data(self, cache_key: str, data: Any):
-        """Cache data with current timestamp"""
-        self.cache[cache_key] = (time.time(), data)
-    
-    @retry_with_backoff()
     async def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make HTTP request to Polygon API with caching and rate limiting"""
+        """Make HTTP request to Polygon API with caching and rate limiting
+        
+        Concurrent misses for the same endpoint/params share one upstream call,
+        and recently expired responses are served while they refresh.
+        """
         if not self.api_key:
             raise PolygonAPIError("POLYGON_API_KEY is required but not set")
         
         if params is None:
             params = {}
         
+        cache_key = self._get_cache_key(endpoint, params)
+        return await self.cache.get_or_set(
+            cache_key, lambda: self._request_uncached(endpoint, dict(params))
+        )
+    
+    @retry_with_backoff()
+    async def _request_uncached(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the Polygon API directly, bypassing the cache"""
         # Rate limiting
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
@@ -158,13 +156,6 @@ class ETFPolygonService:
         
         self.last_request_time = time.time()
         
-        # Check cache first
-        cache_key = self._get_cache_key(endpoint, params)
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data is not None:
-            logger.debug(f"Cache hit for {endpoint}")
-            return cached_data
-        
         try:
             client = await self._get_client()
             params['apikey'] = self.api_key
@@ -184,12 +175,7 @@ class ETFPolygonService:
             response.raise_for_status()
             
             self.api_calls += 1
-            result = response.json()
-            
-            # Cache successful response
-            self._cache_data(cache_key, result)
-            
-            return result
+            return response.json()
             
         except httpx.HTTPStatusError as e:
             error_msg = f"HTTP {e.response.status_code} error for {endpoint}"
@@ -501,6 +487,7 @@ class ETFPolygonService:
             "api_calls": self.api_calls,
             "errors": self.errors[-10:],
             "cache_size": len(self.cache),
+            "cache_stats": self.cache.get_stats(),
             "has_api_key": bool(self.api_key),
             "rest_client_available": self.rest_client is not None
         }
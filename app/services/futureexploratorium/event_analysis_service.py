@@ -16,6 +16,8 @@ from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 
+from app.services.cache_service import cache_namespace
+
 logger = logging.getLogger(__name__)
 
 # OpenRouter configuration
@@ -224,8 +226,8 @@ class FutureExploratoriumEventAnalysisService:
         self.service_name = "FutureExploratoriumEventAnalysisService"
         self.version = "1.0.0"
         self.executor = ThreadPoolExecutor(max_workers=5)
-        self.cache = {}
         self.cache_ttl = 300  # 5 minutes cache
+        self.cache = cache_namespace("futureexploratorium_events", ttl=self.cache_ttl)
         self._symbol_for_events = None
     
     def _expand_window_for_date(self, date_str: str, lookback_days: int = 60, forward_days: int = 2) -> tuple[str, str]:
@@ -260,8 +262,9 @@ class FutureExploratoriumEventAnalysisService:
             end_inclusive = (end_dt + timedelta(days=1)).strftime("%Y-%m-%d")
 
             cache_key = f"event_data_{symbol}_{start_date}_{end_inclusive}"
-            if cache_key in self.cache and (datetime.now().timestamp() - self.cache[cache_key]['timestamp'] < self.cache_ttl):
-                return self.cache[cache_key]['data']
+            cached_df = await self.cache.get(cache_key)
+            if cached_df is not None:
+                return cached_df
 
             loop = asyncio.get_event_loop()
             ticker = yf.Ticker(symbol)
@@ -279,7 +282,7 @@ class FutureExploratoriumEventAnalysisService:
                     df[col] = np.nan
             df = df.dropna(subset=["Close"])  # drop completely missing rows
 
-            self.cache[cache_key] = {'data': df, 'timestamp': datetime.now().timestamp()}
+            await self.cache.set(cache_key, df)
             return df
 
         except Exception as e:
@@ -859,8 +862,8 @@ class FutureExploratoriumEventAnalysisService:
         try:
             # Clear any cached data for this specific date to ensure fresh analysis
             cache_key = f"ai_factor_analysis_{date}_MNQ=F"
-            if hasattr(self, 'cache') and cache_key in self.cache:
-                del self.cache[cache_key]
+            if hasattr(self, 'cache'):
+                await self.cache.delete(cache_key)
             
             # Try to get AI factor analysis for the specific date
             ai_result = await self.get_ai_factor_analysis(
@@ -7,10 +7,12 @@ import pandas as pd
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-import json
 
-from app.models.trading_models import Symbol, Bar, Feature, Forecast, Strategy, Backtest, Trade
+from app.models.trading_models import Bar, Forecast, Strategy, Backtest, Trade
 from app.models.database import get_db
+from app.core.compute import run_method_cpu
+from .feature_store import load_features
+from .symbol_registry import get_symbol_registry
 
 logger = logging.getLogger(__name__)
 
@@ -99,9 +101,11 @@ class FutureQuantBacktestService:
             else:
                 raise ValueError("No data found for backtest")
             
-            # Execute enhanced backtest
-            results = await self._execute_enhanced_backtest(
-                db, backtest_data, strategy, config
+            # Execute enhanced backtest in the compute process pool; the simulation only
+            # needs the data frame and config, so the session and ORM row stay here
+            results = await run_method_cpu(
+                FutureQuantBacktestService, "_execute_enhanced_backtest", None, backtest_data, None, config,
+                name=f"backtest:{strategy_id}"
             )
             
             # Store backtest results
@@ -143,100 +147,51 @@ class FutureQuantBacktestService:
             strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
             strategy_params = strategy.params if strategy.params else {}
             
+            registry = get_symbol_registry()
+            
             # Build base query for bars
-            bars_query = db.query(Bar).filter(
+            bars_query = db.query(
+                Bar.timestamp, Bar.symbol_id, Bar.open, Bar.high, Bar.low, Bar.close, Bar.volume
+            ).filter(
                 Bar.timestamp >= start_date,
                 Bar.timestamp <= end_date
             )
             
             # Add symbol filter if specified
             if symbols:
-                symbol_objs = db.query(Symbol).filter(Symbol.ticker.in_(symbols)).all()
-                symbol_ids = [s.id for s in symbol_objs]
+                symbol_ids = list(registry.ids(db, symbols).values())
                 bars_query = bars_query.filter(Bar.symbol_id.in_(symbol_ids))
             
-            # Get bars
-            bars = bars_query.order_by(Bar.timestamp).all()
-            
-            # Convert to DataFrame
-            bars_data = []
-            for bar in bars:
-                symbol = db.query(Symbol).filter(Symbol.id == bar.symbol_id).first()
-                bars_data.append({
-                    'timestamp': bar.timestamp,
-                    'symbol': symbol.ticker,
-                    'symbol_id': bar.symbol_id,
-                    'open': bar.open,
-                    'high': bar.high,
-                    'low': bar.low,
-                    'close': bar.close,
-                    'volume': bar.volume
-                })
-            
-            bars_df = pd.DataFrame(bars_data)
-            
-            # Get features
-            features_query = db.query(Feature).filter(
-                Feature.timestamp >= start_date,
-                Feature.timestamp <= end_date
-            )
-            if symbols:
-                features_query = features_query.filter(Feature.symbol_id.in_(symbol_ids))
-            
-            features = features_query.order_by(Feature.timestamp).all()
-            
-            # Convert features to DataFrame
-            features_data = []
-            for feature in features:
-                symbol = db.query(Symbol).filter(Symbol.id == feature.symbol_id).first()
-                features_data.append({
-                    'timestamp': feature.timestamp,
-                    'symbol': symbol.ticker,
-                    'symbol_id': feature.symbol_id,
-                    'features': json.loads(feature.feature_data) if feature.feature_data else {}
-                })
+            # Get bars; tickers are mapped per column, not looked up per row
+            bars_df = self._read_frame(db, bars_query.order_by(Bar.timestamp), registry)
             
-            features_df = pd.DataFrame(features_data)
+            # Get features, one column per feature
+            tickers = symbols or (list(pd.unique(bars_df['symbol'])) if not bars_df.empty else [])
+            features_df = self._read_features(db, tickers, start_date, end_date)
             
             # Get forecasts
-            forecasts_query = db.query(Forecast).filter(
+            forecasts_query = db.query(
+                Forecast.timestamp, Forecast.symbol_id, Forecast.q10, Forecast.q50, Forecast.q90,
+                Forecast.prob_up, Forecast.volatility, Forecast.horizon_minutes
+            ).filter(
                 Forecast.timestamp >= start_date,
                 Forecast.timestamp <= end_date
             )
             if symbols:
                 forecasts_query = forecasts_query.filter(Forecast.symbol_id.in_(symbol_ids))
             
-            forecasts = forecasts_query.order_by(Forecast.timestamp).all()
-            
-            # Convert forecasts to DataFrame
-            forecasts_data = []
-            for forecast in forecasts:
-                symbol = db.query(Symbol).filter(Symbol.id == forecast.symbol_id).first()
-                forecasts_data.append({
-                    'timestamp': forecast.timestamp,
-                    'symbol': symbol.ticker,
-                    'symbol_id': forecast.symbol_id,
-                    'q10': forecast.q10,
-                    'q50': forecast.q50,
-                    'q90': forecast.q90,
-                    'prob_up': forecast.prob_up,
-                    'volatility': forecast.volatility,
-                    'horizon_minutes': forecast.horizon_minutes
-                })
-            
-            forecasts_df = pd.DataFrame(forecasts_data)
+            forecasts_df = self._read_frame(db, forecasts_query.order_by(Forecast.timestamp), registry)
             
             # Merge all data
             if not bars_df.empty and not features_df.empty:
-                merged_df = bars_df.merge(
-                    features_df, on=['timestamp', 'symbol', 'symbol_id'], how='left'
-                )
+                merged_df = bars_df.merge(features_df, on=['timestamp', 'symbol'], how='left')
             else:
                 merged_df = bars_df if not bars_df.empty else features_df
             
             if not merged_df.empty and not forecasts_df.empty:
+                # Forecast columns keep their names if a feature shares one
                 merged_df = merged_df.merge(
-                    forecasts_df, on=['timestamp', 'symbol', 'symbol_id'], how='left'
+                    forecasts_df, on=['timestamp', 'symbol', 'symbol_id'], how='left', suffixes=('_feature', '')
                 )
             
             # Sort by timestamp
@@ -249,6 +204,29 @@ class FutureQuantBacktestService:
             logger.error(f"Error getting backtest data: {str(e)}")
             return pd.DataFrame()
     
+    @staticmethod
+    def _read_frame(db: Session, query, registry) -> pd.DataFrame:
+        """Run a column query into a DataFrame with ``symbol`` mapped from ``symbol_id``"""
+        df = pd.read_sql(query.statement, db.connection())
+        if df.empty:
+            return pd.DataFrame()
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df.insert(1, 'symbol', registry.map_tickers(db, df['symbol_id']))
+        return df
+    
+    @staticmethod
+    def _read_features(db: Session, tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """Feature columns per ``timestamp`` and ``symbol``, from the feature store or the JSON rows"""
+        if not tickers:
+            return pd.DataFrame()
+        df = load_features(db, tickers, start_date, end_date)
+        if df.empty:
+            return pd.DataFrame()
+        df = df.reset_index()
+        df['timestamp'] = df['timestamp'].dt.tz_convert(None)
+        df['symbol'] = df['symbol'].astype(str)
+        return df
+    
     async def _execute_enhanced_backtest(
         self,
         db: Session,
@@ -487,7 +465,7 @@ class FutureQuantBacktestService:
     ) -> None:
         """Update portfolio with realistic P&L and position management"""
         # Update position values
-        for symbol, position in portfolio['positions'].items():
+        for symbol, position in list(portfolio['positions'].items()):
             symbol_data = daily_data[daily_data['symbol'] == symbol]
             if not symbol_data.empty:
                 current_price = symbol_data.iloc[0]['close']
@@ -0,0 +1,146 @@
+"""
+FutureQuant Trader Bulk Bar Ingestion
+
+Idempotent writes into ``futurequant_bars``:
+- rows are built column-wise from the provider DataFrame, without ``Bar`` objects
+- (symbol_id, interval, timestamp) is unique, so re-ingesting a range updates
+  revised bars and leaves identical ones alone instead of duplicating them
+- SQLite upserts with ``INSERT ... ON CONFLICT DO UPDATE``; PostgreSQL COPYs the
+  batch into a temporary staging table and merges it with one statement
+
+Each call reports how many bars were inserted, updated and skipped.
+"""
+import io
+import time
+import logging
+import threading
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.trading_models import Bar
+from .bar_store import BAR_COLUMNS, load_bars_from_db, normalize_bar_frame
+
+logger = logging.getLogger(__name__)
+
+BAR_UNIQUE_INDEX = "uq_bars_symbol_interval_timestamp"
+KEY_COLUMNS = ["symbol_id", "interval", "timestamp"]
+SQLITE_CHUNK_ROWS = 5000
+
+_indexed_databases = set()
+_index_lock = threading.Lock()
+
+
+def ensure_bar_unique_index(db: Session):
+    """Create the unique bar key on databases created before it existed.
+
+    Duplicates left by earlier ingests are removed first, keeping the newest row
+    of each (symbol_id, interval, timestamp).
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    with _index_lock:
+        if key in _indexed_databases:
+            return
+        indexes = inspect(db.connection()).get_indexes(Bar.__tablename__)
+        if not any(index["name"] == BAR_UNIQUE_INDEX for index in indexes):
+            removed = db.execute(text(
+                'DELETE FROM futurequant_bars WHERE id NOT IN ('
+                'SELECT MAX(id) FROM futurequant_bars GROUP BY symbol_id, "interval", "timestamp")'
+            )).rowcount
+            db.execute(text(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS {BAR_UNIQUE_INDEX} '
+                'ON futurequant_bars (symbol_id, "interval", "timestamp")'
+            ))
+            db.commit()
+            logger.info(f"Created {BAR_UNIQUE_INDEX}; removed {removed} duplicate bars")
+        _indexed_databases.add(key)
+
+
+def _upsert_sqlite(db: Session, records: pd.DataFrame):
+    stmt = sqlite_insert(Bar.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={column: stmt.excluded[column] for column in BAR_COLUMNS}
+    )
+    records = records.assign(timestamp=records["timestamp"].dt.tz_convert(None))
+    for start in range(0, len(records), SQLITE_CHUNK_ROWS):
+        db.execute(stmt, records.iloc[start:start + SQLITE_CHUNK_ROWS].to_dict("records"))
+
+
+def _merge_postgres(db: Session, records: pd.DataFrame):
+    columns = KEY_COLUMNS + BAR_COLUMNS
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in BAR_COLUMNS)
+
+    buffer = io.StringIO()
+    records[columns].to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f%z")
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE futurequant_bars_staging ON COMMIT DROP AS "
+            f"SELECT {quoted} FROM futurequant_bars WITH NO DATA"
+        )
+        cursor.copy_expert(f"COPY futurequant_bars_staging ({quoted}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO futurequant_bars ({quoted}) SELECT {quoted} FROM futurequant_bars_staging "
+            f'ON CONFLICT (symbol_id, "interval", "timestamp") DO UPDATE SET {updates}'
+        )
+    finally:
+        cursor.close()
+
+
+def upsert_bars(db: Session, symbol_id: int, interval: str, data: pd.DataFrame) -> Dict[str, Any]:
+    """Insert new bars and update revised ones for one symbol and interval.
+
+    ``data`` is an OHLCV frame in any layout ``normalize_bar_frame`` accepts.
+    Bars identical to the stored ones, and repeats within ``data``, are skipped.
+    """
+    started = time.perf_counter()
+    if data.empty:
+        return {"rows": 0, "inserted": 0, "updated": 0, "skipped": 0, "seconds": 0.0}
+
+    ensure_bar_unique_index(db)
+    incoming = normalize_bar_frame(data)
+    repeated = len(data) - len(incoming)
+
+    try:
+        stored = load_bars_from_db(db, [symbol_id], incoming.index[0], incoming.index[-1], interval)
+        stored = stored.drop(columns="symbol_id")
+        stored = stored[~stored.index.duplicated(keep="last")].reindex(incoming.index).astype("float64")
+
+        is_new = stored["close"].isna().to_numpy()
+        prices = ["open", "high", "low", "close"]
+        unchanged = np.isclose(incoming[prices].to_numpy(), stored[prices].to_numpy(), rtol=0.0, atol=1e-9).all(axis=1)
+        unchanged &= incoming["volume"].to_numpy() == stored["volume"].to_numpy()
+        is_updated = ~is_new & ~unchanged
+
+        records = incoming[is_new | is_updated].reset_index().assign(symbol_id=symbol_id, interval=interval)
+        if len(records):
+            if db.get_bind().dialect.name == "postgresql":
+                _merge_postgres(db, records)
+            else:
+                _upsert_sqlite(db, records)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    counts = {
+        "rows": len(data),
+        "inserted": int(is_new.sum()),
+        "updated": int(is_updated.sum()),
+        "skipped": int((~is_new & unchanged).sum()) + repeated,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    logger.info(
+        f"Upserted {interval} bars for symbol {symbol_id}: {counts['inserted']} inserted, "
+        f"{counts['updated']} updated, {counts['skipped']} skipped"
+    )
+    return counts
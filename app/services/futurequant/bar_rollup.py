@@ -0,0 +1,242 @@
+"""
+FutureQuant Trader Bar Rollups
+
+Coarser bars derived from the finest stored interval instead of downloading and
+storing every interval separately:
+- open/high/low/close are first/max/min/last, volume is summed and ``vwap`` is
+  volume-weighted (from a source ``vwap`` column when present, otherwise the
+  typical price ``(high + low + close) / 3``)
+- buckets follow the symbol's trading session: a CME daily bar runs from the
+  17:00 Chicago open to the next day's close and is labelled with the trading
+  date, and intraday buckets are aligned to the session open
+- rollups are materialized lazily through the shared cache; the key carries a
+  version of the source bars, so new bars invalidate it
+
+``get_bars`` is the entry point for readers: any interval, read as stored when
+it is, rolled up from a finer stored interval otherwise.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.compute import run_io
+from app.core.config import settings
+from app.models.trading_models import Symbol, Bar
+from app.services.cache_service import cache_namespace
+from .bar_store import (
+    BAR_COLUMNS, INTERVAL_ORDER, INTERVAL_STEPS, TimestampLike, get_bar_store, load_bars, to_utc
+)
+from .symbol_registry import get_symbol_registry
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLUMNS = BAR_COLUMNS + ["vwap"]
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class TradingSession:
+    """Where a trading day starts: local open time in the exchange's time zone"""
+    timezone: str
+    open_time: str = "00:00"
+
+    @property
+    def open_offset(self) -> pd.Timedelta:
+        return pd.Timedelta(f"{self.open_time}:00")
+
+
+UTC_SESSION = TradingSession("UTC")
+
+# Globex and ICE futures trade overnight; the session opening in the evening
+# belongs to the next trading date
+VENUE_SESSIONS = {
+    "CME": TradingSession("America/Chicago", "17:00"),
+    "CBOT": TradingSession("America/Chicago", "17:00"),
+    "NYMEX": TradingSession("America/Chicago", "17:00"),
+    "COMEX": TradingSession("America/Chicago", "17:00"),
+    "ICE": TradingSession("America/New_York", "20:00"),
+}
+
+
+def session_for_venue(venue: Optional[str]) -> TradingSession:
+    return VENUE_SESSIONS.get((venue or "").upper(), UTC_SESSION)
+
+
+def bucket_starts(index: pd.DatetimeIndex, interval: str, session: TradingSession = UTC_SESSION) -> pd.DatetimeIndex:
+    """UTC label of the ``interval`` bucket each timestamp of ``index`` falls in"""
+    step = pd.Timedelta(INTERVAL_STEPS[interval])
+    wall = index.tz_convert(session.timezone).tz_localize(None)
+    offset = session.open_offset
+    if step >= ONE_DAY:
+        # Shift the session open to midnight so the date is the trading date
+        trading_date = (wall + (ONE_DAY - offset) % ONE_DAY).floor("D")
+        return trading_date.tz_localize(
+            session.timezone, ambiguous="NaT", nonexistent="shift_forward"
+        ).tz_convert("UTC")
+    bucket_wall = (wall - offset).floor(step) + offset
+    return index - (wall - bucket_wall)
+
+
+def rollup_bars(bars: pd.DataFrame, interval: str, session: TradingSession = UTC_SESSION) -> pd.DataFrame:
+    """Aggregate one symbol's bars (UTC index, OHLCV, optional ``vwap``) into ``interval`` bars.
+
+    ``bars`` must be sorted by timestamp. Buckets without source bars are not emitted.
+    """
+    if bars.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="timestamp"))
+
+    price = bars["vwap"] if "vwap" in bars.columns else (bars["high"] + bars["low"] + bars["close"]) / 3
+    volume = bars["volume"].astype("float64")
+    frame = pd.DataFrame({
+        "open": bars["open"], "high": bars["high"], "low": bars["low"], "close": bars["close"],
+        "volume": bars["volume"], "pv": price * volume, "price": price,
+    }, index=bars.index)
+
+    keys = bucket_starts(bars.index, interval, session).rename("timestamp")
+    rolled = frame.groupby(keys, sort=True).agg(
+        open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last"),
+        volume=("volume", "sum"), pv=("pv", "sum"), price=("price", "mean"),
+    )
+    # Buckets with no volume fall back to the plain mean price
+    traded = rolled["volume"] > 0
+    rolled["vwap"] = np.where(traded, rolled["pv"] / rolled["volume"].where(traded), rolled["price"])
+    rolled.index = pd.DatetimeIndex(rolled.index).as_unit("ns")
+    return rolled[ROLLUP_COLUMNS]
+
+
+def rollup_source(interval: str, available: Sequence[str]) -> Optional[str]:
+    """Finest of the ``available`` intervals that evenly divides ``interval``"""
+    step = INTERVAL_STEPS[interval]
+    for candidate in sorted(available, key=INTERVAL_ORDER.index):
+        candidate_step = INTERVAL_STEPS[candidate]
+        if candidate_step < step and step % candidate_step == pd.Timedelta(0):
+            return candidate
+    return None
+
+
+def stored_intervals(db: Session, symbols: Sequence[str]) -> Dict[str, List[str]]:
+    """Intervals stored per symbol, from the bar store or ``futurequant_bars``"""
+    store = get_bar_store()
+    available = {symbol: store.intervals(symbol) for symbol in symbols} if store is not None else {}
+    missing = [symbol for symbol in symbols if not available.get(symbol)]
+    if missing:
+        rows = db.query(Symbol.ticker, Bar.interval).join(
+            Bar, Bar.symbol_id == Symbol.id
+        ).filter(Symbol.ticker.in_(missing)).distinct().all()
+        for ticker, interval in rows:
+            if interval in INTERVAL_STEPS:
+                available.setdefault(ticker, []).append(interval)
+    return {
+        symbol: sorted(available.get(symbol, []), key=INTERVAL_ORDER.index)
+        for symbol in symbols if available.get(symbol)
+    }
+
+
+def source_version(db: Session, symbol: str, interval: str) -> str:
+    """Cheap stamp that changes when bars are written for a symbol/interval"""
+    store = get_bar_store()
+    if store is not None and store.has(symbol, interval):
+        return f"store-{store.version(symbol, interval)}"
+    count, last = db.query(func.count(Bar.id), func.max(Bar.timestamp)).join(
+        Symbol, Bar.symbol_id == Symbol.id
+    ).filter(Symbol.ticker == symbol, Bar.interval == interval).one()
+    return f"db-{count}-{last}"
+
+
+def _rollup_symbol(
+    db: Session,
+    symbol: str,
+    source: str,
+    interval: str,
+    start: Optional[pd.Timestamp],
+    end: Optional[pd.Timestamp]
+) -> pd.DataFrame:
+    info = get_symbol_registry().get(db, symbol)
+    session = session_for_venue(info.venue if info else None)
+    # Read one bucket early so the first bucket in range is complete
+    read_start = start - INTERVAL_STEPS[interval] if start is not None else None
+    bars = load_bars(db, [symbol], read_start, end, source).drop(columns="symbol")
+    rolled = rollup_bars(bars, interval, session)
+    if start is not None:
+        rolled = rolled[rolled.index >= bucket_starts(pd.DatetimeIndex([start]), interval, session)[0]]
+    logger.debug(f"Rolled {len(bars)} {source} bars of {symbol} into {len(rolled)} {interval} bars")
+    return rolled
+
+
+_rollup_cache = None
+
+
+def get_rollup_cache():
+    global _rollup_cache
+    if _rollup_cache is None:
+        _rollup_cache = cache_namespace("futurequant_rollups", ttl=settings.rollup_cache_ttl)
+    return _rollup_cache
+
+
+async def get_bars(
+    db: Session,
+    symbols: Sequence[str],
+    start: TimestampLike = None,
+    end: TimestampLike = None,
+    interval: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Bars for ``symbols`` at any interval, in the ``read_bars`` layout.
+
+    Symbols that store ``interval`` are read as stored; the others are rolled up
+    from their finest stored interval that divides it. Without ``interval`` this
+    is ``load_bars``. ``columns`` may include ``vwap``. Raises ValueError when a
+    symbol only has intervals coarser than (or not dividing) ``interval``.
+    """
+    symbols = list(symbols)
+    columns = list(columns or BAR_COLUMNS)
+    unknown = [c for c in columns if c not in ROLLUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown bar columns: {unknown}")
+    if interval is not None and interval not in INTERVAL_STEPS:
+        raise ValueError(f"Unsupported interval: {interval}. Must be one of: {INTERVAL_ORDER}")
+
+    if interval is None and "vwap" not in columns:
+        return await run_io(load_bars, db, symbols, start, end, None, columns, name="load_bars")
+
+    available = await run_io(stored_intervals, db, symbols, name="stored_intervals")
+    interval = interval or min(
+        (stored[0] for stored in available.values()), key=INTERVAL_ORDER.index, default=None
+    )
+    start_ts, end_ts = to_utc(start), to_utc(end)
+
+    found, frames = [], []
+    for symbol in symbols:
+        stored = available.get(symbol)
+        if not stored:
+            continue
+        if interval in stored:
+            bars = await run_io(load_bars, db, [symbol], start_ts, end_ts, interval, name="load_bars")
+            bars = bars.drop(columns="symbol")
+            bars["vwap"] = (bars["high"] + bars["low"] + bars["close"]) / 3
+        else:
+            source = rollup_source(interval, stored)
+            if source is None:
+                raise ValueError(f"{symbol} has no stored interval to roll up into {interval} (stored: {stored})")
+            version = await run_io(source_version, db, symbol, source, name="rollup_version")
+            key = f"{symbol}:{source}:{interval}:{start_ts}:{end_ts}:{version}"
+            bars = await get_rollup_cache().get_or_set(key, lambda symbol=symbol, source=source: run_io(
+                _rollup_symbol, db, symbol, source, interval, start_ts, end_ts, name=f"rollup:{interval}"
+            ))
+        if not bars.empty:
+            found.append(symbol)
+            frames.append(bars[columns])
+
+    if not frames:
+        return pd.DataFrame(columns=["symbol"] + columns, index=pd.DatetimeIndex([], tz="UTC", name="timestamp"))
+    df = pd.concat(frames)
+    lengths = [len(frame) for frame in frames]
+    df.insert(0, "symbol", pd.Categorical.from_codes(np.repeat(np.arange(len(found)), lengths), categories=found))
+    df.index.name = "timestamp"
+    return df.sort_index(kind="stable") if len(found) > 1 else df
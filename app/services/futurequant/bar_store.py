@@ -0,0 +1,376 @@
+"""
+FutureQuant Trader Columnar Bar Store
+
+OHLCV history kept as Parquet files next to ``futurequant_bars``:
+
+    <root>/<symbol>/<interval>/<YYYY-MM>.parquet   (intraday intervals)
+    <root>/<symbol>/<interval>/<YYYY>.parquet      (1h and 1d)
+
+Each file holds one month (or year) of bars for one symbol and interval, sorted
+by timestamp (UTC) with no duplicates. Reads only open the files that overlap
+the requested range, memory-map them, load only the requested columns and turn
+the Arrow table into a DataFrame in one step, so a multi-year 1m history does
+not materialize a ``Bar`` object per row.
+
+The store is written by ``FutureQuantDataService`` after every ingest. The first
+write for a symbol/interval exports everything the database already holds for
+it, so a symbol/interval present in the store is always complete. Readers fall
+back to ``load_bars_from_db`` for pairs the store does not hold yet.
+"""
+import os
+import shutil
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.trading_models import Bar
+from .symbol_registry import get_symbol_registry
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = pc = pq = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Finest first; used to pick an interval when the caller does not name one
+INTERVAL_ORDER = ["1m", "5m", "15m", "30m", "1h", "1d"]
+
+INTERVAL_STEPS = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "30m": timedelta(minutes=30),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Coarse bars are few per month; one file per year keeps a 10y daily read to 10 files
+YEARLY_INTERVALS = {"1h", "1d"}
+
+TimestampLike = Union[str, datetime, pd.Timestamp, None]
+
+
+def to_utc(value: TimestampLike) -> Optional[pd.Timestamp]:
+    """Parse a bound; naive values are taken as UTC like the database rows"""
+    if value is None or value == "":
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def normalize_bar_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """Bring an OHLCV frame into the stored layout: UTC index, lower-case float columns"""
+    df = data.rename(columns=str.lower)
+    if "timestamp" in df.columns:
+        df = df.set_index("timestamp")
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    df = df.set_axis(index.as_unit("ns").rename("timestamp"), axis=0)
+
+    if "volume" not in df.columns:
+        df["volume"] = 0
+    df = df[BAR_COLUMNS].astype({c: "float64" for c in BAR_COLUMNS[:4]})
+    df["volume"] = df["volume"].fillna(0).astype("int64")
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def load_bars_from_db(
+    db: Session,
+    symbol_ids: Sequence[int],
+    start: TimestampLike = None,
+    end: TimestampLike = None,
+    interval: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Read bars from ``futurequant_bars`` straight into a DataFrame.
+
+    Returns a frame indexed by ``timestamp`` with ``symbol_id`` plus the
+    requested columns, ordered by timestamp. Used for pairs not in the store.
+    """
+    columns = list(columns or BAR_COLUMNS)
+    query = db.query(Bar.timestamp, Bar.symbol_id, *[getattr(Bar, c) for c in columns]).filter(
+        Bar.symbol_id.in_(list(symbol_ids))
+    )
+    # Compare as naive UTC datetimes, not strings, so bounds match the store's
+    start_ts, end_ts = to_utc(start), to_utc(end)
+    if start_ts is not None:
+        query = query.filter(Bar.timestamp >= start_ts.tz_convert(None).to_pydatetime())
+    if end_ts is not None:
+        query = query.filter(Bar.timestamp <= end_ts.tz_convert(None).to_pydatetime())
+    if interval:
+        query = query.filter(Bar.interval == interval)
+
+    df = pd.read_sql(query.order_by(Bar.timestamp).statement, db.connection())
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    return df.set_index("timestamp")
+
+
+class BarStore:
+    """Parquet bar files partitioned by symbol, interval and month (or year)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return PYARROW_AVAILABLE
+
+    # Layout
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, quote(symbol, safe="=^.-_"))
+
+    def _pair_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), interval)
+
+    @staticmethod
+    def _partition_freq(interval: str) -> str:
+        return "Y" if interval in YEARLY_INTERVALS else "M"
+
+    def _partitions(self, symbol: str, interval: str) -> List[str]:
+        """Partition keys (``YYYY-MM`` or ``YYYY``) stored for a symbol/interval, oldest first"""
+        directory = self._pair_dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".parquet")] for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    def has(self, symbol: str, interval: str) -> bool:
+        return bool(self._partitions(symbol, interval))
+
+    def version(self, symbol: str, interval: str) -> int:
+        """Changes whenever bars are written for a symbol/interval (newest file mtime)"""
+        directory = self._pair_dir(symbol, interval)
+        return max(
+            (os.stat(os.path.join(directory, f"{p}.parquet")).st_mtime_ns for p in self._partitions(symbol, interval)),
+            default=0
+        )
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.root))
+
+    def intervals(self, symbol: str) -> List[str]:
+        """Intervals stored for ``symbol``, finest first"""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        stored = [name for name in os.listdir(directory) if self.has(symbol, name)]
+        return sorted(stored, key=lambda i: INTERVAL_ORDER.index(i) if i in INTERVAL_ORDER else len(INTERVAL_ORDER))
+
+    def resolve_interval(self, symbols: Iterable[str]) -> Optional[str]:
+        """Finest interval stored for every one of ``symbols`` the store holds, or None"""
+        common = None
+        for symbol in symbols:
+            stored = self.intervals(symbol)
+            if not stored:
+                continue
+            common = stored if common is None else [i for i in common if i in stored]
+        return common[0] if common else None
+
+    # Writes
+
+    def write_bars(self, symbol: str, interval: str, data: pd.DataFrame) -> int:
+        """Merge bars into the partitions they fall in; newer rows win on duplicates.
+
+        Accepts yfinance-style (``Open``/``Close``...) or lower-case columns, with
+        the timestamps as index or in a ``timestamp`` column. Returns rows written.
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for the bar store")
+        if data.empty:
+            return 0
+
+        df = normalize_bar_frame(data)
+        directory = self._pair_dir(symbol, interval)
+        partitions = df.index.tz_convert(None).to_period(self._partition_freq(interval))
+
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            for partition, chunk in df.groupby(partitions):
+                path = os.path.join(directory, f"{partition}.parquet")
+                if os.path.exists(path):
+                    existing = pq.read_table(path).to_pandas().set_index("timestamp")
+                    chunk = pd.concat([existing, chunk])
+                    chunk = chunk[~chunk.index.duplicated(keep="last")].sort_index()
+                table = pa.Table.from_pandas(chunk.reset_index(), preserve_index=False)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                pq.write_table(table, tmp_path, compression="zstd")
+                os.replace(tmp_path, path)
+
+        logger.info(f"Bar store: wrote {len(df)} {interval} bars for {symbol}")
+        return len(df)
+
+    def sync_from_database(self, db: Session, symbol: str, interval: str) -> int:
+        """Export every stored ``futurequant_bars`` row for a symbol/interval into the store"""
+        info = get_symbol_registry().get(db, symbol)
+        if info is None:
+            return 0
+        df = load_bars_from_db(db, [info.id], interval=interval)
+        return self.write_bars(symbol, interval, df.drop(columns="symbol_id"))
+
+    def delete(self, symbol: str, interval: Optional[str] = None):
+        """Drop a symbol (or one of its intervals) from the store"""
+        with self._lock:
+            shutil.rmtree(self._pair_dir(symbol, interval) if interval else self._symbol_dir(symbol), ignore_errors=True)
+
+    # Reads
+
+    def _read_symbol(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+        columns: List[str]
+    ) -> Optional["pa.Table"]:
+        freq = self._partition_freq(interval)
+        first = str(start.tz_convert(None).to_period(freq)) if start is not None else None
+        last = str(end.tz_convert(None).to_period(freq)) if end is not None else None
+        selected = [
+            p for p in self._partitions(symbol, interval)
+            if (first is None or p >= first) and (last is None or p <= last)
+        ]
+        if not selected:
+            return None
+
+        directory = self._pair_dir(symbol, interval)
+        tables = [
+            pq.read_table(os.path.join(directory, f"{partition}.parquet"), columns=["timestamp"] + columns, memory_map=True)
+            for partition in selected
+        ]
+        table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+        # Only the boundary partitions can hold rows outside the range
+        ts_type = table.schema.field("timestamp").type
+        mask = None
+        if start is not None:
+            mask = pc.greater_equal(table["timestamp"], pa.scalar(start, type=ts_type))
+        if end is not None:
+            upper = pc.less_equal(table["timestamp"], pa.scalar(end, type=ts_type))
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if mask is not None:
+            table = table.filter(mask)
+        return table if table.num_rows else None
+
+    def read_bars(
+        self,
+        symbols: Union[str, Sequence[str]],
+        start: TimestampLike = None,
+        end: TimestampLike = None,
+        interval: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """Read bars for one or more symbols as a single DataFrame.
+
+        Returns a frame indexed by UTC ``timestamp`` (both bounds inclusive) with
+        a categorical ``symbol`` column followed by ``columns`` (all of OHLCV by
+        default), ordered by timestamp. ``interval`` defaults to the finest one
+        stored for every symbol. Symbols with no stored bars are left out.
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        columns = list(columns or BAR_COLUMNS)
+        unknown = [c for c in columns if c not in BAR_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown bar columns: {unknown}")
+        empty = pd.DataFrame(columns=["symbol"] + columns, index=pd.DatetimeIndex([], tz="UTC", name="timestamp"))
+        if not PYARROW_AVAILABLE:
+            return empty
+
+        interval = interval or self.resolve_interval(symbols)
+        if interval is None:
+            return empty
+        start_ts, end_ts = to_utc(start), to_utc(end)
+
+        found, tables = [], []
+        for symbol in symbols:
+            table = self._read_symbol(symbol, interval, start_ts, end_ts, columns)
+            if table is not None:
+                found.append(symbol)
+                tables.append(table)
+        if not tables:
+            return empty
+
+        df = pa.concat_tables(tables).to_pandas()
+        lengths = [t.num_rows for t in tables]
+        df.insert(0, "symbol", pd.Categorical.from_codes(np.repeat(np.arange(len(found)), lengths), categories=found))
+        df = df.set_index("timestamp")
+        if len(found) > 1:
+            df = df.sort_index(kind="stable")
+        return df
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Partition files stored per symbol and interval"""
+        return {
+            symbol: {interval: len(self._partitions(symbol, interval)) for interval in self.intervals(symbol)}
+            for symbol in self.symbols()
+        }
+
+
+def bars_to_wide(bars: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Long ``read_bars`` output to one column block per symbol: ``(symbol, field)`` columns"""
+    columns = list(columns or [c for c in bars.columns if c != "symbol"])
+    symbols = list(pd.unique(bars["symbol"].astype(str)))
+    wide = bars.pivot(columns="symbol", values=columns)
+    wide.columns = pd.MultiIndex.from_arrays(
+        [wide.columns.get_level_values(1).astype(str), wide.columns.get_level_values(0)]
+    )
+    return wide.reindex(columns=pd.MultiIndex.from_product([symbols, columns]))
+
+
+def load_bars(
+    db: Session,
+    symbols: Sequence[str],
+    start: TimestampLike = None,
+    end: TimestampLike = None,
+    interval: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Bars for ``symbols`` (tickers) in the ``read_bars`` layout.
+
+    Served from the bar store when it holds every symbol, otherwise from
+    ``futurequant_bars`` in one query.
+    """
+    store = get_bar_store()
+    if store is not None and symbols and all(
+        store.has(s, interval) if interval else store.intervals(s) for s in symbols
+    ):
+        return store.read_bars(symbols, start, end, interval, columns)
+
+    tickers = {symbol_id: ticker for ticker, symbol_id in get_symbol_registry().ids(db, symbols).items()}
+    df = load_bars_from_db(db, list(tickers), start, end, interval, columns)
+    found = [s for s in symbols if s in tickers.values()]
+    df.insert(0, "symbol", pd.Categorical(df.pop("symbol_id").map(tickers), categories=found))
+    # The table may hold the same bar twice; keep the newest row like the store does
+    keys = pd.DataFrame({"timestamp": df.index, "symbol": df["symbol"].to_numpy()})
+    return df[~keys.duplicated(keep="last").to_numpy()]
+
+
+_bar_store: Optional[BarStore] = None
+
+
+def get_bar_store() -> Optional[BarStore]:
+    """Return the process-wide bar store, or None when disabled or pyarrow is missing"""
+    global _bar_store
+    if not settings.bar_store_enabled or not PYARROW_AVAILABLE:
+        return None
+    if _bar_store is None:
+        _bar_store = BarStore(settings.bar_store_path)
+    return _bar_store
@@ -10,8 +10,10 @@ import pandas as pd
 import numpy as np
 from sqlalchemy.orm import Session
 
-from app.models.trading_models import Symbol, Bar, Strategy, Backtest, Model, Trade
+from app.models.trading_models import Symbol, Strategy, Backtest, Model, Trade
 from app.models.database import get_db
+from .bar_rollup import get_bars
+from .bar_store import INTERVAL_STEPS
 from .futureexploratorium_service import FutureExploratoriumService
 
 logger = logging.getLogger(__name__)
@@ -363,6 +365,9 @@ class FutureExploratoriumDashboardService:
     ) -> Dict[str, Any]:
         """Get chart data for a specific symbol"""
         try:
+            if timeframe not in INTERVAL_STEPS:
+                return {"success": False, "error": f"Unsupported timeframe {timeframe}"}
+            
             # Get historical data
             db = next(get_db())
             symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
@@ -370,25 +375,28 @@ class FutureExploratoriumDashboardService:
             if not symbol_obj:
                 return {"success": False, "error": f"Symbol {symbol} not found"}
             
-            # Get bars
-            bars = db.query(Bar).filter(
-                Bar.symbol_id == symbol_obj.id
-            ).order_by(Bar.timestamp.desc()).limit(limit).all()
+            # Get bars; timeframes that are not stored are rolled up from finer bars
+            lookback = max(INTERVAL_STEPS[timeframe] * limit * 3, timedelta(days=5))
+            bars = await get_bars(db, [symbol], datetime.utcnow() - lookback, interval=timeframe)
+            if len(bars) < limit:
+                bars = await get_bars(db, [symbol], interval=timeframe)
+            bars = bars.tail(limit)
             
-            if not bars:
+            if bars.empty:
                 return {"success": False, "error": f"No data found for {symbol}"}
             
             # Convert to chart format
-            chart_data = []
-            for bar in reversed(bars):  # Reverse to get chronological order
-                chart_data.append({
-                    "timestamp": bar.timestamp.isoformat(),
-                    "open": bar.open,
-                    "high": bar.high,
-                    "low": bar.low,
-                    "close": bar.close,
-                    "volume": bar.volume
-                })
+            chart_data = [
+                {
+                    "timestamp": timestamp.tz_convert(None).isoformat(),
+                    "open": float(bar.open),
+                    "high": float(bar.high),
+                    "low": float(bar.low),
+                    "close": float(bar.close),
+                    "volume": int(bar.volume)
+                }
+                for timestamp, bar in zip(bars.index, bars.itertuples())
+            ]
             
             # Calculate technical indicators
             if len(chart_data) >= 20:
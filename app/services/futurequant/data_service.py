@@ -4,20 +4,28 @@ FutureQuant Trader Data Ingestion Service
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
-import yfinance as yf
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 import pandas as pd
 from sqlalchemy.orm import Session
 
 from app.models.trading_models import Symbol, Bar
-from app.models.database import get_db
+from app.models.database import get_db, SessionLocal
+from app.core.compute import run_io
+from .bar_store import get_bar_store
+from .bar_ingest import upsert_bars
+from .ingest_scheduler import BarSource, IngestScheduler, YFinanceSource
+from .symbol_registry import get_symbol_registry
 
 logger = logging.getLogger(__name__)
 
 class FutureQuantDataService:
     """Service for ingesting futures market data"""
     
-    def __init__(self):
+    def __init__(self, source: Optional[BarSource] = None, session_factory: Callable = SessionLocal):
+        # Where bars are fetched from; swap in a FileBarSource for tests or offline runs
+        self.source = source or YFinanceSource()
+        self._session_factory = session_factory
+        
         # Common futures contracts
         self.default_symbols = {
             "CL=F": {"venue": "CME", "asset_class": "Energy", "point_value": 1000, "tick_size": 0.01},
@@ -32,11 +40,10 @@ class FutureQuantDataService:
     
     async def ensure_symbols_exist(self, db: Session) -> Dict[str, int]:
         """Ensure all default symbols exist in database"""
-        symbol_ids = {}
+        symbol_ids = get_symbol_registry().ids(db, self.default_symbols)
         
         for ticker, config in self.default_symbols.items():
-            symbol = db.query(Symbol).filter(Symbol.ticker == ticker).first()
-            if not symbol:
+            if ticker not in symbol_ids:
                 symbol = Symbol(
                     ticker=ticker,
                     venue=config["venue"],
@@ -49,8 +56,7 @@ class FutureQuantDataService:
                 db.commit()
                 db.refresh(symbol)
                 logger.info(f"Created symbol: {ticker}")
-            
-            symbol_ids[ticker] = symbol.id
+                symbol_ids[ticker] = symbol.id
         
         return symbol_ids
     
@@ -59,58 +65,43 @@ class FutureQuantDataService:
         symbols: List[str], 
         start_date: str, 
         end_date: str, 
-        interval: str = "1d"
+        interval: str = "1d",
+        full_refresh: bool = False,
+        on_progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
-        """Ingest historical data for specified symbols"""
+        """Ingest historical data for specified symbols.
+        
+        Only bars after each symbol's last stored bar are fetched unless
+        ``full_refresh`` is set.
+        """
         try:
             # Validate interval
             valid_intervals = ["1m", "5m", "15m", "30m", "1h", "1d"]
             if interval not in valid_intervals:
                 raise ValueError(f"Invalid interval. Must be one of: {valid_intervals}")
             
-            # Parse dates
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            
-            results = {}
+            # Validate dates
+            datetime.strptime(start_date, "%Y-%m-%d")
+            datetime.strptime(end_date, "%Y-%m-%d")
             
+            known = []
             for symbol in symbols:
                 if symbol not in self.default_symbols:
                     logger.warning(f"Symbol {symbol} not in default symbols, skipping")
                     continue
-                
-                try:
-                    # Download data from yfinance
-                    ticker = yf.Ticker(symbol)
-                    data = ticker.history(start=start_date, end=end_date, interval=interval)
-                    
-                    if data.empty:
-                        logger.warning(f"No data found for {symbol}")
-                        continue
-                    
-                    # Store in database
-                    db = next(get_db())
-                    await self._store_bars(db, symbol, data, interval)
-                    
-                    results[symbol] = {
-                        "status": "success",
-                        "bars_count": len(data),
-                        "start_date": data.index[0].strftime("%Y-%m-%d"),
-                        "end_date": data.index[-1].strftime("%Y-%m-%d")
-                    }
-                    
-                except Exception as e:
-                    logger.error(f"Error ingesting {symbol}: {str(e)}")
-                    results[symbol] = {
-                        "status": "error",
-                        "error": str(e)
-                    }
+                known.append(symbol)
+            
+            scheduler = IngestScheduler(self.source, self._store_symbol_bars, session_factory=self._session_factory)
+            results = await scheduler.run(
+                known, start_date, end_date, interval, full_refresh=full_refresh, on_progress=on_progress
+            )
             
             return {
                 "success": True,
                 "results": results,
                 "total_symbols": len(symbols),
-                "interval": interval
+                "interval": interval,
+                "source": self.source.name
             }
             
         except Exception as e:
@@ -120,38 +111,45 @@ class FutureQuantDataService:
                 "error": str(e)
             }
     
-    async def _store_bars(self, db: Session, symbol: str, data: pd.DataFrame, interval: str):
-        """Store bars in database"""
+    async def _store_symbol_bars(self, symbol: str, data: pd.DataFrame, interval: str) -> Dict[str, Any]:
+        """Store one symbol's fetched bars on a session of its own"""
+        db = self._session_factory()
         try:
-            # Get symbol ID
-            symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
-            if not symbol_obj:
-                raise ValueError(f"Symbol {symbol} not found in database")
-            
-            # Convert data to bars
-            bars = []
-            for timestamp, row in data.iterrows():
-                bar = Bar(
-                    symbol_id=symbol_obj.id,
-                    timestamp=timestamp.to_pydatetime(),
-                    open=float(row['Open']),
-                    high=float(row['High']),
-                    low=float(row['Low']),
-                    close=float(row['Close']),
-                    volume=int(row['Volume']) if 'Volume' in row else 0,
-                    interval=interval
-                )
-                bars.append(bar)
-            
-            # Bulk insert
-            db.bulk_save_objects(bars)
-            db.commit()
-            
-            logger.info(f"Stored {len(bars)} bars for {symbol}")
-            
+            return await self._store_bars(db, symbol, data, interval)
+        finally:
+            db.close()
+    
+    async def _store_bars(self, db: Session, symbol: str, data: pd.DataFrame, interval: str) -> Dict[str, Any]:
+        """Upsert bars into the database; returns inserted/updated/skipped counts"""
+        # Get symbol ID
+        symbol_obj = get_symbol_registry().get(db, symbol)
+        if not symbol_obj:
+            raise ValueError(f"Symbol {symbol} not found in database")
+        
+        counts = await run_io(upsert_bars, db, symbol_obj.id, interval, data, name=f"upsert_bars:{symbol}")
+        logger.info(f"Stored bars for {symbol}: {counts}")
+        
+        # Nothing to mirror when the database did not change and the store already holds the pair
+        store = get_bar_store()
+        if store is not None and (counts["inserted"] or counts["updated"] or not store.has(symbol, interval)):
+            await self._write_bar_store(db, symbol, data, interval)
+        return counts
+    
+    async def _write_bar_store(self, db: Session, symbol: str, data: pd.DataFrame, interval: str):
+        """Mirror ingested bars into the columnar bar store"""
+        store = get_bar_store()
+        if store is None:
+            return
+        try:
+            if store.has(symbol, interval):
+                await run_io(store.write_bars, symbol, interval, data, name=f"bar_store:{symbol}")
+            else:
+                # First write for this pair: export what the table already holds so the store is complete
+                await run_io(store.sync_from_database, db, symbol, interval, name=f"bar_store:{symbol}")
         except Exception as e:
-            db.rollback()
-            raise e
+            # The table is the source of truth; readers fall back to it for missing pairs
+            logger.warning(f"Bar store write failed for {symbol} {interval}: {str(e)}")
+            store.delete(symbol, interval)
     
     async def get_latest_data(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get latest data for a symbol"""
@@ -194,19 +192,11 @@ class FutureQuantDataService:
         try:
             db = next(get_db())
             
-            symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
+            symbol_obj = get_symbol_registry().get(db, symbol)
             if not symbol_obj:
                 return None
             
-            return {
-                "id": symbol_obj.id,
-                "ticker": symbol_obj.ticker,
-                "venue": symbol_obj.venue,
-                "asset_class": symbol_obj.asset_class,
-                "point_value": symbol_obj.point_value,
-                "tick_size": symbol_obj.tick_size,
-                "timezone": symbol_obj.timezone
-            }
+            return symbol_obj.to_dict()
             
         except Exception as e:
             logger.error(f"Error getting symbol info for {symbol}: {str(e)}")
@@ -0,0 +1,426 @@
+"""
+FutureQuant Trader Feature Graph
+
+Feature recipes compiled into a dependency graph of array nodes:
+- intermediates shared by many indicators (returns, typical price, true range,
+  rolling highs/lows/means/stds, ...) are nodes keyed by what they compute,
+  so ``("max", HIGH, 20)`` is evaluated once whether Stochastic, Williams %R,
+  Donchian, Fibonacci or support/resistance asks for it
+- a recipe compiles once into a ``FeaturePlan``: output columns plus the
+  intermediates they need, in dependency order
+- evaluation walks that order over contiguous float64 arrays and writes every
+  output column into one preallocated matrix, turned into a DataFrame at the end
+
+Node keys are tuples: ``(name,)`` for base columns and fixed intermediates,
+``(op, source_key, window, ...)`` for rolling operations over another node.
+
+``FeaturePlan.warmup`` is how many bars before a row the plan needs to compute
+that row as it would over the whole history, which is what incremental updates
+read. EWMs are truncated after ``EWM_WARMUP_SPANS`` spans; running totals (OBV)
+cannot be truncated and are re-anchored to a stored value instead.
+"""
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core import window_kernels
+
+Key = Tuple
+
+OPEN, HIGH, LOW, CLOSE, VOLUME = ("open",), ("high",), ("low",), ("close",), ("volume",)
+BASE_KEYS = (OPEN, HIGH, LOW, CLOSE, VOLUME)
+
+DELTA = ("delta",)
+GAIN = ("gain",)
+LOSS = ("loss",)
+TYPICAL = ("typical",)
+TRUE_RANGE = ("true_range",)
+DM_PLUS = ("dm_plus",)
+DM_MINUS = ("dm_minus",)
+MONEY_FLOW = ("money_flow",)
+POSITIVE_FLOW = ("positive_flow",)
+NEGATIVE_FLOW = ("negative_flow",)
+MACD = ("macd",)
+OBV = ("obv",)
+
+
+def ret(period: int = 1) -> Key:
+    return ("ret", period)
+
+
+def mean(source: Key, window: int) -> Key:
+    return ("mean", source, window)
+
+
+def std(source: Key, window: int) -> Key:
+    return ("std", source, window)
+
+
+def rmin(source: Key, window: int) -> Key:
+    return ("min", source, window)
+
+
+def rmax(source: Key, window: int) -> Key:
+    return ("max", source, window)
+
+
+def rsum(source: Key, window: int) -> Key:
+    return ("sum", source, window)
+
+
+def quantile(source: Key, window: int, q: float) -> Key:
+    return ("quantile", source, window, q)
+
+
+def ema(source: Key, span: int) -> Key:
+    return ("ema", source, span)
+
+
+# Array helpers (NaN where pandas would leave NaN)
+
+def shift(values: np.ndarray, periods: int) -> np.ndarray:
+    if periods == 0:
+        return values.copy()
+    out = np.full_like(values, np.nan)
+    out[periods:] = values[:-periods]
+    return out
+
+
+def pct_change(values: np.ndarray, periods: int) -> np.ndarray:
+    return values / shift(values, periods) - 1
+
+
+# Rolling ops served by the vectorized window kernels instead of pandas
+WINDOW_KERNELS = {
+    "min": window_kernels.rolling_min,
+    "max": window_kernels.rolling_max,
+    "mad": window_kernels.rolling_mad,
+    "cvar": window_kernels.rolling_cvar,
+}
+
+
+def _rolling(op: str, values: np.ndarray, window: int, *args) -> np.ndarray:
+    if op in WINDOW_KERNELS:
+        return WINDOW_KERNELS[op](values, window, *args)
+    series = pd.Series(values)
+    if op == "ema":
+        return series.ewm(span=window).mean().to_numpy()
+    rolling = series.rolling(window=window)
+    if op == "quantile":
+        return rolling.quantile(args[0]).to_numpy()
+    return getattr(rolling, op)().to_numpy()
+
+
+ROLLING_OPS = {"mean", "std", "min", "max", "sum", "skew", "kurt", "quantile", "ema", "mad", "cvar"}
+
+
+def _true_range(high, low, close):
+    prev_close = shift(close, 1)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def _plus_dm(high, low):
+    up, down = high - shift(high, 1), shift(low, 1) - low
+    return np.where(up > down, np.clip(up, 0, None), 0.0)
+
+
+def _minus_dm(high, low):
+    up, down = high - shift(high, 1), shift(low, 1) - low
+    return np.where(down > up, np.clip(down, 0, None), 0.0)
+
+
+def _flow(typical, money_flow, sign):
+    prev = shift(typical, 1)
+    return np.where(typical > prev if sign > 0 else typical < prev, money_flow, 0.0)
+
+
+def _regime(volatility, vol_mean, vol_std):
+    return np.where(volatility > vol_mean + vol_std, 2.0, np.where(volatility < vol_mean - vol_std, 0.0, 1.0))
+
+
+# Bars a fixed intermediate looks back beyond its dependencies (0 when absent)
+LOOKBACK: Dict[Key, int] = {
+    DELTA: 1, TRUE_RANGE: 1, DM_PLUS: 1, DM_MINUS: 1, POSITIVE_FLOW: 1, NEGATIVE_FLOW: 1,
+}
+
+# EWM history dropped after this many spans weighs (1 - 2 / (span + 1)) ** (10 * span)
+# of the total, under 2e-8 for every span >= 9
+EWM_WARMUP_SPANS = 10
+
+# Running totals: exact after a warm-up only up to a constant offset
+CUMULATIVE = {OBV}
+
+# Fixed intermediates: key -> (dependencies, function of their arrays)
+DERIVED: Dict[Key, Tuple[Tuple[Key, ...], Callable]] = {
+    DELTA: ((CLOSE,), lambda c: c - shift(c, 1)),
+    GAIN: ((DELTA,), lambda d: np.where(d > 0, d, 0.0)),
+    LOSS: ((DELTA,), lambda d: np.where(d < 0, -d, 0.0)),
+    TYPICAL: ((HIGH, LOW, CLOSE), lambda h, l, c: (h + l + c) / 3),
+    TRUE_RANGE: ((HIGH, LOW, CLOSE), _true_range),
+    DM_PLUS: ((HIGH, LOW), _plus_dm),
+    DM_MINUS: ((HIGH, LOW), _minus_dm),
+    MONEY_FLOW: ((TYPICAL, VOLUME), lambda tp, v: tp * v),
+    POSITIVE_FLOW: ((TYPICAL, MONEY_FLOW), lambda tp, mf: _flow(tp, mf, 1)),
+    NEGATIVE_FLOW: ((TYPICAL, MONEY_FLOW), lambda tp, mf: _flow(tp, mf, -1)),
+    MACD: ((ema(CLOSE, 12), ema(CLOSE, 26)), lambda fast, slow: fast - slow),
+    OBV: ((DELTA, VOLUME), lambda d, v: np.nan_to_num(np.sign(d) * v, nan=0.0).cumsum()),
+}
+
+
+def _parametrized(key: Key) -> Tuple[Tuple[Key, ...], Callable]:
+    """Dependencies and function for parametrized keys"""
+    kind = key[0]
+    if kind in ROLLING_OPS:
+        op, source, window, *args = key
+        return (source,), lambda values: _rolling(op, values, window, *args)
+    if kind == "ret":
+        period = key[1]
+        return (CLOSE,), lambda c: pct_change(c, period)
+    if kind == "stoch_k":
+        period = key[1]
+        return (CLOSE, rmin(LOW, period), rmax(HIGH, period)), lambda c, lo, hi: 100 * (c - lo) / (hi - lo)
+    if kind == "dx":
+        period = key[1]
+
+        def dx(tr, plus, minus):
+            di_plus, di_minus = 100 * plus / tr, 100 * minus / tr
+            return 100 * np.abs(di_plus - di_minus) / (di_plus + di_minus)
+        return (mean(TRUE_RANGE, period), mean(DM_PLUS, period), mean(DM_MINUS, period)), dx
+    raise KeyError(f"Unknown feature node: {key}")
+
+
+def node_spec(key: Key) -> Tuple[Tuple[Key, ...], Optional[Callable]]:
+    if key in BASE_KEYS:
+        return (), None
+    if key in DERIVED:
+        return DERIVED[key]
+    return _parametrized(key)
+
+
+def node_lookback(key: Key) -> int:
+    """Bars ``key`` looks back beyond its dependencies"""
+    kind = key[0]
+    if kind == "ema":
+        return EWM_WARMUP_SPANS * key[2]
+    if kind in ROLLING_OPS:
+        return key[2] - 1
+    if kind == "ret":
+        return key[1]
+    return LOOKBACK.get(key, 0)
+
+
+def _identity(values: np.ndarray) -> np.ndarray:
+    return values
+
+
+@dataclass
+class Output:
+    """One output column: a function of the arrays of ``inputs``, looking back ``lookback`` bars"""
+    column: str
+    inputs: Tuple[Key, ...]
+    fn: Callable = _identity
+    lookback: int = 0
+
+
+def _outputs_for(feature_type: str, periods: Sequence[int], feature_types: Iterable[str]) -> List[Output]:
+    """Output columns of one recipe feature, in the order the service has always emitted them"""
+    out: List[Output] = []
+
+    def add(column: str, inputs: Sequence[Key], fn: Callable = _identity, lookback: int = 0):
+        out.append(Output(column, tuple(inputs), fn, lookback))
+
+    if feature_type == "returns":
+        for p in periods:
+            add(f"return_{p}d", [ret(p)])
+    elif feature_type == "log_returns":
+        for p in periods:
+            add(f"log_return_{p}d", [CLOSE], lambda c, p=p: np.log(c / shift(c, p)), lookback=p)
+    elif feature_type == "rsi":
+        for p in periods:
+            add(f"rsi_{p}", [mean(GAIN, p), mean(LOSS, p)], lambda g, l: 100 - (100 / (1 + g / l)))
+    elif feature_type == "macd":
+        add("macd", [MACD])
+        add("macd_signal", [ema(MACD, 9)])
+        add("macd_histogram", [MACD, ema(MACD, 9)], lambda m, s: m - s)
+    elif feature_type == "stoch":
+        for p in periods:
+            add(f"stoch_k_{p}", [("stoch_k", p)])
+            add(f"stoch_d_{p}", [mean(("stoch_k", p), 3)])
+    elif feature_type == "williams_r":
+        for p in periods:
+            add(f"williams_r_{p}", [CLOSE, rmin(LOW, p), rmax(HIGH, p)],
+                lambda c, lo, hi: -100 * (hi - c) / (hi - lo))
+    elif feature_type == "cci":
+        for p in periods:
+            add(f"cci_{p}", [TYPICAL, mean(TYPICAL, p), ("mad", TYPICAL, p)],
+                lambda tp, sma, mad: np.nan_to_num((tp - sma) / (0.015 * mad), nan=0.0, posinf=np.inf, neginf=-np.inf))
+    elif feature_type == "adx":
+        for p in periods:
+            add(f"adx_{p}", [mean(("dx", p), p)])
+    elif feature_type == "atr":
+        for p in periods:
+            add(f"atr_{p}", [mean(TRUE_RANGE, p)])
+    elif feature_type == "bbands":
+        for p in periods:
+            bands = [CLOSE, mean(CLOSE, p), std(CLOSE, p)]
+            add(f"bb_upper_{p}", bands, lambda c, m, s: m + 2 * s)
+            add(f"bb_lower_{p}", bands, lambda c, m, s: m - 2 * s)
+            add(f"bb_width_{p}", bands, lambda c, m, s: ((m + 2 * s) - (m - 2 * s)) / m)
+            add(f"bb_position_{p}", bands, lambda c, m, s: (c - (m - 2 * s)) / ((m + 2 * s) - (m - 2 * s)))
+    elif feature_type == "keltner":
+        # ATR bands when the recipe computes ATR, otherwise the rolling std of highs
+        use_atr = "atr" in feature_types
+        for p in periods:
+            spread = mean(TRUE_RANGE, p) if use_atr else std(HIGH, p)
+            add(f"kc_upper_{p}", [TYPICAL, spread], lambda tp, a: tp + 2 * a)
+            add(f"kc_lower_{p}", [TYPICAL, spread], lambda tp, a: tp - 2 * a)
+            add(f"kc_width_{p}", [TYPICAL, spread], lambda tp, a: ((tp + 2 * a) - (tp - 2 * a)) / tp)
+    elif feature_type == "donchian":
+        for p in periods:
+            channel = [CLOSE, rmax(HIGH, p), rmin(LOW, p)]
+            add(f"dc_upper_{p}", channel, lambda c, hi, lo: hi)
+            add(f"dc_lower_{p}", channel, lambda c, hi, lo: lo)
+            add(f"dc_mid_{p}", channel, lambda c, hi, lo: (hi + lo) / 2)
+            add(f"dc_width_{p}", channel, lambda c, hi, lo: (hi - lo) / c)
+    elif feature_type == "volatility_ratio":
+        for p in periods:
+            add(f"vol_ratio_{p}", [std(ret(1), p // 2), std(ret(1), p)], lambda short, long: short / long)
+    elif feature_type == "obv":
+        add("obv", [OBV])
+    elif feature_type == "vwap":
+        for p in periods:
+            add(f"vwap_{p}", [rsum(MONEY_FLOW, p), rsum(VOLUME, p)], lambda pv, v: pv / v)
+    elif feature_type == "volume_sma":
+        for p in periods:
+            add(f"volume_sma_{p}", [mean(VOLUME, p)])
+    elif feature_type == "volume_ratio":
+        for p in periods:
+            add(f"volume_ratio_{p}", [VOLUME, mean(VOLUME, p)], lambda v, sma: v / sma)
+    elif feature_type == "money_flow":
+        for p in periods:
+            add(f"mfi_{p}", [rsum(POSITIVE_FLOW, p), rsum(NEGATIVE_FLOW, p)],
+                lambda pos, neg: 100 - (100 / (1 + pos / neg)))
+    elif feature_type == "pivot_points":
+        pivot = [TYPICAL, HIGH, LOW]
+        add("pivot", [TYPICAL])
+        add("r1", pivot, lambda pv, h, l: 2 * pv - l)
+        add("s1", pivot, lambda pv, h, l: 2 * pv - h)
+        add("r2", pivot, lambda pv, h, l: pv + (h - l))
+        add("s2", pivot, lambda pv, h, l: pv - (h - l))
+    elif feature_type == "fibonacci":
+        for p in periods:
+            for level in (236, 382, 500, 618, 786):
+                add(f"fib_{level}_{p}", [rmax(HIGH, p), rmin(LOW, p)],
+                    lambda hi, lo, r=level / 1000: hi - r * (hi - lo))
+    elif feature_type == "support_resistance":
+        for p in periods:
+            add(f"support_1_{p}", [rmin(LOW, p)])
+            add(f"support_2_{p}", [rmin(LOW, p * 2)])
+            add(f"resistance_1_{p}", [rmax(HIGH, p)])
+            add(f"resistance_2_{p}", [rmax(HIGH, p * 2)])
+            add(f"dist_to_support_{p}", [CLOSE, rmin(LOW, p)], lambda c, s: (c - s) / c)
+            add(f"dist_to_resistance_{p}", [CLOSE, rmax(HIGH, p)], lambda c, r: (r - c) / c)
+    elif feature_type == "quantile_features":
+        for p in periods:
+            for q in (10, 25, 75, 90):
+                add(f"return_q{q}_{p}", [quantile(ret(1), p, q / 100)])
+            add(f"return_iqr_{p}", [quantile(ret(1), p, 0.75), quantile(ret(1), p, 0.25)], lambda q75, q25: q75 - q25)
+            add(f"return_skew_{p}", [("skew", ret(1), p)])
+            add(f"return_kurt_{p}", [("kurt", ret(1), p)])
+    elif feature_type == "volatility_regime":
+        for p in periods:
+            volatility = std(ret(1), p)
+            add(f"vol_regime_{p}", [volatility, mean(volatility, p * 2), std(volatility, p * 2)], _regime)
+            add(f"vol_momentum_{p}", [volatility], lambda v, p=p: pct_change(v, p // 2), lookback=p // 2)
+    elif feature_type == "tail_risk":
+        for p in periods:
+            add(f"var_95_{p}", [quantile(ret(1), p, 0.05)])
+            add(f"var_99_{p}", [quantile(ret(1), p, 0.01)])
+            add(f"cvar_95_{p}", [("cvar", ret(1), p, 0.05)])
+            add(f"cvar_99_{p}", [("cvar", ret(1), p, 0.01)])
+            add(f"tail_risk_ratio_{p}", [("cvar", ret(1), p, 0.05), std(ret(1), p)], lambda cvar, s: np.abs(cvar) / s)
+    return out
+
+
+FEATURE_TYPES = (
+    "returns", "log_returns", "rsi", "macd", "stoch", "williams_r", "cci", "adx", "atr", "bbands", "keltner",
+    "donchian", "volatility_ratio", "obv", "vwap", "volume_sma", "volume_ratio", "money_flow", "pivot_points",
+    "fibonacci", "support_resistance", "quantile_features", "volatility_regime", "tail_risk",
+)
+
+
+@dataclass
+class FeaturePlan:
+    """A compiled recipe: intermediates in dependency order and the output columns"""
+    nodes: List[Key] = field(default_factory=list)
+    outputs: List[Output] = field(default_factory=list)
+
+    @property
+    def columns(self) -> List[str]:
+        return [output.column for output in self.outputs]
+
+    @cached_property
+    def warmup(self) -> int:
+        """Bars of history before a row that make its values match a full-history evaluation"""
+        needed: Dict[Key, int] = {}
+        for key in self.nodes:
+            needed[key] = node_lookback(key) + max((needed[k] for k in node_spec(key)[0]), default=0)
+        return max((output.lookback + max(needed[k] for k in output.inputs) for output in self.outputs), default=0)
+
+    @cached_property
+    def cumulative_columns(self) -> List[str]:
+        """Output columns that are a running total (offset by where the history starts)"""
+        return [output.column for output in self.outputs if CUMULATIVE.intersection(output.inputs)]
+
+    def evaluate(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """Feature columns for ``bars`` (lower-case OHLCV), indexed like ``bars``"""
+        values: Dict[Key, np.ndarray] = {
+            key: np.ascontiguousarray(bars[key[0]].to_numpy(dtype="float64")) for key in BASE_KEYS
+            if key in self.nodes
+        }
+        matrix = np.empty((len(bars), len(self.outputs)), dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for key in self.nodes:
+                if key in values:
+                    continue
+                inputs, fn = node_spec(key)
+                values[key] = fn(*(values[k] for k in inputs))
+            for i, output in enumerate(self.outputs):
+                matrix[:, i] = output.fn(*(values[k] for k in output.inputs))
+        return pd.DataFrame(matrix, index=bars.index, columns=self.columns)
+
+
+def compile_recipe(feature_types: Sequence[str], periods: Sequence[int]) -> FeaturePlan:
+    """Compile recipe features into a plan; unknown feature types are ignored"""
+    outputs, seen = [], set()
+    for feature_type in feature_types:
+        for output in _outputs_for(feature_type, list(periods), feature_types):
+            if output.column not in seen:
+                seen.add(output.column)
+                outputs.append(output)
+
+    # Depth-first topological order over every node the outputs need
+    order: List[Key] = []
+    visited = set()
+
+    def visit(key: Key):
+        if key in visited:
+            return
+        visited.add(key)
+        for dependency in node_spec(key)[0]:
+            visit(dependency)
+        order.append(key)
+
+    for output in outputs:
+        for key in output.inputs:
+            visit(key)
+    return FeaturePlan(nodes=order, outputs=outputs)
+
+
+@lru_cache(maxsize=64)
+def compiled_plan(feature_types: Tuple[str, ...], periods: Tuple[int, ...]) -> FeaturePlan:
+    """``compile_recipe`` cached per recipe"""
+    return compile_recipe(feature_types, periods)
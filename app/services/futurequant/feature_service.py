@@ -1,19 +1,30 @@
 """
 FutureQuant Trader Feature Engineering Service - Enhanced Technical Indicators
 """
+import asyncio
 import logging
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+from datetime import datetime
 from sqlalchemy.orm import Session
 import json
 
-from app.models.trading_models import Symbol, Bar, Feature
-from app.models.database import get_db
+from app.models.trading_models import Feature, FeatureState
+from app.models.database import SessionLocal
+from app.core.compute import get_compute_executor, run_method_cpu
+from app.core.config import settings
+from .bar_rollup import get_bars
+from .bar_store import to_utc
+from .feature_graph import compiled_plan
+from .feature_store import NATIVE_INTERVAL, feature_version, get_feature_store
+from .symbol_registry import get_symbol_registry
 
 logger = logging.getLogger(__name__)
 
+# (done, total, ticker) after each symbol of a batch
+ProgressFn = Callable[[int, int, str], Awaitable[None]]
+
 class FutureQuantFeatureService:
     """Enhanced feature engineering service for distributional futures trading"""
     
@@ -76,51 +87,45 @@ class FutureQuantFeatureService:
         recipe_name: str = "full",
         start_date: str = None,
         end_date: str = None,
-        custom_params: Dict[str, Any] = None
+        custom_params: Dict[str, Any] = None,
+        interval: Optional[str] = None,
+        full_refresh: bool = False
     ) -> Dict[str, Any]:
-        """Compute features for a symbol using specified recipe"""
+        """Compute features for a symbol using specified recipe.
+
+        When an earlier run left a ``FeatureState`` for the same symbol, recipe,
+        interval and parameters, only bars from its last computed bar onwards are
+        computed (plus the recipe's warm-up) and stored. ``full_refresh`` recomputes
+        the whole range, which is also the reference for validating the incremental path.
+        """
+        db = SessionLocal()
         try:
-            # Validate recipe
-            if recipe_name not in self.feature_recipes:
-                raise ValueError(f"Invalid recipe. Must be one of: {list(self.feature_recipes.keys())}")
-            
-            # Get database session
-            db = next(get_db())
-            
-            # Get recipe configuration
-            recipe = self.feature_recipes[recipe_name]
-            
-            # Merge parameters
-            params = self.default_params.copy()
-            if custom_params:
-                params.update(custom_params)
+            recipe, params = self._recipe_and_params(recipe_name, custom_params)
             
-            # Get historical data
-            bars_data = await self._get_bars_for_feature_computation(
-                db, symbol_id, start_date, end_date
+            state_row, state, version = self._plan_update(
+                db, symbol_id, recipe_name, recipe, params, start_date, interval, full_refresh
             )
+            if self._up_to_date(state, end_date):
+                # Everything requested is already computed
+                return self._compute_result(symbol_id, recipe_name, [], 0, 0, params, "incremental", state)
             
-            if bars_data.empty:
-                raise ValueError("No historical data found for feature computation")
+            bars_data, state = await self._read_update_window(db, symbol_id, state, start_date, end_date, interval)
             
-            # Compute features
-            features_df = await self._compute_feature_set(
-                bars_data, recipe, params
+            # Compute features in the compute process pool
+            features_df, new_state = await run_method_cpu(
+                FutureQuantFeatureService, "_compute_feature_update", bars_data, recipe, params, state,
+                name=f"features:{recipe_name}:{symbol_id}"
             )
             
-            # Store features
-            stored_count = await self._store_features(db, symbol_id, features_df, recipe_name)
+            stored_count = await self._finish_update(
+                db, state_row, symbol_id, recipe_name, interval, version, start_date, state, new_state, features_df
+            )
             
-            return {
-                'success': True,
-                'symbol_id': symbol_id,
-                'recipe_name': recipe_name,
-                'features_computed': len(features_df.columns),
-                'data_points': len(features_df),
-                'stored_count': stored_count,
-                'feature_list': list(features_df.columns),
-                'computation_params': params
-            }
+            mode = "incremental" if state is not None else "full"
+            return self._compute_result(
+                symbol_id, recipe_name, list(features_df.columns), len(features_df), stored_count, params, mode,
+                new_state
+            )
             
         except Exception as e:
             logger.error(f"Feature computation error: {str(e)}")
@@ -128,49 +133,235 @@ class FutureQuantFeatureService:
                 'success': False,
                 'error': str(e)
             }
+        finally:
+            db.close()
+    
+    def _recipe_and_params(
+        self,
+        recipe_name: str,
+        custom_params: Optional[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Validated recipe and the default parameters merged with ``custom_params``"""
+        if recipe_name not in self.feature_recipes:
+            raise ValueError(f"Invalid recipe. Must be one of: {list(self.feature_recipes.keys())}")
+        params = self.default_params.copy()
+        if custom_params:
+            params.update(custom_params)
+        return self.feature_recipes[recipe_name], params
+    
+    @staticmethod
+    def _compute_result(
+        symbol_id: int,
+        recipe_name: str,
+        columns: List[str],
+        data_points: int,
+        stored_count: int,
+        params: Dict[str, Any],
+        mode: str,
+        state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'symbol_id': symbol_id,
+            'recipe_name': recipe_name,
+            'mode': mode,
+            'features_computed': len(columns),
+            'data_points': data_points,
+            'stored_count': stored_count,
+            'feature_list': columns,
+            'last_timestamp': state['last_timestamp'],
+            'warmup_bars': state['warmup'],
+            'computation_params': params
+        }
+    
+    # Update steps shared by compute_features and the batch workers
+    
+    def _plan_update(
+        self,
+        db: Session,
+        symbol_id: int,
+        recipe_name: str,
+        recipe: Dict[str, Any],
+        params: Dict[str, Any],
+        start_date: Optional[str],
+        interval: Optional[str],
+        full_refresh: bool
+    ) -> Tuple[Optional[FeatureState], Optional[Dict[str, Any]], str]:
+        """The stored state row, the state to resume from (None for a full computation) and the store version"""
+        state_row = self._load_feature_state(db, symbol_id, recipe_name, interval)
+        state = None if full_refresh else self._resumable_state(state_row, recipe, params, start_date)
+        version = feature_version(recipe, params, interval)
+        if state is not None and not self._store_holds_version(db, symbol_id, recipe_name, version):
+            # The rows this state continues were stored as JSON before the feature store was enabled
+            state = None
+        return state_row, state, version
+    
+    @staticmethod
+    def _up_to_date(state: Optional[Dict[str, Any]], end_date: Optional[str]) -> bool:
+        return state is not None and end_date is not None and to_utc(end_date) < pd.Timestamp(state['last_timestamp'])
+    
+    async def _read_update_window(
+        self,
+        db: Session,
+        symbol_id: int,
+        state: Optional[Dict[str, Any]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        interval: Optional[str]
+    ) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+        """Bars to compute from ``state``, or the whole range (and no state) when it cannot be resumed"""
+        bars_data = None
+        if state is not None:
+            bars_data = await self._get_bars_for_feature_computation(
+                db, symbol_id, state['resume_from'], end_date, interval, min_points=1
+            )
+            if not self._window_covers_state(bars_data, state):
+                logger.info(f"Stored feature state of symbol {symbol_id} no longer matches its bars; recomputing")
+                state, bars_data = None, None
+        
+        # Get historical data
+        if bars_data is None:
+            bars_data = await self._get_bars_for_feature_computation(
+                db, symbol_id, start_date, end_date, interval
+            )
+        
+        if bars_data.empty:
+            raise ValueError("No historical data found for feature computation")
+        return bars_data, state
+    
+    async def _finish_update(
+        self,
+        db: Session,
+        state_row: Optional[FeatureState],
+        symbol_id: int,
+        recipe_name: str,
+        interval: Optional[str],
+        version: str,
+        start_date: Optional[str],
+        state: Optional[Dict[str, Any]],
+        new_state: Dict[str, Any],
+        features_df: Optional[pd.DataFrame],
+        stored_count: Optional[int] = None
+    ) -> int:
+        """Store features and the state to resume from, in one transaction.
+
+        ``features_df`` is None when a batch worker already wrote the
+        ``stored_count`` rows to the feature store; only the state is saved then.
+        """
+        new_state['start_date'] = state['start_date'] if state is not None else start_date
+        if state is not None and get_feature_store() is None:
+            self._delete_features_from(db, symbol_id, recipe_name, features_df.index[0])
+        self._save_feature_state(db, state_row, symbol_id, recipe_name, interval, new_state)
+        if features_df is None:
+            db.commit()
+            return stored_count
+        return await self._store_features(
+            db, symbol_id, features_df, recipe_name, version=version, replace=state is None
+        )
+    
+    # Incremental state
+    
+    @staticmethod
+    def _load_feature_state(
+        db: Session,
+        symbol_id: int,
+        recipe_name: str,
+        interval: Optional[str]
+    ) -> Optional[FeatureState]:
+        return db.query(FeatureState).filter(
+            FeatureState.symbol_id == symbol_id,
+            FeatureState.recipe_name == recipe_name,
+            FeatureState.interval == (interval or NATIVE_INTERVAL)
+        ).first()
+    
+    @staticmethod
+    def _resumable_state(
+        state_row: Optional[FeatureState],
+        recipe: Dict[str, Any],
+        params: Dict[str, Any],
+        start_date: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """The stored state when it was computed the same way and covers ``start_date``"""
+        if state_row is None:
+            return None
+        state = state_row.state
+        if state.get('recipe') != {'features': recipe['features'], 'lookback_periods': recipe['lookback_periods']}:
+            return None
+        if state.get('params') != json.loads(json.dumps(params)):
+            return None
+        stored_start = state.get('start_date')
+        if stored_start is not None and (start_date is None or to_utc(start_date) < to_utc(stored_start)):
+            return None
+        return state
+    
+    @staticmethod
+    def _window_covers_state(bars: pd.DataFrame, state: Dict[str, Any]) -> bool:
+        """The bars read for an update still contain the warm-up, anchor and last computed bar"""
+        if bars.empty:
+            return False
+        position = bars.index.get_indexer([pd.Timestamp(state['last_timestamp'])])[0]
+        return position >= state['warmup'] and pd.Timestamp(state['anchor_timestamp']) in bars.index
+    
+    @staticmethod
+    def _save_feature_state(
+        db: Session,
+        state_row: Optional[FeatureState],
+        symbol_id: int,
+        recipe_name: str,
+        interval: Optional[str],
+        state: Dict[str, Any]
+    ):
+        """Stage the state for the next update; committed with the features"""
+        if state_row is None:
+            state_row = FeatureState(symbol_id=symbol_id, recipe_name=recipe_name,
+                                     interval=interval or NATIVE_INTERVAL)
+            db.add(state_row)
+        state_row.last_timestamp = pd.Timestamp(state['last_timestamp']).to_pydatetime()
+        state_row.state = state
+    
+    @staticmethod
+    def _store_holds_version(db: Session, symbol_id: int, recipe_name: str, version: str) -> bool:
+        """Whether an update can merge into the stored matrix (always true when rows go to the database)"""
+        store = get_feature_store()
+        if store is None:
+            return True
+        symbol = get_symbol_registry().by_id(db, symbol_id)
+        return symbol is not None and store.has(symbol.ticker, recipe_name, version)
+    
+    @staticmethod
+    def _delete_features_from(db: Session, symbol_id: int, recipe_name: str, since: pd.Timestamp):
+        """Stage deletion of the recipe's stored rows from ``since``, which an update recomputes"""
+        rows = db.query(Feature).filter(
+            Feature.symbol_id == symbol_id,
+            Feature.timestamp >= since.to_pydatetime()
+        ).all()
+        for row in rows:
+            if (row.payload or {}).get('recipe_name') == recipe_name:
+                db.delete(row)
     
     async def _get_bars_for_feature_computation(
         self,
         db: Session,
         symbol_id: int,
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        interval: Optional[str] = None,
+        min_points: Optional[int] = None
     ) -> pd.DataFrame:
-        """Get historical bars for feature computation"""
+        """Get historical bars for feature computation, rolled up when ``interval`` is not stored"""
         try:
-            # Build query
-            query = db.query(Bar).filter(Bar.symbol_id == symbol_id)
-            
-            if start_date:
-                query = query.filter(Bar.timestamp >= start_date)
-            if end_date:
-                query = query.filter(Bar.timestamp <= end_date)
-            
-            # Get bars
-            bars = query.order_by(Bar.timestamp).all()
-            
-            if not bars:
+            symbol = get_symbol_registry().by_id(db, symbol_id)
+            if symbol is None:
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            bars_data = []
-            for bar in bars:
-                bars_data.append({
-                    'timestamp': bar.timestamp,
-                    'open': bar.open,
-                    'high': bar.high,
-                    'low': bar.low,
-                    'close': bar.close,
-                    'volume': bar.volume
-                })
-            
-            df = pd.DataFrame(bars_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.set_index('timestamp')
+            df = (await get_bars(db, [symbol.ticker], start_date, end_date, interval)).drop(columns="symbol")
+            if df.empty:
+                return pd.DataFrame()
             
             # Ensure minimum data points
-            if len(df) < self.default_params['min_data_points']:
-                raise ValueError(f"Insufficient data points: {len(df)} < {self.default_params['min_data_points']}")
+            min_points = min_points or self.default_params['min_data_points']
+            if len(df) < min_points:
+                raise ValueError(f"Insufficient data points: {len(df)} < {min_points}")
             
             return df
             
@@ -185,67 +376,41 @@ class FutureQuantFeatureService:
         params: Dict[str, Any]
     ) -> pd.DataFrame:
         """Compute complete feature set based on recipe"""
+        features_df, _ = await self._compute_feature_update(df, recipe, params)
+        return features_df
+    
+    async def _compute_feature_update(
+        self,
+        df: pd.DataFrame,
+        recipe: Dict[str, Any],
+        params: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Compute the feature set of ``df`` and the state to continue it from later.
+
+        Without ``state`` every row of ``df`` is computed. With the state of an
+        earlier run, ``df`` starts at ``state['resume_from']``: running totals are
+        re-anchored to their stored values, normalization reuses the stored
+        statistics, and only rows from ``state['last_timestamp']`` on are returned.
+        """
         try:
-            features_df = df.copy()
-            
-            # Compute basic features
-            for feature_type in recipe['features']:
-                if feature_type == "returns":
-                    features_df = await self._compute_returns(features_df, recipe['lookback_periods'])
-                elif feature_type == "log_returns":
-                    features_df = await self._compute_log_returns(features_df, recipe['lookback_periods'])
-                elif feature_type == "rsi":
-                    features_df = await self._compute_rsi(features_df, recipe['lookback_periods'])
-                elif feature_type == "macd":
-                    features_df = await self._compute_macd(features_df)
-                elif feature_type == "stoch":
-                    features_df = await self._compute_stochastic(features_df, recipe['lookback_periods'])
-                elif feature_type == "williams_r":
-                    features_df = await self._compute_williams_r(features_df, recipe['lookback_periods'])
-                elif feature_type == "cci":
-                    features_df = await self._compute_cci(features_df, recipe['lookback_periods'])
-                elif feature_type == "adx":
-                    features_df = await self._compute_adx(features_df, recipe['lookback_periods'])
-                elif feature_type == "atr":
-                    features_df = await self._compute_atr(features_df, recipe['lookback_periods'])
-                elif feature_type == "bbands":
-                    features_df = await self._compute_bollinger_bands(features_df, recipe['lookback_periods'])
-                elif feature_type == "keltner":
-                    features_df = await self._compute_keltner_channels(features_df, recipe['lookback_periods'])
-                elif feature_type == "donchian":
-                    features_df = await self._compute_donchian_channels(features_df, recipe['lookback_periods'])
-                elif feature_type == "volatility_ratio":
-                    features_df = await self._compute_volatility_ratio(features_df, recipe['lookback_periods'])
-                elif feature_type == "obv":
-                    features_df = await self._compute_obv(features_df)
-                elif feature_type == "vwap":
-                    features_df = await self._compute_vwap(features_df, recipe['lookback_periods'])
-                elif feature_type == "volume_sma":
-                    features_df = await self._compute_volume_sma(features_df, recipe['lookback_periods'])
-                elif feature_type == "volume_ratio":
-                    features_df = await self._compute_volume_ratio(features_df, recipe['lookback_periods'])
-                elif feature_type == "money_flow":
-                    features_df = await self._compute_money_flow(features_df, recipe['lookback_periods'])
-                elif feature_type == "pivot_points":
-                    features_df = await self._compute_pivot_points(features_df)
-                elif feature_type == "fibonacci":
-                    features_df = await self._compute_fibonacci_levels(features_df, recipe['lookback_periods'])
-                elif feature_type == "support_resistance":
-                    features_df = await self._compute_support_resistance(features_df, recipe['lookback_periods'])
-                elif feature_type == "quantile_features":
-                    features_df = await self._compute_quantile_features(features_df, recipe['lookback_periods'])
-                elif feature_type == "volatility_regime":
-                    features_df = await self._compute_volatility_regime(features_df, recipe['lookback_periods'])
-                elif feature_type == "tail_risk":
-                    features_df = await self._compute_tail_risk(features_df, recipe['lookback_periods'])
+            # One pass over the recipe's compiled feature graph
+            plan = compiled_plan(tuple(recipe['features']), tuple(recipe['lookback_periods']))
+            features = plan.evaluate(df)
+            if state is not None:
+                anchor = pd.Timestamp(state['anchor_timestamp'])
+                for column, value in state['anchors'].items():
+                    features[column] += value - features.at[anchor, column]
+            features_df = self._join_features(df, features)
             
             # Add interaction features
             if params.get('add_interaction_features', True):
                 features_df = await self._add_interaction_features(features_df)
             
-            # Normalize features
+            # Normalize features, with the statistics of the first full computation when updating
+            stats = state['normalization'] if state is not None else self._normalization_stats(features_df)
             if params.get('normalize_features', True):
-                features_df = await self._normalize_features(features_df)
+                features_df = await self._normalize_features(features_df, stats)
             
             # Handle missing values
             features_df = features_df.fillna(method=params['fill_method'])
@@ -260,7 +425,21 @@ class FutureQuantFeatureService:
             # Final validation - ensure no object dtypes remain
             features_df = self._validate_final_features(features_df)
             
-            return features_df
+            index = features.index
+            anchor_timestamp = index[-2] if len(index) > 1 else index[-1]
+            new_state = {
+                'recipe': {'features': recipe['features'], 'lookback_periods': recipe['lookback_periods']},
+                'params': json.loads(json.dumps(params)),
+                'warmup': max(plan.warmup, 1),
+                'resume_from': index[max(0, len(index) - 1 - max(plan.warmup, 1))].isoformat(),
+                'anchor_timestamp': anchor_timestamp.isoformat(),
+                'anchors': {column: float(features.at[anchor_timestamp, column]) for column in plan.cumulative_columns},
+                'last_timestamp': index[-1].isoformat(),
+                'normalization': stats,
+            }
+            if state is not None:
+                features_df = features_df[features_df.index >= pd.Timestamp(state['last_timestamp'])]
+            return features_df, new_state
             
         except Exception as e:
             logger.error(f"Error computing feature set: {str(e)}")
@@ -269,25 +448,21 @@ class FutureQuantFeatureService:
     def _ensure_numeric_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Ensure all features are numeric and properly typed"""
         try:
-            # Convert all columns to numeric, coercing errors to NaN
-            for col in df.columns:
-                if col in ['timestamp', 'date']:  # Skip timestamp columns
-                    continue
-                    
-                # Convert to numeric, coercing errors
+            # Skip timestamp columns
+            columns = [col for col in df.columns if col not in ['timestamp', 'date']]
+            
+            # Convert to numeric, coercing errors
+            for col in df[columns].select_dtypes(include=['object', 'string']).columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Fill any resulting NaN values
-                if df[col].isna().any():
-                    df[col] = df[col].ffill().bfill().fillna(0)
-                
-                # Ensure float64 type for all numeric columns
-                if df[col].dtype in ['object', 'string']:
-                    df[col] = df[col].astype('float64')
-                elif df[col].dtype in ['int64', 'int32', 'int16', 'int8']:
-                    df[col] = df[col].astype('float64')
-                elif df[col].dtype in ['float32', 'float16']:
-                    df[col] = df[col].astype('float64')
+            
+            # Fill any resulting NaN values and ensure float64 type, all columns at once
+            filled = df[columns].ffill().bfill().fillna(0)
+            widen = filled.select_dtypes(
+                include=['object', 'string', 'int64', 'int32', 'int16', 'int8', 'float32', 'float16']
+            ).columns
+            if len(widen):
+                filled = self._join_features(filled, filled[widen].astype('float64'))
+            df = self._join_features(df, filled)[list(df.columns)]
             
             logger.info(f"Ensured numeric types for {len(df.columns)} columns")
             return df
@@ -329,294 +504,41 @@ class FutureQuantFeatureService:
             logger.error(f"Error in final validation: {str(e)}")
             return df
     
+    @staticmethod
+    def _evaluate(df: pd.DataFrame, feature_types: List[str], periods: List[int]) -> pd.DataFrame:
+        """Evaluate feature types through the compiled (and cached) feature graph"""
+        return compiled_plan(tuple(feature_types), tuple(periods)).evaluate(df)
+    
+    @staticmethod
+    def _join_features(df: pd.DataFrame, features: pd.DataFrame) -> pd.DataFrame:
+        """Append feature columns to ``df`` in one step, replacing columns of the same name"""
+        return pd.concat([df.drop(columns=df.columns.intersection(features.columns)), features], axis=1)
+    
+    # Single-indicator entry points; each reads only OHLCV, so evaluating it alone matches the recipe graph
+    
     async def _compute_returns(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """Compute returns for multiple periods"""
-        for period in periods:
-            df[f'return_{period}d'] = df['close'].pct_change(period)
-        return df
-    
-    async def _compute_log_returns(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute log returns for multiple periods"""
-        for period in periods:
-            df[f'log_return_{period}d'] = np.log(df['close'] / df['close'].shift(period))
-        return df
+        return self._join_features(df, self._evaluate(df, ["returns"], periods))
     
     async def _compute_rsi(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """Compute RSI for multiple periods"""
-        for period in periods:
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            df[f'rsi_{period}'] = 100 - (100 / (1 + rs))
-        return df
+        return self._join_features(df, self._evaluate(df, ["rsi"], periods))
     
     async def _compute_macd(self, df: pd.DataFrame) -> pd.DataFrame:
         """Compute MACD indicators"""
-        exp1 = df['close'].ewm(span=12).mean()
-        exp2 = df['close'].ewm(span=26).mean()
-        df['macd'] = exp1 - exp2
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        return df
-    
-    async def _compute_stochastic(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Stochastic oscillator for multiple periods"""
-        for period in periods:
-            low_min = df['low'].rolling(window=period).min()
-            high_max = df['high'].rolling(window=period).max()
-            df[f'stoch_k_{period}'] = 100 * (df['close'] - low_min) / (high_max - low_min)
-            df[f'stoch_d_{period}'] = df[f'stoch_k_{period}'].rolling(window=3).mean()
-        return df
-    
-    async def _compute_williams_r(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Williams %R for multiple periods"""
-        for period in periods:
-            low_min = df['low'].rolling(window=period).min()
-            high_max = df['high'].rolling(window=period).max()
-            df[f'williams_r_{period}'] = -100 * (high_max - df['close']) / (high_max - low_min)
-        return df
+        return self._join_features(df, self._evaluate(df, ["macd"], []))
     
     async def _compute_cci(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """Compute Commodity Channel Index for multiple periods"""
-        for period in periods:
-            typical_price = (df['high'] + df['low'] + df['close']) / 3
-            sma = typical_price.rolling(window=period).mean()
-            
-            # Use pandas operations instead of numpy.apply for better type handling
-            def mad_function(x):
-                return np.mean(np.abs(x - x.mean()))
-            
-            mad = typical_price.rolling(window=period).apply(mad_function, raw=False)
-            df[f'cci_{period}'] = (typical_price - sma) / (0.015 * mad)
-            
-            # Ensure the result is numeric
-            df[f'cci_{period}'] = pd.to_numeric(df[f'cci_{period}'], errors='coerce').fillna(0)
-        return df
+        return self._join_features(df, self._evaluate(df, ["cci"], periods))
     
     async def _compute_adx(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """Compute Average Directional Index for multiple periods"""
-        for period in periods:
-            # True Range
-            tr1 = df['high'] - df['low']
-            tr2 = abs(df['high'] - df['close'].shift(1))
-            tr3 = abs(df['low'] - df['close'].shift(1))
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            
-            # Directional Movement - ensure proper data types
-            high_diff = df['high'] - df['high'].shift(1)
-            low_diff = df['low'].shift(1) - df['low']
-            
-            # Use pandas operations instead of numpy.where for better type handling
-            dm_plus = pd.Series(0.0, index=df.index)
-            dm_plus.loc[high_diff > low_diff] = high_diff.loc[high_diff > low_diff].clip(lower=0)
-            
-            dm_minus = pd.Series(0.0, index=df.index)
-            dm_minus.loc[low_diff > high_diff] = low_diff.loc[low_diff > high_diff].clip(lower=0)
-            
-            # Smoothed values
-            tr_smooth = tr.rolling(window=period).mean()
-            dm_plus_smooth = dm_plus.rolling(window=period).mean()
-            dm_minus_smooth = dm_minus.rolling(window=period).mean()
-            
-            # DI values
-            di_plus = 100 * dm_plus_smooth / tr_smooth
-            di_minus = 100 * dm_minus_smooth / tr_smooth
-            
-            # DX and ADX
-            dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
-            df[f'adx_{period}'] = dx.rolling(window=period).mean()
-        
-        return df
-    
-    async def _compute_atr(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Average True Range for multiple periods"""
-        for period in periods:
-            tr1 = df['high'] - df['low']
-            tr2 = abs(df['high'] - df['close'].shift(1))
-            tr3 = abs(df['low'] - df['close'].shift(1))
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            df[f'atr_{period}'] = tr.rolling(window=period).mean()
-        return df
+        return self._join_features(df, self._evaluate(df, ["adx"], periods))
     
     async def _compute_bollinger_bands(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """Compute Bollinger Bands for multiple periods"""
-        for period in periods:
-            sma = df['close'].rolling(window=period).mean()
-            std = df['close'].rolling(window=period).std()
-            df[f'bb_upper_{period}'] = sma + (2 * std)
-            df[f'bb_lower_{period}'] = sma - (2 * std)
-            df[f'bb_width_{period}'] = (df[f'bb_upper_{period}'] - df[f'bb_lower_{period}']) / sma
-            df[f'bb_position_{period}'] = (df['close'] - df[f'bb_lower_{period}']) / (df[f'bb_upper_{period}'] - df[f'bb_lower_{period}'])
-        return df
-    
-    async def _compute_keltner_channels(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Keltner Channels for multiple periods"""
-        for period in periods:
-            typical_price = (df['high'] + df['low'] + df['close']) / 3
-            atr = df[f'atr_{period}'] if f'atr_{period}' in df.columns else df['high'].rolling(window=period).std()
-            
-            df[f'kc_upper_{period}'] = typical_price + (2 * atr)
-            df[f'kc_lower_{period}'] = typical_price - (2 * atr)
-            df[f'kc_width_{period}'] = (df[f'kc_upper_{period}'] - df[f'kc_lower_{period}']) / typical_price
-        return df
-    
-    async def _compute_donchian_channels(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Donchian Channels for multiple periods"""
-        for period in periods:
-            df[f'dc_upper_{period}'] = df['high'].rolling(window=period).max()
-            df[f'dc_lower_{period}'] = df['low'].rolling(window=period).min()
-            df[f'dc_mid_{period}'] = (df[f'dc_upper_{period}'] + df[f'dc_lower_{period}']) / 2
-            df[f'dc_width_{period}'] = (df[f'dc_upper_{period}'] - df[f'dc_lower_{period}']) / df['close']
-        return df
-    
-    async def _compute_volatility_ratio(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute volatility ratio for multiple periods"""
-        for period in periods:
-            returns = df['close'].pct_change()
-            short_vol = returns.rolling(window=period//2).std()
-            long_vol = returns.rolling(window=period).std()
-            df[f'vol_ratio_{period}'] = short_vol / long_vol
-        return df
-    
-    async def _compute_obv(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Compute On-Balance Volume"""
-        df['obv'] = (np.sign(df['close'].diff()) * df['volume']).fillna(0).cumsum()
-        return df
-    
-    async def _compute_vwap(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Volume Weighted Average Price for multiple periods"""
-        for period in periods:
-            typical_price = (df['high'] + df['low'] + df['close']) / 3
-            df[f'vwap_{period}'] = (typical_price * df['volume']).rolling(window=period).sum() / df['volume'].rolling(window=period).sum()
-        return df
-    
-    async def _compute_volume_sma(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute volume simple moving average for multiple periods"""
-        for period in periods:
-            df[f'volume_sma_{period}'] = df['volume'].rolling(window=period).mean()
-        return df
-    
-    async def _compute_volume_ratio(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute volume ratio for multiple periods"""
-        for period in periods:
-            df[f'volume_ratio_{period}'] = df['volume'] / df[f'volume_sma_{period}']
-        return df
-    
-    async def _compute_money_flow(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Money Flow Index for multiple periods"""
-        for period in periods:
-            typical_price = (df['high'] + df['low'] + df['close']) / 3
-            money_flow = typical_price * df['volume']
-            
-            positive_flow = np.where(typical_price > typical_price.shift(1), money_flow, 0)
-            negative_flow = np.where(typical_price < typical_price.shift(1), money_flow, 0)
-            
-            positive_mf = pd.Series(positive_flow).rolling(window=period).sum()
-            negative_mf = pd.Series(negative_flow).rolling(window=period).sum()
-            
-            mfi = 100 - (100 / (1 + positive_mf / negative_mf))
-            df[f'mfi_{period}'] = mfi
-        return df
-    
-    async def _compute_pivot_points(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Compute pivot points"""
-        df['pivot'] = (df['high'] + df['low'] + df['close']) / 3
-        df['r1'] = 2 * df['pivot'] - df['low']
-        df['s1'] = 2 * df['pivot'] - df['high']
-        df['r2'] = df['pivot'] + (df['high'] - df['low'])
-        df['s2'] = df['pivot'] - (df['high'] - df['low'])
-        return df
-    
-    async def _compute_fibonacci_levels(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute Fibonacci retracement levels for multiple periods"""
-        for period in periods:
-            high = df['high'].rolling(window=period).max()
-            low = df['low'].rolling(window=period).min()
-            diff = high - low
-            
-            df[f'fib_236_{period}'] = high - 0.236 * diff
-            df[f'fib_382_{period}'] = high - 0.382 * diff
-            df[f'fib_500_{period}'] = high - 0.500 * diff
-            df[f'fib_618_{period}'] = high - 0.618 * diff
-            df[f'fib_786_{period}'] = high - 0.786 * diff
-        return df
-    
-    async def _compute_support_resistance(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute support and resistance levels for multiple periods"""
-        for period in periods:
-            # Support levels
-            df[f'support_1_{period}'] = df['low'].rolling(window=period).min()
-            df[f'support_2_{period}'] = df['low'].rolling(window=period*2).min()
-            
-            # Resistance levels
-            df[f'resistance_1_{period}'] = df['high'].rolling(window=period).max()
-            df[f'resistance_2_{period}'] = df['high'].rolling(window=period*2).max()
-            
-            # Distance to support/resistance
-            df[f'dist_to_support_{period}'] = (df['close'] - df[f'support_1_{period}']) / df['close']
-            df[f'dist_to_resistance_{period}'] = (df[f'resistance_1_{period}'] - df['close']) / df['close']
-        return df
-    
-    async def _compute_quantile_features(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute distribution-aware quantile features for multiple periods"""
-        for period in periods:
-            returns = df['close'].pct_change()
-            
-            # Rolling quantiles
-            df[f'return_q10_{period}'] = returns.rolling(window=period).quantile(0.10)
-            df[f'return_q25_{period}'] = returns.rolling(window=period).quantile(0.25)
-            df[f'return_q75_{period}'] = returns.rolling(window=period).quantile(0.75)
-            df[f'return_q90_{period}'] = returns.rolling(window=period).quantile(0.90)
-            
-            # Interquartile range
-            df[f'return_iqr_{period}'] = df[f'return_q75_{period}'] - df[f'return_q25_{period}']
-            
-            # Tail risk measures
-            df[f'return_skew_{period}'] = returns.rolling(window=period).skew()
-            df[f'return_kurt_{period}'] = returns.rolling(window=period).kurt()
-        return df
-    
-    async def _compute_volatility_regime(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute volatility regime indicators for multiple periods"""
-        for period in periods:
-            returns = df['close'].pct_change()
-            volatility = returns.rolling(window=period).std()
-            
-            # Volatility regime classification
-            vol_mean = volatility.rolling(window=period*2).mean()
-            vol_std = volatility.rolling(window=period*2).std()
-            
-            df[f'vol_regime_{period}'] = np.where(
-                volatility > vol_mean + vol_std, 2,  # High volatility
-                np.where(volatility < vol_mean - vol_std, 0, 1)  # Low volatility, Normal
-            )
-            
-            # Volatility momentum
-            df[f'vol_momentum_{period}'] = volatility.pct_change(period//2)
-        return df
-    
-    async def _compute_tail_risk(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
-        """Compute tail risk measures for multiple periods"""
-        for period in periods:
-            returns = df['close'].pct_change()
-            
-            # Value at Risk (VaR)
-            df[f'var_95_{period}'] = returns.rolling(window=period).quantile(0.05)
-            df[f'var_99_{period}'] = returns.rolling(window=period).quantile(0.01)
-            
-            # Expected Shortfall (CVaR)
-            def cvar_95(x):
-                return x[x <= x.quantile(0.05)].mean()
-            def cvar_99(x):
-                return x[x <= x.quantile(0.01)].mean()
-            
-            df[f'cvar_95_{period}'] = returns.rolling(window=period).apply(cvar_95)
-            df[f'cvar_99_{period}'] = returns.rolling(window=period).apply(cvar_99)
-            
-            # Tail risk ratio
-            df[f'tail_risk_ratio_{period}'] = abs(df[f'cvar_95_{period}']) / returns.rolling(window=period).std()
-        return df
+        return self._join_features(df, self._evaluate(df, ["bbands"], periods))
     
     async def _add_interaction_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add interaction features between key indicators"""
@@ -644,27 +566,43 @@ class FutureQuantFeatureService:
             logger.warning(f"Could not add all interaction features: {str(e)}")
             return df
     
-    async def _normalize_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Normalize features using z-score normalization"""
+    @staticmethod
+    def _normalize_columns(df: pd.DataFrame) -> List[str]:
+        """Numeric columns that get a z-scored copy; price and volume columns are skipped"""
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        skip_cols = ['open', 'high', 'low', 'close', 'volume']
+        return [col for col in numeric_cols if not any(skip in col for skip in skip_cols)]
+    
+    @classmethod
+    def _normalization_stats(cls, df: pd.DataFrame) -> Dict[str, Optional[List[float]]]:
+        """Z-score mean and std per column; None for constant columns, which normalize to 0"""
+        values = df[cls._normalize_columns(df)].astype('float64')
+        mean_vals, std_vals = values.mean(), values.std()
+        return {
+            col: [float(mean_vals[col]), float(std_vals[col])] if std_vals[col] > 0 else None
+            for col in values.columns
+        }
+    
+    async def _normalize_features(
+        self,
+        df: pd.DataFrame,
+        stats: Optional[Dict[str, Optional[List[float]]]] = None
+    ) -> pd.DataFrame:
+        """Normalize features using z-score normalization, by default with the statistics of ``df``"""
         try:
-            # Select only numeric columns
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            
-            # Skip price and volume columns from normalization
-            skip_cols = ['open', 'high', 'low', 'close', 'volume']
-            normalize_cols = [col for col in numeric_cols if not any(skip in col for skip in skip_cols)]
-            
-            # Z-score normalization
-            for col in normalize_cols:
-                mean_val = df[col].mean()
-                std_val = df[col].std()
-                if std_val > 0:
-                    df[f'{col}_normalized'] = (df[col] - mean_val) / std_val
-                else:
-                    df[f'{col}_normalized'] = 0
+            if stats is None:
+                stats = self._normalization_stats(df)
+            normalize_cols = self._normalize_columns(df)
+            
+            # Z-score normalization, all columns at once; constant columns become 0
+            scale = [stats.get(col) or [0.0, np.nan] for col in normalize_cols]
+            std_vals = np.array([std for _, std in scale])
+            normalized = (df[normalize_cols].astype('float64') - np.array([mean for mean, _ in scale])) / std_vals
+            normalized.loc[:, np.isnan(std_vals)] = 0.0
+            normalized.columns = [f'{col}_normalized' for col in normalize_cols]
             
             logger.info(f"Normalized {len(normalize_cols)} features")
-            return df
+            return self._join_features(df, normalized)
             
         except Exception as e:
             logger.warning(f"Could not normalize features: {str(e)}")
@@ -675,35 +613,43 @@ class FutureQuantFeatureService:
         db: Session,
         symbol_id: int,
         features_df: pd.DataFrame,
-        recipe_name: str
+        recipe_name: str,
+        version: Optional[str] = None,
+        replace: bool = False
     ) -> int:
-        """Store computed features in database"""
+        """Store computed features and commit.
+
+        With the feature store enabled and a ``version`` given, the matrix is
+        written there as one columnar block, replacing the version when
+        ``replace`` (full computations) and merging into it otherwise. Without
+        the store, one JSON ``Feature`` row is added per timestamp.
+        """
         try:
-            stored_count = 0
-            
-            for timestamp, row in features_df.iterrows():
-                # Convert features to JSON
-                feature_data = {}
-                for col in features_df.columns:
-                    if col not in ['open', 'high', 'low', 'close', 'volume']:
-                        value = row[col]
-                        if pd.isna(value) or np.isinf(value):
-                            continue
-                        feature_data[col] = float(value)
-                
-                # Create feature record
-                feature = Feature(
+            store = get_feature_store()
+            if store is not None and version is not None:
+                ticker = get_symbol_registry().by_id(db, symbol_id).ticker
+                stored_count = store.write_features(ticker, recipe_name, version, features_df, replace=replace)
+                db.commit()
+                return stored_count
+            
+            # JSON payloads keep only finite values
+            values = features_df.drop(columns=[c for c in ['open', 'high', 'low', 'close', 'volume']
+                                               if c in features_df.columns])
+            values = values.astype('float64').replace([np.inf, -np.inf], np.nan)
+            computed_at = datetime.now().isoformat()
+            db.add_all([
+                Feature(
                     symbol_id=symbol_id,
                     timestamp=timestamp,
                     payload={
                         "recipe_name": recipe_name,
-                        "features": feature_data,
-                        "computed_at": datetime.now().isoformat()
+                        "features": {k: v for k, v in record.items() if v == v},
+                        "computed_at": computed_at
                     }
                 )
-                
-                db.add(feature)
-                stored_count += 1
+                for timestamp, record in zip(values.index, values.to_dict('records'))
+            ])
+            stored_count = len(values)
             
             db.commit()
             logger.info(f"Stored {stored_count} feature records")
@@ -740,27 +686,37 @@ class FutureQuantFeatureService:
         symbol_ids: List[int],
         recipe_name: str = "full",
         start_date: str = None,
-        end_date: str = None
+        end_date: str = None,
+        custom_params: Dict[str, Any] = None,
+        interval: Optional[str] = None,
+        full_refresh: bool = False,
+        max_workers: Optional[int] = None,
+        on_progress: Optional[ProgressFn] = None
     ) -> Dict[str, Any]:
-        """Compute features for multiple symbols"""
+        """Compute features for multiple symbols in parallel (see ``iter_batch_compute_features``).
+
+        ``on_progress(done, total, ticker)`` is awaited as each symbol finishes;
+        results are returned in the order of ``symbol_ids``.
+        """
         try:
-            results = []
-            
-            for symbol_id in symbol_ids:
-                result = await self.compute_features(
-                    symbol_id, recipe_name, start_date, end_date
-                )
-                results.append({
-                    'symbol_id': symbol_id,
-                    'result': result
-                })
+            results = {}
+            async for event in self.iter_batch_compute_features(
+                symbol_ids, recipe_name, start_date, end_date, custom_params, interval, full_refresh, max_workers
+            ):
+                results[event['symbol_id']] = {
+                    'symbol_id': event['symbol_id'],
+                    'result': event['result']
+                }
+                if on_progress is not None:
+                    await on_progress(event['done'], event['total'], event['symbol'])
+            results = [results[symbol_id] for symbol_id in dict.fromkeys(symbol_ids)]
             
             successful = [r for r in results if r['result']['success']]
             failed = [r for r in results if not r['result']['success']]
             
             return {
                 'success': True,
-                'total_symbols': len(symbol_ids),
+                'total_symbols': len(results),
                 'successful': len(successful),
                 'failed': len(failed),
                 'results': results
@@ -772,3 +728,124 @@ class FutureQuantFeatureService:
                 'success': False,
                 'error': str(e)
             }
+    
+    async def iter_batch_compute_features(
+        self,
+        symbol_ids: List[int],
+        recipe_name: str = "full",
+        start_date: str = None,
+        end_date: str = None,
+        custom_params: Dict[str, Any] = None,
+        interval: Optional[str] = None,
+        full_refresh: bool = False,
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Compute features for many symbols at once, yielding each symbol's result as it finishes.
+
+        Up to ``max_workers`` symbols (default ``feature_batch_workers``, else the
+        compute pool size) run at once in the compute process pool. A worker
+        reads its symbol's bars from the shared bar store (the database for
+        symbols not in it) and writes the features straight to the feature
+        store, so only the update state comes back; states, and JSON rows when
+        the feature store is off, are saved here on one session.
+
+        Yields ``{'symbol_id', 'symbol', 'done', 'total', 'result'}`` in
+        completion order; ``result`` is what ``compute_features`` would return.
+        """
+        recipe, params = self._recipe_and_params(recipe_name, custom_params)
+        symbol_ids = list(dict.fromkeys(symbol_ids))
+        db = SessionLocal()
+        try:
+            tickers = get_symbol_registry().tickers(db, symbol_ids)
+        except Exception:
+            db.close()
+            raise
+        workers = max_workers or settings.feature_batch_workers or get_compute_executor().cpu_workers
+        slots = asyncio.Semaphore(max(1, workers))
+        
+        async def compute(symbol_id: int) -> Tuple[int, Dict[str, Any]]:
+            try:
+                if symbol_id not in tickers:
+                    raise ValueError(f"Symbol {symbol_id} not found")
+                state_row, state, version = self._plan_update(
+                    db, symbol_id, recipe_name, recipe, params, start_date, interval, full_refresh
+                )
+                if self._up_to_date(state, end_date):
+                    return symbol_id, self._compute_result(
+                        symbol_id, recipe_name, [], 0, 0, params, "incremental", state
+                    )
+                async with slots:
+                    update = await run_method_cpu(
+                        FutureQuantFeatureService, "_compute_batch_symbol", symbol_id, recipe_name, recipe, params,
+                        state, version, start_date, end_date, interval, name=f"features:{recipe_name}:{symbol_id}"
+                    )
+                state = state if update['resumed'] else None
+                stored_count = await self._finish_update(
+                    db, state_row, symbol_id, recipe_name, interval, version, start_date, state, update['state'],
+                    update['features'], update['stored_count']
+                )
+                mode = "incremental" if state is not None else "full"
+                return symbol_id, self._compute_result(
+                    symbol_id, recipe_name, update['columns'], update['data_points'], stored_count, params, mode,
+                    update['state']
+                )
+            except Exception as e:
+                logger.error(f"Feature computation error for symbol {symbol_id}: {str(e)}")
+                db.rollback()
+                return symbol_id, {'success': False, 'error': str(e)}
+        
+        tasks = [asyncio.ensure_future(compute(symbol_id)) for symbol_id in symbol_ids]
+        try:
+            for done, finished in enumerate(asyncio.as_completed(tasks), 1):
+                symbol_id, result = await finished
+                yield {
+                    'symbol_id': symbol_id,
+                    'symbol': tickers.get(symbol_id),
+                    'done': done,
+                    'total': len(symbol_ids),
+                    'result': result
+                }
+        finally:
+            # The consumer stopped early; symbols not started yet are dropped
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            db.close()
+    
+    async def _compute_batch_symbol(
+        self,
+        symbol_id: int,
+        recipe_name: str,
+        recipe: Dict[str, Any],
+        params: Dict[str, Any],
+        state: Optional[Dict[str, Any]],
+        version: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        interval: Optional[str]
+    ) -> Dict[str, Any]:
+        """Batch worker: one symbol from its bars to the feature store, on a session of its own.
+
+        Returns the new state, whether ``state`` was resumed, the feature
+        columns and row count, and the features themselves only when there is
+        no feature store to write them to.
+        """
+        db = SessionLocal()
+        try:
+            bars_data, state = await self._read_update_window(db, symbol_id, state, start_date, end_date, interval)
+            features_df, new_state = await self._compute_feature_update(bars_data, recipe, params, state)
+            store = get_feature_store()
+            stored_count = None
+            if store is not None:
+                ticker = get_symbol_registry().by_id(db, symbol_id).ticker
+                stored_count = store.write_features(ticker, recipe_name, version, features_df, replace=state is None)
+            return {
+                'state': new_state,
+                'resumed': state is not None,
+                'columns': list(features_df.columns),
+                'data_points': len(features_df),
+                'stored_count': stored_count,
+                'features': features_df if store is None else None
+            }
+        finally:
+            db.close()
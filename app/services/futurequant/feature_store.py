@@ -0,0 +1,501 @@
+"""
+FutureQuant Trader Columnar Feature Store
+
+Computed feature matrices kept as Parquet files instead of one JSON
+``futurequant_features`` row per bar:
+
+    <root>/<symbol>/<recipe>/<version>/<YYYY-MM>.parquet   (intraday data)
+    <root>/<symbol>/<recipe>/<version>/<YYYY>.parquet      (hourly or coarser)
+    <root>/<symbol>/<recipe>/CURRENT                        (version readers get)
+
+A version is one way of computing a recipe: its interval, definition and
+parameters (``feature_version``). Each file holds one month (or year) of the
+feature matrix, a UTC ``timestamp`` column plus one float64 column per feature,
+sorted by timestamp with no duplicates. Reads only open the partitions that
+overlap the requested range and only load the requested columns, so a model
+using a handful of the ``full`` recipe's features reads only those columns.
+
+Full computations replace a version in one swap; incremental updates merge into
+it, newer rows winning. ``migrate_from_database`` moves existing JSON rows into
+the store, and ``load_features`` falls back to flattening them for symbols the
+store does not hold yet.
+"""
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.trading_models import Feature
+from .bar_store import BAR_COLUMNS, TimestampLike, to_utc
+from .symbol_registry import get_symbol_registry
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = pc = pq = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+
+# Version given to feature matrices migrated from futurequant_features rows
+MIGRATED_VERSION = "migrated"
+
+# Recipe name for JSON rows written without one
+LEGACY_RECIPE = "legacy"
+
+# Payload keys that describe a JSON row rather than hold a feature value
+PAYLOAD_METADATA_KEYS = {"recipe_name", "computed_at", "feature_type"}
+
+# Leading columns of read_feature_rows; the feature columns follow
+ROW_COLUMNS = ["id", "timestamp", "symbol_id", "recipe_name"]
+
+# Stands for "the finest stored interval" where an interval is part of a key
+NATIVE_INTERVAL = "native"
+
+
+def feature_version(recipe: Dict[str, Any], params: Dict[str, Any], interval: Optional[str]) -> str:
+    """Version name of a recipe computed with ``params`` on ``interval`` bars"""
+    definition = json.dumps({
+        "features": recipe["features"],
+        "lookback_periods": recipe["lookback_periods"],
+        "params": params,
+    }, sort_keys=True, default=str)
+    return f"{interval or NATIVE_INTERVAL}-{hashlib.sha1(definition.encode()).hexdigest()[:10]}"
+
+
+def normalize_feature_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """Bring a feature matrix into the stored layout: UTC index, float64 feature columns only"""
+    df = data.drop(columns=[c for c in BAR_COLUMNS if c in data.columns])
+    if "timestamp" in df.columns:
+        df = df.set_index("timestamp")
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    df = df.set_axis(index.as_unit("ns").rename("timestamp"), axis=0).astype("float64")
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _to_table(df: pd.DataFrame) -> "pa.Table":
+    """Arrow table of a stored-layout frame, one zero-copy column per feature.
+
+    Built from a transposed copy of the float block rather than through
+    ``Table.from_pandas``, which converts (and describes in the file footer)
+    each of the hundreds of columns separately.
+    """
+    values = np.ascontiguousarray(df.to_numpy(dtype="float64").T)
+    timestamps = pa.array(df.index.asi8, type=pa.timestamp("ns", tz="UTC"))
+    return pa.Table.from_arrays([timestamps] + list(map(pa.array, values)), names=["timestamp"] + list(df.columns))
+
+
+def _payload_features(payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Feature values of a JSON row: nested under ``features`` or flat next to metadata"""
+    if not payload:
+        return {}
+    if isinstance(payload.get("features"), dict):
+        return payload["features"]
+    return {k: v for k, v in payload.items() if k not in PAYLOAD_METADATA_KEYS}
+
+
+def read_feature_rows(
+    db: Session,
+    symbol_ids: Sequence[int],
+    start: TimestampLike = None,
+    end: TimestampLike = None
+) -> pd.DataFrame:
+    """Read ``futurequant_features`` rows into one flat frame.
+
+    Returns ``id``, ``timestamp`` (UTC), ``symbol_id`` and ``recipe_name``
+    followed by one float column per feature key found in the payloads (NaN
+    where a row has no value), ordered by timestamp then row id.
+    """
+    query = db.query(Feature.id, Feature.timestamp, Feature.symbol_id, Feature.payload).filter(
+        Feature.symbol_id.in_(list(symbol_ids))
+    )
+    start_ts, end_ts = to_utc(start), to_utc(end)
+    if start_ts is not None:
+        query = query.filter(Feature.timestamp >= start_ts.tz_convert(None).to_pydatetime())
+    if end_ts is not None:
+        query = query.filter(Feature.timestamp <= end_ts.tz_convert(None).to_pydatetime())
+
+    rows = pd.read_sql(query.order_by(Feature.timestamp, Feature.id).statement, db.connection())
+    payloads = rows.pop("payload").tolist()
+    rows["timestamp"] = pd.to_datetime(rows["timestamp"], utc=True)
+    rows["recipe_name"] = [(p or {}).get("recipe_name") or LEGACY_RECIPE for p in payloads]
+    values = pd.DataFrame.from_records([_payload_features(p) for p in payloads], index=rows.index)
+    values = values.apply(pd.to_numeric, errors="coerce").astype("float64")
+    return pd.concat([rows[ROW_COLUMNS], values], axis=1)
+
+
+def select_recipe_rows(rows: pd.DataFrame, recipe: Optional[str] = None) -> pd.DataFrame:
+    """Keep one recipe per symbol (``recipe``, or the most recently written one) and one row per timestamp"""
+    if rows.empty:
+        return rows
+    if recipe is None:
+        latest = rows.loc[rows.groupby("symbol_id")["id"].idxmax()].set_index("symbol_id")["recipe_name"]
+        rows = rows[rows["recipe_name"].to_numpy() == rows["symbol_id"].map(latest).to_numpy()]
+    else:
+        rows = rows[rows["recipe_name"] == recipe]
+    rows = rows[~rows.duplicated(["symbol_id", "timestamp"], keep="last")]
+    # Keys of the recipes left out are all-NaN now
+    unused = [c for c in rows.columns[len(ROW_COLUMNS):] if rows[c].isna().all()]
+    return rows.drop(columns=unused)
+
+
+class FeatureStore:
+    """Parquet feature matrices partitioned by symbol, recipe, version and month (or year)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return PYARROW_AVAILABLE
+
+    # Layout
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, quote(symbol, safe="=^.-_"))
+
+    def _recipe_dir(self, symbol: str, recipe: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), quote(recipe, safe=".-_"))
+
+    def _version_dir(self, symbol: str, recipe: str, version: str) -> str:
+        return os.path.join(self._recipe_dir(symbol, recipe), quote(version, safe=".-_"))
+
+    @staticmethod
+    def _partitions(directory: str) -> List[str]:
+        """Partition keys (``YYYY-MM`` or ``YYYY``) in a version directory, oldest first"""
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".parquet")] for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    @staticmethod
+    def _partition_freq(df: pd.DataFrame, existing: List[str]) -> str:
+        """Keep a version's partitioning; otherwise one file per year unless bars are under an hour apart"""
+        if existing:
+            return "Y" if len(existing[0]) == 4 else "M"
+        if len(df) < 2:
+            return "Y"
+        spacing = (df.index[-1] - df.index[0]) / (len(df) - 1)
+        return "Y" if spacing >= pd.Timedelta(hours=1) else "M"
+
+    def current_version(self, symbol: str, recipe: str) -> Optional[str]:
+        path = os.path.join(self._recipe_dir(symbol, recipe), CURRENT_FILE)
+        try:
+            with open(path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _set_current(self, symbol: str, recipe: str, version: str):
+        path = os.path.join(self._recipe_dir(symbol, recipe), CURRENT_FILE)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, path)
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.root))
+
+    def recipes(self, symbol: str) -> List[str]:
+        """Recipes stored for ``symbol``, most recently written first"""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        written = {}
+        for name in os.listdir(directory):
+            current = os.path.join(directory, name, CURRENT_FILE)
+            if os.path.exists(current):
+                written[unquote(name)] = os.stat(current).st_mtime_ns
+        return sorted(written, key=written.get, reverse=True)
+
+    def has(self, symbol: str, recipe: Optional[str] = None, version: Optional[str] = None) -> bool:
+        """Whether the store holds ``symbol`` (for ``recipe``, at ``version`` or its current one)"""
+        if recipe is None:
+            return bool(self.recipes(symbol))
+        version = version or self.current_version(symbol, recipe)
+        return version is not None and bool(self._partitions(self._version_dir(symbol, recipe, version)))
+
+    # Writes
+
+    def _write_partitions(self, directory: str, df: pd.DataFrame, merge: bool):
+        existing = self._partitions(directory)
+        partitions = df.index.tz_convert(None).to_period(self._partition_freq(df, existing))
+        os.makedirs(directory, exist_ok=True)
+        for partition, chunk in df.groupby(partitions):
+            path = os.path.join(directory, f"{partition}.parquet")
+            if merge and os.path.exists(path):
+                stored = pq.read_table(path).to_pandas().set_index("timestamp")
+                chunk = pd.concat([stored, chunk])
+                chunk = chunk[~chunk.index.duplicated(keep="last")].sort_index()
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            # Only the timestamp is filtered on; statistics for hundreds of feature columns just cost time
+            pq.write_table(_to_table(chunk), tmp_path, compression="zstd", use_dictionary=False,
+                           write_statistics=["timestamp"])
+            os.replace(tmp_path, path)
+
+    def write_features(
+        self,
+        symbol: str,
+        recipe: str,
+        version: str,
+        data: pd.DataFrame,
+        replace: bool = False
+    ) -> int:
+        """Write a feature matrix (timestamps as index or ``timestamp`` column) and make ``version`` current.
+
+        ``replace`` swaps in ``data`` as the whole version, for full
+        computations; otherwise rows are merged into the stored partitions,
+        newer rows winning on duplicates. Bar columns are dropped. Returns rows written.
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for the feature store")
+        df = normalize_feature_frame(data)
+        if df.empty:
+            return 0
+
+        directory = self._version_dir(symbol, recipe, version)
+        with self._lock:
+            if replace:
+                staging = f"{directory}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.rmtree(staging, ignore_errors=True)
+                self._write_partitions(staging, df, merge=False)
+                retired = f"{staging}.old"
+                if os.path.isdir(directory):
+                    os.replace(directory, retired)
+                os.replace(staging, directory)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                self._write_partitions(directory, df, merge=True)
+            self._set_current(symbol, recipe, version)
+
+        logger.info(f"Feature store: wrote {len(df)} x {len(df.columns)} {recipe}/{version} features for {symbol}")
+        return len(df)
+
+    def delete(self, symbol: str, recipe: Optional[str] = None):
+        """Drop a symbol (or one of its recipes) from the store"""
+        with self._lock:
+            shutil.rmtree(self._recipe_dir(symbol, recipe) if recipe else self._symbol_dir(symbol), ignore_errors=True)
+
+    def migrate_from_database(
+        self,
+        db: Session,
+        symbols: Optional[Sequence[str]] = None,
+        delete_rows: bool = False
+    ) -> Dict[str, int]:
+        """Move ``futurequant_features`` rows into the store, one matrix per symbol and recipe.
+
+        Recipes the store already holds for a symbol are left as they are (the
+        store is newer). With ``delete_rows`` the symbol's JSON rows are deleted
+        once its recipes are in the store. Returns rows migrated per symbol.
+        """
+        registry = get_symbol_registry()
+        if symbols:
+            symbol_ids = list(registry.ids(db, symbols).values())
+        else:
+            symbol_ids = [symbol_id for (symbol_id,) in db.query(Feature.symbol_id).distinct()]
+
+        migrated = {}
+        for symbol_id, ticker in registry.tickers(db, symbol_ids).items():
+            rows = read_feature_rows(db, [symbol_id])
+            count = 0
+            for recipe in rows["recipe_name"].unique():
+                if self.has(ticker, recipe):
+                    continue
+                selected = select_recipe_rows(rows, recipe).set_index("timestamp")
+                count += self.write_features(
+                    ticker, recipe, MIGRATED_VERSION,
+                    selected.drop(columns=["id", "symbol_id", "recipe_name"]), replace=True
+                )
+            if delete_rows:
+                db.query(Feature).filter(Feature.symbol_id == symbol_id).delete(synchronize_session=False)
+                db.commit()
+            migrated[ticker] = count
+            logger.info(f"Feature store: migrated {count} feature rows of {ticker}")
+        return migrated
+
+    # Reads
+
+    def _read_version(
+        self,
+        directory: str,
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+        columns: Optional[List[str]]
+    ) -> Optional["pa.Table"]:
+        first = start.tz_convert(None) if start is not None else None
+        last = end.tz_convert(None) if end is not None else None
+        selected = []
+        for partition in self._partitions(directory):
+            period = pd.Period(partition)
+            if (first is None or period.end_time >= first) and (last is None or period.start_time <= last):
+                selected.append(partition)
+        if not selected:
+            return None
+
+        # Wide files have large footers; parse each one once
+        files = [
+            pq.ParquetFile(os.path.join(directory, f"{partition}.parquet"), memory_map=True) for partition in selected
+        ]
+        if columns is not None:
+            stored = set(files[0].schema_arrow.names)
+            unknown = [c for c in columns if c not in stored]
+            if unknown:
+                raise ValueError(f"Unknown feature columns: {unknown}")
+            columns = ["timestamp"] + columns
+        tables = [f.read(columns=columns) for f in files]
+        table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+        # Only the boundary partitions can hold rows outside the range
+        ts_type = table.schema.field("timestamp").type
+        mask = None
+        if start is not None:
+            mask = pc.greater_equal(table["timestamp"], pa.scalar(start, type=ts_type))
+        if end is not None:
+            upper = pc.less_equal(table["timestamp"], pa.scalar(end, type=ts_type))
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if mask is not None:
+            table = table.filter(mask)
+        return table if table.num_rows else None
+
+    def read_features(
+        self,
+        symbols: Union[str, Sequence[str]],
+        start: TimestampLike = None,
+        end: TimestampLike = None,
+        recipe: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """Read feature matrices for one or more symbols as a single DataFrame.
+
+        Returns a frame indexed by UTC ``timestamp`` (both bounds inclusive) with
+        a categorical ``symbol`` column followed by ``columns`` (every stored
+        feature by default), ordered by timestamp. Each symbol is read at the
+        current version of ``recipe``, by default its most recently written
+        recipe. Symbols with nothing stored are left out.
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        columns = list(columns) if columns else None
+        empty = pd.DataFrame(columns=["symbol"] + (columns or []),
+                             index=pd.DatetimeIndex([], tz="UTC", name="timestamp"))
+        if not PYARROW_AVAILABLE:
+            return empty
+        start_ts, end_ts = to_utc(start), to_utc(end)
+
+        found, tables = [], []
+        for symbol in symbols:
+            name = recipe or next(iter(self.recipes(symbol)), None)
+            version = self.current_version(symbol, name) if name else None
+            if version is None:
+                continue
+            table = self._read_version(self._version_dir(symbol, name, version), start_ts, end_ts, columns)
+            if table is not None:
+                found.append(symbol)
+                tables.append(table)
+        if not tables:
+            return empty
+
+        # Symbols read at different recipes have different columns
+        if all(t.schema.equals(tables[0].schema) for t in tables[1:]):
+            df = pa.concat_tables(tables).to_pandas()
+        else:
+            df = pd.concat([t.to_pandas() for t in tables], ignore_index=True)
+        lengths = [t.num_rows for t in tables]
+        df.insert(0, "symbol", pd.Categorical.from_codes(np.repeat(np.arange(len(found)), lengths), categories=found))
+        df = df.set_index("timestamp")
+        if len(found) > 1:
+            df = df.sort_index(kind="stable")
+        return df
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Current version and partition files stored per symbol and recipe"""
+        stats = {}
+        for symbol in self.symbols():
+            stats[symbol] = {}
+            for recipe in self.recipes(symbol):
+                version = self.current_version(symbol, recipe)
+                stats[symbol][recipe] = {
+                    "version": version,
+                    "partitions": len(self._partitions(self._version_dir(symbol, recipe, version))),
+                }
+        return stats
+
+
+def load_features(
+    db: Session,
+    symbols: Sequence[str],
+    start: TimestampLike = None,
+    end: TimestampLike = None,
+    recipe: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Features for ``symbols`` (tickers) in the ``read_features`` layout.
+
+    Symbols the feature store holds are read from it, the rest by flattening
+    their ``futurequant_features`` rows (features a row has no value for are
+    NaN).
+    """
+    store = get_feature_store()
+    stored = [s for s in symbols if store is not None and store.has(s, recipe)]
+    if not stored:
+        return _load_feature_rows(db, symbols, start, end, recipe, columns)
+    if len(stored) == len(symbols):
+        return store.read_features(symbols, start, end, recipe, columns)
+
+    df = pd.concat([
+        store.read_features(stored, start, end, recipe, columns),
+        _load_feature_rows(db, [s for s in symbols if s not in stored], start, end, recipe, columns),
+    ])
+    found = set(df["symbol"].astype(object))
+    df["symbol"] = pd.Categorical(df["symbol"].astype(object), categories=[s for s in symbols if s in found])
+    return df.sort_index(kind="stable")
+
+
+def _load_feature_rows(
+    db: Session,
+    symbols: Sequence[str],
+    start: TimestampLike,
+    end: TimestampLike,
+    recipe: Optional[str],
+    columns: Optional[Sequence[str]]
+) -> pd.DataFrame:
+    """``load_features`` for symbols read from their ``futurequant_features`` rows"""
+    tickers = {symbol_id: ticker for ticker, symbol_id in get_symbol_registry().ids(db, symbols).items()}
+    rows = select_recipe_rows(read_feature_rows(db, list(tickers), start, end), recipe)
+    found = [s for s in symbols if s in tickers.values()]
+    df = rows.drop(columns=["id", "recipe_name"]).set_index("timestamp")
+    df.insert(0, "symbol", pd.Categorical(df.pop("symbol_id").map(tickers), categories=found))
+    if columns:
+        df = df.reindex(columns=["symbol"] + list(columns))
+    return df
+
+
+_feature_store: Optional[FeatureStore] = None
+
+
+def get_feature_store() -> Optional[FeatureStore]:
+    """Return the process-wide feature store, or None when disabled or pyarrow is missing"""
+    global _feature_store
+    if not settings.feature_store_enabled or not PYARROW_AVAILABLE:
+        return None
+    if _feature_store is None:
+        _feature_store = FeatureStore(settings.feature_store_path)
+    return _feature_store
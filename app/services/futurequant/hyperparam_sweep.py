@@ -0,0 +1,494 @@
+"""
+FutureQuant Trader Hyperparameter Sweeps
+
+Searches the ``hyperparams`` of one ``FutureQuantModelService._train_<model_type>``
+method over a declared space. Each parameter of the space is one of:
+
+- a list of values, or ``{"values": [...]}``
+- a range ``{"low": a, "high": b}``, optionally with ``"log": true`` (sampled
+  log-uniformly) and ``"type": "int"``
+
+Strategies:
+
+- ``grid``: every combination of the listed values (ranges are not allowed)
+- ``random``: ``n_trials`` independent samples
+- ``successive_halving``: ``n_trials`` samples trained on the most recent
+  ``1/eta**k`` of the training rows; the best ``1/eta`` of each rung move on to
+  ``eta`` times the rows until the last rung uses all of them
+
+Every trial is scored by the mean pinball loss of its q10/q50/q90 on a
+validation split (the last ``val_fraction`` of the training window). Trials run
+in the compute process pool, at most ``max_parallel`` at once, each under a
+time budget counted from its start in the worker, a native-thread cap and
+optionally an address-space cap. A trial over budget is interrupted and marked
+``timed_out``; its slot is only handed on once the worker is free. Transformer
+trials are stopped early once their per-epoch validation loss is worse than the
+median of the finished trials at the same epoch and row budget.
+
+The best configuration is retrained on the whole training window, scored on the
+test window and recorded as an MLflow run.
+"""
+import asyncio
+import itertools
+import logging
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from app.core.compute import get_compute_executor, run_cpu
+from app.core.config import settings
+from app.models.database import get_db
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("grid", "random", "successive_halving")
+QUANTILES = {"q10": 0.1, "q50": 0.5, "q90": 0.9}
+# Epochs a transformer trial always gets before it can be pruned
+PRUNE_WARMUP_EPOCHS = 5
+# Finished trials needed at an epoch before it has a median to prune against
+PRUNE_MIN_TRIALS = 3
+# Smallest row budget a successive-halving rung trains on
+MIN_BUDGET_ROWS = 100
+
+Space = Dict[str, Any]
+ProgressFn = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class TrialLimits:
+    """Resource caps for one trial; 0 / None means uncapped"""
+    timeout: Optional[float] = None  # seconds, from the trial's start in its worker
+    threads: int = 0  # BLAS/OpenMP and torch intra-op threads
+    max_memory_mb: int = 0  # address space, Linux process pool only
+
+    @classmethod
+    def from_settings(cls, **overrides) -> "TrialLimits":
+        limits = {
+            "timeout": settings.sweep_trial_timeout,
+            "threads": settings.sweep_trial_threads,
+            "max_memory_mb": settings.sweep_trial_max_memory_mb,
+        }
+        limits.update({name: value for name, value in overrides.items() if value is not None})
+        return cls(**limits)
+
+
+class TrialPruned(Exception):
+    """Raised from a trial's epoch callback when its loss falls behind the finished trials"""
+    pass
+
+
+class TrialTimedOut(Exception):
+    """Raised inside a trial once it has used up its time budget"""
+    pass
+
+
+def _is_range(spec: Any) -> bool:
+    return isinstance(spec, dict) and "values" not in spec
+
+
+def _values(spec: Any) -> List[Any]:
+    return list(spec["values"] if isinstance(spec, dict) else spec)
+
+
+def validate_space(space: Space, strategy: str):
+    """Raise ``ValueError`` for an unknown strategy or a malformed space"""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Invalid strategy. Must be one of: {list(STRATEGIES)}")
+    if not space:
+        raise ValueError("The search space is empty")
+    for name, spec in space.items():
+        if not _is_range(spec):
+            if not _values(spec):
+                raise ValueError(f"No values given for {name}")
+            continue
+        if strategy == "grid":
+            raise ValueError(f"Grid search needs a list of values for {name}, not a range")
+        if "low" not in spec or "high" not in spec or spec["low"] >= spec["high"]:
+            raise ValueError(f"Range for {name} needs low < high")
+        if spec.get("log") and spec["low"] <= 0:
+            raise ValueError(f"Log range for {name} needs low > 0")
+
+
+def grid_points(space: Space) -> List[Dict[str, Any]]:
+    """Every combination of the listed values"""
+    values = {name: _values(spec) for name, spec in space.items()}
+    return [dict(zip(values, combination)) for combination in itertools.product(*values.values())]
+
+
+def sample_params(space: Space, rng: np.random.Generator) -> Dict[str, Any]:
+    """One random point of the space"""
+    params = {}
+    for name, spec in space.items():
+        if not _is_range(spec):
+            values = _values(spec)
+            params[name] = values[int(rng.integers(len(values)))]
+            continue
+        low, high = spec["low"], spec["high"]
+        if spec.get("log"):
+            value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            value = float(rng.uniform(low, high))
+        params[name] = int(round(value)) if spec.get("type") == "int" else value
+    return params
+
+
+def halving_budgets(n_configs: int, eta: int) -> List[float]:
+    """Fractions of the training rows per successive-halving rung, smallest first"""
+    rungs = int(math.floor(math.log(n_configs, eta) + 1e-9)) if n_configs > 1 else 0
+    return [float(eta) ** -(rungs - rung) for rung in range(rungs + 1)]
+
+
+def mean_pinball_loss(y: np.ndarray, outputs: Dict[str, np.ndarray]) -> float:
+    """Mean pinball loss of the q10/q50/q90 predictions"""
+    losses = []
+    for name, q in QUANTILES.items():
+        error = y - outputs[name]
+        losses.append(np.mean(np.maximum(q * error, (q - 1) * error)))
+    return float(np.mean(losses))
+
+
+def median_curve(curves: List[List[float]]) -> List[float]:
+    """Per-epoch median of loss curves, for as many epochs as enough curves reach"""
+    medians = []
+    for epoch in itertools.count():
+        losses = [curve[epoch] for curve in curves if len(curve) > epoch]
+        if len(losses) < PRUNE_MIN_TRIALS:
+            return medians
+        medians.append(float(np.median(losses)))
+
+
+def _in_worker_process() -> bool:
+    # Thread-mode executors run trials inside the app process, where caps would apply to everything
+    return multiprocessing.parent_process() is not None
+
+
+@contextmanager
+def _trial_limits(limits: TrialLimits):
+    """Native-thread and address-space caps for the duration of one trial"""
+    if not _in_worker_process():
+        yield
+        return
+    previous = None
+    with ExitStack() as stack:
+        if limits.threads:
+            try:
+                from threadpoolctl import threadpool_limits
+                stack.enter_context(threadpool_limits(limits=limits.threads))
+            except ImportError:
+                logger.debug("threadpoolctl not installed; BLAS threads are not capped")
+        if limits.max_memory_mb and resource is not None:
+            previous = resource.getrlimit(resource.RLIMIT_AS)
+            cap = limits.max_memory_mb * 1024 * 1024
+            if previous[1] != resource.RLIM_INFINITY:
+                cap = min(cap, previous[1])
+            resource.setrlimit(resource.RLIMIT_AS, (cap, previous[1]))
+        try:
+            yield
+        finally:
+            # Pool workers are reused, so the cap must not outlive the trial
+            if previous is not None:
+                resource.setrlimit(resource.RLIMIT_AS, previous)
+
+
+@contextmanager
+def _trial_deadline(seconds: Optional[float]):
+    """Interrupt the trial with ``TrialTimedOut`` once ``seconds`` have passed.
+
+    Uses a SIGALRM timer, so only in the main thread of a pool worker process on
+    platforms that have one; elsewhere ``run_trial`` checks the deadline itself
+    after each epoch and after fitting. A single native call (one solver run)
+    finishes before the timer can interrupt it.
+    """
+    if (not seconds or not _in_worker_process() or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise TrialTimedOut(f"trial exceeded its {seconds:g}s budget")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_trial(
+    model_type: str,
+    horizon_minutes: float,
+    params: Dict[str, Any],
+    X_fit: np.ndarray,
+    y_fit: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    prune_curve: Optional[List[float]] = None,
+    limits: TrialLimits = TrialLimits()
+) -> Dict[str, Any]:
+    """Compute-pool entry point: train one configuration and score it on the validation rows
+
+    Calls ``_train_<model_type>`` directly rather than ``_train_distributional_model``,
+    whose demo-mode fallback would swap a pruned transformer for quantile regression.
+    ``limits.timeout`` is enforced here, from the moment the trial starts.
+    """
+    from .model_service import FutureQuantModelService
+    service = FutureQuantModelService()
+    service._current_horizon = horizon_minutes
+    train = getattr(service, f"_train_{model_type}")
+    hyperparams = dict(params)
+    curve: List[float] = []
+    kwargs = {}
+    started = time.perf_counter()
+
+    def check_deadline():
+        if limits.timeout and time.perf_counter() - started > limits.timeout:
+            raise TrialTimedOut(f"trial exceeded its {limits.timeout:g}s budget")
+
+    if model_type == "transformer":
+        if limits.threads and _in_worker_process():
+            hyperparams.setdefault("intra_op_threads", limits.threads)
+
+        def on_epoch(stats: Dict[str, Any]):
+            loss = stats.get("val_loss", stats["loss"])
+            curve.append(loss)
+            epoch = stats["epoch"]
+            if prune_curve and PRUNE_WARMUP_EPOCHS <= epoch <= len(prune_curve) and loss > prune_curve[epoch - 1]:
+                raise TrialPruned(f"epoch {epoch} loss {loss:.6g} is above the median {prune_curve[epoch - 1]:.6g}")
+            check_deadline()
+
+        kwargs["on_epoch"] = on_epoch
+
+    try:
+        with _trial_limits(limits), _trial_deadline(limits.timeout):
+            try:
+                model, _ = asyncio.run(train(X_fit, y_fit, X_val, y_val, hyperparams, **kwargs))
+            except TrialPruned as e:
+                return {"status": "pruned", "loss": None, "curve": curve, "reason": str(e),
+                        "seconds": time.perf_counter() - started}
+            check_deadline()
+            loss = mean_pinball_loss(y_val, service._predict_matrix(model, X_val))
+    except TrialTimedOut as e:
+        return {"status": "timed_out", "loss": None, "curve": curve, "reason": str(e),
+                "seconds": time.perf_counter() - started}
+    return {"status": "completed", "loss": loss, "curve": curve, "seconds": time.perf_counter() - started}
+
+
+class FutureQuantSweepService:
+    """Hyperparameter search for the distributional models"""
+
+    async def run_sweep(
+        self,
+        symbol: str,
+        model_type: str,
+        space: Space,
+        strategy: str = "random",
+        n_trials: int = 20,
+        horizon_minutes: float = 1440,
+        start_date: str = None,
+        end_date: str = None,
+        test_size: float = 0.2,
+        val_fraction: float = 0.2,
+        base_params: Dict[str, Any] = None,
+        eta: int = 3,
+        max_parallel: Optional[int] = None,
+        limits: Optional[TrialLimits] = None,
+        seed: Optional[int] = None,
+        on_progress: Optional[ProgressFn] = None
+    ) -> Dict[str, Any]:
+        """Search ``space`` for ``model_type`` on one symbol and record the best trial
+
+        ``on_progress`` is awaited with a summary after every finished trial.
+        """
+        from .model_service import FutureQuantModelService, _train_model_job
+        try:
+            service = FutureQuantModelService()
+            if model_type not in service.model_types:
+                raise ValueError(f"Invalid model type. Must be one of: {list(service.model_types.keys())}")
+            horizon_minutes = float(horizon_minutes)
+            if horizon_minutes not in service.horizons:
+                raise ValueError(f"Invalid horizon. Must be one of: {service.horizons}")
+            validate_space(space, strategy)
+            if eta < 2:
+                raise ValueError("eta must be at least 2")
+            if not 0 < val_fraction < 1:
+                raise ValueError("val_fraction must be between 0 and 1")
+
+            if not start_date or not end_date:
+                end_date = datetime.now().strftime("%Y-%m-%d")
+                start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+            db = next(get_db())
+            try:
+                X_train, y_train, X_test, y_test = await service._prepare_training_data(
+                    db, symbol, start_date, end_date, horizon_minutes, test_size
+                )
+            finally:
+                db.close()
+            split = int(len(X_train) * (1 - val_fraction))
+            if split < MIN_BUDGET_ROWS or len(X_train) - split < 10:
+                raise ValueError(f"Insufficient training data for a sweep, got {len(X_train)} samples")
+            X_fit, y_fit, X_val, y_val = X_train[:split], y_train[:split], X_train[split:], y_train[split:]
+
+            rng = np.random.default_rng(seed)
+            if strategy == "grid":
+                configs = grid_points(space)
+            else:
+                configs = [sample_params(space, rng) for _ in range(n_trials)]
+            configs = [{**(base_params or {}), **config} for config in configs]
+            budgets = halving_budgets(len(configs), eta) if strategy == "successive_halving" else [1.0]
+
+            sweep = _Sweep(
+                model_type, horizon_minutes, X_fit, y_fit, X_val, y_val,
+                limits=limits or TrialLimits.from_settings(),
+                max_parallel=max_parallel or settings.sweep_max_parallel or get_compute_executor().cpu_workers,
+                total=sum(max(1, math.ceil(len(configs) / eta ** rung)) for rung in range(len(budgets))),
+                on_progress=on_progress
+            )
+            trials = [{"trial": i, "params": config, "status": "pending", "loss": None, "rungs": []}
+                      for i, config in enumerate(configs)]
+            survivors = trials
+            for rung, fraction in enumerate(budgets):
+                rows = min(len(X_fit), max(MIN_BUDGET_ROWS, int(round(len(X_fit) * fraction))))
+                await sweep.run_rung(survivors, rung, rows)
+                ranked = sorted((t for t in survivors if t["status"] == "completed"), key=lambda t: t["loss"])
+                if rung < len(budgets) - 1:
+                    survivors = ranked[:max(1, math.ceil(len(survivors) / eta))]
+                    for trial in ranked[len(survivors):]:
+                        trial["status"] = "pruned"
+                        trial["reason"] = f"not in the best 1/{eta} of rung {rung}"
+
+            finished = sorted((t for t in survivors if t["status"] == "completed"), key=lambda t: t["loss"])
+            if not finished:
+                raise ValueError("Every trial failed or was pruned")
+            best = finished[0]
+
+            model, test_metrics = await run_cpu(
+                _train_model_job, model_type, horizon_minutes, X_train, y_train, X_test, y_test, best["params"],
+                timeout=settings.compute_training_timeout, name=f"sweep:{model_type}:{symbol}:best"
+            )
+            test_metrics["pinball_loss"] = mean_pinball_loss(y_test, service._predict_matrix(model, X_test))
+            counts = {status: sum(1 for t in trials if t["status"] == status)
+                      for status in ("completed", "pruned", "failed", "timed_out")}
+            mlflow_run_id = await self._record_best(symbol, model_type, horizon_minutes, strategy, best, test_metrics, counts)
+
+            return {
+                "success": True,
+                "symbol": symbol,
+                "model_type": model_type,
+                "horizon_minutes": horizon_minutes,
+                "strategy": strategy,
+                "trials": trials,
+                "trial_counts": counts,
+                "best_trial": best["trial"],
+                "best_params": best["params"],
+                "best_val_pinball_loss": best["loss"],
+                "test_metrics": test_metrics,
+                "mlflow_run_id": mlflow_run_id,
+                "training_samples": len(X_train),
+                "test_samples": len(X_test),
+            }
+        except Exception as e:
+            logger.error(f"Hyperparameter sweep error: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    async def _record_best(
+        self,
+        symbol: str,
+        model_type: str,
+        horizon_minutes: float,
+        strategy: str,
+        best: Dict[str, Any],
+        test_metrics: Dict[str, float],
+        counts: Dict[str, int]
+    ) -> Optional[str]:
+        """Log the best trial's params and metrics as an MLflow run; failures only log"""
+        try:
+            from .mlflow_service import FutureQuantMLflowService
+        except ImportError:
+            logger.debug("MLflow not installed; skipping sweep record")
+            return None
+        try:
+            mlflow_service = FutureQuantMLflowService()
+            run = await mlflow_service.start_experiment(
+                run_name=f"sweep_{symbol}_{model_type}_{horizon_minutes}m",
+                tags={"symbol": symbol, "model_type": model_type, "sweep_strategy": strategy,
+                      "best_trial": str(best["trial"])}
+            )
+            if not run["success"]:
+                return None
+            try:
+                await mlflow_service.log_parameters(best["params"])
+                await mlflow_service.log_metrics({
+                    "val_pinball_loss": best["loss"],
+                    **{f"test_{name}": value for name, value in test_metrics.items() if np.isfinite(value)},
+                    **{f"trials_{status}": count for status, count in counts.items()},
+                })
+            finally:
+                await mlflow_service.end_experiment()
+            return run.get("run_id")
+        except Exception as e:
+            logger.warning(f"Could not record the sweep in MLflow: {e}")
+            return None
+
+
+class _Sweep:
+    """Runs trials of one sweep in parallel and keeps the loss curves used for pruning"""
+
+    def __init__(self, model_type: str, horizon_minutes: float, X_fit: np.ndarray, y_fit: np.ndarray,
+                 X_val: np.ndarray, y_val: np.ndarray, limits: TrialLimits, max_parallel: int, total: int,
+                 on_progress: Optional[ProgressFn]):
+        self.model_type = model_type
+        self.horizon_minutes = horizon_minutes
+        self.X_fit, self.y_fit, self.X_val, self.y_val = X_fit, y_fit, X_val, y_val
+        self.limits = limits
+        self.slots = asyncio.Semaphore(max(1, max_parallel))
+        self.total = total
+        self.done = 0
+        self.on_progress = on_progress
+        # Curves are only comparable between trials trained on the same rows
+        self.curves: Dict[int, List[List[float]]] = {}
+
+    async def run_rung(self, trials: List[Dict[str, Any]], rung: int, rows: int):
+        await asyncio.gather(*(self._run(trial, rung, rows) for trial in trials))
+
+    async def _run(self, trial: Dict[str, Any], rung: int, rows: int):
+        async with self.slots:
+            # Snapshot at launch: the median of whatever has finished by now
+            prune_curve = median_curve(self.curves.get(rows, []))
+            try:
+                # No executor timeout: it would free the slot while the worker is still busy and
+                # count time spent queued; run_trial enforces the budget from its own start
+                result = await run_cpu(
+                    run_trial, self.model_type, self.horizon_minutes, trial["params"],
+                    self.X_fit[-rows:], self.y_fit[-rows:], self.X_val, self.y_val, prune_curve, self.limits,
+                    name=f"sweep:{self.model_type}:{trial['trial']}"
+                )
+            except Exception as e:
+                logger.warning(f"Sweep trial {trial['trial']} failed: {e}")
+                result = {"status": "failed", "loss": None, "reason": str(e)}
+
+        if result["status"] == "completed" and result.get("curve"):
+            self.curves.setdefault(rows, []).append(result["curve"])
+        trial.update(status=result["status"], loss=result["loss"], rows=rows)
+        if result.get("reason"):
+            trial["reason"] = result["reason"]
+        trial["rungs"].append({"rung": rung, "rows": rows, "status": result["status"], "loss": result["loss"],
+                               "epochs": len(result.get("curve") or []), "seconds": result.get("seconds")})
+        self.done += 1
+        if self.on_progress is not None:
+            await self.on_progress({"done": self.done, "total": self.total, "trial": trial["trial"], "rung": rung,
+                                    "status": result["status"], "loss": result["loss"]})
@@ -0,0 +1,269 @@
+"""
+FutureQuant Trader Ingestion Scheduler
+
+Incremental, concurrent bar ingestion for many symbols:
+- one grouped query finds each symbol's last stored bar; only the tail from
+  that bar onwards is fetched (the last bar again, since it may have been
+  partial). Symbols whose last bar already reaches the end of the window are
+  not fetched at all, so a partial last bar is refreshed by the first run
+  whose end lies past it
+- symbols with the same fetch window are batched up to the source's batch size
+- batches are fetched concurrently in the I/O pool, limited by a concurrency cap
+  and a requests-per-second budget; writes go through a single writer so SQLite
+  is never written from two threads at once
+
+Where bars come from is a ``BarSource``: ``YFinanceSource`` in production,
+``FileBarSource`` (CSV/Parquet files on disk) for tests and offline runs.
+"""
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import func
+
+from app.core.compute import run_io
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.trading_models import Symbol, Bar
+from .bar_store import INTERVAL_STEPS, TimestampLike, to_utc
+
+logger = logging.getLogger(__name__)
+
+StoreFn = Callable[[str, pd.DataFrame, str], Awaitable[Dict]]
+ProgressFn = Callable[[int, int, str], Awaitable[None]]
+
+
+class BarSource:
+    """Provider of OHLCV bars.
+
+    ``fetch`` is blocking and returns one frame per symbol that has data for
+    ``[start, end)``; the scheduler runs it in the I/O pool.
+    """
+    name = "base"
+    max_batch_size = 1
+
+    def fetch(self, symbols: List[str], start: pd.Timestamp, end: pd.Timestamp,
+              interval: str) -> Dict[str, pd.DataFrame]:
+        raise NotImplementedError
+
+
+class YFinanceSource(BarSource):
+    """Yahoo Finance; several tickers are downloaded with one request"""
+    name = "yfinance"
+    max_batch_size = 20
+
+    def fetch(self, symbols: List[str], start: pd.Timestamp, end: pd.Timestamp,
+              interval: str) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+        data = yf.download(
+            tickers=symbols, start=start.to_pydatetime(), end=end.to_pydatetime(), interval=interval,
+            group_by="ticker", auto_adjust=True, threads=False, progress=False
+        )
+        if data is None or data.empty:
+            return {}
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(how="all")
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
+
+
+class FileBarSource(BarSource):
+    """Bars from ``<root>/<symbol>_<interval>.parquet`` or ``.csv`` files.
+
+    CSV files need a ``timestamp`` column (or the timestamps as first column);
+    naive timestamps are taken as UTC.
+    """
+    name = "file"
+    max_batch_size = 100
+
+    def __init__(self, root: str):
+        self.root = root
+        self.requests = 0
+
+    def _read(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        base = os.path.join(self.root, f"{symbol}_{interval}")
+        if os.path.exists(f"{base}.parquet"):
+            frame = pd.read_parquet(f"{base}.parquet")
+        elif os.path.exists(f"{base}.csv"):
+            frame = pd.read_csv(f"{base}.csv")
+        else:
+            return None
+        if "timestamp" in frame.columns:
+            frame = frame.set_index("timestamp")
+        elif not isinstance(frame.index, pd.DatetimeIndex):
+            frame = frame.set_index(frame.columns[0])
+        index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+        return frame.set_axis(index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC"), axis=0)
+
+    def fetch(self, symbols: List[str], start: pd.Timestamp, end: pd.Timestamp,
+              interval: str) -> Dict[str, pd.DataFrame]:
+        self.requests += 1
+        frames = {}
+        for symbol in symbols:
+            frame = self._read(symbol, interval)
+            if frame is None:
+                continue
+            frame = frame[(frame.index >= start) & (frame.index < end)]
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
+
+
+class RateLimiter:
+    """Spaces request starts at least ``1 / rate`` seconds apart"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            wait = self._next - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next = max(time.monotonic(), self._next) + self.interval
+
+
+@dataclass
+class FetchBatch:
+    symbols: List[str]
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+
+class IngestScheduler:
+    """Plans and runs incremental fetches for a set of symbols"""
+
+    def __init__(self, source: BarSource, store: StoreFn, session_factory: Callable = SessionLocal,
+                 concurrency: Optional[int] = None, requests_per_second: Optional[float] = None,
+                 batch_size: Optional[int] = None):
+        self.source = source
+        self.store = store
+        self._session_factory = session_factory
+        self.concurrency = max(1, concurrency or settings.ingest_concurrency)
+        self.batch_size = max(1, min(batch_size or settings.ingest_batch_size, source.max_batch_size))
+        self._limiter = RateLimiter(
+            requests_per_second if requests_per_second is not None else settings.ingest_requests_per_second
+        )
+
+    def last_stored(self, symbols: Sequence[str], interval: str) -> Dict[str, pd.Timestamp]:
+        """Timestamp of the newest stored bar per symbol, in one grouped query"""
+        db = self._session_factory()
+        try:
+            rows = db.query(Symbol.ticker, func.max(Bar.timestamp)).join(
+                Bar, Bar.symbol_id == Symbol.id
+            ).filter(
+                Symbol.ticker.in_(list(symbols)),
+                Bar.interval == interval
+            ).group_by(Symbol.ticker).all()
+        finally:
+            db.close()
+        return {ticker: to_utc(last) for ticker, last in rows if last is not None}
+
+    def plan(self, symbols: Sequence[str], start: TimestampLike, end: TimestampLike, interval: str,
+             last_stored: Dict[str, pd.Timestamp]) -> Tuple[List[FetchBatch], List[str]]:
+        """Fetch batches for the missing tails, plus the symbols that are already up to date
+
+        A symbol is up to date when its last stored bar reaches ``end``; otherwise
+        its batch starts at that bar so the bar is fetched again.
+        """
+        start_ts, end_ts = to_utc(start), to_utc(end)
+        step = INTERVAL_STEPS.get(interval, timedelta(0))
+        by_start: Dict[pd.Timestamp, List[str]] = {}
+        up_to_date = []
+        for symbol in symbols:
+            last = last_stored.get(symbol)
+            if last is not None and last + step >= end_ts:
+                up_to_date.append(symbol)
+                continue
+            fetch_from = max(start_ts, last) if last is not None else start_ts
+            by_start.setdefault(fetch_from, []).append(symbol)
+
+        batches = []
+        for fetch_from, group in sorted(by_start.items()):
+            for i in range(0, len(group), self.batch_size):
+                batches.append(FetchBatch(group[i:i + self.batch_size], fetch_from, end_ts))
+        return batches, up_to_date
+
+    async def run(self, symbols: Sequence[str], start: TimestampLike, end: TimestampLike, interval: str,
+                  full_refresh: bool = False, on_progress: Optional[ProgressFn] = None) -> Dict[str, Dict]:
+        """Fetch and store the missing bars; returns a result per symbol"""
+        symbols = list(dict.fromkeys(symbols))
+        last_stored = {} if full_refresh else await run_io(
+            self.last_stored, symbols, interval, name="ingest_last_stored"
+        )
+        batches, up_to_date = self.plan(symbols, start, end, interval, last_stored)
+
+        results: Dict[str, Dict] = {
+            symbol: {"status": "up_to_date", "bars_count": 0, "last_bar": last_stored[symbol].isoformat()}
+            for symbol in up_to_date
+        }
+        fetch_slots = asyncio.Semaphore(self.concurrency)
+        writer = asyncio.Lock()
+        progress = {"done": len(up_to_date)}
+
+        async def finish(symbol: str, result: Dict):
+            results[symbol] = result
+            progress["done"] += 1
+            if on_progress is not None:
+                await on_progress(progress["done"], len(symbols), symbol)
+
+        async def run_batch(batch: FetchBatch):
+            async with fetch_slots:
+                await self._limiter.acquire()
+                try:
+                    frames = await run_io(
+                        self.source.fetch, batch.symbols, batch.start, batch.end, interval,
+                        name=f"ingest_fetch:{self.source.name}"
+                    )
+                except Exception as e:
+                    logger.error(f"Fetching {batch.symbols} from {self.source.name} failed: {str(e)}")
+                    for symbol in batch.symbols:
+                        await finish(symbol, {"status": "error", "error": str(e)})
+                    return
+
+            for symbol in batch.symbols:
+                data = frames.get(symbol)
+                if data is None or data.empty:
+                    logger.warning(f"No data found for {symbol}")
+                    await finish(symbol, {"status": "no_data", "bars_count": 0})
+                    continue
+                try:
+                    async with writer:
+                        counts = await self.store(symbol, data, interval)
+                    await finish(symbol, {
+                        "status": "success",
+                        "bars_count": len(data),
+                        "inserted": counts["inserted"],
+                        "updated": counts["updated"],
+                        "skipped": counts["skipped"],
+                        "fetched_from": batch.start.isoformat(),
+                        "start_date": data.index[0].strftime("%Y-%m-%d"),
+                        "end_date": data.index[-1].strftime("%Y-%m-%d")
+                    })
+                except Exception as e:
+                    logger.error(f"Error ingesting {symbol}: {str(e)}")
+                    await finish(symbol, {"status": "error", "error": str(e)})
+
+        await asyncio.gather(*(run_batch(batch) for batch in batches))
+        logger.info(
+            f"Ingested {len(symbols)} symbols ({interval}) from {self.source.name}: "
+            f"{len(batches)} fetches, {len(up_to_date)} already up to date"
+        )
+        return {symbol: results[symbol] for symbol in symbols}
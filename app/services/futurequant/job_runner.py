@@ -0,0 +1,572 @@
+"""
+FutureQuant Trader Background Job Runner
+
+Durable, broker-less job runner on the ``futurequant_jobs`` table:
+- every job is a ``Job`` row; parameters, priority, attempts, progress and the
+  result live in ``Job.meta``
+- pending jobs sit in an in-memory priority queue per ``kind`` and are
+  dispatched to a fixed number of worker slots, with a concurrency limit per
+  kind (e.g. at most 2 trainings at once)
+- failed jobs are retried with exponential backoff up to ``max_retries``
+- every status or progress change is pushed to ``/ws/jobs`` subscribers
+- pending and interrupted jobs are re-queued when the runner starts, so a
+  restart does not lose work
+"""
+import json
+import heapq
+import asyncio
+import logging
+import itertools
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.trading_models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINAL_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# Lower runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+
+class JobError(Exception):
+    """Raised by handlers; ``retryable=False`` fails the job without retrying"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class JobContext:
+    """Handed to a job handler: its parameters plus a progress reporter"""
+
+    def __init__(self, runner: "JobRunner", job_id: int, kind: str, params: Dict[str, Any], attempt: int):
+        self.runner = runner
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.attempt = attempt
+
+    async def progress(self, percent: float, message: Optional[str] = None, **extra):
+        """Record progress (0-100) on the job row and broadcast it"""
+        update = {"progress": round(min(max(percent, 0.0), 100.0), 1)}
+        if message is not None:
+            update["message"] = message
+        if extra:
+            update["metrics"] = _jsonable(extra)
+        await self.runner._update_meta(self.job_id, update)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+def _jsonable(value: Any) -> Any:
+    """Make handler results storable in a JSON column (numpy scalars, timestamps, ...)"""
+    def default(obj):
+        if hasattr(obj, "item"):
+            return obj.item()
+        if hasattr(obj, "isoformat"):
+            return obj.isoformat()
+        return str(obj)
+    return json.loads(json.dumps(value, default=default))
+
+
+class JobRunner:
+    """Priority queues per job kind, a shared pool of worker slots and per-kind limits"""
+
+    def __init__(self, workers: int = 4, concurrency: Optional[Dict[str, int]] = None,
+                 max_retries: int = 2, retry_backoff: float = 5.0,
+                 session_factory: Callable = SessionLocal):
+        self.workers = workers
+        self.concurrency = dict(concurrency or {})
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._session_factory = session_factory
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queues: Dict[str, List] = {}
+        self._running: Dict[int, asyncio.Task] = {}
+        self._running_kinds: Dict[int, str] = {}
+        self._done_events: Dict[int, asyncio.Event] = {}
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # Registration and lifecycle
+
+    def register(self, kind: str, handler: JobHandler, concurrency: Optional[int] = None):
+        self._handlers[kind] = handler
+        self._queues.setdefault(kind, [])
+        if concurrency is not None:
+            self.concurrency[kind] = concurrency
+
+    @property
+    def started(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self):
+        """Create the jobs table if needed, re-queue unfinished jobs and start dispatching"""
+        if self.started:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        db = self._session_factory()
+        try:
+            Job.__table__.create(bind=db.get_bind(), checkfirst=True)
+            unfinished = (
+                db.query(Job)
+                .filter(Job.status.in_([JOB_PENDING, JOB_RUNNING]))
+                .order_by(Job.id)
+                .all()
+            )
+            for job in unfinished:
+                if job.kind not in self._handlers:
+                    continue
+                if job.status == JOB_RUNNING:
+                    # Interrupted by a restart; run it again
+                    job.status = JOB_PENDING
+                self._enqueue(job.kind, job.id, (job.meta or {}).get("priority", PRIORITY_NORMAL))
+            db.commit()
+        finally:
+            db.close()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        logger.info(f"Job runner started with {self.workers} workers, "
+                    f"{sum(len(q) for q in self._queues.values())} jobs re-queued")
+
+    async def stop(self):
+        """Stop dispatching; running jobs are cancelled and left pending for the next start"""
+        self._stopping = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for queue in self._queues.values():
+            queue.clear()
+
+    # Submitting and controlling jobs
+
+    async def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, priority: int = PRIORITY_NORMAL,
+                     max_retries: Optional[int] = None) -> int:
+        """Persist a new job and queue it; returns the job id"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'. Must be one of: {sorted(self._handlers)}")
+        if not self.started:
+            await self.start()
+        meta = {
+            "params": _jsonable(params or {}),
+            "priority": priority,
+            "attempts": 0,
+            "max_retries": self.max_retries if max_retries is None else max_retries,
+            "progress": 0.0,
+        }
+        db = self._session_factory()
+        try:
+            job = Job(kind=kind, status=JOB_PENDING, meta=meta)
+            db.add(job)
+            db.commit()
+            job_id = job.id
+        finally:
+            db.close()
+        self._enqueue(kind, job_id, priority)
+        await self._broadcast(job_id)
+        return job_id
+
+    async def cancel(self, job_id: int) -> bool:
+        """Cancel a pending or running job; returns False if it already finished"""
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            return True
+        job = self._load(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return False
+        await self._finish(job_id, JOB_CANCELLED, error="Cancelled before start")
+        return True
+
+    async def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait until a job reaches a final status (or ``timeout``) and return it"""
+        job = self._load(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return job
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._load(job_id)
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        return self._load(job_id)
+
+    def list_jobs(self, kind: Optional[str] = None, status: Optional[str] = None,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        db = self._session_factory()
+        try:
+            query = db.query(Job)
+            if kind:
+                query = query.filter(Job.kind == kind)
+            if status:
+                query = query.filter(Job.status == status)
+            return [self._to_dict(job) for job in query.order_by(Job.id.desc()).limit(limit).all()]
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        running: Dict[str, int] = {}
+        for kind in self._running_kinds.values():
+            running[kind] = running.get(kind, 0) + 1
+        return {
+            "started": self.started,
+            "workers": self.workers,
+            "kinds": {
+                kind: {
+                    "queued": len(self._queues.get(kind, [])),
+                    "running": running.get(kind, 0),
+                    "concurrency": self._limit(kind),
+                }
+                for kind in self._handlers
+            },
+        }
+
+    # Dispatching
+
+    def _limit(self, kind: str) -> int:
+        return self.concurrency.get(kind, self.workers)
+
+    def _enqueue(self, kind: str, job_id: int, priority: int):
+        heapq.heappush(self._queues.setdefault(kind, []), (priority, next(self._sequence), job_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _dispatch(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            while self._start_next():
+                pass
+            await self._wakeup.wait()
+
+    def _start_next(self) -> bool:
+        """Start the highest-priority queued job whose kind is under its limit"""
+        if len(self._running) >= self.workers:
+            return False
+        running: Dict[str, int] = {}
+        for kind in self._running_kinds.values():
+            running[kind] = running.get(kind, 0) + 1
+        best = None
+        for kind, queue in self._queues.items():
+            if queue and running.get(kind, 0) < self._limit(kind):
+                if best is None or queue[0] < self._queues[best][0]:
+                    best = kind
+        if best is None:
+            return False
+        _, _, job_id = heapq.heappop(self._queues[best])
+        self._running_kinds[job_id] = best
+        self._running[job_id] = asyncio.create_task(self._execute(job_id, best))
+        return True
+
+    async def _execute(self, job_id: int, kind: str):
+        try:
+            claimed = self._claim(job_id)
+            if claimed is None:
+                return
+            params, attempt, max_retries = claimed
+            await self._broadcast(job_id)
+            try:
+                result = await self._handlers[kind](JobContext(self, job_id, kind, params, attempt))
+            except asyncio.CancelledError:
+                if self._stopping:
+                    # Shutting down: leave it for the next start
+                    self._set_status(job_id, JOB_PENDING)
+                else:
+                    await self._finish(job_id, JOB_CANCELLED, error="Cancelled")
+            except Exception as e:
+                retryable = getattr(e, "retryable", True)
+                if retryable and attempt <= max_retries:
+                    delay = self.retry_backoff * (2 ** (attempt - 1))
+                    logger.warning(f"Job {job_id} ({kind}) attempt {attempt} failed: {e}; retrying in {delay:.1f}s")
+                    await self._update_meta(job_id, {"last_error": str(e)}, status=JOB_PENDING)
+                    priority = (self._load(job_id) or {}).get("priority", PRIORITY_NORMAL)
+                    asyncio.get_running_loop().call_later(delay, self._enqueue, kind, job_id, priority)
+                else:
+                    logger.error(f"Job {job_id} ({kind}) failed: {e}")
+                    await self._finish(job_id, JOB_FAILED, error=str(e))
+            else:
+                await self._finish(job_id, JOB_COMPLETED, result=result)
+        finally:
+            self._running.pop(job_id, None)
+            self._running_kinds.pop(job_id, None)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    # Persistence
+
+    def _claim(self, job_id: int):
+        """Mark a pending job running; returns (params, attempt, max_retries) or None if it was cancelled"""
+        db = self._session_factory()
+        try:
+            job = db.get(Job, job_id)
+            if job is None or job.status != JOB_PENDING:
+                return None
+            meta = dict(job.meta or {})
+            meta["attempts"] = meta.get("attempts", 0) + 1
+            job.meta = meta
+            job.status = JOB_RUNNING
+            job.started_at = datetime.utcnow()
+            job.error_message = None
+            db.commit()
+            return meta.get("params", {}), meta["attempts"], meta.get("max_retries", self.max_retries)
+        finally:
+            db.close()
+
+    def _set_status(self, job_id: int, status: str):
+        db = self._session_factory()
+        try:
+            job = db.get(Job, job_id)
+            if job is not None:
+                job.status = status
+                db.commit()
+        finally:
+            db.close()
+
+    async def _update_meta(self, job_id: int, update: Dict[str, Any], status: Optional[str] = None):
+        db = self._session_factory()
+        try:
+            job = db.get(Job, job_id)
+            if job is None:
+                return
+            job.meta = {**(job.meta or {}), **update}
+            if status is not None:
+                job.status = status
+            db.commit()
+        finally:
+            db.close()
+        await self._broadcast(job_id)
+
+    async def _finish(self, job_id: int, status: str, result: Any = None, error: Optional[str] = None):
+        db = self._session_factory()
+        try:
+            job = db.get(Job, job_id)
+            if job is None:
+                return
+            meta = dict(job.meta or {})
+            if status == JOB_COMPLETED:
+                meta["progress"] = 100.0
+                meta["result"] = _jsonable(result)
+            job.meta = meta
+            job.status = status
+            job.finished_at = datetime.utcnow()
+            job.error_message = error
+            db.commit()
+        finally:
+            db.close()
+        event = self._done_events.pop(job_id, None)
+        if event is not None:
+            event.set()
+        await self._broadcast(job_id)
+
+    def _load(self, job_id: int) -> Optional[Dict[str, Any]]:
+        db = self._session_factory()
+        try:
+            job = db.get(Job, job_id)
+            return self._to_dict(job) if job is not None else None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_dict(job: Job) -> Dict[str, Any]:
+        meta = job.meta or {}
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "priority": meta.get("priority", PRIORITY_NORMAL),
+            "attempts": meta.get("attempts", 0),
+            "max_retries": meta.get("max_retries"),
+            "progress": meta.get("progress", 0.0),
+            "message": meta.get("message"),
+            "metrics": meta.get("metrics"),
+            "params": meta.get("params", {}),
+            "result": meta.get("result"),
+            "error": job.error_message or meta.get("last_error"),
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    async def _broadcast(self, job_id: int):
+        try:
+            from app.api.v1.endpoints.websocket import broadcast_job_update
+            job = self._load(job_id)
+            if job is not None:
+                await broadcast_job_update([job])
+        except Exception as e:
+            logger.warning(f"Job update broadcast failed for job {job_id}: {e}")
+
+
+# Built-in handlers. Services are imported on first use so that starting the
+# runner does not pull in torch, vectorbt and friends.
+
+def _require_success(result: Dict[str, Any]) -> Dict[str, Any]:
+    if not result.get("success", False):
+        raise JobError(result.get("error", "Unknown error"))
+    return result
+
+
+async def _run_ingest_job(ctx: JobContext) -> Dict[str, Any]:
+    from app.services.futurequant.data_service import FutureQuantDataService
+    params = ctx.params
+    await ctx.progress(0, f"Ingesting {len(params['symbols'])} symbols")
+    
+    async def on_progress(done: int, total: int, symbol: str):
+        await ctx.progress(100.0 * done / max(total, 1), f"{symbol} done ({done}/{total})")
+    
+    return _require_success(await FutureQuantDataService().ingest_data(
+        symbols=params["symbols"],
+        start_date=params["start_date"],
+        end_date=params["end_date"],
+        interval=params.get("interval", "1d"),
+        full_refresh=params.get("full_refresh", False),
+        on_progress=on_progress
+    ))
+
+
+async def _run_features_job(ctx: JobContext) -> Dict[str, Any]:
+    from app.services.futurequant.feature_service import FutureQuantFeatureService
+    from app.services.futurequant.symbol_registry import get_symbol_registry
+    params = ctx.params
+    db = SessionLocal()
+    try:
+        symbol = get_symbol_registry().get(db, params["symbol"])
+        symbol_id = symbol.id if symbol else None
+    finally:
+        db.close()
+    if symbol_id is None:
+        raise JobError(f"Symbol {params['symbol']} not found; ingest it first", retryable=False)
+    await ctx.progress(0, f"Computing {params.get('recipe', 'full')} features for {params['symbol']}")
+    return _require_success(await FutureQuantFeatureService().compute_features(
+        symbol_id=symbol_id,
+        recipe_name=params.get("recipe", "full"),
+        start_date=params.get("start_date"),
+        end_date=params.get("end_date"),
+        interval=params.get("interval"),
+        full_refresh=params.get("full_refresh", False)
+    ))
+
+
+async def _run_features_batch_job(ctx: JobContext) -> Dict[str, Any]:
+    from app.services.futurequant.feature_service import FutureQuantFeatureService
+    from app.services.futurequant.symbol_registry import get_symbol_registry
+    params = ctx.params
+    db = SessionLocal()
+    try:
+        symbol_ids = get_symbol_registry().ids(db, params["symbols"])
+    finally:
+        db.close()
+    if not symbol_ids:
+        raise JobError(f"None of {params['symbols']} found; ingest them first", retryable=False)
+    await ctx.progress(0, f"Computing {params.get('recipe', 'full')} features for {len(symbol_ids)} symbols")
+    
+    async def on_progress(done: int, total: int, symbol: str):
+        await ctx.progress(100.0 * done / max(total, 1), f"{symbol} done ({done}/{total})")
+    
+    result = _require_success(await FutureQuantFeatureService().batch_compute_features(
+        symbol_ids=list(symbol_ids.values()),
+        recipe_name=params.get("recipe", "full"),
+        start_date=params.get("start_date"),
+        end_date=params.get("end_date"),
+        interval=params.get("interval"),
+        full_refresh=params.get("full_refresh", False),
+        on_progress=on_progress
+    ))
+    result["missing_symbols"] = [s for s in params["symbols"] if s not in symbol_ids]
+    return result
+
+
+async def _run_train_job(ctx: JobContext) -> Dict[str, Any]:
+    from app.services.futurequant.model_service import FutureQuantModelService
+    params = ctx.params
+    await ctx.progress(0, f"Training {params.get('model_type', 'quantile_regression')} for {params['symbol']}")
+    
+    async def on_epoch(stats: Dict[str, Any]):
+        await ctx.progress(100.0 * stats["epoch"] / max(stats["epochs"], 1),
+                           f"Epoch {stats['epoch']}/{stats['epochs']} ({stats['samples_per_sec']:.0f} samples/s)",
+                           **stats)
+    
+    return _require_success(await FutureQuantModelService().train_model(**params, on_progress=on_epoch))
+
+
+async def _run_sweep_job(ctx: JobContext) -> Dict[str, Any]:
+    from app.services.futurequant.hyperparam_sweep import FutureQuantSweepService, TrialLimits
+    params = dict(ctx.params)
+    limits = TrialLimits.from_settings(
+        timeout=params.pop("trial_timeout", None),
+        threads=params.pop("trial_threads", None),
+        max_memory_mb=params.pop("trial_max_memory_mb", None)
+    )
+    await ctx.progress(0, f"Sweeping {params['model_type']} hyperparameters for {params['symbol']}")
+    
+    async def on_trial(summary: Dict[str, Any]):
+        loss = f"loss {summary['loss']:.6g}" if summary["loss"] is not None else summary["status"]
+        await ctx.progress(100.0 * summary["done"] / max(summary["total"], 1),
+                           f"Trial {summary['trial']} (rung {summary['rung']}): {loss}", **summary)
+    
+    return _require_success(await FutureQuantSweepService().run_sweep(**params, limits=limits, on_progress=on_trial))
+
+
+async def _run_backtest_job(ctx: JobContext) -> Dict[str, Any]:
+    from app.services.futurequant.backtest_service import FutureQuantBacktestService
+    params = ctx.params
+    custom_config = dict(params.get("config") or {})
+    if params.get("initial_capital") is not None:
+        custom_config.setdefault("initial_capital", params["initial_capital"])
+    await ctx.progress(0, f"Backtesting strategy {params['strategy_id']}")
+    return _require_success(await FutureQuantBacktestService().run_backtest(
+        strategy_id=params["strategy_id"],
+        start_date=params["start_date"],
+        end_date=params["end_date"],
+        config_name=params.get("config_name", "moderate"),
+        custom_config=custom_config or None,
+        symbols=params.get("symbols")
+    ))
+
+
+DEFAULT_HANDLERS: Dict[str, JobHandler] = {
+    "ingest": _run_ingest_job,
+    "features": _run_features_job,
+    "features_batch": _run_features_batch_job,
+    "train": _run_train_job,
+    "sweep": _run_sweep_job,
+    "backtest": _run_backtest_job,
+}
+
+
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner with the built-in handlers registered"""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner(
+            workers=settings.job_workers,
+            concurrency=settings.job_concurrency,
+            max_retries=settings.job_max_retries,
+            retry_backoff=settings.job_retry_backoff
+        )
+        for kind, handler in DEFAULT_HANDLERS.items():
+            _job_runner.register(kind, handler)
+    return _job_runner
@@ -10,8 +10,11 @@ from sqlalchemy.orm import Session
 import json
 import asyncio
 
-from app.models.trading_models import Symbol, Bar, Strategy, Backtest, Trade
+from app.models.trading_models import Strategy, Backtest, Trade
 from app.models.database import get_db
+from app.core.compute import run_method_cpu
+from .bar_rollup import get_bars
+from .bar_store import BAR_COLUMNS, bars_to_wide
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +39,8 @@ class FutureQuantLeanService:
         end_date: str,
         symbols: List[str],
         strategy_code: str,
-        custom_config: Dict[str, Any] = None
+        custom_config: Dict[str, Any] = None,
+        interval: Optional[str] = None
     ) -> Dict[str, Any]:
         """Run Lean backtest for a strategy"""
         try:
@@ -52,13 +56,16 @@ class FutureQuantLeanService:
                 config.update(custom_config)
             
             # Get historical data
-            price_data = await self._get_price_data(db, symbols, start_date, end_date)
+            price_data = await self._get_price_data(db, symbols, start_date, end_date, interval)
             
             if price_data.empty:
                 raise ValueError("No price data found for backtest")
             
-            # Run Lean backtest simulation
-            results = await self._simulate_lean_backtest(price_data, strategy_code, config)
+            # Run Lean backtest simulation in the compute process pool
+            results = await run_method_cpu(
+                FutureQuantLeanService, "_simulate_lean_backtest", price_data, strategy_code, config,
+                name=f"lean:{strategy_id}"
+            )
             
             # Store results
             backtest_id = await self._store_lean_results(db, strategy_id, results, start_date, end_date)
@@ -75,45 +82,22 @@ class FutureQuantLeanService:
             logger.error(f"Lean backtest error: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    async def _get_price_data(self, db: Session, symbols: List[str], start_date: str, end_date: str) -> pd.DataFrame:
-        """Get price data for symbols"""
+    async def _get_price_data(
+        self,
+        db: Session,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        interval: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Get price data for symbols; ``interval`` is rolled up from finer bars when not stored"""
         try:
-            symbol_objs = db.query(Symbol).filter(Symbol.ticker.in_(symbols)).all()
-            symbol_ids = [s.id for s in symbol_objs]
-            
-            bars = db.query(Bar).filter(
-                Bar.symbol_id.in_(symbol_ids),
-                Bar.timestamp >= start_date,
-                Bar.timestamp <= end_date
-            ).order_by(Bar.timestamp).all()
-            
-            data = []
-            for bar in bars:
-                symbol_ticker = next(s.ticker for s in symbol_objs if s.id == bar.symbol_id)
-                data.append({
-                    'timestamp': bar.timestamp,
-                    'symbol': symbol_ticker,
-                    'open': bar.open,
-                    'high': bar.high,
-                    'low': bar.low,
-                    'close': bar.close,
-                    'volume': bar.volume
-                })
-            
-            df = pd.DataFrame(data)
-            if df.empty:
+            bars = await get_bars(db, symbols, start_date, end_date, interval)
+            if bars.empty:
                 return pd.DataFrame()
             
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.set_index(['timestamp', 'symbol'])
-            
-            # Create OHLCV structure
-            ohlcv = {}
-            for symbol in symbols:
-                symbol_data = df.xs(symbol, level=1)
-                ohlcv[symbol] = symbol_data[['open', 'high', 'low', 'close', 'volume']]
-            
-            return pd.concat(ohlcv, axis=1)
+            # One OHLCV column block per symbol
+            return bars_to_wide(bars, BAR_COLUMNS)
             
         except Exception as e:
             logger.error(f"Error getting price data: {str(e)}")
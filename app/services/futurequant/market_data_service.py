@@ -11,7 +11,8 @@ from datetime import datetime, timedelta
 import aiohttp
 import json
 from concurrent.futures import ThreadPoolExecutor
-import time
+
+from app.services.cache_service import cache_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +20,9 @@ class MarketDataService:
     """Real-time market data service using Yahoo Finance"""
     
     def __init__(self):
-        self.cache = {}
         self.cache_ttl = 30  # 30 seconds cache
+        self.cache = cache_namespace("futurequant_market_data", ttl=self.cache_ttl)
+        self.history_cache = cache_namespace("futurequant_market_history", ttl=300)
         self.executor = ThreadPoolExecutor(max_workers=10)
         self.session = None
         
@@ -37,20 +39,16 @@ class MarketDataService:
         try:
             # Check cache first
             cache_key = f"price_{symbol}"
-            if cache_key in self.cache:
-                cached_data = self.cache[cache_key]
-                if time.time() - cached_data['timestamp'] < self.cache_ttl:
-                    return cached_data['price']
+            cached_price = await self.cache.get(cache_key)
+            if cached_price is not None:
+                return cached_price
             
             # Fetch from Yahoo Finance
             price = await self._fetch_yahoo_price(symbol)
             
             if price is not None:
                 # Update cache
-                self.cache[cache_key] = {
-                    'price': price,
-                    'timestamp': time.time()
-                }
+                await self.cache.set(cache_key, price)
                 return price
                 
         except Exception as e:
@@ -66,13 +64,9 @@ class MarketDataService:
             symbols_to_fetch = []
             
             for symbol in symbols:
-                cache_key = f"price_{symbol}"
-                if cache_key in self.cache:
-                    cached_data = self.cache[cache_key]
-                    if time.time() - cached_data['timestamp'] < self.cache_ttl:
-                        prices[symbol] = cached_data['price']
-                    else:
-                        symbols_to_fetch.append(symbol)
+                cached_price = await self.cache.get(f"price_{symbol}")
+                if cached_price is not None:
+                    prices[symbol] = cached_price
                 else:
                     symbols_to_fetch.append(symbol)
             
@@ -84,11 +78,7 @@ class MarketDataService:
                 # Update cache
                 for symbol, price in batch_prices.items():
                     if price is not None:
-                        cache_key = f"price_{symbol}"
-                        self.cache[cache_key] = {
-                            'price': price,
-                            'timestamp': time.time()
-                        }
+                        await self.cache.set(f"price_{symbol}", price)
             
             return prices
             
@@ -106,20 +96,16 @@ class MarketDataService:
         try:
             # Check cache first
             cache_key = f"hist_{symbol}_{period}_{interval}"
-            if cache_key in self.cache:
-                cached_data = self.cache[cache_key]
-                if time.time() - cached_data['timestamp'] < 300:  # 5 min cache for historical
-                    return cached_data['data']
+            cached_data = await self.history_cache.get(cache_key)
+            if cached_data is not None:
+                return cached_data
             
             # Fetch from Yahoo Finance
             data = await self._fetch_yahoo_historical(symbol, period, interval)
             
             if data is not None and not data.empty:
-                # Update cache
-                self.cache[cache_key] = {
-                    'data': data,
-                    'timestamp': time.time()
-                }
+                # Update cache (5 min cache for historical)
+                await self.history_cache.set(cache_key, data)
                 return data
                 
         except Exception as e:
@@ -132,20 +118,16 @@ class MarketDataService:
         try:
             # Check cache first
             cache_key = f"info_{symbol}"
-            if cache_key in self.cache:
-                cached_data = self.cache[cache_key]
-                if time.time() - cached_data['timestamp'] < 3600:  # 1 hour cache for info
-                    return cached_data['data']
+            cached_info = await self.cache.get(cache_key)
+            if cached_info is not None:
+                return cached_info
             
             # Fetch from Yahoo Finance
             info = await self._fetch_yahoo_info(symbol)
             
             if info:
-                # Update cache
-                self.cache[cache_key] = {
-                    'data': info,
-                    'timestamp': time.time()
-                }
+                # Update cache (1 hour cache for info)
+                await self.cache.set(cache_key, info, ttl=3600)
                 return info
                 
         except Exception as e:
@@ -311,12 +293,13 @@ class MarketDataService:
         """Clear cache for specific symbol or all symbols"""
         if symbol:
             # Clear specific symbol cache
-            for key in list(self.cache.keys()):
-                if key.startswith(f"price_{symbol}") or key.startswith(f"hist_{symbol}") or key.startswith(f"info_{symbol}"):
-                    del self.cache[key]
+            self.cache.clear(prefix=f"price_{symbol}")
+            self.cache.clear(prefix=f"info_{symbol}")
+            self.history_cache.clear(prefix=f"hist_{symbol}")
         else:
             # Clear all cache
             self.cache.clear()
+            self.history_cache.clear()
         
         logger.info(f"Cache cleared for {'symbol ' + symbol if symbol else 'all symbols'}")
     
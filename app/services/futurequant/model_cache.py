@@ -0,0 +1,152 @@
+"""
+FutureQuant Trader Loaded-Model Cache
+
+Prediction paths used to ``joblib.load`` a model artifact on every call, paying
+deserialization and torch module construction each time. Loaded artifacts are
+now kept in a per-worker LRU keyed by model id and artifact mtime, so a file
+rewritten in place is reloaded rather than served stale. The byte budget is
+counted in artifact bytes on disk, a close proxy for the unpickled size of the
+sklearn ensembles and torch modules ``_save_model`` writes.
+
+Concurrent misses for the same artifact share one load. Any update or delete of
+a ``Model`` through the ORM (status changes, cleanup of old models) drops that
+model's entries. Serving models are loaded in the background after startup.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+import joblib
+from sqlalchemy import event, func
+
+from app.core.compute import run_io
+from app.core.config import settings
+from app.models.database import SessionLocal
+from app.models.trading_models import Model
+from app.services.cache_service import LRUCache, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "models"
+SERVING_STATUSES = ("active", "completed")
+# Entries leave the cache through LRU eviction or invalidation, never by age
+_NO_EXPIRY = 10 * 365 * 24 * 3600
+
+
+class ModelCache:
+    """LRU of loaded model artifacts within a byte budget"""
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, max_entries: int = 32):
+        self._cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._loads = SingleFlight()
+        # Bumped on invalidation so a load that was already running does not re-insert the model
+        self._generations: Dict[int, int] = {}
+        self.loads = 0
+
+    @staticmethod
+    def _key(model_id: int, mtime_ns: int) -> str:
+        return f"{model_id}:{mtime_ns}"
+
+    async def get(self, model_id: int, artifact_uri: str) -> Any:
+        """Return the loaded artifact of ``model_id``, loading it on a miss"""
+        stat = os.stat(artifact_uri)
+        key = self._key(model_id, stat.st_mtime_ns)
+        stats = self._cache.stats_for(NAMESPACE)
+        found, model = self._cache.get(key)
+        if found:
+            stats.hits += 1
+            return model
+        if self._loads.in_flight(key):
+            stats.coalesced += 1
+        else:
+            stats.misses += 1
+        return await self._loads.do(key, lambda: self._load(model_id, artifact_uri, key, stat.st_size))
+
+    async def _load(self, model_id: int, artifact_uri: str, key: str, size: int) -> Any:
+        generation = self._generations.get(model_id, 0)
+        model = await run_io(joblib.load, artifact_uri, name=f"load_model:{model_id}")
+        self.loads += 1
+        if self._generations.get(model_id, 0) == generation:
+            # An older mtime of the same model is now unreachable
+            self._cache.clear(namespace=NAMESPACE, prefix=f"{model_id}:")
+            if not self._cache.set(key, model, ttl=_NO_EXPIRY, namespace=NAMESPACE, size=size):
+                logger.info(f"Model {model_id} ({size} bytes) exceeds the model cache budget; not cached")
+        return model
+
+    def invalidate(self, model_id: Optional[int] = None) -> int:
+        """Drop one model's entries, or every entry; returns how many were dropped"""
+        if model_id is None:
+            for known in self._generations:
+                self._generations[known] += 1
+            return self._cache.clear(namespace=NAMESPACE)
+        self._generations[model_id] = self._generations.get(model_id, 0) + 1
+        return self._cache.clear(namespace=NAMESPACE, prefix=f"{model_id}:")
+
+    async def warm_up(self, session_factory: Callable = SessionLocal, delay: float = 0.0) -> int:
+        """Load serving models, most recently updated first, while they fit the budget"""
+        if delay:
+            await asyncio.sleep(delay)
+        db = session_factory()
+        try:
+            rows = db.query(Model.id, Model.artifact_uri).filter(
+                Model.status.in_(SERVING_STATUSES)
+            ).order_by(func.coalesce(Model.updated_at, Model.registered_at).desc(), Model.id.desc()).all()
+        finally:
+            db.close()
+
+        loaded, budget = 0, self._cache.max_bytes
+        for model_id, artifact_uri in rows[:self._cache.max_entries]:
+            try:
+                size = os.path.getsize(artifact_uri)
+                if size > budget:
+                    continue
+                await self.get(model_id, artifact_uri)
+            except Exception as e:
+                logger.warning(f"Could not warm up model {model_id}: {e}")
+                continue
+            budget -= size
+            loaded += 1
+        logger.info(f"Model cache warmed up with {loaded} of {len(rows)} serving models")
+        return loaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._cache.get_stats()
+        return {
+            **stats["namespaces"].get(NAMESPACE, {}),
+            "entries": stats["entries"],
+            "bytes": stats["bytes"],
+            "max_entries": stats["max_entries"],
+            "max_bytes": stats["max_bytes"],
+            "loads": self.loads,
+        }
+
+
+_model_cache: Optional[ModelCache] = None
+
+
+def get_model_cache() -> Optional[ModelCache]:
+    """Return the process-wide model cache, or None when it is disabled"""
+    global _model_cache
+    if not settings.serving_cache_enabled:
+        return None
+    if _model_cache is None:
+        _model_cache = ModelCache(settings.serving_cache_max_bytes, settings.serving_cache_max_entries)
+    return _model_cache
+
+
+async def load_model(model_id: int, artifact_uri: str) -> Any:
+    """Loaded artifact of a model, from the cache when it is enabled"""
+    cache = get_model_cache()
+    if cache is None:
+        return await run_io(joblib.load, artifact_uri, name=f"load_model:{model_id}")
+    return await cache.get(model_id, artifact_uri)
+
+
+def _invalidate_model_cache(mapper, connection, target):
+    if _model_cache is not None:
+        _model_cache.invalidate(target.id)
+
+
+for _event in ("after_update", "after_delete"):
+    event.listen(Model, _event, _invalidate_model_cache)
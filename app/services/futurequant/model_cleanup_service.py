@@ -11,8 +11,19 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 import asyncio
 
+from .transformer_export import EXTENSIONS as EXPORT_EXTENSIONS
+
 logger = logging.getLogger(__name__)
 
+
+def _remove_model_file(model_file: Path):
+    """Remove a joblib artifact and any compiled TorchScript/ONNX copy next to it"""
+    os.remove(model_file)
+    for extension in EXPORT_EXTENSIONS.values():
+        compiled = Path(model_file).with_suffix(extension)
+        if compiled.exists():
+            os.remove(compiled)
+
 class FutureQuantModelCleanupService:
     """Service for automatically cleaning up old model files after trades"""
     
@@ -87,7 +98,7 @@ class FutureQuantModelCleanupService:
                     # Remove older models
                     for old_model in models_to_remove:
                         try:
-                            os.remove(old_model['file'])
+                            _remove_model_file(old_model['file'])
                             logger.info(f"  Removed: {old_model['filename']}")
                             total_removed += 1
                         except OSError as e:
@@ -158,7 +169,7 @@ class FutureQuantModelCleanupService:
                 
                 if mtime < cutoff_date:
                     try:
-                        os.remove(model_file)
+                        _remove_model_file(model_file)
                         logger.info(f"Removed old model: {model_file.name}")
                         removed_count += 1
                     except OSError as e:
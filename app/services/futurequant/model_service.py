@@ -1,13 +1,15 @@
 """
 FutureQuant Trader ML Model Service - Distributional Models
 """
+import asyncio
 import logging
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional, Tuple, Protocol
+from typing import List, Dict, Any, Optional, Tuple, Protocol, Callable, Awaitable
 from datetime import datetime, timedelta
 import joblib
 import os
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 # PyTorch imports for transformer models
@@ -19,8 +21,15 @@ except ImportError:
     TORCH_AVAILABLE = False
 
 from app.models.trading_models import Symbol, Bar, Feature, Forecast, Model
-from app.models.database import get_db
+from app.models.database import get_db, SessionLocal
 from app.services.brpc_service import get_brpc_service
+from app.core.compute import run_cpu, run_cpu_with_events, run_io
+from app.core.config import settings
+from .feature_store import load_features
+from .model_cache import load_model
+from .symbol_registry import get_symbol_registry
+from .transformer_export import EXTENSIONS as EXPORT_EXTENSIONS, export_transformer, transformer_outputs
+from .transformer_training import EpochFn, train_transformer
 
 logger = logging.getLogger(__name__)
 
@@ -169,9 +178,14 @@ class FutureQuantModelService:
         start_date: str = None,
         end_date: str = None,
         test_size: float = 0.2,
-        hyperparams: Dict[str, Any] = None
+        hyperparams: Dict[str, Any] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
-        """Train a new distributional model for a symbol"""
+        """Train a new distributional model for a symbol
+
+        ``on_progress`` is awaited with each epoch's stats (loss, val_loss, samples_per_sec)
+        while epoch-based models train.
+        """
         try:
             # Validate model type
             if model_type not in self.model_types:
@@ -219,13 +233,25 @@ class FutureQuantModelService:
             # Set current horizon for demo mode detection
             self._current_horizon = horizon_minutes
             
-            # Train model
-            model, metrics = await self._train_distributional_model(
-                model_type, X_train, y_train, X_test, y_test, hyperparams
-            )
+            # Train model in the compute process pool so the event loop stays responsive; the
+            # job also exports the compiled transformer next to where the artifact will be saved
+            model_path = self._model_path(symbol, model_type, horizon_minutes)
+            job_args = (_train_model_job, model_type, horizon_minutes, X_train, y_train, X_test, y_test, hyperparams)
+            if on_progress is not None:
+                model, metrics = await run_cpu_with_events(
+                    *job_args, on_event=on_progress, export_stem=os.path.splitext(model_path)[0],
+                    timeout=settings.compute_training_timeout, name=f"train:{model_type}:{symbol}"
+                )
+            else:
+                model, metrics = await run_cpu(
+                    *job_args, export_stem=os.path.splitext(model_path)[0],
+                    timeout=settings.compute_training_timeout, name=f"train:{model_type}:{symbol}"
+                )
+            if isinstance(model, dict) and model.get('history'):
+                await self._log_training_history(symbol, model_type, horizon_minutes, model, metrics)
             
             # Save model
-            model_path = await self._save_model(model, symbol, model_type, horizon_minutes)
+            await self._save_model(model, model_path)
             
             # Store model metadata in database with initial "training" status
             model_id = await self._store_model_metadata(
@@ -272,9 +298,12 @@ class FutureQuantModelService:
             model_obj = db.query(Model).filter(Model.id == model_id).first()
             if not model_obj:
                 raise ValueError(f"Model {model_id} not found")
+            unavailable = self._unavailable_reason(model_obj)
+            if unavailable:
+                raise ValueError(unavailable)
             
-            # Load model
-            model = joblib.load(model_obj.artifact_uri)
+            # Load model (kept loaded across calls by the model cache)
+            model = await load_model(model_obj.id, model_obj.artifact_uri)
             
             # Get features for prediction
             features = await self._get_features_for_prediction(db, symbol, start_date, end_date)
@@ -304,6 +333,166 @@ class FutureQuantModelService:
                 "error": str(e)
             }
     
+    async def predict_batch(
+        self,
+        pairs: List[Tuple[str, int]],
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, Any]:
+        """Forecast many (symbol, model_id) pairs at once.
+
+        Each symbol's features are read once, the feature matrices of all symbols scored by
+        the same model are stacked for a single forward pass, and every forecast row of the
+        batch is inserted in one transaction.
+        """
+        db = SessionLocal()
+        try:
+            pairs = list(dict.fromkeys((symbol, int(model_id)) for symbol, model_id in pairs))
+            results = {pair: {"symbol": pair[0], "model_id": pair[1], "success": False} for pair in pairs}
+            models = {
+                model.id: model
+                for model in db.query(Model).filter(Model.id.in_({model_id for _, model_id in pairs})).all()
+            }
+            symbol_ids = get_symbol_registry().ids(db, {symbol for symbol, _ in pairs})
+            matrices = await run_io(self._feature_matrices, db, list(symbol_ids), start_date, end_date,
+                                    name="predict_batch:features")
+            
+            unavailable = {model_id: self._unavailable_reason(model) for model_id, model in models.items()}
+            groups: Dict[int, List[Tuple[str, int]]] = {}
+            for pair in pairs:
+                symbol, model_id = pair
+                if model_id not in models:
+                    results[pair]["error"] = f"Model {model_id} not found"
+                elif unavailable[model_id]:
+                    results[pair]["error"] = unavailable[model_id]
+                elif symbol not in symbol_ids:
+                    results[pair]["error"] = f"Symbol {symbol} not found"
+                elif not len(matrices[symbol][1]):
+                    results[pair]["error"] = f"No features found for {symbol} in date range"
+                else:
+                    groups.setdefault(model_id, []).append(pair)
+            
+            scored = await asyncio.gather(
+                *(self._predict_group(models[model_id], group, matrices) for model_id, group in groups.items()),
+                return_exceptions=True
+            )
+            
+            rows = []
+            for (model_id, group), outcomes in zip(groups.items(), scored):
+                if isinstance(outcomes, Exception):
+                    outcomes = [outcomes] * len(group)
+                horizon_minutes = models[model_id].params.get('horizon_minutes', 1440)
+                for pair, outputs in zip(group, outcomes):
+                    if isinstance(outputs, Exception):
+                        results[pair]["error"] = str(outputs)
+                        continue
+                    timestamps = matrices[pair[0]][0]
+                    columns = {name: values.tolist() for name, values in outputs.items()}
+                    rows.extend(
+                        {
+                            "symbol_id": symbol_ids[pair[0]],
+                            "timestamp": timestamp,
+                            "horizon_minutes": horizon_minutes,
+                            "model_id": model_id,
+                            **{name: values[i] for name, values in columns.items()}
+                        }
+                        for i, timestamp in enumerate(timestamps)
+                    )
+                    results[pair].update(success=True, predictions_count=len(timestamps))
+            
+            # One transaction for every forecast in the batch
+            if rows:
+                db.bulk_insert_mappings(Forecast, rows)
+                db.commit()
+            
+            results = list(results.values())
+            successful = sum(1 for result in results if result["success"])
+            logger.info(f"Batch prediction stored {len(rows)} forecasts for {successful}/{len(results)} pairs")
+            return {
+                "success": True,
+                "results": results,
+                "successful": successful,
+                "failed": len(results) - successful,
+                "forecasts_stored": len(rows),
+                "start_date": start_date,
+                "end_date": end_date,
+                "forecast_type": "distributional"
+            }
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Batch prediction error: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _feature_matrices(
+        db: Session,
+        symbols: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, Tuple[Any, np.ndarray]]:
+        """Per symbol, the timestamps and feature matrix of its fully populated feature rows"""
+        matrices = {}
+        for symbol in symbols:
+            features = load_features(db, [symbol], start_date, end_date).drop(columns="symbol")
+            X = features.to_numpy(dtype=float)
+            # Rows with missing values cannot be scored
+            valid = np.isfinite(X).all(axis=1)
+            matrices[symbol] = (features.index[valid].tz_convert(None).to_pydatetime(), X[valid])
+        return matrices
+    
+    async def _predict_group(
+        self,
+        model_obj: Model,
+        group: List[Tuple[str, int]],
+        matrices: Dict[str, Tuple[Any, np.ndarray]]
+    ) -> List[Any]:
+        """Score every symbol of one model in a single pass; per pair, outputs or the error"""
+        model = await load_model(model_obj.id, model_obj.artifact_uri)
+        blocks = [matrices[symbol][1] for symbol, _ in group]
+        n_features = self._n_features(model) or blocks[0].shape[1]
+        fits = [block.shape[1] == n_features for block in blocks]
+        stacked = [block for block, fit in zip(blocks, fits) if fit]
+        
+        outputs = {}
+        if stacked:
+            outputs = await run_io(self._predict_matrix, model, np.vstack(stacked), name=f"predict:{model_obj.id}")
+        bounds = np.cumsum([0] + [len(block) for block in stacked])
+        
+        scored, position = [], 0
+        for (symbol, _), block, fit in zip(group, blocks, fits):
+            if not fit:
+                scored.append(ValueError(
+                    f"{symbol} has {block.shape[1]} features; model {model_obj.id} expects {n_features}"
+                ))
+                continue
+            start, stop = bounds[position], bounds[position + 1]
+            scored.append({name: values[start:stop] for name, values in outputs.items()})
+            position += 1
+        return scored
+    
+    @staticmethod
+    def _unavailable_reason(model_obj: Model) -> Optional[str]:
+        """Why a model's artifact cannot be loaded for predictions, or None when it can"""
+        if model_obj.status == 'archived':
+            return f"Model {model_obj.id} is archived; its artifact has been removed"
+        if not os.path.exists(model_obj.artifact_uri):
+            return f"Model {model_obj.id} artifact is missing: {model_obj.artifact_uri}"
+        return None
+    
+    @staticmethod
+    def _n_features(model: Any) -> Optional[int]:
+        """Width of the feature matrix a model was trained on, when it records it"""
+        if isinstance(model, dict) and model.get('type') == 'transformer':
+            return model.get('input_dim')
+        if isinstance(model, dict) and model.get('type') == 'quantile_regression':
+            return getattr(model['models'][0.5], 'n_features_in_', None)
+        return getattr(model, 'n_features_in_', None)
+    
     async def _prepare_training_data(
         self,
         db: Session,
@@ -315,7 +504,7 @@ class FutureQuantModelService:
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """Prepare training and test data with strict time-based split"""
         # Get symbol
-        symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
+        symbol_obj = get_symbol_registry().get(db, symbol)
         if not symbol_obj:
             raise ValueError(f"Symbol {symbol} not found")
         
@@ -327,17 +516,11 @@ class FutureQuantModelService:
             Bar.timestamp <= end_date
         ).order_by(Bar.timestamp).all()
         
-        features = db.query(Feature).filter(
-            Feature.symbol_id == symbol_obj.id,
-            Feature.timestamp >= start_date,
-            Feature.timestamp <= end_date
-        ).order_by(Feature.timestamp).all()
+        features = load_features(db, [symbol], start_date, end_date).drop(columns="symbol")
         
-        if not bars or not features:
+        if not bars or features.empty:
             raise ValueError("No bars or features found for training")
         
-        data = []
-        
         # Convert horizon to appropriate index offset
         if horizon_minutes == 0.5:  # 30 seconds demo
             horizon_index = 1  # 1 day minimum for daily bars
@@ -347,28 +530,17 @@ class FutureQuantModelService:
         else:
             horizon_index = int(horizon_minutes)
         
-        for i, bar in enumerate(bars):
-            if i + horizon_index >= len(bars):
-                break
-            
-            # Get current features
-            feature = next((f for f in features if f.timestamp == bar.timestamp), None)
-            if not feature:
-                continue
-            
-            # Target
-            future_bar = bars[i + horizon_index]
-            future_return = (future_bar.close - bar.close) / bar.close
-            
-            row = feature.payload.copy()
-            row['future_return'] = future_return
-            row['timestamp'] = bar.timestamp
-            data.append(row)
+        # Target: return ``horizon_index`` bars ahead, joined to the features of each bar
+        closes = pd.Series(
+            [bar.close for bar in bars], index=pd.to_datetime([bar.timestamp for bar in bars], utc=True)
+        )
+        future_return = ((closes.shift(-horizon_index) - closes) / closes).rename('future_return')
+        data = features.join(future_return.iloc[:-horizon_index], how='inner')
         
-        if not data:
+        if data.empty:
             raise ValueError("No valid training data found")
         
-        df = pd.DataFrame(data).dropna()
+        df = data.rename_axis('timestamp').reset_index().dropna()
         if len(df) < 100:
             raise ValueError(f"Insufficient data after preprocessing. Got {len(df)} samples")
         
@@ -419,9 +591,10 @@ class FutureQuantModelService:
         y_train: np.ndarray,
         X_test: np.ndarray,
         y_test: np.ndarray,
-        hyperparams: Dict[str, Any] = None
+        hyperparams: Dict[str, Any] = None,
+        on_epoch: Optional[EpochFn] = None
     ) -> Tuple[Any, Dict[str, float]]:
-        """Train a distributional model"""
+        """Train a distributional model; ``on_epoch`` gets per-epoch stats from epoch-based models"""
         try:
             if model_type == "quantile_regression":
                 return await self._train_quantile_regression(X_train, y_train, X_test, y_test, hyperparams)
@@ -436,13 +609,13 @@ class FutureQuantModelService:
                 if hasattr(self, '_current_horizon') and self._current_horizon == 0.5:
                     try:
                         logger.info("Attempting transformer training for demo mode...")
-                        return await self._train_transformer(X_train, y_train, X_test, y_test, hyperparams)
+                        return await self._train_transformer(X_train, y_train, X_test, y_test, hyperparams, on_epoch)
                     except Exception as e:
                         logger.warning(f"Transformer training failed for demo mode: {str(e)}")
                         logger.info("Falling back to quantile regression for faster training...")
                         return await self._train_quantile_regression(X_train, y_train, X_test, y_test, hyperparams)
                 else:
-                    return await self._train_transformer(X_train, y_train, X_test, y_test, hyperparams)
+                    return await self._train_transformer(X_train, y_train, X_test, y_test, hyperparams, on_epoch)
             else:
                 raise ValueError(f"Unknown model type: {model_type}")
         except Exception as e:
@@ -491,14 +664,13 @@ class FutureQuantModelService:
         y_train: np.ndarray,
         X_test: np.ndarray,
         y_test: np.ndarray,
-        hyperparams: Dict[str, Any] = None
+        hyperparams: Dict[str, Any] = None,
+        on_epoch: Optional[EpochFn] = None
     ) -> Tuple[Any, Dict[str, float]]:
-        """Train transformer encoder model (FQT-lite)"""
+        """Train transformer encoder model (FQT-lite) in shuffled mini-batches with early stopping"""
         if not TORCH_AVAILABLE:
             raise ImportError("PyTorch required for transformer models")
         
-        import torch.optim as optim
-        
         default_params = {
             "d_model": 64,
             "n_heads": 4,
@@ -506,7 +678,10 @@ class FutureQuantModelService:
             "dropout": 0.1,
             "lr": 0.001,
             "epochs": 100,
-            "batch_size": 32
+            "batch_size": 32,
+            "val_fraction": 0.1,  # last rows of the training window, used for early stopping
+            "patience": 10,
+            "min_delta": 0.0
         }
         if hasattr(self, '_current_horizon') and self._current_horizon == 0.5:
             logger.info("30-second demo mode: using ultra-fast training parameters")
@@ -517,13 +692,12 @@ class FutureQuantModelService:
                 "lr": 0.1,  # Higher learning rate for faster convergence
                 "d_model": 16,  # Smaller model for speed
                 "n_heads": 2,  # Fewer attention heads
-                "n_layers": 1  # Single layer for speed
+                "n_layers": 1,  # Single layer for speed
+                "max_seconds": 15  # 15 seconds max for demo mode
             })
         if hyperparams:
             default_params.update(hyperparams)
         
-        # Use the module-level FutureQuantTransformer class
-        
         model = FutureQuantTransformer(
             input_dim=X_train.shape[1],
             d_model=default_params["d_model"],
@@ -531,63 +705,19 @@ class FutureQuantModelService:
             n_layers=default_params["n_layers"],
             dropout=default_params["dropout"]
         )
-        
-        optimizer = optim.Adam(model.parameters(), lr=default_params["lr"])
-        # Pinball-like plus volatility penalty is implemented explicitly below
-        
-        X_train_tensor = torch.as_tensor(X_train, dtype=torch.float32)
-        y_train_tensor = torch.as_tensor(y_train, dtype=torch.float32)
-        
-        model.train()
-        logger.info(f"Starting training with {default_params['epochs']} epochs")
-        
-        # Add timeout for demo mode
-        import time
-        start_time = time.time()
-        max_training_time = 15  # 15 seconds max for demo mode
-        
-        for epoch in range(default_params["epochs"]):
-            # Check timeout
-            if hasattr(self, '_current_horizon') and self._current_horizon == 0.5:
-                if time.time() - start_time > max_training_time:
-                    logger.warning(f"Training timeout after {max_training_time}s, stopping early at epoch {epoch+1}")
-                    break
-            try:
-                optimizer.zero_grad()
-                quantiles, prob_up, vol = model(X_train_tensor)  # (B,3), (B,1), (B,1)
-                q10, q50, q90 = quantiles[:, 0], quantiles[:, 1], quantiles[:, 2]
-                y = y_train_tensor
-                
-                # Pinball losses
-                def pinball_loss(y_true, y_pred, q):
-                    e = y_true - y_pred
-                    return torch.mean(torch.maximum((q - 1) * e, q * e))
-                q10_loss = pinball_loss(y, q10, 0.1)
-                q50_loss = pinball_loss(y, q50, 0.5)
-                q90_loss = pinball_loss(y, q90, 0.9)
-                
-                vol_loss = torch.mean(torch.abs(vol.squeeze(1) - torch.std(y)))
-                total_loss = q10_loss + q50_loss + q90_loss + 0.1 * vol_loss
-                total_loss.backward()
-                optimizer.step()
-                
-                # Log progress every few epochs
-                if epoch % max(1, default_params["epochs"] // 5) == 0:
-                    logger.info(f"Epoch {epoch+1}/{default_params['epochs']}, Loss: {total_loss.item():.6f}")
-                    
-            except Exception as e:
-                logger.error(f"Error during epoch {epoch+1}: {str(e)}")
-                raise e
-        
+        history = train_transformer(model, X_train, y_train, default_params, on_epoch=on_epoch)
         logger.info("Training completed successfully")
         
         transformer_model = {
             'type': 'transformer',
             'model': model,
             'hyperparams': default_params,
-            'input_dim': X_train.shape[1]
+            'input_dim': X_train.shape[1],
+            'history': history
         }
         metrics = await self._evaluate_distributional_model(transformer_model, X_test, y_test)
+        metrics["epochs_trained"] = len(history["loss"])
+        metrics["samples_per_sec"] = float(np.mean(history["samples_per_sec"]))
         return transformer_model, metrics
     
     async def _train_random_forest(
@@ -662,18 +792,11 @@ class FutureQuantModelService:
                 coverage_10 = np.mean((y_test >= q10_pred) & (y_test <= q90_pred))
                 coverage_50 = np.mean((y_test >= q10_pred) & (y_test <= q50_pred))
             elif isinstance(model, dict) and model.get('type') == 'transformer':
-                # Lazy import torch here to avoid NameError if sklearn path is used
-                import torch
-                model['model'].eval()
-                with torch.no_grad():
-                    X_test_tensor = torch.as_tensor(X_test, dtype=torch.float32)
-                    quantiles, prob_up, vol = model['model'](X_test_tensor)
-                    q10_pred = quantiles[:, 0].detach().cpu().numpy()
-                    q50_pred = quantiles[:, 1].detach().cpu().numpy()
-                    q90_pred = quantiles[:, 2].detach().cpu().numpy()
-                    y_pred = q50_pred
-                    coverage_10 = np.mean((y_test >= q10_pred) & (y_test <= q90_pred))
-                    coverage_50 = np.mean((y_test >= q10_pred) & (y_test <= q50_pred))
+                quantiles, _, _ = transformer_outputs(model, X_test)
+                q10_pred, q50_pred, q90_pred = quantiles.T
+                y_pred = q50_pred
+                coverage_10 = np.mean((y_test >= q10_pred) & (y_test <= q90_pred))
+                coverage_50 = np.mean((y_test >= q10_pred) & (y_test <= q50_pred))
             else:
                 y_pred = model.predict(X_test)
                 coverage_10 = coverage_50 = 0.0  # not available
@@ -698,20 +821,51 @@ class FutureQuantModelService:
                 "coverage_10_50": 0.0
             }
     
-    async def _save_model(
+    async def _log_training_history(
         self,
-        model: Any,
         symbol: str,
         model_type: str,
-        horizon_minutes: float
-    ) -> str:
-        """Save trained model to disk"""
+        horizon_minutes: float,
+        model: Dict[str, Any],
+        metrics: Dict[str, float]
+    ):
+        """Record the per-epoch history (losses, samples/sec) as an MLflow run; failures only log"""
+        if not settings.training_mlflow_logging:
+            return
+        try:
+            from .mlflow_service import FutureQuantMLflowService
+        except ImportError:
+            logger.debug("MLflow not installed; skipping training history")
+            return
+        try:
+            mlflow_service = FutureQuantMLflowService()
+            run = await mlflow_service.start_experiment(
+                run_name=f"{symbol}_{model_type}_{horizon_minutes}m",
+                tags={"symbol": symbol, "model_type": model_type}
+            )
+            if not run["success"]:
+                return
+            try:
+                await mlflow_service.log_parameters(model['hyperparams'])
+                await mlflow_service.log_training_history(model['history'], plot=False)
+                await mlflow_service.log_metrics(metrics)
+            finally:
+                await mlflow_service.end_experiment()
+        except Exception as e:
+            logger.warning(f"Could not log training history to MLflow: {e}")
+    
+    @staticmethod
+    def _model_path(symbol: str, model_type: str, horizon_minutes: float) -> str:
+        """Path a newly trained model is saved to"""
         models_dir = "models"
         os.makedirs(models_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{symbol}_{model_type}_{horizon_minutes}m_{timestamp}.joblib"
-        filepath = os.path.join(models_dir, filename)
-        joblib.dump(model, filepath)
+        return os.path.join(models_dir, filename)
+    
+    async def _save_model(self, model: Any, filepath: str) -> str:
+        """Save trained model to disk (in the I/O pool)"""
+        await run_io(joblib.dump, model, filepath, name=f"save_model:{os.path.basename(filepath)}")
         return filepath
     
     async def _store_model_metadata(
@@ -726,7 +880,7 @@ class FutureQuantModelService:
         initial_status: str = "active"
     ) -> int:
         """Store model metadata in database"""
-        symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
+        symbol_obj = get_symbol_registry().get(db, symbol)
         if not symbol_obj:
             raise ValueError(f"Symbol {symbol} not found")
         
@@ -759,41 +913,43 @@ class FutureQuantModelService:
                 db.commit()
                 logger.info(f"Updated model {model_id} status to: {status}")
                 
-                # Auto-cleanup old models if this one completed successfully
-                if status == 'completed':
-                    await self._cleanup_old_models(db, model.symbol, model.timeframe)
+                # Auto-cleanup old models if this one completed successfully (opt-in: it deletes files)
+                if status == 'completed' and settings.training_keep_models > 0:
+                    await self._cleanup_old_models(db, model.name, settings.training_keep_models)
             else:
                 logger.warning(f"Model {model_id} not found for status update")
         except Exception as e:
             logger.error(f"Error updating model {model_id} status: {str(e)}")
             db.rollback()
     
-    async def _cleanup_old_models(self, db: Session, symbol: str, timeframe: str, keep_count: int = 3):
-        """Automatically cleanup old models, keeping only the most recent ones"""
+    async def _cleanup_old_models(self, db: Session, name: str, keep_count: int = 3):
+        """Automatically cleanup old models, keeping only the most recent ones
+
+        ``name`` is the symbol/model type/horizon combination. Older models are archived
+        rather than deleted (their forecasts still reference them) and their files removed.
+        """
         try:
-            # Get all completed models for this symbol/timeframe combination
+            # Get all completed models for this symbol/model type/horizon combination
             models = db.query(Model).filter(
-                Model.symbol == symbol,
-                Model.timeframe == timeframe,
+                Model.name == name,
                 Model.status == 'completed'
-            ).order_by(Model.updated_at.desc()).all()
+            ).order_by(func.coalesce(Model.updated_at, Model.registered_at).desc(), Model.id.desc()).all()
             
             if len(models) > keep_count:
                 # Keep only the most recent models
-                models_to_delete = models[keep_count:]
+                models_to_archive = models[keep_count:]
                 
-                for model in models_to_delete:
+                for model in models_to_archive:
                     # Delete the model file
-                    model_path = f"models/{model.filename}"
-                    if os.path.exists(model_path):
-                        os.remove(model_path)
-                        logger.info(f"Deleted old model file: {model_path}")
-                    
-                    # Delete from database
-                    db.delete(model)
+                    stem = os.path.splitext(model.artifact_uri)[0]
+                    for path in [model.artifact_uri] + [stem + ext for ext in EXPORT_EXTENSIONS.values()]:
+                        if os.path.exists(path):
+                            os.remove(path)
+                            logger.info(f"Deleted old model file: {path}")
+                    model.status = 'archived'
                 
                 db.commit()
-                logger.info(f"Cleaned up {len(models_to_delete)} old models for {symbol}_{timeframe}")
+                logger.info(f"Archived {len(models_to_archive)} old models for {name}")
                 
         except Exception as e:
             logger.error(f"Error during model cleanup: {str(e)}")
@@ -807,20 +963,15 @@ class FutureQuantModelService:
         end_date: str
     ) -> List[Dict[str, Any]]:
         """Get features for making predictions"""
-        symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
+        symbol_obj = get_symbol_registry().get(db, symbol)
         if not symbol_obj:
             raise ValueError(f"Symbol {symbol} not found")
-        features = db.query(Feature).filter(
-            Feature.symbol_id == symbol_obj.id,
-            Feature.timestamp >= start_date,
-            Feature.timestamp <= end_date
-        ).order_by(Feature.timestamp).all()
-        result = []
-        for feature in features:
-            feature_dict = feature.payload.copy()
-            feature_dict['timestamp'] = feature.timestamp
-            result.append(feature_dict)
-        return result
+        features = load_features(db, [symbol], start_date, end_date).drop(columns="symbol")
+        timestamps = features.index.tz_convert(None).to_pydatetime()
+        return [
+            {**record, 'timestamp': timestamp}
+            for record, timestamp in zip(features.to_dict('records'), timestamps)
+        ]
     
     async def _make_distributional_predictions(
         self,
@@ -829,51 +980,42 @@ class FutureQuantModelService:
         model_params: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Make distributional predictions using trained model"""
-        predictions = []
-        for feature in features:
-            try:
-                feature_values = {k: v for k, v in feature.items() if k != 'timestamp'}
-                X = np.array([list(feature_values.values())])
-                
-                if isinstance(model, dict) and model.get('type') == 'quantile_regression':
-                    q10_pred = model['models'][0.1].predict(X)[0]
-                    q50_pred = model['models'][0.5].predict(X)[0]
-                    q90_pred = model['models'][0.9].predict(X)[0]
-                    prob_up = 0.5 + (q50_pred / (abs(q10_pred) + abs(q90_pred) + 1e-8)) * 0.5
-                    prob_up = max(0.0, min(1.0, prob_up))
-                    volatility = abs(q90_pred - q10_pred) / 2
-                elif isinstance(model, dict) and model.get('type') == 'transformer':
-                    import torch
-                    model['model'].eval()
-                    with torch.no_grad():
-                        X_tensor = torch.as_tensor(X, dtype=torch.float32)
-                        quantiles, prob_up_t, vol_t = model['model'](X_tensor)
-                        q10_pred = float(quantiles[0, 0].item())
-                        q50_pred = float(quantiles[0, 1].item())
-                        q90_pred = float(quantiles[0, 2].item())
-                        prob_up = float(prob_up_t[0, 0].item())
-                        volatility = float(vol_t[0, 0].item())
-                else:
-                    pred = float(model.predict(X)[0])
-                    q10_pred = pred * 0.9
-                    q50_pred = pred
-                    q90_pred = pred * 1.1
-                    prob_up = 0.5 + (pred / (abs(pred) + 0.01)) * 0.5
-                    prob_up = max(0.0, min(1.0, prob_up))
-                    volatility = abs(pred) * 0.1
-                
-                predictions.append({
-                    "timestamp": feature['timestamp'],
-                    "q10": float(q10_pred),
-                    "q50": float(q50_pred),
-                    "q90": float(q90_pred),
-                    "prob_up": float(prob_up),
-                    "volatility": float(volatility)
-                })
-            except Exception as e:
-                logger.error(f"Prediction error for feature: {str(e)}")
-                continue
-        return predictions
+        if not features:
+            return []
+        timestamps = [feature['timestamp'] for feature in features]
+        X = np.array([[v for k, v in feature.items() if k != 'timestamp'] for feature in features], dtype=float)
+        # Rows with missing values cannot be scored
+        valid = np.isfinite(X).all(axis=1)
+        if not valid.all():
+            logger.warning(f"Skipping {int((~valid).sum())} feature rows with missing values")
+        try:
+            outputs = self._predict_matrix(model, X[valid])
+        except Exception as e:
+            logger.error(f"Prediction error for features: {str(e)}")
+            return []
+        return [
+            {"timestamp": timestamp, **{name: float(values[i]) for name, values in outputs.items()}}
+            for i, timestamp in enumerate(np.asarray(timestamps, dtype=object)[valid])
+        ]
+    
+    def _predict_matrix(self, model: Any, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """One forward pass over a feature matrix; q10/q50/q90/prob_up/volatility per row"""
+        if isinstance(model, dict) and model.get('type') == 'quantile_regression':
+            q10, q50, q90 = (model['models'][q].predict(X) for q in (0.1, 0.5, 0.9))
+            prob_up = np.clip(0.5 + (q50 / (np.abs(q10) + np.abs(q90) + 1e-8)) * 0.5, 0.0, 1.0)
+            volatility = np.abs(q90 - q10) / 2
+        elif isinstance(model, dict) and model.get('type') == 'transformer':
+            # Compiled artifact when the model has one, eager module otherwise
+            quantiles, prob_up_t, vol_t = transformer_outputs(model, X)
+            q10, q50, q90 = quantiles.T
+            prob_up, volatility = prob_up_t[:, 0], vol_t[:, 0]
+        else:
+            pred = np.asarray(model.predict(X), dtype=float)
+            q10, q50, q90 = pred * 0.9, pred, pred * 1.1
+            prob_up = np.clip(0.5 + (pred / (np.abs(pred) + 0.01)) * 0.5, 0.0, 1.0)
+            volatility = np.abs(pred) * 0.1
+        outputs = {"q10": q10, "q50": q50, "q90": q90, "prob_up": prob_up, "volatility": volatility}
+        return {name: np.asarray(values, dtype=float) for name, values in outputs.items()}
     
     async def _store_forecasts(
         self,
@@ -885,7 +1027,7 @@ class FutureQuantModelService:
     ):
         """Store forecasts in database"""
         try:
-            symbol_obj = db.query(Symbol).filter(Symbol.ticker == symbol).first()
+            symbol_obj = get_symbol_registry().get(db, symbol)
             if not symbol_obj:
                 raise ValueError(f"Symbol {symbol} not found")
             forecasts = []
@@ -965,3 +1107,32 @@ class FutureQuantModelService:
         except Exception as e:
             logger.error(f"Prediction via BRPC failed: {e}")
             return {"success": False, "error": str(e)}
+
+
+def _train_model_job(
+    model_type: str,
+    horizon_minutes: float,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    hyperparams: Dict[str, Any] = None,
+    export_stem: Optional[str] = None,
+    events: Any = None
+) -> Tuple[Any, Dict[str, float]]:
+    """Compute-pool entry point for ``FutureQuantModelService._train_distributional_model``
+
+    Per-epoch stats are put on ``events`` when the caller passes a queue. With
+    ``export_stem`` a trained transformer also gets its compiled copy for
+    inference exported there (see ``transformer_export``).
+    """
+    service = FutureQuantModelService()
+    service._current_horizon = horizon_minutes
+    model, metrics = asyncio.run(service._train_distributional_model(
+        model_type, X_train, y_train, X_test, y_test, hyperparams,
+        on_epoch=events.put if events is not None else None
+    ))
+    if export_stem and isinstance(model, dict) and model.get('type') == 'transformer':
+        # Compiled copy for inference; the pickled module stays as the eager fallback
+        model['compiled'] = export_transformer(model['model'], model['input_dim'], export_stem)
+    return model, metrics
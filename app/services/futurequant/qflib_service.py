@@ -8,8 +8,11 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from app.models.trading_models import Symbol, Bar, Strategy, Backtest
+from app.models.trading_models import Strategy, Backtest
 from app.models.database import get_db
+from app.core.compute import run_method_cpu
+from .bar_rollup import get_bars
+from .bar_store import bars_to_wide
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +33,8 @@ class FutureQuantQFLibService:
         start_date: str,
         end_date: str,
         symbols: List[str],
-        analysis_type: str = "risk_metrics"
+        analysis_type: str = "risk_metrics",
+        interval: Optional[str] = None
     ) -> Dict[str, Any]:
         """Run QF-Lib analysis for a strategy"""
         try:
@@ -40,19 +44,22 @@ class FutureQuantQFLibService:
             if not strategy:
                 raise ValueError(f"Strategy {strategy_id} not found")
             
-            price_data = await self._get_price_data(db, symbols, start_date, end_date)
+            price_data = await self._get_price_data(db, symbols, start_date, end_date, interval)
             
             if price_data.empty:
                 raise ValueError("No price data found for analysis")
             
-            if analysis_type == "risk_metrics":
-                results = await self._calculate_risk_metrics(price_data)
-            elif analysis_type == "factor_analysis":
-                results = await self._run_factor_analysis(price_data)
-            elif analysis_type == "portfolio_optimization":
-                results = await self._run_portfolio_optimization(price_data)
-            else:
+            analysis_methods = {
+                "risk_metrics": "_calculate_risk_metrics",
+                "factor_analysis": "_run_factor_analysis",
+                "portfolio_optimization": "_run_portfolio_optimization"
+            }
+            if analysis_type not in analysis_methods:
                 raise ValueError(f"Unsupported analysis type: {analysis_type}")
+            results = await run_method_cpu(
+                FutureQuantQFLibService, analysis_methods[analysis_type], price_data,
+                name=f"qflib:{analysis_type}"
+            )
             
             return {
                 "success": True,
@@ -65,37 +72,22 @@ class FutureQuantQFLibService:
             logger.error(f"QF-Lib analysis error: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    async def _get_price_data(self, db: Session, symbols: List[str], start_date: str, end_date: str) -> pd.DataFrame:
-        """Get price data for symbols"""
+    async def _get_price_data(
+        self,
+        db: Session,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        interval: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Get price data for symbols; ``interval`` is rolled up from finer bars when not stored"""
         try:
-            symbol_objs = db.query(Symbol).filter(Symbol.ticker.in_(symbols)).all()
-            symbol_ids = [s.id for s in symbol_objs]
-            
-            bars = db.query(Bar).filter(
-                Bar.symbol_id.in_(symbol_ids),
-                Bar.timestamp >= start_date,
-                Bar.timestamp <= end_date
-            ).order_by(Bar.timestamp).all()
-            
-            data = []
-            for bar in bars:
-                symbol_ticker = next(s.ticker for s in symbol_objs if s.id == bar.symbol_id)
-                data.append({
-                    'timestamp': bar.timestamp,
-                    'symbol': symbol_ticker,
-                    'close': bar.close
-                })
-            
-            df = pd.DataFrame(data)
-            if df.empty:
+            bars = await get_bars(db, symbols, start_date, end_date, interval, columns=["close"])
+            if bars.empty:
                 return pd.DataFrame()
             
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.set_index(['timestamp', 'symbol'])
-            
             # Pivot to get close prices
-            close_prices = df['close'].unstack()
-            return close_prices
+            return bars_to_wide(bars, ["close"]).droplevel(1, axis=1)
             
         except Exception as e:
             logger.error(f"Error getting price data: {str(e)}")
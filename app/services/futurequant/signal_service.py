@@ -8,8 +8,9 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from app.models.trading_models import Symbol, Bar, Feature, Forecast, Strategy
+from app.models.trading_models import Bar, Feature, Forecast, Strategy
 from app.models.database import get_db
+from .symbol_registry import get_symbol_registry
 
 logger = logging.getLogger(__name__)
 
@@ -134,23 +135,21 @@ class FutureQuantSignalService:
         )
         
         # Add symbol filter if specified
+        registry = get_symbol_registry()
         if symbols:
-            symbol_objs = db.query(Symbol).filter(Symbol.ticker.in_(symbols)).all()
-            symbol_ids = [s.id for s in symbol_objs]
+            symbol_ids = list(registry.ids(db, symbols).values())
             query = query.filter(Forecast.symbol_id.in_(symbol_ids))
         
         # Execute query
         forecasts = query.order_by(Forecast.timestamp).all()
+        tickers = registry.tickers(db, {forecast.symbol_id for forecast in forecasts})
         
         # Convert to list of dicts
         result = []
         for forecast in forecasts:
-            # Get symbol info
-            symbol = db.query(Symbol).filter(Symbol.id == forecast.symbol_id).first()
-            
             result.append({
                 "id": forecast.id,
-                "symbol": symbol.ticker,
+                "symbol": tickers.get(forecast.symbol_id),
                 "symbol_id": forecast.symbol_id,
                 "timestamp": forecast.timestamp,
                 "q10": forecast.q10,
@@ -172,10 +171,15 @@ class FutureQuantSignalService:
         """Generate signals using distribution-aware strategy"""
         signals = []
         
+        # One latest-price lookup per symbol, not per forecast
+        current_prices = {}
+        for symbol_id in {forecast['symbol_id'] for forecast in forecasts}:
+            current_prices[symbol_id] = await self._get_current_price(db, symbol_id)
+        
         for forecast in forecasts:
             try:
                 # Get current price
-                current_price = await self._get_current_price(db, forecast['symbol_id'])
+                current_price = current_prices[forecast['symbol_id']]
                 if not current_price:
                     continue
                 
@@ -0,0 +1,151 @@
+"""
+FutureQuant Trader Symbol Registry
+
+Process-wide id <-> ticker <-> contract metadata map for ``futurequant_symbols``.
+The table is small and rarely written, so it is loaded with one query and kept
+in memory; loaders resolve symbol ids for a whole result set with a dict lookup
+(or a vectorized ``Series.map``) instead of one ``Symbol`` query per row.
+
+Any insert, update or delete of a ``Symbol`` through the ORM drops the loaded
+map. A lookup that misses reloads it, so symbols created by another process are
+picked up too, but at most once per ``miss_reload_interval`` seconds: unknown
+tickers from bad input do not turn every call into a table scan.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.trading_models import Symbol
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SymbolInfo:
+    """Immutable snapshot of a ``Symbol`` row"""
+    id: int
+    ticker: str
+    venue: str
+    asset_class: str
+    point_value: float
+    tick_size: float
+    timezone: Optional[str] = "UTC"
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "ticker": self.ticker,
+            "venue": self.venue,
+            "asset_class": self.asset_class,
+            "point_value": self.point_value,
+            "tick_size": self.tick_size,
+            "timezone": self.timezone,
+        }
+
+
+class SymbolRegistry:
+    """In-memory view of every ``Symbol``, loaded on first use"""
+
+    def __init__(self, miss_reload_interval: float = 5.0):
+        self._by_id: Dict[int, SymbolInfo] = {}
+        self._by_ticker: Dict[str, SymbolInfo] = {}
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.miss_reload_interval = miss_reload_interval
+        self.loads = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def _load(self, db: Session):
+        rows = db.query(
+            Symbol.id, Symbol.ticker, Symbol.venue, Symbol.asset_class,
+            Symbol.point_value, Symbol.tick_size, Symbol.timezone
+        ).all()
+        infos = [SymbolInfo(*row) for row in rows]
+        with self._lock:
+            self._by_id = {info.id: info for info in infos}
+            self._by_ticker = {info.ticker: info for info in infos}
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+        logger.debug(f"Symbol registry loaded {len(infos)} symbols")
+
+    def _ensure(self, db: Session, missing: bool = False):
+        """Load when empty or invalidated, or when a lookup missed (``missing``) and the
+        map is older than ``miss_reload_interval``"""
+        if not self._loaded:
+            self._load(db)
+        elif missing and time.monotonic() - self._loaded_at >= self.miss_reload_interval:
+            self._load(db)
+
+    # Lookups
+
+    def get(self, db: Session, ticker: str) -> Optional[SymbolInfo]:
+        self._ensure(db)
+        info = self._by_ticker.get(ticker)
+        if info is None:
+            self._ensure(db, missing=True)
+            info = self._by_ticker.get(ticker)
+        return info
+
+    def by_id(self, db: Session, symbol_id: int) -> Optional[SymbolInfo]:
+        self._ensure(db)
+        info = self._by_id.get(symbol_id)
+        if info is None:
+            self._ensure(db, missing=True)
+            info = self._by_id.get(symbol_id)
+        return info
+
+    def ids(self, db: Session, tickers: Iterable[str]) -> Dict[str, int]:
+        """Ticker -> id for the tickers that exist, in the order given"""
+        tickers = list(tickers)
+        self._ensure(db)
+        if any(t not in self._by_ticker for t in tickers):
+            self._ensure(db, missing=True)
+        return {t: self._by_ticker[t].id for t in tickers if t in self._by_ticker}
+
+    def tickers(self, db: Session, symbol_ids: Iterable[int]) -> Dict[int, str]:
+        """Id -> ticker for the ids that exist"""
+        symbol_ids = set(symbol_ids)
+        self._ensure(db)
+        if any(i not in self._by_id for i in symbol_ids):
+            self._ensure(db, missing=True)
+        return {i: self._by_id[i].ticker for i in symbol_ids if i in self._by_id}
+
+    def map_tickers(self, db: Session, symbol_ids: pd.Series) -> pd.Series:
+        """Vectorized id -> ticker for a column of symbol ids"""
+        return symbol_ids.map(self.tickers(db, pd.unique(symbol_ids)))
+
+    def all(self, db: Session) -> Dict[str, SymbolInfo]:
+        self._ensure(db)
+        return dict(self._by_ticker)
+
+
+_symbol_registry: Optional[SymbolRegistry] = None
+
+
+def get_symbol_registry() -> SymbolRegistry:
+    """Return the process-wide symbol registry"""
+    global _symbol_registry
+    if _symbol_registry is None:
+        _symbol_registry = SymbolRegistry(settings.symbol_registry_miss_reload_seconds)
+    return _symbol_registry
+
+
+def _invalidate_symbol_registry(mapper, connection, target):
+    if _symbol_registry is not None:
+        _symbol_registry.invalidate()
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Symbol, _event, _invalidate_symbol_registry)
@@ -0,0 +1,151 @@
+"""
+Compiled inference artifacts for FutureQuantTransformer
+
+At save time the trained module is exported next to its joblib artifact, with
+the input dimension fixed and the batch dimension left free:
+
+- ONNX (``.onnx``), when onnxruntime is installed to run it
+- TorchScript (``.pt``, traced, frozen and optimized for inference) otherwise
+
+An export is only kept if it reproduces the eager module's outputs on a batch
+of a different size than the one it was traced with. ``transformer_outputs``
+prefers the compiled artifact and falls back to the eager module (under
+``torch.inference_mode``) when there is none, its input width does not match,
+or it fails to load or run.
+"""
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TORCHSCRIPT = "torchscript"
+ONNX = "onnx"
+EXTENSIONS = {TORCHSCRIPT: ".pt", ONNX: ".onnx"}
+OUTPUT_NAMES = ["quantiles", "prob_up", "vol"]
+# Largest difference from the eager outputs an export may show on the check batch
+TOLERANCE = 1e-4
+
+Outputs = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def export_format(requested: Optional[str] = None) -> Optional[str]:
+    """Resolve ``transformer_export_format`` (auto | torchscript | onnx | none) to what can run here"""
+    requested = (requested or settings.transformer_export_format).lower()
+    if requested == "none" or not TORCH_AVAILABLE:
+        return None
+    if requested == ONNX and not ONNXRUNTIME_AVAILABLE:
+        logger.warning("onnxruntime is not installed; exporting TorchScript instead")
+        return TORCHSCRIPT
+    if requested == "auto":
+        return ONNX if ONNXRUNTIME_AVAILABLE else TORCHSCRIPT
+    return requested
+
+
+def _export_torchscript(module: "torch.nn.Module", example: "torch.Tensor", path: str):
+    with torch.no_grad():
+        traced = torch.jit.trace(module, example, check_trace=False)
+    try:
+        traced = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    except Exception as e:
+        logger.debug(f"Keeping the unoptimized trace: {e}")
+    torch.jit.save(traced, path)
+
+
+def _export_onnx(module: "torch.nn.Module", example: "torch.Tensor", path: str):
+    batch_axis = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            module, example, path, input_names=["features"], output_names=OUTPUT_NAMES,
+            dynamic_axes={name: batch_axis for name in ["features"] + OUTPUT_NAMES}, opset_version=17
+        )
+
+
+def export_transformer(module: "torch.nn.Module", input_dim: int, path_stem: str,
+                       fmt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Write a compiled copy of ``module`` to ``path_stem`` + extension.
+
+    Returns ``{"format", "path", "input_dim"}`` to store with the model, or None when
+    exporting is off or the export does not match the eager module.
+    """
+    fmt = export_format(fmt)
+    if fmt is None:
+        return None
+    module.eval()
+    # Operators ONNX cannot express still trace to TorchScript
+    for candidate in ([ONNX, TORCHSCRIPT] if fmt == ONNX else [fmt]):
+        path = path_stem + EXTENSIONS[candidate]
+        try:
+            generator = torch.Generator().manual_seed(0)
+            example = torch.randn(4, input_dim, generator=generator)
+            (_export_onnx if candidate == ONNX else _export_torchscript)(module, example, path)
+
+            # Check on another batch size: the batch dimension must not have been baked in
+            check = torch.randn(7, input_dim, generator=generator).numpy()
+            expected = _eager_outputs(module, check)
+            actual = _compiled_outputs(_load_compiled(path, os.stat(path).st_mtime_ns), candidate, check)
+            if not all(np.allclose(a, e, atol=TOLERANCE) for a, e in zip(actual, expected)):
+                raise ValueError("compiled outputs differ from the eager module")
+        except Exception as e:
+            logger.warning(f"{candidate} export of the transformer failed: {e}")
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+        logger.info(f"Exported transformer ({input_dim} features) to {path}")
+        return {"format": candidate, "path": path, "input_dim": input_dim}
+    logger.warning("No compiled transformer artifact; inference will use the eager module")
+    return None
+
+
+@lru_cache(maxsize=64)
+def _load_compiled(path: str, mtime_ns: int) -> Any:
+    # Keyed by mtime so a rewritten artifact is loaded again
+    if path.endswith(EXTENSIONS[ONNX]):
+        return onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+    module = torch.jit.load(path, map_location="cpu")
+    module.eval()
+    return module
+
+
+def _compiled_outputs(runtime: Any, fmt: str, X: np.ndarray) -> Outputs:
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    if fmt == ONNX:
+        return tuple(runtime.run(OUTPUT_NAMES, {"features": X}))
+    with torch.inference_mode():
+        return tuple(output.numpy() for output in runtime(torch.from_numpy(X)))
+
+
+def _eager_outputs(module: "torch.nn.Module", X: np.ndarray) -> Outputs:
+    module.eval()
+    with torch.inference_mode():
+        outputs = module(torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32)))
+    return tuple(output.cpu().numpy() for output in outputs)
+
+
+def transformer_outputs(model: Dict[str, Any], X: np.ndarray) -> Outputs:
+    """(quantiles, prob_up, vol) of a saved transformer model dict for a feature matrix"""
+    compiled = model.get('compiled')
+    if compiled and X.shape[1] == compiled["input_dim"]:
+        try:
+            runtime = _load_compiled(compiled["path"], os.stat(compiled["path"]).st_mtime_ns)
+            return _compiled_outputs(runtime, compiled["format"], X)
+        except Exception as e:
+            logger.warning(f"Compiled transformer at {compiled['path']} failed, using the eager module: {e}")
+    return _eager_outputs(model['model'], X)
@@ -0,0 +1,166 @@
+"""
+Mini-batch training loop for FutureQuantTransformer
+
+- Rows are served in shuffled mini-batches by a DataLoader that slices whole
+  batches out of contiguous float32 tensors (no per-row collation).
+- The last ``val_fraction`` of the time-ordered rows is held out; training stops
+  once its loss has not improved for ``patience`` epochs and the best weights
+  are restored.
+- torch's intra-op and inter-op thread pools are set per job so a training
+  worker uses its share of the cores instead of the library default.
+
+``on_epoch`` receives each epoch's losses and throughput (samples/sec).
+"""
+import copy
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import torch
+    from torch.utils.data import BatchSampler, DataLoader, RandomSampler, SequentialSampler, TensorDataset
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.1, 0.5, 0.9)
+VOL_LOSS_WEIGHT = 0.1
+
+EpochFn = Callable[[Dict[str, Any]], None]
+
+
+def pinball_loss(y_true: "torch.Tensor", y_pred: "torch.Tensor", q: float) -> "torch.Tensor":
+    """Mean quantile (pinball) loss of ``y_pred`` as the ``q`` quantile of ``y_true``"""
+    e = y_true - y_pred
+    return torch.mean(torch.maximum((q - 1) * e, q * e))
+
+
+def distributional_loss(outputs: Tuple["torch.Tensor", ...], y: "torch.Tensor", vol_target: float) -> "torch.Tensor":
+    """Pinball losses of the q10/q50/q90 heads plus a penalty pulling the vol head to ``vol_target``"""
+    quantiles, _, vol = outputs
+    loss = sum(pinball_loss(y, quantiles[:, i], q) for i, q in enumerate(QUANTILES))
+    return loss + VOL_LOSS_WEIGHT * torch.mean(torch.abs(vol.squeeze(1) - vol_target))
+
+
+def configure_threads(intra_op: int = 0, inter_op: int = 0):
+    """Size torch's intra-op and inter-op thread pools; 0 leaves a pool as it is"""
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0 and torch.get_num_interop_threads() != inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            # Only settable before the process has run any inter-op parallel work
+            logger.debug(f"Keeping {torch.get_num_interop_threads()} inter-op threads")
+
+
+def _as_tensor(values: np.ndarray) -> "torch.Tensor":
+    # Zero-copy when the array is already contiguous float32
+    return torch.from_numpy(np.ascontiguousarray(values, dtype=np.float32))
+
+
+def make_loader(X: np.ndarray, y: np.ndarray, batch_size: int, shuffle: bool = True,
+                seed: Optional[int] = None) -> "DataLoader":
+    """DataLoader yielding ``(X, y)`` mini-batches, reshuffled every epoch when ``shuffle``"""
+    dataset = TensorDataset(_as_tensor(X), _as_tensor(y))
+    if shuffle:
+        generator = torch.Generator().manual_seed(seed) if seed is not None else None
+        sampler = RandomSampler(dataset, generator=generator)
+    else:
+        sampler = SequentialSampler(dataset)
+    # Each fetch indexes the tensors with a whole batch of row ids
+    return DataLoader(dataset, sampler=BatchSampler(sampler, batch_size, drop_last=False), batch_size=None)
+
+
+def _validation_loss(model: "torch.nn.Module", loader: "DataLoader", vol_target: float) -> float:
+    model.eval()
+    total, seen = 0.0, 0
+    with torch.no_grad():
+        for X, y in loader:
+            total += distributional_loss(model(X), y, vol_target).item() * len(y)
+            seen += len(y)
+    return total / seen
+
+
+def train_transformer(model: "torch.nn.Module", X_train: np.ndarray, y_train: np.ndarray,
+                      params: Dict[str, Any], on_epoch: Optional[EpochFn] = None) -> Dict[str, List[float]]:
+    """Fit ``model`` in place and return its per-epoch history.
+
+    ``params`` takes ``lr``, ``epochs`` and ``batch_size`` plus optional ``val_fraction``,
+    ``patience``, ``min_delta``, ``max_seconds``, ``seed``, ``intra_op_threads`` and
+    ``inter_op_threads``.
+    """
+    configure_threads(params.get("intra_op_threads", settings.training_intra_op_threads),
+                      params.get("inter_op_threads", settings.training_inter_op_threads))
+    if params.get("seed") is not None:
+        torch.manual_seed(params["seed"])
+
+    n_val = int(len(X_train) * params.get("val_fraction", 0.0))
+    n_fit = len(X_train) - n_val
+    epochs, batch_size = int(params["epochs"]), int(params["batch_size"])
+    patience, min_delta = params.get("patience"), params.get("min_delta", 0.0)
+    max_seconds = params.get("max_seconds")
+
+    train_loader = make_loader(X_train[:n_fit], y_train[:n_fit], batch_size, seed=params.get("seed"))
+    val_loader = make_loader(X_train[n_fit:], y_train[n_fit:], batch_size, shuffle=False) if n_val else None
+    # The full-batch loop penalised the vol head against the std of every training target
+    vol_target = float(np.std(y_train[:n_fit], ddof=1))
+    optimizer = torch.optim.Adam(model.parameters(), lr=params["lr"])
+
+    history: Dict[str, List[float]] = {"loss": [], "val_loss": [], "samples_per_sec": []}
+    best_loss, best_state, stale = float("inf"), None, 0
+    logger.info(f"Training on {n_fit} rows ({n_val} held out) in batches of {batch_size} for up to {epochs} epochs "
+                f"with {torch.get_num_threads()} threads")
+    started = time.perf_counter()
+
+    for epoch in range(1, epochs + 1):
+        model.train()
+        epoch_started = time.perf_counter()
+        total = torch.zeros(())
+        for X, y in train_loader:
+            optimizer.zero_grad(set_to_none=True)
+            loss = distributional_loss(model(X), y, vol_target)
+            loss.backward()
+            optimizer.step()
+            total += loss.detach() * len(y)
+        elapsed = time.perf_counter() - epoch_started
+
+        event = {
+            "epoch": epoch,
+            "epochs": epochs,
+            "loss": total.item() / n_fit,
+            "samples_per_sec": n_fit / max(elapsed, 1e-9),
+        }
+        history["loss"].append(event["loss"])
+        history["samples_per_sec"].append(event["samples_per_sec"])
+        if val_loader is not None:
+            event["val_loss"] = _validation_loss(model, val_loader, vol_target)
+            history["val_loss"].append(event["val_loss"])
+        if on_epoch is not None:
+            on_epoch(event)
+        if epoch % max(1, epochs // 5) == 0:
+            logger.info(f"Epoch {epoch}/{epochs}, loss {event['loss']:.6f}, "
+                        f"{event['samples_per_sec']:.0f} samples/s")
+
+        if val_loader is not None:
+            if event["val_loss"] < best_loss - min_delta:
+                best_loss, best_state, stale = event["val_loss"], copy.deepcopy(model.state_dict()), 0
+            else:
+                stale += 1
+                if patience is not None and stale >= patience:
+                    logger.info(f"Stopping at epoch {epoch}: validation loss has not improved for {stale} epochs")
+                    break
+        if max_seconds is not None and time.perf_counter() - started > max_seconds:
+            logger.warning(f"Training stopped after {max_seconds}s at epoch {epoch}")
+            break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    model.eval()
+    return {key: values for key, values in history.items() if values}
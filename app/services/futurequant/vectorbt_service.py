@@ -9,8 +9,11 @@ from datetime import datetime, timedelta
 import vectorbt as vbt
 from sqlalchemy.orm import Session
 
-from app.models.trading_models import Symbol, Bar, Strategy, Backtest, Trade
+from app.models.trading_models import Strategy, Backtest, Trade
 from app.models.database import get_db
+from app.core.compute import run_method_cpu
+from .bar_rollup import get_bars
+from .bar_store import BAR_COLUMNS, bars_to_wide
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +39,8 @@ class FutureQuantVectorBTService:
         end_date: str,
         symbols: List[str],
         strategy_type: str = "momentum",
-        custom_params: Dict[str, Any] = None
+        custom_params: Dict[str, Any] = None,
+        interval: Optional[str] = None
     ) -> Dict[str, Any]:
         """Run VectorBT backtest for a strategy"""
         try:
@@ -49,22 +53,18 @@ class FutureQuantVectorBTService:
                 raise ValueError(f"Strategy {strategy_id} not found")
             
             # Get historical data
-            price_data = await self._get_price_data(db, symbols, start_date, end_date)
+            price_data = await self._get_price_data(db, symbols, start_date, end_date, interval)
             
             if price_data.empty:
                 raise ValueError("No price data found for backtest")
             
-            # Run VectorBT backtest based on strategy type
-            if strategy_type == "momentum":
-                results = await self._run_momentum_strategy(price_data, custom_params)
-            elif strategy_type == "mean_reversion":
-                results = await self._run_mean_reversion_strategy(price_data, custom_params)
-            elif strategy_type == "trend_following":
-                results = await self._run_trend_following_strategy(price_data, custom_params)
-            elif strategy_type == "statistical_arbitrage":
-                results = await self._run_statistical_arbitrage_strategy(price_data, custom_params)
-            else:
+            # Run VectorBT backtest based on strategy type, in the compute process pool
+            if strategy_type not in ("momentum", "mean_reversion", "trend_following", "statistical_arbitrage"):
                 raise ValueError(f"Unsupported strategy type: {strategy_type}")
+            results = await run_method_cpu(
+                FutureQuantVectorBTService, f"_run_{strategy_type}_strategy", price_data, custom_params,
+                name=f"vectorbt:{strategy_type}"
+            )
             
             # Store results in database
             backtest_id = await self._store_backtest_results(db, strategy_id, results, start_date, end_date)
@@ -84,49 +84,22 @@ class FutureQuantVectorBTService:
                 "error": str(e)
             }
     
-    async def _get_price_data(self, db: Session, symbols: List[str], start_date: str, end_date: str) -> pd.DataFrame:
-        """Get price data for symbols"""
+    async def _get_price_data(
+        self,
+        db: Session,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        interval: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Get price data for symbols; ``interval`` is rolled up from finer bars when not stored"""
         try:
-            # Get symbol IDs
-            symbol_objs = db.query(Symbol).filter(Symbol.ticker.in_(symbols)).all()
-            symbol_ids = [s.id for s in symbol_objs]
-            
-            # Get bars data
-            bars = db.query(Bar).filter(
-                Bar.symbol_id.in_(symbol_ids),
-                Bar.timestamp >= start_date,
-                Bar.timestamp <= end_date
-            ).order_by(Bar.timestamp).all()
-            
-            # Convert to DataFrame
-            data = []
-            for bar in bars:
-                symbol_ticker = next(s.ticker for s in symbol_objs if s.id == bar.symbol_id)
-                data.append({
-                    'timestamp': bar.timestamp,
-                    'symbol': symbol_ticker,
-                    'open': bar.open,
-                    'high': bar.high,
-                    'low': bar.low,
-                    'close': bar.close,
-                    'volume': bar.volume
-                })
-            
-            df = pd.DataFrame(data)
-            if df.empty:
+            bars = await get_bars(db, symbols, start_date, end_date, interval)
+            if bars.empty:
                 return pd.DataFrame()
             
-            # Pivot to get OHLCV data
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.set_index(['timestamp', 'symbol'])
-            
-            # Create OHLCV structure
-            ohlcv = {}
-            for symbol in symbols:
-                symbol_data = df.xs(symbol, level=1)
-                ohlcv[symbol] = symbol_data[['open', 'high', 'low', 'close', 'volume']]
-            
-            return pd.concat(ohlcv, axis=1)
+            # One OHLCV column block per symbol
+            return bars_to_wide(bars, BAR_COLUMNS)
             
         except Exception as e:
             logger.error(f"Error getting price data: {str(e)}")
@@ -17,6 +17,7 @@ Layer 3: API + Service Layer
 设计原则: 删除所有不必要的部分，只保留核心功能
 """
 import json
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
@@ -28,6 +29,7 @@ except ImportError:
 
 from app.services.marketpulse.data_collector import MarketPulseDataCollector
 from app.services.marketpulse.aws_storage import AWSStorageService
+from app.services.cache_service import cache_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +69,10 @@ class MarketPulseService:
         # Storage service: for reading processed data
         self.aws_storage = AWSStorageService(s3_bucket=s3_bucket)
         
+        # Agent output changes at most once per compute cycle; serve a short-lived
+        # copy and let one background read refresh it
+        self.events_cache = cache_namespace("marketpulse_events", ttl=15, stale_ttl=60)
+        
         self.started = False
     
     def start(self):
@@ -103,7 +109,7 @@ class MarketPulseService:
             ticker: Optional ticker symbol to filter by (e.g., 'SPY', 'QQQ')
         """
         try:
-            events = self._get_today_pulse_events(ticker=ticker)
+            events = await self._get_today_pulse_events_cached(ticker=ticker)
             
             if events:
                 latest = events[-1]
@@ -133,6 +139,19 @@ class MarketPulseService:
         """
         return self._get_today_pulse_events(ticker=ticker)
     
+    async def _get_today_pulse_events_cached(self, ticker: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Today's pulse events via the shared cache
+        Concurrent dashboard requests share one S3 read, run off the event loop
+        """
+        date_str = datetime.now(timezone.utc).date().isoformat()
+        events = await self.events_cache.get_or_set(
+            date_str, lambda: asyncio.to_thread(self._get_today_pulse_events)
+        )
+        if ticker:
+            events = [e for e in events if e.get('ticker') == ticker]
+        return events
+    
     def _get_today_pulse_events(self, ticker: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Internal method: Read today's pulse events from S3
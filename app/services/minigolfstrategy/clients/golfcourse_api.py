@@ -4,10 +4,10 @@ External API integration for golf course data
 """
 import httpx
 import logging
-import time
 import hashlib
 from typing import Dict, List, Optional, Any
 from app.core.config import settings
+from app.services.cache_service import cache_namespace
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +18,8 @@ class GolfCourseAPIClient:
         self.base_url = settings.golfcourse_api_base
         self.api_key = settings.golfcourse_api_key or ''
         self.timeout = 30.0  # Increased timeout for better reliability
-        self.cache = {}  # Simple in-memory cache
         self.cache_ttl = 3600  # 1 hour cache TTL
+        self.cache = cache_namespace("golfcourse_api", ttl=self.cache_ttl)
     
     
     def _get_cache_key(self, endpoint: str, params: Dict[str, Any]) -> str:
@@ -28,23 +28,17 @@ class GolfCourseAPIClient:
         cache_string = f"{endpoint}:{sorted(params.items())}"
         return hashlib.md5(cache_string.encode()).hexdigest()
     
-    def _get_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
+    async def _get_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Get data from cache if not expired"""
-        if cache_key in self.cache:
-            data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                logger.info(f"Cache hit for key: {cache_key[:8]}...")
-                return data
-            else:
-                # Remove expired cache entry
-                del self.cache[cache_key]
-                logger.info(f"Cache expired for key: {cache_key[:8]}...")
-        return None
+        data = await self.cache.get(cache_key)
+        if data is not None:
+            logger.debug(f"Cache hit for key: {cache_key[:8]}...")
+        return data
     
-    def _set_cache(self, cache_key: str, data: Dict[str, Any]) -> None:
+    async def _set_cache(self, cache_key: str, data: Dict[str, Any]) -> None:
         """Store data in cache"""
-        self.cache[cache_key] = (data, time.time())
-        logger.info(f"Cached data for key: {cache_key[:8]}...")
+        await self.cache.set(cache_key, data)
+        logger.debug(f"Cached data for key: {cache_key[:8]}...")
     
     async def _make_request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
         """Make API request with retry logic for rate limiting"""
@@ -102,7 +96,7 @@ class GolfCourseAPIClient:
             
             # Check cache first
             cache_key = self._get_cache_key("search", params)
-            cached_result = self._get_from_cache(cache_key)
+            cached_result = await self._get_from_cache(cache_key)
             if cached_result:
                 return cached_result
             
@@ -125,7 +119,7 @@ class GolfCourseAPIClient:
             
             # Cache successful results
             if "error" not in result:
-                self._set_cache(cache_key, result)
+                await self._set_cache(cache_key, result)
             
             return result
                 
@@ -199,7 +193,8 @@ class GolfCourseAPIClient:
         """Get current cache statistics"""
         return {
             "cache_size": len(self.cache),
-            "cache_ttl": self.cache_ttl
+            "cache_ttl": self.cache_ttl,
+            **self.cache.get_stats()
         }
 
 # Global client instance
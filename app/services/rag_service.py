@@ -21,6 +21,8 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from app.core.compute import run_cpu, run_io
+
 LANGCHAIN_AVAILABLE = True
 HuggingFaceEmbeddings = None
 FAISS = None
@@ -47,6 +49,12 @@ except Exception:
         LANGCHAIN_AVAILABLE = False
 
 
+def _fit_tfidf(texts: List[str]) -> Tuple[TfidfVectorizer, Any]:
+    """Fit the lexical index; runs in the compute process pool"""
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=50000)
+    return vectorizer, vectorizer.fit_transform(texts)
+
+
 @dataclass
 class RAGNodeResult:
     name: str
@@ -103,29 +111,36 @@ class AsyncRAGService:
             for chunk in self._text_splitter.split_text(doc["page_content"]):
                 split_docs.append({"page_content": chunk, "metadata": doc["metadata"]})
 
-        # Build or update both FAISS and TF-IDF indexes
+        # Build or update both FAISS and TF-IDF indexes. Embedding runs in the I/O pool
+        # (the model lives in this process and releases the GIL), the TF-IDF fit in the
+        # CPU pool, concurrently.
         if corpus_id in self._corpus_to_index:
             corpus_index = self._corpus_to_index[corpus_id]
-            # Update vector index
-            corpus_index.vectorstore.add_texts(
-                texts=[d["page_content"] for d in split_docs],
-                metadatas=[d["metadata"] for d in split_docs]
-            )
-            # Update lexical index (refit for simplicity)
+            # Update vector index and lexical index (refit for simplicity)
             all_chunks = corpus_index.chunks + split_docs
-            vectorizer = TfidfVectorizer(stop_words='english', max_features=50000)
-            tfidf_matrix = vectorizer.fit_transform([c["page_content"] for c in all_chunks])
+            _, (vectorizer, tfidf_matrix) = await asyncio.gather(
+                run_io(
+                    corpus_index.vectorstore.add_texts,
+                    texts=[d["page_content"] for d in split_docs],
+                    metadatas=[d["metadata"] for d in split_docs],
+                    name="rag:embed"
+                ),
+                run_cpu(_fit_tfidf, [c["page_content"] for c in all_chunks], name="rag:tfidf")
+            )
             corpus_index.tfidf_vectorizer = vectorizer
             corpus_index.tfidf_matrix = tfidf_matrix
             corpus_index.chunks = all_chunks
         else:
-            vectorstore = FAISS.from_texts(
-                texts=[d["page_content"] for d in split_docs],
-                embedding=self._embeddings,
-                metadatas=[d["metadata"] for d in split_docs]
+            vectorstore, (vectorizer, tfidf_matrix) = await asyncio.gather(
+                run_io(
+                    FAISS.from_texts,
+                    texts=[d["page_content"] for d in split_docs],
+                    embedding=self._embeddings,
+                    metadatas=[d["metadata"] for d in split_docs],
+                    name="rag:embed"
+                ),
+                run_cpu(_fit_tfidf, [d["page_content"] for d in split_docs], name="rag:tfidf")
             )
-            vectorizer = TfidfVectorizer(stop_words='english', max_features=50000)
-            tfidf_matrix = vectorizer.fit_transform([d["page_content"] for d in split_docs])
             self._corpus_to_index[corpus_id] = AsyncRAGService.CorpusIndex(
                 vectorstore=vectorstore,
                 tfidf_vectorizer=vectorizer,
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 
+from app.core.window_kernels import rolling_percentile_rank
 from app.models.simulation_models import (
     PricesDaily, OptionsSnapshotDaily, FeaturesDaily
 )
@@ -99,11 +100,35 @@ class SimulationFeatureService:
         if len(historical_values) == 0:
             return None
         
-        # Percentile rank
-        pct = (np.sum(historical_values <= value) / len(historical_values)) * 100.0
+        # Percentile rank; one O(n) count (compute_percentile_series is for whole-series backfills)
+        pct = np.count_nonzero(historical_values <= value) / len(historical_values) * 100.0
         
         return float(pct)
     
+    def compute_percentile_series(
+        self,
+        values: np.ndarray,
+        window: Optional[int] = None,
+        min_periods: int = 252
+    ) -> np.ndarray:
+        """
+        Percentile rank of every value against the values before it (no lookahead)
+        
+        Vectorized counterpart of compute_percentile for a whole history, e.g.
+        when backfilling rv20_pct/atr14_pct over many dates.
+        
+        Args:
+            values: Feature values sorted by date (NaN for missing)
+            window: Number of prior values to rank against (default ROLLING_WINDOW_DAYS)
+            min_periods: Minimum valid prior values, NaN below that
+            
+        Returns:
+            Array of percentile ranks (0-100)
+        """
+        return rolling_percentile_rank(
+            values, window or self.ROLLING_WINDOW_DAYS, min_periods=min_periods, include_current=False
+        )
+    
     def compute_features_for_date(
         self, 
         symbol: str, 
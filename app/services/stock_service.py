@@ -10,6 +10,8 @@ from .cache_service import AsyncCacheService
 
 logger = logging.getLogger(__name__)
 
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
 class AsyncStockService:
     def __init__(self, cache_service: AsyncCacheService):
         self.cache_service = cache_service
@@ -256,14 +258,15 @@ class AsyncStockService:
         try:
             logger.info(f"Fetching stock data for {symbol} for {days} days")
             
-            # Generate cache key
-            cache_key = f"stock_data:{symbol}:{days}"
+            # The raw history frame is cached (binary codec) rather than the
+            # derived list of dicts, so cache hits skip per-row encode/decode
+            cache_key = f"stock_history:{symbol}:{days}"
             
             # Check cache first
-            cached_data = await self.cache_service.get(cache_key)
-            if cached_data:
+            cached_hist = await self.cache_service.get(cache_key)
+            if cached_hist is not None:
                 logger.info(f"Cache hit for stock data: {symbol}")
-                return cached_data
+                return self._history_to_payload(symbol, days, cached_hist)
             
             logger.info(f"Cache miss for {symbol}, fetching from yfinance")
             
@@ -291,59 +294,16 @@ class AsyncStockService:
             
             logger.info(f"Retrieved {len(hist)} rows from yfinance for {symbol}")
             
-            # Process data - yfinance returns DataFrame with datetime index
-            records = []
-            for date, row in hist.iterrows():
-                try:
-                    record = {
-                        'Date': date,
-                        'Open': float(row['Open']) if pd.notna(row['Open']) else 0.0,
-                        'High': float(row['High']) if pd.notna(row['High']) else 0.0,
-                        'Low': float(row['Low']) if pd.notna(row['Low']) else 0.0,
-                        'Close': float(row['Close']) if pd.notna(row['Close']) else 0.0,
-                        'Volume': int(row['Volume']) if pd.notna(row['Volume']) else 0,
-                        'Dividends': float(row['Dividends']) if pd.notna(row['Dividends']) else 0.0,
-                        'Stock Splits': float(row['Stock Splits']) if pd.notna(row['Stock Splits']) else 0.0
-                    }
-                    records.append(record)
-                except Exception as row_error:
-                    logger.error(f"Error processing row for {symbol} at {date}: {row_error}")
-                    continue
-            
-            if len(records) == 0:
-                logger.error(f"No valid records processed for {symbol}")
-                return None
-            
-            # Calculate summary statistics
-            close_prices = [r['Close'] for r in records if r['Close'] > 0]
-            if len(close_prices) == 0:
-                logger.error(f"No valid close prices for {symbol}")
-                return None
-            
-            data = {
-                "symbol": symbol,
-                "period": f"{days} days",
-                "data": records,
-                "summary": {
-                    "start_price": float(close_prices[0]),
-                    "end_price": float(close_prices[-1]),
-                    "min_price": float(min(close_prices)),
-                    "max_price": float(max(close_prices)),
-                    "avg_price": float(sum(close_prices) / len(close_prices)),
-                    "volume": int(sum(r['Volume'] for r in records)),
-                    "price_change": float(close_prices[-1] - close_prices[0]),
-                    "percent_change": float(((close_prices[-1] / close_prices[0]) - 1) * 100) if close_prices[0] > 0 else 0
-                }
-            }
-            
             # Cache the result
             try:
-                await self.cache_service.set(cache_key, data, ttl=300)  # 5 minutes
+                await self.cache_service.set(cache_key, hist, ttl=300)  # 5 minutes
                 logger.info(f"Cached stock data for {symbol}")
             except Exception as cache_error:
                 logger.warning(f"Failed to cache data for {symbol}: {cache_error}")
             
-            logger.info(f"Successfully fetched data for {symbol}: {len(records)} records")
+            data = self._history_to_payload(symbol, days, hist)
+            if data is not None:
+                logger.info(f"Successfully fetched data for {symbol}: {len(data['data'])} records")
             return data
             
         except Exception as e:
@@ -352,6 +312,43 @@ class AsyncStockService:
             logger.error(f"Error details: {str(e)}")
             return None
     
+    @staticmethod
+    def _history_to_payload(symbol: str, days: int, hist: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Build the stock data response from a yfinance history frame, column-wise"""
+        # Process data - yfinance returns DataFrame with datetime index
+        frame = hist.reindex(columns=HISTORY_COLUMNS).apply(pd.to_numeric, errors='coerce').fillna(0.0)
+        frame['Volume'] = frame['Volume'].astype('int64')
+        frame.index.name = 'Date'
+        records = frame.reset_index().to_dict('records')
+        
+        if len(records) == 0:
+            logger.error(f"No valid records processed for {symbol}")
+            return None
+        
+        # Calculate summary statistics
+        close_prices = frame['Close'][frame['Close'] > 0]
+        if len(close_prices) == 0:
+            logger.error(f"No valid close prices for {symbol}")
+            return None
+        
+        start_price = float(close_prices.iloc[0])
+        end_price = float(close_prices.iloc[-1])
+        return {
+            "symbol": symbol,
+            "period": f"{days} days",
+            "data": records,
+            "summary": {
+                "start_price": start_price,
+                "end_price": end_price,
+                "min_price": float(close_prices.min()),
+                "max_price": float(close_prices.max()),
+                "avg_price": float(close_prices.mean()),
+                "volume": int(frame['Volume'].sum()),
+                "price_change": end_price - start_price,
+                "percent_change": float(((end_price / start_price) - 1) * 100) if start_price > 0 else 0
+            }
+        }
+    
     async def get_multiple_stocks(
         self, 
         symbols: List[str], 
@@ -359,11 +356,18 @@ class AsyncStockService:
     ) -> Dict[str, Any]:
         """Get data for multiple stocks concurrently"""
         
-        # Create tasks for concurrent execution
-        tasks = [self.get_stock_data(symbol, days) for symbol in symbols]
+        # One pipelined cache round trip for every symbol; only misses hit yfinance
+        cache_keys = {symbol: f"stock_history:{symbol}:{days}" for symbol in symbols}
+        cached = await self.cache_service.mget(list(cache_keys.values()))
+        
+        async def load(symbol: str):
+            hist = cached.get(cache_keys[symbol])
+            if hist is not None:
+                return self._history_to_payload(symbol, days, hist)
+            return await self.get_stock_data(symbol, days)
         
         # Execute all tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(*[load(symbol) for symbol in symbols], return_exceptions=True)
         
         # Process results
         processed_results = {}
@@ -456,10 +460,10 @@ class AsyncStockService:
                     "volatility": float(history['Close'].pct_change().std() * np.sqrt(252) * 100),
                 }
             
-            # Dividends and splits
+            # Dividends and splits (ISO date keys so the payload is cacheable)
             dividend_data = {
-                "dividends": dividends.to_dict() if not isinstance(dividends, Exception) and hasattr(dividends, 'empty') and not dividends.empty else {},
-                "splits": splits.to_dict() if not isinstance(splits, Exception) and hasattr(splits, 'empty') and not splits.empty else {},
+                "dividends": self._series_to_iso_dict(dividends),
+                "splits": self._series_to_iso_dict(splits),
             }
             
             # Financial data (simplified)
@@ -498,6 +502,12 @@ class AsyncStockService:
             logger.error(f"Error fetching comprehensive stock data for {symbol}: {e}")
             return None
     
+    @staticmethod
+    def _series_to_iso_dict(series: Any) -> Dict[str, float]:
+        if isinstance(series, Exception) or not hasattr(series, 'empty') or series.empty:
+            return {}
+        return {ts.isoformat(): float(value) for ts, value in series.items()}
+    
     async def get_stock_info(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get basic stock information"""
         
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the hot paths: FutureQuant features and backtests,
+Market Pulse, consumer options analytics, simulation features and RAG retrieval.
+
+Run with ``python -m benchmarks.run --size small``.
+"""
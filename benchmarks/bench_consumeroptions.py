@@ -0,0 +1,43 @@
+"""
+Consumer options analytics over synthetic chains
+"""
+from functools import partial
+
+from benchmarks.generators import generate_options_chain, generate_underlying_bars
+from benchmarks.harness import Case, benchmark
+
+# (expiries, strikes per expiry) -> 2 * expiries * strikes contracts
+CHAIN_SIZES = {"small": (12, 100), "medium": (25, 200), "large": (50, 500)}
+UNDERLYING_DAYS = {"small": 252, "medium": 1260, "large": 2520}
+
+
+@benchmark("consumeroptions.analytics")
+def analytics(size):
+    """ConsumerOptionsAnalyticsService methods on one chain snapshot"""
+    from app.services.consumeroptions.analytics_service import ConsumerOptionsAnalyticsService
+
+    service = ConsumerOptionsAnalyticsService()
+    expiries, strikes = CHAIN_SIZES[size]
+    chain = generate_options_chain("AAPL", expiries=expiries, strikes_per_expiry=strikes)
+    bars = generate_underlying_bars("AAPL", UNDERLYING_DAYS[size])
+    params = {"contracts": len(chain), "expiries": expiries, "strikes": strikes}
+
+    methods = [
+        ("call_put_ratios", partial(service.calculate_call_put_ratios, chain, "AAPL")),
+        ("iv_term_structure", partial(service.calculate_iv_term_structure, chain)),
+        ("unusual_activity", partial(service.detect_unusual_activity, chain, "AAPL")),
+        ("oi_heatmap", partial(service.calculate_oi_change_heatmap_data, chain)),
+        ("delta_distribution", partial(service.calculate_delta_distribution_data, chain)),
+        ("filter", partial(service.filter_contracts_by_criteria, chain,
+                           {"min_volume": 100, "contract_type": "call", "min_delta": 0.3, "max_delta": 0.7})),
+    ]
+    cases = [Case(label=f"{name},{len(chain)}", fn=fn, items=len(chain), unit="contracts", params=params)
+             for name, fn in methods]
+    cases.append(Case(
+        label=f"technical_indicators,{len(bars)}d",
+        fn=partial(service.calculate_technical_indicators, bars),
+        items=len(bars),
+        unit="bars",
+        params={"days": len(bars)},
+    ))
+    return cases
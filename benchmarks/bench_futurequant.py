@@ -0,0 +1,257 @@
+"""
+FutureQuant feature engineering and backtest loop
+"""
+import tempfile
+from functools import partial
+
+from benchmarks.generators import generate_bars, bars_for_symbol, attach_forecasts
+from benchmarks.harness import Case, benchmark
+
+# (interval, years) per size profile; one symbol each
+FEATURE_SIZES = {
+    "small": [("1d", 2)],
+    "medium": [("1d", 10), ("1h", 2)],
+    "large": [("1d", 10), ("5m", 2), ("1m", 1)],
+}
+FEATURE_RECIPES = ("momentum", "volatility", "distribution", "full")
+
+# (symbols, years) of daily bars with forecasts
+BACKTEST_SIZES = {
+    "small": [(5, 1)],
+    "medium": [(50, 2)],
+    "large": [(500, 1), (20, 10)],
+}
+
+# (symbols, interval, years) written to a temporary bar store
+BAR_STORE_SIZES = {
+    "small": [(1, "1d", 10), (1, "5m", 1)],
+    "medium": [(1, "1m", 1), (10, "5m", 1)],
+    "large": [(1, "1m", 5), (20, "1m", 1)],
+}
+
+
+@benchmark("futurequant.bar_store_read")
+def bar_store_read(size):
+    """BarStore.read_bars of the full history for every symbol"""
+    from app.services.futurequant.bar_store import BarStore
+
+    store = BarStore(tempfile.mkdtemp(prefix="bench_bar_store_"))
+    cases = []
+    for symbols, interval, years in BAR_STORE_SIZES[size]:
+        bars = generate_bars(symbols, interval, years)
+        names = list(bars["symbol"].unique())
+        for name in names:
+            store.write_bars(name, interval, bars_for_symbol(bars, name))
+        cases.append(Case(
+            label=f"{symbols}sym,{interval},{years}y",
+            fn=partial(store.read_bars, names, interval=interval),
+            items=len(bars),
+            params={"symbols": symbols, "interval": interval, "years": years, "bars": len(bars)},
+        ))
+    return cases
+
+# (interval, years) of one symbol's bars upserted into in-memory SQLite
+UPSERT_SIZES = {
+    "small": [("1d", 10), ("5m", 0.25)],
+    "medium": [("5m", 1), ("1m", 0.25)],
+    "large": [("1m", 1)],
+}
+
+
+def _bar_session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.models.database import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+@benchmark("futurequant.bar_upsert")
+def bar_upsert(size):
+    """upsert_bars into an empty table, re-ingesting unchanged bars, and re-ingesting revised bars"""
+    from app.services.futurequant.bar_ingest import upsert_bars
+
+    cases = []
+    for interval, years in UPSERT_SIZES[size]:
+        bars = bars_for_symbol(generate_bars(1, interval, years))
+        params = {"interval": interval, "years": years, "bars": len(bars)}
+
+        existing = _bar_session()
+        upsert_bars(existing, 1, interval, bars)
+        revisions = iter(range(1, 1_000_000))
+
+        def revised(existing=existing, bars=bars, interval=interval):
+            # A different close every run, so every bar is an update
+            return upsert_bars(existing, 1, interval, bars.assign(close=bars["close"] + next(revisions) * 0.01))
+
+        cases += [
+            Case(label=f"insert,{interval},{years}y", items=len(bars), params=params,
+                 fn=lambda bars=bars, interval=interval: upsert_bars(_bar_session(), 1, interval, bars)),
+            Case(label=f"unchanged,{interval},{years}y", items=len(bars), params=params,
+                 fn=partial(upsert_bars, existing, 1, interval, bars)),
+            Case(label=f"revised,{interval},{years}y", items=len(bars), params=params, fn=revised),
+        ]
+    return cases
+
+
+# (source interval, years, target intervals) of one symbol's bars rolled up in memory
+ROLLUP_SIZES = {
+    "small": [("5m", 1, ("1h", "1d"))],
+    "medium": [("1m", 1, ("15m", "1h", "1d"))],
+    "large": [("1m", 5, ("5m", "1h", "1d"))],
+}
+
+
+@benchmark("futurequant.bar_rollup")
+def bar_rollup(size):
+    """rollup_bars of finer bars into coarser CME-session bars (source rows/s)"""
+    from app.services.futurequant.bar_rollup import VENUE_SESSIONS, rollup_bars
+    from app.services.futurequant.bar_store import normalize_bar_frame
+
+    cases = []
+    for source, years, targets in ROLLUP_SIZES[size]:
+        bars = normalize_bar_frame(bars_for_symbol(generate_bars(1, source, years)))
+        for target in targets:
+            cases.append(Case(
+                label=f"{source}->{target},{years}y",
+                fn=partial(rollup_bars, bars, target, VENUE_SESSIONS["CME"]),
+                items=len(bars),
+                params={"source": source, "target": target, "years": years, "bars": len(bars)},
+            ))
+    return cases
+
+
+@benchmark("futurequant.feature_set")
+def feature_set(size):
+    """FutureQuantFeatureService._compute_feature_set for each recipe"""
+    from app.services.futurequant.feature_service import FutureQuantFeatureService
+
+    service = FutureQuantFeatureService()
+    cases = []
+    for interval, years in FEATURE_SIZES[size]:
+        bars = bars_for_symbol(generate_bars(1, interval, years))
+        for recipe in FEATURE_RECIPES:
+            cases.append(Case(
+                label=f"{recipe},{interval},{years}y",
+                fn=partial(service._compute_feature_set, bars, service.feature_recipes[recipe],
+                           dict(service.default_params)),
+                items=len(bars),
+                params={"recipe": recipe, "interval": interval, "years": years, "bars": len(bars)},
+            ))
+    return cases
+
+
+@benchmark("futurequant.feature_update")
+def feature_update(size):
+    """_compute_feature_update of the full recipe for one new bar, from a stored state"""
+    import asyncio
+    from app.services.futurequant.feature_service import FutureQuantFeatureService
+
+    service = FutureQuantFeatureService()
+    recipe, params = service.feature_recipes["full"], dict(service.default_params)
+    cases = []
+    for interval, years in FEATURE_SIZES[size]:
+        bars = bars_for_symbol(generate_bars(1, interval, years))
+        _, state = asyncio.run(service._compute_feature_update(bars.iloc[:-1], recipe, params))
+        window = bars[bars.index >= state["resume_from"]]
+        cases.append(Case(
+            label=f"full,{interval},{years}y",
+            fn=partial(service._compute_feature_update, window, recipe, params, state),
+            items=1,
+            params={"interval": interval, "years": years, "bars": len(bars), "window": len(window)},
+        ))
+    return cases
+
+
+@benchmark("futurequant.feature_store")
+def feature_store(size):
+    """FeatureStore writes of the full recipe's matrix, and reads of all or ten of its columns"""
+    import asyncio
+    from app.services.futurequant.feature_service import FutureQuantFeatureService
+    from app.services.futurequant.feature_store import FeatureStore
+
+    service = FutureQuantFeatureService()
+    store = FeatureStore(tempfile.mkdtemp(prefix="bench_feature_store_"))
+    cases = []
+    for interval, years in FEATURE_SIZES[size]:
+        bars = bars_for_symbol(generate_bars(1, interval, years))
+        features = asyncio.run(service._compute_feature_set(
+            bars, service.feature_recipes["full"], dict(service.default_params)
+        ))
+        symbol, version = f"BENCH-{interval}", f"{interval}-bench"
+        store.write_features(symbol, "full", version, features, replace=True)
+        columns = [c for c in features.columns if c not in bars.columns][:10]
+        params = {"interval": interval, "years": years, "rows": len(features), "columns": len(features.columns)}
+        cases += [
+            Case(label=f"write,{interval},{years}y",
+                 fn=partial(store.write_features, symbol, "full", version, features, replace=True),
+                 items=len(features), params=params),
+            Case(label=f"read,{interval},{years}y", fn=partial(store.read_features, symbol),
+                 items=len(features), params=params),
+            Case(label=f"read_10_columns,{interval},{years}y",
+                 fn=partial(store.read_features, symbol, columns=columns), items=len(features), params=params),
+        ]
+    return cases
+
+
+# (features, rows) per forward pass of a default-sized FutureQuantTransformer
+INFERENCE_SIZES = {
+    "small": [(32, 1), (32, 256)],
+    "medium": [(64, 1), (64, 2048)],
+    "large": [(128, 1), (128, 16384)],
+}
+
+
+@benchmark("futurequant.transformer_inference")
+def transformer_inference(size):
+    """FutureQuantTransformer forward pass: eager module vs compiled TorchScript/ONNX artifact"""
+    import os
+    import numpy as np
+    from app.services.futurequant.model_service import FutureQuantTransformer
+    from app.services.futurequant.transformer_export import (
+        ONNX, ONNXRUNTIME_AVAILABLE, TORCHSCRIPT, export_transformer, transformer_outputs
+    )
+
+    directory = tempfile.mkdtemp(prefix="bench_transformer_")
+    rng = np.random.default_rng(0)
+    cases = []
+    for features, rows in INFERENCE_SIZES[size]:
+        module = FutureQuantTransformer(input_dim=features, d_model=64, n_heads=4, n_layers=2, dropout=0.1)
+        eager = {"type": "transformer", "model": module, "input_dim": features}
+        models = {"eager": eager}
+        for fmt in [TORCHSCRIPT] + ([ONNX] if ONNXRUNTIME_AVAILABLE else []):
+            compiled = export_transformer(module, features, os.path.join(directory, f"{features}f"), fmt=fmt)
+            if compiled is not None and compiled["format"] == fmt:
+                models[fmt] = {**eager, "compiled": compiled}
+        X = rng.normal(size=(rows, features))
+        for name, model in models.items():
+            cases.append(Case(
+                label=f"{name},{features}f,{rows}rows",
+                fn=partial(transformer_outputs, model, X),
+                items=rows,
+                params={"runtime": name, "features": features, "rows": rows},
+            ))
+    return cases
+
+
+@benchmark("futurequant.backtest")
+def backtest(size):
+    """FutureQuantBacktestService._execute_enhanced_backtest over daily bars with forecasts"""
+    from app.services.futurequant.backtest_service import FutureQuantBacktestService
+
+    service = FutureQuantBacktestService()
+    config = dict(service.default_configs["moderate"])
+    cases = []
+    for symbols, years in BACKTEST_SIZES[size]:
+        data = attach_forecasts(generate_bars(symbols, "1d", years))
+        cases.append(Case(
+            label=f"{symbols}sym,1d,{years}y",
+            # The loop adds a 'date' column to its input, so give every run a fresh copy
+            fn=lambda data=data: service._execute_enhanced_backtest(None, data.copy(), None, dict(config)),
+            items=len(data),
+            params={"symbols": symbols, "years": years, "rows": len(data)},
+        ))
+    return cases
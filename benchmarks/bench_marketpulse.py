@@ -0,0 +1,31 @@
+"""
+Market Pulse fallback calculator
+"""
+from benchmarks.generators import generate_aggregate_stream
+from benchmarks.harness import Case, benchmark
+
+STREAM_SIZES = {"small": 2_000, "medium": 20_000, "large": 100_000}
+
+
+@benchmark("marketpulse.compute_pulse")
+def compute_pulse(size):
+    """PulseCalculator.compute_pulse on a full window, and on_bar + compute_pulse per streamed bar"""
+    from app.services.marketpulse.pulse_calculator import PulseCalculator
+
+    warm = PulseCalculator()
+    for bar in generate_aggregate_stream("SPY", warm.max_bars_per_ticker):
+        warm.on_bar("SPY", bar)
+
+    stream = generate_aggregate_stream("SPY", STREAM_SIZES[size], seed=7)
+
+    def replay():
+        calculator = PulseCalculator()
+        for bar in stream:
+            calculator.on_bar("SPY", bar)
+            calculator.compute_pulse("SPY")
+
+    return [
+        Case(label=f"window{warm.max_bars_per_ticker}", fn=lambda: warm.compute_pulse("SPY"), items=1, unit="pulses"),
+        Case(label=f"stream{len(stream)}", fn=replay, items=len(stream), unit="bars",
+             params={"bars": len(stream)}),
+    ]
@@ -0,0 +1,58 @@
+"""
+RAG retrieval over a synthetic research corpus
+"""
+import os
+import asyncio
+
+from benchmarks.generators import generate_documents, generate_queries
+from benchmarks.harness import Case, benchmark
+
+CORPUS_SIZES = {"small": 200, "medium": 2_000, "large": 10_000}
+QUERIES = 50
+
+# Vector retrieval needs the sentence-transformers model; opt in when it is available locally
+WITH_EMBEDDINGS = os.getenv("BENCH_RAG_EMBEDDINGS", "").lower() in ("1", "true", "yes")
+
+
+@benchmark("rag.retrieval")
+def retrieval(size):
+    """AsyncRAGService lexical (and optionally vector/hybrid) retrieval"""
+    from app.services.rag_service import AsyncRAGService, _fit_tfidf
+
+    documents = generate_documents(CORPUS_SIZES[size])
+    queries = generate_queries(QUERIES)
+    service = AsyncRAGService(ai_service=None)
+    params = {"documents": len(documents), "queries": len(queries)}
+
+    chunks = [{"page_content": text, "metadata": {"doc": i}} for i, text in enumerate(documents)]
+    vectorizer, matrix = _fit_tfidf([c["page_content"] for c in chunks])
+    service._corpus_to_index["bench"] = AsyncRAGService.CorpusIndex(
+        vectorstore=None, tfidf_vectorizer=vectorizer, tfidf_matrix=matrix, chunks=chunks
+    )
+
+    def run_queries(method):
+        async def run():
+            for query in queries:
+                await method("bench", query, k=4)
+        return run
+
+    cases = [
+        Case(label=f"tfidf_fit,{len(documents)}", fn=lambda: _fit_tfidf(documents), items=len(documents),
+             unit="docs", params=params),
+        Case(label=f"lexical,{len(documents)}", fn=run_queries(service._retrieve_lexical), items=len(queries),
+             unit="queries", params=params),
+    ]
+    if WITH_EMBEDDINGS:
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(service.ingest("bench_vector", documents))
+        finally:
+            loop.close()
+        service._corpus_to_index["bench"].vectorstore = service._corpus_to_index["bench_vector"].vectorstore
+        cases += [
+            Case(label=f"vector,{len(documents)}", fn=run_queries(service._retrieve_vector),
+                 items=len(queries), unit="queries", params=params),
+            Case(label=f"hybrid,{len(documents)}", fn=run_queries(service._retrieve_hybrid),
+                 items=len(queries), unit="queries", params=params),
+        ]
+    return cases
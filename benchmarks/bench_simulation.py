@@ -0,0 +1,70 @@
+"""
+Simulation daily feature computation against an in-memory SQLite database
+"""
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.generators import daily_price_rows
+from benchmarks.harness import Case, benchmark
+
+HISTORY_DAYS = {"small": 300, "medium": 1260, "large": 2520}
+DATES_PER_RUN = 20
+
+
+def build_simulation_db(symbol: str, days: int, seed: int = 42):
+    """Prices, options snapshots and feature history for one symbol in a fresh in-memory database"""
+    from app.models.database import Base
+    from app.models.simulation_models import PricesDaily, OptionsSnapshotDaily, FeaturesDaily
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        PricesDaily.__table__, OptionsSnapshotDaily.__table__, FeaturesDaily.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+
+    prices = daily_price_rows(symbol, days, seed=seed)
+    rng = np.random.default_rng([seed, 6])
+    iv = 0.2 + np.abs(rng.normal(0, 0.05, days))
+    session.bulk_insert_mappings(PricesDaily, [
+        {"symbol": symbol, "date": row.date, "open": row.open, "high": row.high, "low": row.low,
+         "close": row.close, "adjusted_close": row.close, "volume": int(row.volume)}
+        for row in prices.itertuples(index=False)
+    ])
+    session.bulk_insert_mappings(OptionsSnapshotDaily, [
+        {"symbol": symbol, "date": day, "snapshot_json": {}, "iv_median": float(iv[i]),
+         "iv_slope": float(rng.normal(0, 0.02)), "total_call_volume": int(rng.integers(1e4, 1e5)),
+         "total_put_volume": int(rng.integers(1e4, 1e5)), "total_call_oi": int(rng.integers(1e5, 1e6)),
+         "total_put_oi": int(rng.integers(1e5, 1e6)), "unusual_count": int(rng.integers(0, 5))}
+        for i, day in enumerate(prices["date"])
+    ])
+    # Feature history for the percentile ranks, leaving the last dates to be computed
+    session.bulk_insert_mappings(FeaturesDaily, [
+        {"symbol": symbol, "date": day, "rv20": float(rng.uniform(0.1, 0.4)),
+         "atr14": float(rng.uniform(1, 5)), "iv_median": float(iv[i])}
+        for i, day in enumerate(prices["date"][:-DATES_PER_RUN])
+    ])
+    session.commit()
+    return session, list(prices["date"])
+
+
+@benchmark("simulation.features_for_date")
+def features_for_date(size):
+    """SimulationFeatureService.compute_features_for_date for the most recent trading dates"""
+    from app.services.simulation import SimulationFeatureService
+
+    session, dates = build_simulation_db("SPY", HISTORY_DAYS[size])
+    service = SimulationFeatureService(session)
+    targets = dates[-DATES_PER_RUN:]
+
+    def compute_range():
+        for day in targets:
+            service.compute_features_for_date("SPY", day)
+
+    return [
+        Case(label=f"single,{len(dates)}d", fn=lambda: service.compute_features_for_date("SPY", dates[-1]),
+             items=1, unit="dates", params={"history_days": len(dates)}),
+        Case(label=f"range{len(targets)},{len(dates)}d", fn=compute_range, items=len(targets), unit="dates",
+             params={"history_days": len(dates)}),
+    ]
@@ -0,0 +1,240 @@
+"""
+Deterministic synthetic market data for benchmarks.
+
+Every generator takes a ``seed``; the same arguments always produce the same
+data, and each symbol's path depends only on (seed, symbol index), so growing
+the universe does not change the existing symbols.
+"""
+import math
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_START = "2015-01-02"
+
+INTERVAL_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "4h": 240, "1d": 1440}
+
+# Regular US equity/futures day session used for intraday bars
+SESSION_OPEN = "09:30"
+SESSION_MINUTES = 390
+TRADING_DAYS_PER_YEAR = 252
+
+_WORDS = (
+    "futures contract margin volatility skew curve basis roll carry momentum reversal liquidity "
+    "spread yield duration inflation earnings guidance revenue consumer demand supply crude gold "
+    "treasury equity index option strike expiry gamma delta hedge flow dealer positioning regime "
+    "breakout drawdown risk return alpha beta sharpe drift shock rally selloff rebound tariff "
+    "central bank policy rate hike cut payrolls growth recession credit default swap"
+).split()
+
+
+def symbol_names(count: int, prefix: str = "SYM") -> List[str]:
+    return [f"{prefix}{i:03d}" for i in range(count)]
+
+
+def bar_timestamps(interval: str = "1d", years: float = 1.0, start: str = DEFAULT_START) -> pd.DatetimeIndex:
+    """Business-day timestamps; intraday intervals cover the regular session only"""
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f"Unsupported interval {interval}. Must be one of: {list(INTERVAL_MINUTES)}")
+    days = pd.bdate_range(start=start, periods=max(1, int(round(years * TRADING_DAYS_PER_YEAR))))
+    minutes = INTERVAL_MINUTES[interval]
+    if minutes >= 1440:
+        return days
+    open_offset = pd.Timedelta(SESSION_OPEN + ":00")
+    offsets = pd.to_timedelta(np.arange(0, SESSION_MINUTES, minutes), unit="m") + open_offset
+    return pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel())
+
+
+def _bar_path(rng: np.random.Generator, n: int, interval: str, start_price: float,
+              annual_vol: float, annual_drift: float) -> Dict[str, np.ndarray]:
+    minutes = INTERVAL_MINUTES[interval]
+    dt = 1.0 / TRADING_DAYS_PER_YEAR if minutes >= 1440 else minutes / (TRADING_DAYS_PER_YEAR * SESSION_MINUTES)
+    sigma = annual_vol * math.sqrt(dt)
+    log_returns = rng.normal((annual_drift - 0.5 * annual_vol ** 2) * dt, sigma, n)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    prev_close = np.concatenate(([start_price], close[:-1]))
+    open_ = prev_close * np.exp(rng.normal(0.0, sigma * 0.25, n))
+    wick = np.abs(rng.normal(0.0, sigma * 0.5, (2, n)))
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+    volume = rng.lognormal(mean=math.log(1e6 * minutes / 1440 + 100), sigma=0.4, size=n).astype(np.int64)
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def generate_bars(symbols: Union[int, Sequence[str]] = 1, interval: str = "1d", years: float = 1.0,
+                  start: str = DEFAULT_START, seed: int = 42, start_price: float = 100.0,
+                  annual_vol: float = 0.25, annual_drift: float = 0.05) -> pd.DataFrame:
+    """Long-format OHLCV bars: columns symbol, timestamp, open, high, low, close, volume"""
+    names = symbol_names(symbols) if isinstance(symbols, int) else list(symbols)
+    timestamps = bar_timestamps(interval, years, start)
+    frames = []
+    for index, name in enumerate(names):
+        rng = np.random.default_rng([seed, index])
+        price = start_price * float(np.exp(rng.normal(0.0, 0.5)))
+        path = _bar_path(rng, len(timestamps), interval, price, annual_vol, annual_drift)
+        frames.append(pd.DataFrame({"symbol": name, "timestamp": timestamps, **path}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def bars_for_symbol(bars: pd.DataFrame, symbol: Optional[str] = None) -> pd.DataFrame:
+    """One symbol's bars indexed by timestamp, as the feature service reads them from the database"""
+    symbol = symbol or bars["symbol"].iloc[0]
+    frame = bars[bars["symbol"] == symbol].drop(columns=["symbol"]).set_index("timestamp")
+    return frame[["open", "high", "low", "close", "volume"]]
+
+
+def attach_forecasts(bars: pd.DataFrame, seed: int = 7, skill: float = 0.1) -> pd.DataFrame:
+    """Add q10/q50/q90/prob_up/volatility forecast columns with a little predictive skill"""
+    rng = np.random.default_rng(seed)
+    frame = bars.copy()
+    next_return = frame.groupby("symbol")["close"].pct_change().shift(-1).fillna(0.0).to_numpy()
+    noise = rng.normal(0.0, 0.01, len(frame))
+    expected = skill * next_return + noise
+    spread = np.abs(rng.normal(0.02, 0.005, len(frame)))
+    frame["q50"] = frame["close"] * (1 + expected)
+    frame["q10"] = frame["q50"] * (1 - spread)
+    frame["q90"] = frame["q50"] * (1 + spread)
+    frame["prob_up"] = 1.0 / (1.0 + np.exp(-expected * 150))
+    frame["volatility"] = spread / 1.2816
+    frame["symbol_id"] = frame["symbol"].astype("category").cat.codes + 1
+    return frame
+
+
+def generate_aggregate_stream(symbol: str = "SPY", bars: int = 500, start: str = "2024-03-01 09:30",
+                              seed: int = 42, start_price: float = 500.0) -> List[Dict[str, Any]]:
+    """Per-minute aggregates as the Market Pulse WebSocket delivers them"""
+    rng = np.random.default_rng([seed, 1])
+    path = _bar_path(rng, bars, "1m", start_price, 0.18, 0.0)
+    first = pd.Timestamp(start)
+    typical = (path["high"] + path["low"] + path["close"]) / 3
+    return [
+        {
+            "ticker": symbol,
+            "timestamp": (first + pd.Timedelta(minutes=i)).isoformat(),
+            "open": float(path["open"][i]),
+            "high": float(path["high"][i]),
+            "low": float(path["low"][i]),
+            "close": float(path["close"][i]),
+            "volume": int(path["volume"][i]),
+            "vwap": float(typical[i]),
+        }
+        for i in range(bars)
+    ]
+
+
+def generate_ticks(symbol: str = "ES=F", ticks: int = 100_000, start: str = "2024-03-01 09:30",
+                   seed: int = 42, start_price: float = 5000.0, tick_size: float = 0.25) -> pd.DataFrame:
+    """Trade prints: timestamp (exponential inter-arrival), price on the tick grid, size"""
+    rng = np.random.default_rng([seed, 2])
+    gaps = rng.exponential(0.05, ticks)
+    timestamps = pd.Timestamp(start) + pd.to_timedelta(np.cumsum(gaps), unit="s")
+    steps = rng.choice([-1, 0, 1], size=ticks, p=[0.3, 0.4, 0.3])
+    price = start_price + np.cumsum(steps) * tick_size
+    size = rng.geometric(0.3, ticks)
+    return pd.DataFrame({"symbol": symbol, "timestamp": timestamps, "price": price, "size": size})
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.vectorize(math.erf)(x / math.sqrt(2.0)))
+
+
+def generate_options_chain(underlying: str = "AAPL", spot: float = 180.0, as_of: Optional[date] = None,
+                           expiries: int = 12, strikes_per_expiry: int = 100, seed: int = 42,
+                           unusual_fraction: float = 0.01) -> List["OptionContract"]:
+    """Calls and puts on a strike x expiry grid with a volatility smile and Black-Scholes deltas.
+
+    Returns ``2 * expiries * strikes_per_expiry`` ``OptionContract`` models.
+    """
+    from app.models.options_models import OptionContract, ContractType
+
+    rng = np.random.default_rng([seed, 3])
+    as_of = as_of or date(2024, 3, 1)
+    expiry_dates = [as_of + timedelta(days=int(d)) for d in np.linspace(7, 365, expiries)]
+    strikes = np.round(np.linspace(spot * 0.6, spot * 1.4, strikes_per_expiry), 1)
+
+    contracts = []
+    for expiry in expiry_dates:
+        years = (expiry - as_of).days / 365.0
+        moneyness = np.log(strikes / spot)
+        iv = 0.22 + 0.35 * moneyness ** 2 - 0.08 * moneyness + 0.03 * math.sqrt(years)
+        d1 = (-moneyness + 0.5 * iv ** 2 * years) / (iv * math.sqrt(years))
+        call_delta = _norm_cdf(d1)
+        for contract_type in (ContractType.CALL, ContractType.PUT):
+            delta = call_delta if contract_type == ContractType.CALL else call_delta - 1.0
+            intrinsic = np.maximum(spot - strikes, 0) if contract_type == ContractType.CALL else np.maximum(strikes - spot, 0)
+            price = intrinsic + spot * iv * math.sqrt(years) * 0.4 * np.exp(-moneyness ** 2 * 4)
+            volume = rng.lognormal(4.0, 1.2, strikes_per_expiry).astype(int)
+            open_interest = rng.lognormal(6.0, 1.0, strikes_per_expiry).astype(int)
+            spikes = rng.random(strikes_per_expiry) < unusual_fraction
+            volume[spikes] *= 20
+            code = "C" if contract_type == ContractType.CALL else "P"
+            for i, strike in enumerate(strikes):
+                contracts.append(OptionContract(
+                    contract=f"O:{underlying}{expiry:%y%m%d}{code}{int(strike * 1000):08d}",
+                    underlying=underlying,
+                    expiry=expiry,
+                    strike=float(strike),
+                    type=contract_type,
+                    last_price=round(float(price[i]), 2),
+                    bid=round(float(price[i]) * 0.98, 2),
+                    ask=round(float(price[i]) * 1.02, 2),
+                    day_volume=int(volume[i]),
+                    day_oi=int(open_interest[i]),
+                    implied_volatility=round(float(iv[i]), 4),
+                    delta=round(float(delta[i]), 4),
+                ))
+    return contracts
+
+
+def generate_underlying_bars(ticker: str = "AAPL", days: int = 252, seed: int = 42,
+                             start: str = DEFAULT_START) -> List["UnderlyingData"]:
+    """Daily ``UnderlyingData`` models for the consumer options technicals"""
+    from app.models.options_models import UnderlyingData
+
+    bars = generate_bars([ticker], "1d", days / TRADING_DAYS_PER_YEAR, start=start, seed=seed)
+    return [
+        UnderlyingData(ticker=ticker, bar_date=row.timestamp.date(), open=row.open, high=row.high,
+                       low=row.low, close=row.close, volume=int(row.volume))
+        for row in bars.itertuples(index=False)
+    ]
+
+
+def generate_documents(count: int = 200, words: int = 300, seed: int = 42) -> List[str]:
+    """Pseudo research notes built from a finance vocabulary, for retrieval benchmarks"""
+    rng = np.random.default_rng([seed, 4])
+    vocabulary = np.array(_WORDS)
+    # Zipf-like weights so some terms are common and others rare, as in real text
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    documents = []
+    for _ in range(count):
+        tokens = rng.choice(vocabulary, size=words, p=weights)
+        sentences = [" ".join(tokens[i:i + 12]).capitalize() + "." for i in range(0, words, 12)]
+        documents.append(" ".join(sentences))
+    return documents
+
+
+def generate_queries(count: int = 50, seed: int = 43) -> List[str]:
+    rng = np.random.default_rng([seed, 5])
+    return [" ".join(rng.choice(_WORDS, size=4)) for _ in range(count)]
+
+
+def trading_dates(days: int, start: str = DEFAULT_START) -> List[date]:
+    return [ts.date() for ts in pd.bdate_range(start=start, periods=days)]
+
+
+def daily_price_rows(symbol: str, days: int, seed: int = 42, start: str = DEFAULT_START) -> pd.DataFrame:
+    """Daily OHLCV rows (date column) for the simulation tables"""
+    bars = generate_bars([symbol], "1d", days / TRADING_DAYS_PER_YEAR, start=start, seed=seed)
+    bars["date"] = bars["timestamp"].dt.date
+    return bars.drop(columns=["timestamp"])
+
+
+__all__ = [
+    "INTERVAL_MINUTES", "symbol_names", "bar_timestamps", "generate_bars", "bars_for_symbol",
+    "attach_forecasts", "generate_aggregate_stream", "generate_ticks", "generate_options_chain",
+    "generate_underlying_bars", "generate_documents", "generate_queries", "trading_dates",
+    "daily_price_rows",
+]
@@ -0,0 +1,167 @@
+"""
+Benchmark registry, timer and result comparison.
+
+A benchmark is a factory registered with ``@benchmark(name)``. Called with a
+size profile (``small``/``medium``/``large``) it does its setup and returns the
+cases to time. Each case is a sync or async callable; it is run ``warmup`` times
+untimed and ``repeat`` times timed. Results are plain dicts so they can be
+written to JSON and compared against an earlier run.
+"""
+import gc
+import time
+import asyncio
+import inspect
+import platform
+import statistics
+import subprocess
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+SIZES = ("small", "medium", "large")
+
+
+@dataclass
+class Case:
+    """One timed callable; ``items`` (rows, contracts, queries...) gives a throughput figure"""
+    label: str
+    fn: Callable[[], Any]
+    items: Optional[int] = None
+    unit: str = "rows"
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    factory: Callable[[str], List[Case]]
+    description: str = ""
+
+
+_REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register a case factory under ``name`` (e.g. ``futurequant.feature_set``)"""
+    def decorator(factory: Callable[[str], List[Case]]):
+        doc = inspect.getdoc(factory) or ""
+        _REGISTRY[name] = Benchmark(name, factory, doc.splitlines()[0] if doc else "")
+        return factory
+    return decorator
+
+
+def registered(filters: Optional[List[str]] = None) -> List[Benchmark]:
+    benchmarks = sorted(_REGISTRY.values(), key=lambda b: b.name)
+    if filters:
+        benchmarks = [b for b in benchmarks if any(f in b.name for f in filters)]
+    return benchmarks
+
+
+def _call(fn: Callable[[], Any], loop: asyncio.AbstractEventLoop) -> Any:
+    result = fn()
+    if inspect.isawaitable(result):
+        result = loop.run_until_complete(result)
+    return result
+
+
+def time_case(case: Case, loop: asyncio.AbstractEventLoop, repeat: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        _call(case.fn, loop)
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _call(case.fn, loop)
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    median = statistics.median(timings)
+    return {
+        "runs": repeat,
+        "min_s": round(min(timings), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.fmean(timings), 6),
+        "stdev_s": round(statistics.stdev(timings), 6) if len(timings) > 1 else 0.0,
+        "items": case.items,
+        "unit": case.unit,
+        "items_per_s": round(case.items / median, 1) if case.items and median > 0 else None,
+    }
+
+
+def run_benchmarks(benchmarks: List[Benchmark], size: str = "small", repeat: int = 5, warmup: int = 1,
+                   log: Callable[[str], None] = print) -> List[Dict[str, Any]]:
+    """Set up and time every case; failures are recorded, not raised"""
+    results = []
+    loop = asyncio.new_event_loop()
+    try:
+        for bench in benchmarks:
+            try:
+                cases = bench.factory(size)
+            except Exception as e:
+                log(f"  {bench.name}: setup failed: {e}")
+                results.append({"name": bench.name, "benchmark": bench.name, "error": f"setup: {e}"})
+                continue
+            for case in cases:
+                name = f"{bench.name}[{case.label}]"
+                entry: Dict[str, Any] = {"name": name, "benchmark": bench.name, "params": case.params}
+                try:
+                    entry.update(time_case(case, loop, repeat, warmup))
+                    rate = f", {entry['items_per_s']:,.0f} {case.unit}/s" if entry["items_per_s"] else ""
+                    log(f"  {name}: median {entry['median_s'] * 1000:.2f} ms{rate}")
+                except Exception as e:
+                    entry["error"] = f"{type(e).__name__}: {e}"
+                    entry["traceback"] = traceback.format_exc(limit=5)
+                    log(f"  {name}: FAILED {entry['error']}")
+                results.append(entry)
+    finally:
+        loop.close()
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    import numpy
+    import pandas
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            threshold: float = 0.2) -> Dict[str, List[Dict[str, Any]]]:
+    """Match cases by name; a median slower than baseline by more than ``threshold`` is a regression"""
+    previous = {entry["name"]: entry for entry in baseline if "median_s" in entry}
+    regressions, improvements, missing = [], [], []
+    for entry in current:
+        before = previous.get(entry["name"])
+        if before is None or "median_s" not in entry:
+            if before is not None:
+                missing.append({"name": entry["name"], "error": entry.get("error")})
+            continue
+        ratio = entry["median_s"] / before["median_s"] if before["median_s"] else 1.0
+        row = {
+            "name": entry["name"],
+            "baseline_median_s": before["median_s"],
+            "median_s": entry["median_s"],
+            "ratio": round(ratio, 3),
+        }
+        if ratio > 1 + threshold:
+            regressions.append(row)
+        elif ratio < 1 / (1 + threshold):
+            improvements.append(row)
+    return {"regressions": regressions, "improvements": improvements, "failed": missing}
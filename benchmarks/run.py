@@ -0,0 +1,92 @@
+"""
+Benchmark runner
+
+    python -m benchmarks.run --size small
+    python -m benchmarks.run --size medium --filter futurequant --output results.json
+    python -m benchmarks.run --size small --baseline results.json --threshold 0.25
+
+Exits with status 1 when a case is slower than the baseline by more than the
+threshold, or when a case that passed in the baseline now fails.
+"""
+import sys
+import json
+import argparse
+import importlib
+import logging
+import warnings
+from pathlib import Path
+
+from benchmarks.harness import SIZES, registered, run_benchmarks, environment, compare
+
+BENCHMARK_MODULES = (
+    "benchmarks.bench_futurequant",
+    "benchmarks.bench_marketpulse",
+    "benchmarks.bench_consumeroptions",
+    "benchmarks.bench_simulation",
+    "benchmarks.bench_rag",
+)
+
+
+def load_benchmarks():
+    for module in BENCHMARK_MODULES:
+        importlib.import_module(module)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run Tokimeki performance benchmarks")
+    parser.add_argument("--size", choices=SIZES, default="small", help="Dataset size profile")
+    parser.add_argument("--filter", action="append", help="Only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against an earlier results JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown of the median that counts as a regression")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    # Service modules log at INFO on every call; keep the output readable
+    logging.basicConfig(level=logging.WARNING)
+    warnings.simplefilter("ignore", category=FutureWarning)
+    warnings.filterwarnings("ignore", message=".*highly fragmented.*")
+    load_benchmarks()
+    benchmarks = registered(args.filter)
+
+    if args.list:
+        for bench in benchmarks:
+            print(f"{bench.name:36} {bench.description}")
+        return 0
+
+    print(f"Running {len(benchmarks)} benchmarks, size={args.size}, repeat={args.repeat}, warmup={args.warmup}")
+    results = run_benchmarks(benchmarks, size=args.size, repeat=args.repeat, warmup=args.warmup)
+    report = {"meta": environment(), "size": args.size, "repeat": args.repeat, "results": results}
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+        print(f"Results written to {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    if baseline.get("size") != args.size:
+        print(f"Warning: baseline size is {baseline.get('size')}, this run is {args.size}")
+    diff = compare(results, baseline.get("results", []), threshold=args.threshold)
+    for row in diff["improvements"]:
+        print(f"  faster  {row['name']}: {row['baseline_median_s'] * 1000:.2f} -> {row['median_s'] * 1000:.2f} ms "
+              f"(x{row['ratio']})")
+    for row in diff["regressions"]:
+        print(f"  SLOWER  {row['name']}: {row['baseline_median_s'] * 1000:.2f} -> {row['median_s'] * 1000:.2f} ms "
+              f"(x{row['ratio']})")
+    for row in diff["failed"]:
+        print(f"  FAILED  {row['name']}: {row['error']}")
+    if diff["regressions"] or diff["failed"]:
+        print(f"{len(diff['regressions'])} regressions, {len(diff['failed'])} newly failing cases "
+              f"(threshold {args.threshold:.0%})")
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Import-time report for the app's cold start.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter and
+summarizes the slowest modules. Heavy libraries that feature routers are meant
+to load lazily (torch, vectorbt, mlflow, ...) are flagged if they show up, and
+``--budget-ms`` turns the report into a check that fails on regressions.
+
+Usage:
+    python scripts/import_time_report.py
+    python scripts/import_time_report.py --top 40 --budget-ms 2500
+    python scripts/import_time_report.py --json > import_times.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Libraries that must only be imported on first use of their feature routers
+DEFAULT_FORBIDDEN = [
+    "torch", "vectorbt", "qf_lib", "mlflow", "langchain", "langchain_community",
+    "sentence_transformers", "faiss", "transformers", "sklearn", "scipy",
+]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def run_importtime(module: str):
+    """Import ``module`` in a child interpreter and return parsed (self_us, cumulative_us, depth, name) rows"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.splitlines()[-20:])
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return rows
+
+
+def build_report(module: str, rows, top: int, forbidden):
+    target = next((row for row in rows if row[3] == module), None)
+    total_ms = target[1] / 1000 if target else sum(row[0] for row in rows) / 1000
+
+    # Aggregate self time per top-level package (e.g. all of pandas.*)
+    by_package = {}
+    for self_us, _, _, name in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    imported = {row[3] for row in rows}
+    return {
+        "module": module,
+        "total_ms": round(total_ms, 1),
+        "modules_imported": len(rows),
+        "slowest_cumulative": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(own / 1000, 1)}
+            for own, cum, _, name in sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+        ],
+        "slowest_packages": [
+            {"package": package, "self_ms": round(us / 1000, 1)}
+            for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "forbidden_imported": sorted(name for name in forbidden if name in imported),
+    }
+
+
+def print_report(report, budget_ms):
+    print(f"Import time for {report['module']}: {report['total_ms']:.0f} ms "
+          f"({report['modules_imported']} modules)")
+    if budget_ms:
+        print(f"Budget: {budget_ms:.0f} ms")
+
+    print("\nSlowest modules (cumulative):")
+    print(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    for row in report["slowest_cumulative"]:
+        print(f"  {row['cumulative_ms']:>13.1f}  {row['self_ms']:>8.1f}  {row['module']}")
+
+    print("\nSlowest packages (self time, all submodules):")
+    for row in report["slowest_packages"]:
+        print(f"  {row['self_ms']:>10.1f}  {row['package']}")
+
+    if report["forbidden_imported"]:
+        print("\nHeavy libraries imported at startup (should load lazily):")
+        for name in report["forbidden_imported"]:
+            print(f"  - {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report module import times for app cold start")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of rows per table")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail (exit 1) if the total import time exceeds this many milliseconds")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                        help="Top-level modules that must not be imported at startup")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        rows = run_importtime(args.module)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    report = build_report(args.module, rows, args.top, args.forbid)
+    over_budget = bool(args.budget_ms and report["total_ms"] > args.budget_ms)
+    report["over_budget"] = over_budget
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.budget_ms)
+
+    if over_budget or report["forbidden_imported"]:
+        if not args.json:
+            print("\nFAILED: import-time regression detected")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
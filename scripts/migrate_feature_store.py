@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Feature store migration for FutureQuant Trader
+Moves JSON futurequant_features rows into the columnar feature store
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.database import SessionLocal
+from app.services.futurequant.feature_store import get_feature_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate futurequant_features rows into the feature store")
+    parser.add_argument("symbols", nargs="*", help="Tickers to migrate (default: every symbol with feature rows)")
+    parser.add_argument("--delete-rows", action="store_true",
+                        help="Delete the JSON rows of each symbol once it is in the store")
+    args = parser.parse_args()
+
+    store = get_feature_store()
+    if store is None:
+        print("❌ Feature store is disabled or pyarrow is not installed")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        migrated = store.migrate_from_database(db, args.symbols or None, delete_rows=args.delete_rows)
+        for symbol, count in migrated.items():
+            print(f"✓ {symbol}: {count} rows")
+        print(f"✅ Migrated {sum(migrated.values())} feature rows for {len(migrated)} symbols into {store.root}")
+    except Exception as e:
+        print(f"❌ Feature store migration failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Tests for the binary cache codecs
+"""
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import cache_codecs
+from app.services.cache_codecs import (
+    CacheCodec, CODEC_ARROW, CODEC_FRAME_NPZ, CODEC_NUMPY, COMPRESSION_NONE, MAGIC
+)
+from app.services.cache_service import AsyncCacheService, LRUCache
+
+from tests.core.test_cache_service import FakeRedis
+
+
+def make_bars(rows=5):
+    index = pd.date_range("2024-01-02 09:30", periods=rows, freq="min", tz="America/New_York", name="Date")
+    return pd.DataFrame({
+        "Open": np.linspace(100, 101, rows),
+        "Close": np.linspace(100.5, 101.5, rows),
+        "Volume": np.arange(rows, dtype=np.int64) * 10,
+        "symbol": ["ES"] * rows,
+    }, index=index)
+
+
+class TestCacheCodec:
+    """Round trips for each payload kind"""
+
+    def test_dataframe_uses_arrow(self):
+        codec = CacheCodec()
+        bars = make_bars()
+        payload = codec.encode(bars)
+
+        assert payload.startswith(MAGIC)
+        assert payload[len(MAGIC)] == CODEC_ARROW
+        pd.testing.assert_frame_equal(codec.decode(payload), bars, check_freq=False)
+
+    def test_dataframe_numpy_fallback(self, monkeypatch):
+        monkeypatch.setattr(cache_codecs, "PYARROW_AVAILABLE", False)
+        codec = CacheCodec()
+        bars = make_bars()
+        payload = codec.encode(bars)
+
+        assert payload[len(MAGIC)] == CODEC_FRAME_NPZ
+        pd.testing.assert_frame_equal(codec.decode(payload), bars, check_freq=False)
+
+    def test_series_keeps_name(self):
+        codec = CacheCodec()
+        close = make_bars()["Close"]
+
+        pd.testing.assert_series_equal(codec.decode(codec.encode(close)), close, check_freq=False)
+
+    def test_ndarray(self):
+        codec = CacheCodec()
+        values = np.random.default_rng(0).normal(size=(50, 3))
+        payload = codec.encode(values)
+
+        assert payload[len(MAGIC)] == CODEC_NUMPY
+        np.testing.assert_array_equal(codec.decode(payload), values)
+
+    def test_plain_values_with_timestamps(self):
+        codec = CacheCodec()
+        value = {"symbol": "SPY", "prices": [1.0, 2.0], "as_of": pd.Timestamp("2024-01-02")}
+
+        assert codec.decode(codec.encode(value)) == {
+            "symbol": "SPY", "prices": [1.0, 2.0], "as_of": "2024-01-02T00:00:00"
+        }
+
+    def test_compression_threshold(self):
+        codec = CacheCodec(compression="zlib", compress_min_bytes=1024)
+        small = codec.encode({"a": 1})
+        large = codec.encode({"rows": ["x" * 10] * 1000})
+
+        assert small[len(MAGIC) + 1] == COMPRESSION_NONE
+        assert large[len(MAGIC) + 1] != COMPRESSION_NONE
+        assert codec.decode(large) == {"rows": ["x" * 10] * 1000}
+
+    def test_legacy_json_payload(self):
+        codec = CacheCodec()
+        assert codec.decode(json.dumps({"v": 1}).encode()) == {"v": 1}
+        assert codec.decode(json.dumps([1, 2])) == [1, 2]
+
+
+class TestCacheServiceCodec:
+    """DataFrames survive the Redis tier"""
+
+    @pytest.mark.asyncio
+    async def test_dataframe_through_redis(self):
+        fake_redis = FakeRedis()
+        bars = make_bars(200)
+        writer = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        await writer.namespace("futurequant_market_history").set("ES", bars)
+
+        reader = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        cached = await reader.namespace("futurequant_market_history").get("ES")
+        pd.testing.assert_frame_equal(cached, bars, check_freq=False)
@@ -0,0 +1,344 @@
+"""
+Tests for the two-tier cache service (in-process LRU + Redis)
+"""
+import json
+import time
+import asyncio
+import pytest
+import pandas as pd
+
+from app.core.redis_pool import CircuitBreaker, OPEN
+from app.services.cache_service import AsyncCacheService, LRUCache, STALE, _estimate_size, async_cached_response
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in backed by a dict"""
+
+    def __init__(self):
+        self.store = {}
+        self.round_trips = 0
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.ops.append(("get", key))
+        return self
+
+    def ttl(self, key):
+        self.ops.append(("ttl", key))
+        return self
+
+    def setex(self, key, ttl, value):
+        self.ops.append(("setex", key, value))
+        return self
+
+    async def execute(self):
+        self.redis_client.round_trips += 1
+        results = []
+        for op, key, *args in self.ops:
+            if op == "get":
+                results.append(self.redis_client.store.get(key))
+            elif op == "setex":
+                self.redis_client.store[key] = args[0]
+                results.append(True)
+            else:
+                results.append(60 if key in self.redis_client.store else -2)
+        return results
+
+
+class BrokenRedis:
+    """Redis stand-in whose every call fails, like a server that went away"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def setex(self, key, ttl, value):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+    def pipeline(self, transaction=False):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+
+class TestLRUCache:
+    """L1 eviction and expiry behaviour"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, max_bytes=1024 * 1024)
+        cache.set("a", 1, ttl=60, namespace="ns")
+        cache.set("b", 2, ttl=60, namespace="ns")
+        cache.get("a")
+        cache.set("c", 3, ttl=60, namespace="ns")
+
+        assert cache.get("a") == (True, 1)
+        assert cache.get("b") == (False, None)
+        assert cache.stats_for("ns").evictions == 1
+
+    def test_byte_budget(self):
+        cache = LRUCache(max_entries=100, max_bytes=100)
+        cache.set("a", "x" * 60, ttl=60)
+        cache.set("b", "y" * 60, ttl=60)
+
+        assert cache.current_bytes <= 100
+        assert cache.get("a")[0] is False
+        assert cache.set("huge", "z" * 500, ttl=60) is False
+
+    def test_size_estimate_does_not_serialize(self, monkeypatch):
+        rows = [{"ticker": "SPY", "close": 1.0, "volume": 100} for _ in range(1000)]
+        monkeypatch.setattr(json, "dumps", lambda *args, **kwargs: pytest.fail("value was serialized"))
+
+        size = _estimate_size(rows)
+
+        # Same order of magnitude as the rows' JSON (~45 bytes each), without encoding them
+        assert 45_000 < size < 2_000_000
+        assert 45_000 < _estimate_size({"nested": rows}) < 2_000_000
+
+    def test_ttl_expiry(self):
+        cache = LRUCache()
+        cache.set("a", 1, ttl=60, namespace="ns")
+        _, _, size, ns, value = cache._entries["a"]
+        cache._entries["a"] = (time.time() - 2, time.time() - 1, size, ns, value)
+
+        assert cache.get("a") == (False, None)
+        assert cache.stats_for("ns").expirations == 1
+
+    def test_clear_by_namespace_and_prefix(self):
+        cache = LRUCache()
+        cache.set("one:price_ES", 1, ttl=60, namespace="one")
+        cache.set("one:info_ES", 2, ttl=60, namespace="one")
+        cache.set("two:price_ES", 3, ttl=60, namespace="two")
+
+        assert cache.clear("one", prefix="one:price_") == 1
+        assert cache.count("one") == 1
+        assert cache.clear("one") == 1
+        assert cache.count() == 1
+
+
+class TestAsyncCacheService:
+    """Namespaced L1/L2 lookups"""
+
+    @pytest.mark.asyncio
+    async def test_l1_only_without_redis(self):
+        service = AsyncCacheService(None, local_cache=LRUCache())
+        ns = service.namespace("etf_polygon", ttl=60)
+
+        assert await ns.get("SPY") is None
+        await ns.set("SPY", {"close": 1.0})
+        assert await ns.get("SPY") == {"close": 1.0}
+
+        stats = ns.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_backfills_l1(self):
+        fake_redis = FakeRedis()
+        writer = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        await writer.namespace("aapl_polygon").set("k", {"v": 1})
+        assert "aapl_polygon:k" in fake_redis.store
+
+        # A second worker with a cold L1 shares the Redis tier
+        reader = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        ns = reader.namespace("aapl_polygon")
+        assert await ns.get("k") == {"v": 1}
+        assert await ns.get("k") == {"v": 1}
+
+        stats = ns.get_stats()
+        assert stats["l2_hits"] == 1
+        assert stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_local_only_namespace_skips_redis(self):
+        fake_redis = FakeRedis()
+        service = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        ns = service.namespace("frames", local_only=True)
+        df = pd.DataFrame({"Close": [1.0, 2.0]})
+
+        await ns.set("ES", df)
+
+        assert fake_redis.store == {}
+        assert (await ns.get("ES")) is df
+
+
+class TestBatchAndBreaker:
+    """Pipelined mget/mset and degrading to L1 when Redis is down"""
+
+    @pytest.mark.asyncio
+    async def test_mset_mget_single_round_trip(self):
+        fake_redis = FakeRedis()
+        writer = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        await writer.namespace("quotes").mset({"SPY": 1, "QQQ": 2, "IWM": 3})
+        assert fake_redis.round_trips == 1
+
+        reader = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        ns = reader.namespace("quotes")
+        await ns.set("SPY", 10)
+        result = await ns.mget(["SPY", "QQQ", "IWM", "DIA"])
+
+        assert result == {"SPY": 10, "QQQ": 2, "IWM": 3}
+        # SPY came from L1, only the rest went to Redis, in one pipeline
+        assert fake_redis.round_trips == 2
+        stats = ns.get_stats()
+        assert stats["hits"] == 1
+        assert stats["l2_hits"] == 2
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_falls_back_to_l1(self):
+        broken = BrokenRedis()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        service = AsyncCacheService(broken, local_cache=LRUCache(), breaker=breaker)
+        ns = service.namespace("etf_polygon", ttl=60)
+
+        await ns.set("SPY", 1)
+        await ns.get("QQQ")
+        assert breaker.state == OPEN
+        calls = broken.calls
+
+        # Redis is skipped entirely while the breaker is open; L1 keeps serving
+        await ns.set("IWM", 3)
+        assert await ns.get("SPY") == 1
+        assert await ns.get("IWM") == 3
+        assert await ns.mget(["SPY", "DIA"]) == {"SPY": 1}
+        assert broken.calls == calls
+
+    @pytest.mark.asyncio
+    async def test_unencodable_values_do_not_trip_the_breaker(self):
+        class FailingCodec:
+            def encode(self, value):
+                raise TypeError("cannot encode")
+
+        fake_redis = FakeRedis()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        service = AsyncCacheService(fake_redis, local_cache=LRUCache(), codec=FailingCodec(), breaker=breaker)
+        ns = service.namespace("models", ttl=60)
+
+        assert await ns.set("a", 1) is True
+        assert await ns.mset({"b": 2, "c": 3}) is True
+
+        assert breaker.state != OPEN and fake_redis.store == {}
+        assert await ns.mget(["a", "b", "c"]) == {"a": 1, "b": 2, "c": 3}
+
+
+class TestSingleFlight:
+    """Request coalescing and stale-while-revalidate"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        service = AsyncCacheService(None, local_cache=LRUCache())
+        ns = service.namespace("etf_dashboard", ttl=60)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"ticker": "SPY"}
+
+        results = await asyncio.gather(*[ns.get_or_set("SPY", loader) for _ in range(10)])
+
+        assert calls == 1
+        assert all(r == {"ticker": "SPY"} for r in results)
+        assert ns.get_stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_loader_error_reaches_every_waiter(self):
+        service = AsyncCacheService(None, local_cache=LRUCache())
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("429")
+
+        results = await asyncio.gather(
+            *[service.get_or_set("k", loader) for _ in range(3)], return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert not service.single_flight.in_flight("k")
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        local_cache = LRUCache()
+        service = AsyncCacheService(None, local_cache=local_cache)
+        ns = service.namespace("pulse", ttl=60, stale_ttl=120)
+        await ns.set("today", "old")
+
+        # Age the entry past its fresh window but inside the stale window
+        fresh_until, expires_at, size, name, value = local_cache._entries["pulse:today"]
+        local_cache._entries["pulse:today"] = (time.time() - 1, expires_at, size, name, value)
+        assert local_cache.lookup("pulse:today")[0] == STALE
+
+        refreshed = asyncio.Event()
+
+        async def loader():
+            refreshed.set()
+            return "new"
+
+        assert await ns.get_or_set("today", loader) == "old"
+        await asyncio.wait_for(refreshed.wait(), timeout=1)
+        await asyncio.sleep(0)
+        assert await ns.get("today") == "new"
+        assert ns.get_stats()["stale_served"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_redis_tail_is_not_backfilled_as_fresh(self):
+        fake_redis = FakeRedis()
+        writer = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        await writer.namespace("pulse", ttl=60, stale_ttl=120).set("today", "old")
+
+        # FakeRedis reports 60s left: inside the 120s stale tail of the key
+        reader = AsyncCacheService(fake_redis, local_cache=LRUCache())
+        ns = reader.namespace("pulse", ttl=60, stale_ttl=120)
+        assert await ns.get("today") is None
+
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return "new"
+
+        assert await ns.get_or_set("today", loader) == "old"
+        await asyncio.sleep(0.01)
+        assert loads == [1] and not reader._refresh_tasks
+
+    @pytest.mark.asyncio
+    async def test_cached_response_decorator(self):
+        calls = 0
+
+        @async_cached_response(ttl=60, key_prefix="test")
+        async def compute(x, scale=1):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": x * scale}
+
+        compute.cache_service = AsyncCacheService(None, local_cache=LRUCache())
+
+        results = await asyncio.gather(compute(2, scale=3), compute(2, scale=3))
+        assert results == [{"value": 6}, {"value": 6}]
+        assert await compute(2, scale=3) == {"value": 6}
+        assert calls == 1
@@ -0,0 +1,120 @@
+"""
+Tests for the shared compute executor
+"""
+import os
+import asyncio
+import threading
+
+import pytest
+
+from app.core.compute import (
+    ComputeExecutor, ComputeTimeoutError, ComputeQueueFullError, call_service_method, CPU_POOL, IO_POOL
+)
+
+
+def _square_sum(n):
+    return sum(i * i for i in range(n)), os.getpid()
+
+
+def _wait_for(event, seconds=5.0):
+    event.wait(seconds)
+    return "done"
+
+
+def _count_to(n, events=None):
+    for i in range(1, n + 1):
+        events.put({"step": i, "pid": os.getpid()})
+    return n
+
+
+class _Doubler:
+    async def double(self, value):
+        return value * 2
+
+
+class TestComputeExecutor:
+    """Jobs run off the loop, with timeouts, back-pressure and stats"""
+
+    @pytest.mark.asyncio
+    async def test_process_pool_runs_job_in_worker(self):
+        executor = ComputeExecutor(cpu_workers=1, use_processes=True)
+        try:
+            total, pid = await executor.run_cpu(_square_sum, 1000)
+            assert total == sum(i * i for i in range(1000))
+            assert pid != os.getpid()
+
+            doubled = await executor.run_method_cpu(_Doubler, "double", 21)
+            assert doubled == 42
+        finally:
+            executor.shutdown(wait=True)
+
+        stats = executor.get_stats()["pools"][CPU_POOL]
+        assert stats["completed"] == 2
+        assert stats["queued"] == 0 and stats["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_failure_are_counted(self):
+        executor = ComputeExecutor(cpu_workers=1, use_processes=False)
+        release = threading.Event()
+        try:
+            with pytest.raises(ComputeTimeoutError):
+                await executor.run_cpu(_wait_for, release, timeout=0.05)
+            release.set()
+
+            with pytest.raises(ValueError):
+                await executor.run_io(int, "not a number")
+        finally:
+            executor.shutdown(wait=True)
+
+        stats = executor.get_stats()["pools"]
+        assert stats[CPU_POOL]["timed_out"] == 1
+        assert stats[IO_POOL]["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_limit_and_cancellation(self):
+        executor = ComputeExecutor(cpu_workers=1, io_workers=1, max_queue=1, use_processes=False)
+        release = threading.Event()
+        try:
+            running = asyncio.create_task(executor.run_io(_wait_for, release))
+            queued = asyncio.create_task(executor.run_io(_wait_for, release))
+            await asyncio.sleep(0.05)
+            assert executor.get_stats()["pools"][IO_POOL]["queued"] == 1
+
+            with pytest.raises(ComputeQueueFullError):
+                await executor.run_io(_wait_for, release)
+
+            # Cancelling the caller drops the job that has not started yet
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            release.set()
+            assert await running == "done"
+        finally:
+            executor.shutdown(wait=True)
+
+        stats = executor.get_stats()["pools"][IO_POOL]
+        assert stats["rejected"] == 1
+        assert stats["cancelled"] == 1
+        assert stats["completed"] == 1
+        assert 'compute_jobs_total{pool="io",outcome="rejected"} 1' in executor.prometheus_lines()
+
+    def test_call_service_method_drives_coroutines(self):
+        assert call_service_method(_Doubler, "double", (5,), {}) == 10
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_processes", [False, True])
+    async def test_events_reach_caller_before_result(self, use_processes):
+        executor = ComputeExecutor(cpu_workers=1, use_processes=use_processes)
+        received = []
+
+        async def on_event(event):
+            received.append(event)
+
+        try:
+            result = await executor.run_cpu_with_events(_count_to, 5, on_event=on_event, poll_interval=0.01)
+        finally:
+            executor.shutdown(wait=True)
+
+        assert result == 5
+        assert [event["step"] for event in received] == [1, 2, 3, 4, 5]
+        assert (received[0]["pid"] != os.getpid()) == use_processes
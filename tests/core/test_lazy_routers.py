@@ -0,0 +1,78 @@
+"""
+Tests for lazily loaded feature routers
+"""
+import asyncio
+import sys
+import types
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.lazy_routers import LazyRouter, LazyRouterGroup, install_lazy_routers
+
+
+def make_feature_module(name):
+    router = APIRouter()
+
+    @router.get("/ping")
+    async def ping():
+        return {"pong": True}
+
+    module = types.ModuleType(name)
+    module.router = router
+    sys.modules[name] = module
+    return module
+
+
+class TestLazyRouters:
+    """Placeholders load the real routers on first use"""
+
+    def test_first_request_loads_router(self):
+        make_feature_module("tests_lazy_feature_a")
+        app = FastAPI()
+        loader = install_lazy_routers(app, [
+            LazyRouterGroup("feature", "/feature", [
+                LazyRouter("tests_lazy_feature_a", prefix="/feature", tags=["feature"]),
+            ]),
+        ], prefix="/api/v1")
+        client = TestClient(app)
+
+        assert not loader.is_loaded("feature")
+        assert client.get("/api/v1/feature/ping").json() == {"pong": True}
+        assert loader.is_loaded("feature")
+        assert client.get("/api/v1/other").status_code == 404
+        assert not any(getattr(route, "name", "").startswith("lazy:") for route in app.routes)
+
+    def test_openapi_includes_pending_routers(self):
+        make_feature_module("tests_lazy_feature_b")
+        app = FastAPI()
+        install_lazy_routers(app, [
+            LazyRouterGroup("feature", "/feature", [
+                LazyRouter("tests_lazy_feature_b", prefix="/feature"),
+            ]),
+        ])
+
+        paths = TestClient(app).get("/openapi.json").json()["paths"]
+        assert "/feature/ping" in paths
+
+
+class TestWarmUpTask:
+    """The startup warm-up task stays referenced until it finishes"""
+
+    @pytest.mark.asyncio
+    async def test_task_is_kept_until_done(self):
+        from app import main
+        started = asyncio.Event()
+
+        async def warm_up():
+            started.set()
+            await asyncio.sleep(60)
+
+        task = main._start_background_task(warm_up())
+        await started.wait()
+        assert task in main._background_tasks
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert task not in main._background_tasks
@@ -0,0 +1,74 @@
+"""
+Tests for request metrics and the instrumentation middleware
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import LatencyHistogram, MetricsRegistry
+from app.core.middleware import InstrumentationMiddleware
+
+
+def make_app(registry):
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.get("/metrics")
+    async def metrics():
+        return registry.summary()
+
+    return app
+
+
+class TestLatencyHistogram:
+    """Bucketed latency with interpolated quantiles"""
+
+    def test_quantiles(self):
+        histogram = LatencyHistogram(buckets=(0.1, 1.0))
+        for _ in range(90):
+            histogram.observe(0.05)
+        for _ in range(10):
+            histogram.observe(0.5)
+
+        assert histogram.counts == [90, 10, 0]
+        assert histogram.quantile(0.5) <= 0.1
+        assert 0.1 < histogram.quantile(0.99) <= 1.0
+
+
+class TestInstrumentationMiddleware:
+    """Per-route metrics keyed by route template"""
+
+    def test_templated_routes_and_status_classes(self):
+        registry = MetricsRegistry()
+        client = TestClient(make_app(registry))
+
+        client.get("/items/1")
+        response = client.get("/items/2")
+        client.get("/items/not-a-number")
+        client.get("/missing")
+
+        assert "X-Process-Time" in response.headers
+        routes = {(r["method"], r["route"]): r for r in registry.summary()["routes"]}
+        items = routes[("GET", "/items/{item_id}")]
+        assert items["requests"] == 3
+        assert items["status"] == {"2xx": 2, "4xx": 1}
+        assert items["in_flight"] == 0
+        assert routes[("GET", "<unmatched>")]["status"] == {"4xx": 1}
+
+    def test_in_flight_and_prometheus_output(self):
+        registry = MetricsRegistry()
+        client = TestClient(make_app(registry))
+        client.get("/items/1")
+
+        # The summary request itself is in flight while it is rendered
+        summary = client.get("/metrics").json()
+        in_flight = {r["route"]: r["in_flight"] for r in summary["routes"]}
+        assert in_flight["/metrics"] == 1
+
+        text = registry.render_prometheus()
+        assert 'http_requests_total{method="GET",route="/items/{item_id}",status="2xx"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",le="+Inf"} 1' in text
+        assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 1' in text
@@ -0,0 +1,73 @@
+"""
+Tests for the sampling profiler
+"""
+import time
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.middleware import InstrumentationMiddleware
+from app.core.profiler import collapsed_text, get_profiler, summarize
+
+
+def spin(seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        sum(range(1000))
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware)
+
+    @app.get("/busy/{n}")
+    async def busy(n: int):
+        spin(0.2)
+        return {"n": n}
+
+    @app.get("/profile")
+    async def profile():
+        result = await get_profiler().profile(duration=1.0, rate_hz=200, threads="loop")
+        return {"collapsed": collapsed_text(result["stacks"]), **summarize(result["stacks"])}
+
+    return app
+
+
+class TestSamplingProfiler:
+    """Event loop samples are tagged with the active route"""
+
+    def test_samples_tagged_with_route(self):
+        with TestClient(make_app()) as client:
+            def hit():
+                time.sleep(0.1)
+                for n in range(3):
+                    client.get(f"/busy/{n}")
+
+            caller = threading.Thread(target=hit)
+            caller.start()
+            result = client.get("/profile").json()
+            caller.join()
+
+        assert result["routes"].get("GET /busy/{n}", 0) > 0
+        assert any(row["frame"].startswith("spin (") for row in result["top_self"])
+        line = next(l for l in result["collapsed"].splitlines() if "GET /busy/{n}" in l)
+        assert line.startswith("event_loop;GET /busy/{n};")
+        assert int(line.rsplit(" ", 1)[1]) > 0
+        assert not get_profiler().active
+
+    def test_requires_admin_token(self, monkeypatch):
+        from app.core.config import settings
+        from app.api.v1.endpoints import monitoring
+
+        app = FastAPI()
+        app.include_router(monitoring.router, prefix="/monitoring")
+        client = TestClient(app)
+
+        monkeypatch.setattr(settings, "admin_token", None)
+        assert client.get("/monitoring/profile?duration=0.1").status_code == 403
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        assert client.get("/monitoring/profile?duration=0.1", headers={"X-Admin-Token": "nope"}).status_code == 401
+        response = client.get("/monitoring/profile?duration=0.1&format=json", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["profile"]["samples"] > 0
@@ -0,0 +1,89 @@
+"""
+Tests for the vectorized window kernels, pinned against the pandas callbacks they replace
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core import window_kernels
+
+
+def make_returns(periods=600, seed=11):
+    values = np.random.default_rng(seed).normal(0, 0.01, periods)
+    values[[40, 41, periods // 2]] = np.nan
+    return values
+
+
+def pandas_mad(x):
+    return np.mean(np.abs(x - x.mean()))
+
+
+def pandas_cvar(q):
+    return lambda x: x[x <= x.quantile(q)].mean()
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 14, 20, 63])
+class TestMatchesPandas:
+    """Same values as rolling(window).apply/quantile/min/max"""
+
+    def test_mad(self, window):
+        values = make_returns()
+        expected = pd.Series(values).rolling(window).apply(pandas_mad, raw=True)
+        np.testing.assert_allclose(window_kernels.rolling_mad(values, window), expected, rtol=1e-12, equal_nan=True)
+
+    @pytest.mark.parametrize("q", [0.01, 0.05, 0.25, 0.5])
+    def test_quantile_and_cvar(self, window, q):
+        values = make_returns()
+        rolling = pd.Series(values).rolling(window)
+        np.testing.assert_allclose(
+            window_kernels.rolling_quantile(values, window, q), rolling.quantile(q), rtol=1e-12, equal_nan=True
+        )
+        np.testing.assert_allclose(
+            window_kernels.rolling_cvar(values, window, q), rolling.apply(pandas_cvar(q), raw=False),
+            rtol=1e-12, equal_nan=True
+        )
+
+    def test_min_max(self, window):
+        values = make_returns()
+        rolling = pd.Series(values).rolling(window)
+        np.testing.assert_array_equal(window_kernels.rolling_min(values, window), rolling.min())
+        np.testing.assert_array_equal(window_kernels.rolling_max(values, window), rolling.max())
+
+
+class TestEdges:
+    """Short inputs, ties and block boundaries"""
+
+    def test_shorter_than_window(self):
+        assert np.isnan(window_kernels.rolling_mad([1.0, 2.0], 3)).all()
+        assert np.isnan(window_kernels.rolling_max([1.0, 2.0], 3)).all()
+
+    def test_cvar_with_ties(self):
+        values = np.round(np.random.default_rng(5).normal(0, 1, 400), 1)
+        expected = pd.Series(values).rolling(20).apply(pandas_cvar(0.25), raw=False)
+        np.testing.assert_allclose(window_kernels.rolling_cvar(values, 20, 0.25), expected, rtol=1e-12, equal_nan=True)
+
+    def test_blocks_do_not_change_results(self, monkeypatch):
+        values = make_returns()
+        whole = window_kernels.rolling_cvar(values, 20, 0.05)
+        monkeypatch.setattr(window_kernels, "BLOCK_ELEMENTS", 50)
+        np.testing.assert_array_equal(window_kernels.rolling_cvar(values, 20, 0.05), whole)
+
+
+class TestPercentileRank:
+    """Share of trailing values at or below the current one"""
+
+    def test_matches_per_row_count(self):
+        values = make_returns(periods=200)
+        ranks = window_kernels.rolling_percentile_rank(values, 50, min_periods=30, include_current=False)
+
+        for i in range(len(values)):
+            history = values[max(0, i - 50):i]
+            history = history[~np.isnan(history)]
+            if len(history) < 30 or np.isnan(values[i]):
+                assert np.isnan(ranks[i])
+            else:
+                assert ranks[i] == pytest.approx(np.sum(history <= values[i]) / len(history) * 100)
+
+    def test_including_current(self):
+        ranks = window_kernels.rolling_percentile_rank([3.0, 1.0, 2.0, 5.0], 3)
+        np.testing.assert_allclose(ranks, [np.nan, np.nan, 200 / 3, 100], equal_nan=True)
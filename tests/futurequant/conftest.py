@@ -0,0 +1,121 @@
+"""
+Shared fixtures and data factories for the FutureQuant tests
+"""
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import compute
+from app.core.compute import ComputeExecutor
+from app.models.database import Base
+from app.models.trading_models import Symbol
+from app.services.cache_service import cache_namespace
+from app.services.futurequant import bar_rollup, bar_store, symbol_registry
+from app.services.futurequant.bar_store import BarStore
+from app.services.futurequant.symbol_registry import SymbolRegistry
+
+SYMBOL_DEFAULTS = {"venue": "CME", "asset_class": "Equity", "point_value": 50, "tick_size": 0.25}
+
+
+def make_session_factory(url: str = "sqlite://", create_tables: bool = True):
+    """Session factory over a fresh SQLite database.
+
+    The default in-memory database lives on one shared connection so every
+    session sees the same data; pass a file URL when sessions are used from
+    several threads at once.
+    """
+    if url == "sqlite://":
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    if create_tables:
+        Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def add_symbols(session, tickers, **attributes):
+    """Insert one ``Symbol`` per ticker (ids follow the order given)"""
+    session.add_all([Symbol(ticker=ticker, **{**SYMBOL_DEFAULTS, **attributes}) for ticker in tickers])
+    session.commit()
+
+
+def make_bars(periods: int = 300, seed: int = 0, start: str = "2022-01-03", freq: str = "D") -> pd.DataFrame:
+    """Random-walk OHLCV bars on a UTC ``timestamp`` index"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    return pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.002, periods)),
+        "high": close * (1 + rng.uniform(0, 0.01, periods)),
+        "low": close * (1 - rng.uniform(0, 0.01, periods)),
+        "close": close,
+        "volume": rng.integers(1_000, 5_000, periods).astype(float),
+    }, index=pd.date_range(start, periods=periods, freq=freq, tz="UTC", name="timestamp"))
+
+
+def make_linear_bars(start: str, periods: int, freq: str = "D", base: float = 100.0, tz: str = None,
+                     name: str = None) -> pd.DataFrame:
+    """Bars shaped like a yfinance download whose close rises by 1 per bar"""
+    index = pd.date_range(start, periods=periods, freq=freq, tz=tz, name=name)
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close,
+        "Volume": np.arange(periods) * 100,
+    }, index=index)
+
+
+@pytest.fixture
+def tickers():
+    """Symbols the ``db`` fixture creates; override in a test module to change them"""
+    return ["ES=F"]
+
+
+@pytest.fixture
+def symbol_attributes():
+    """Column values shared by the symbols ``db`` creates, on top of ``SYMBOL_DEFAULTS``"""
+    return {}
+
+
+@pytest.fixture
+def session_factory():
+    return make_session_factory()
+
+
+@pytest.fixture
+def db(session_factory, tickers, symbol_attributes):
+    session = session_factory()
+    add_symbols(session, tickers, **symbol_attributes)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh process-wide symbol registry"""
+    registry = SymbolRegistry()
+    monkeypatch.setattr(symbol_registry, "_symbol_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def rollup_store(tmp_path, monkeypatch):
+    """A bar store under ``tmp_path`` that bar reads and rollups use, with a rollup cache of its own"""
+    store = BarStore(str(tmp_path / "bars"))
+    monkeypatch.setattr(bar_store, "get_bar_store", lambda: store)
+    monkeypatch.setattr(bar_rollup, "get_bar_store", lambda: store)
+    monkeypatch.setattr(bar_rollup, "_rollup_cache", cache_namespace(f"test_rollups_{uuid.uuid4().hex}", ttl=60,
+                                                                     local_only=True))
+    return store
+
+
+@pytest.fixture
+def thread_executor(monkeypatch):
+    """Compute executor running CPU jobs in threads, so tests can patch what the jobs call"""
+    executor = ComputeExecutor(cpu_workers=4, use_processes=False)
+    monkeypatch.setattr(compute, "_compute_executor", executor)
+    yield executor
+    executor.shutdown(wait=True)
@@ -0,0 +1,78 @@
+"""
+Tests for the idempotent bulk bar upsert
+"""
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+
+from app.models.trading_models import Bar
+from app.services.futurequant import bar_ingest
+from app.services.futurequant.bar_ingest import BAR_UNIQUE_INDEX, upsert_bars
+
+from .conftest import make_linear_bars
+
+
+def make_bars(periods=4):
+    return make_linear_bars("2024-03-01", periods, tz="America/New_York")
+
+
+@pytest.fixture(autouse=True)
+def unindexed(monkeypatch):
+    monkeypatch.setattr(bar_ingest, "_indexed_databases", set())
+
+
+def stored_closes(db):
+    return [bar.close for bar in db.query(Bar).order_by(Bar.timestamp).all()]
+
+
+class TestUpsertBars:
+    """Insert, skip and update counts on repeated ingests"""
+
+    def test_reingest_is_idempotent(self, db):
+        first = upsert_bars(db, 1, "1d", make_bars())
+        second = upsert_bars(db, 1, "1d", make_bars())
+
+        assert (first["inserted"], first["updated"], first["skipped"]) == (4, 0, 0)
+        assert (second["inserted"], second["updated"], second["skipped"]) == (0, 0, 4)
+        assert db.query(Bar).count() == 4
+
+    def test_overlapping_range_updates_revised_bars(self, db):
+        upsert_bars(db, 1, "1d", make_bars())
+        revised = make_bars(periods=6).iloc[2:].copy()
+        revised.loc[revised.index[0], "Close"] = 150.0
+
+        counts = upsert_bars(db, 1, "1d", revised)
+
+        assert (counts["inserted"], counts["updated"], counts["skipped"]) == (2, 1, 1)
+        assert stored_closes(db) == [100.0, 101.0, 150.0, 103.0, 104.0, 105.0]
+
+    def test_intervals_are_separate_keys(self, db):
+        upsert_bars(db, 1, "1d", make_bars())
+        counts = upsert_bars(db, 1, "1h", make_bars())
+
+        assert counts["inserted"] == 4
+        assert db.query(Bar).count() == 8
+
+    def test_repeats_within_batch_are_skipped(self, db):
+        bars = make_bars()
+        counts = upsert_bars(db, 1, "1d", pd.concat([bars, bars.iloc[:1]]))
+
+        assert (counts["rows"], counts["inserted"], counts["skipped"]) == (5, 4, 1)
+
+
+class TestUniqueIndexMigration:
+    """Databases created before the unique key are deduplicated first"""
+
+    def test_existing_duplicates_are_removed(self, db):
+        db.execute(text(f"DROP INDEX {BAR_UNIQUE_INDEX}"))
+        for close in (1.0, 2.0):
+            db.add(Bar(symbol_id=1, timestamp=pd.Timestamp("2024-03-01 05:00").to_pydatetime(), open=close,
+                       high=close, low=close, close=close, volume=0, interval="1d"))
+        db.commit()
+
+        counts = upsert_bars(db, 1, "1d", make_bars())
+
+        index_names = [index["name"] for index in inspect(db.get_bind()).get_indexes("futurequant_bars")]
+        assert BAR_UNIQUE_INDEX in index_names
+        assert (counts["inserted"], counts["updated"]) == (3, 1)
+        assert db.query(Bar).count() == 4
@@ -0,0 +1,109 @@
+"""
+Tests for rolling coarser bars up from the finest stored interval
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.services.futurequant import bar_rollup
+from app.services.futurequant.bar_rollup import (
+    UTC_SESSION, VENUE_SESSIONS, get_bars, rollup_bars, rollup_source
+)
+
+
+def make_minute_bars(start="2024-07-01 13:00", periods=30):
+    index = pd.date_range(start, periods=periods, freq="min", tz="UTC", name="timestamp")
+    close = 100.0 + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "open": close - 0.5, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.full(periods, 10, dtype="int64"),
+    }, index=index)
+
+
+class TestRollupBars:
+    """OHLCV/VWAP aggregation and session-aware buckets"""
+
+    def test_minute_bars_into_five_minute_bars(self):
+        bars = make_minute_bars(periods=10)
+        rolled = rollup_bars(bars, "5m")
+
+        assert list(rolled.index) == list(pd.date_range("2024-07-01 13:00", periods=2, freq="5min", tz="UTC"))
+        first = rolled.iloc[0]
+        assert (first["open"], first["high"], first["low"], first["close"], first["volume"]) == (
+            99.5, 105.0, 99.0, 104.0, 50
+        )
+        typical = (bars["high"] + bars["low"] + bars["close"]) / 3
+        assert first["vwap"] == pytest.approx(typical.iloc[:5].mean())
+
+    def test_vwap_weights_by_volume(self):
+        bars = make_minute_bars(periods=2)
+        bars["vwap"] = [100.0, 200.0]
+        bars["volume"] = [1, 3]
+
+        assert rollup_bars(bars, "5m")["vwap"].iloc[0] == pytest.approx(175.0)
+
+    def test_cme_daily_bars_follow_the_globex_session(self):
+        # 16:00 and 17:00 Chicago time (CDT) on July 1st: the second opens July 2nd's session
+        index = pd.DatetimeIndex(["2024-07-01 21:00", "2024-07-01 22:00", "2024-07-02 15:00"], tz="UTC")
+        bars = pd.DataFrame({"open": [1.0, 2.0, 3.0], "high": [1.0, 2.0, 3.0], "low": [1.0, 2.0, 3.0],
+                             "close": [1.0, 2.0, 3.0], "volume": [1, 1, 1]}, index=index)
+
+        cme = rollup_bars(bars, "1d", VENUE_SESSIONS["CME"])
+        assert list(cme.index) == [pd.Timestamp("2024-07-01 05:00", tz="UTC"), pd.Timestamp("2024-07-02 05:00", tz="UTC")]
+        assert list(cme["open"]) == [1.0, 2.0]
+        assert list(cme["close"]) == [1.0, 3.0]
+
+        assert len(rollup_bars(bars, "1d", UTC_SESSION)) == 2
+        assert list(rollup_bars(bars, "1d", UTC_SESSION)["close"]) == [2.0, 3.0]
+
+    def test_source_is_the_finest_dividing_interval(self):
+        assert rollup_source("1h", ["1d", "5m", "1m"]) == "1m"
+        assert rollup_source("1d", ["1h", "1d"]) == "1h"
+        assert rollup_source("1h", ["1d"]) is None
+
+
+class TestGetBars:
+    """Native reads, lazy cached rollups and invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_stored_interval_is_read_as_is(self, rollup_store, db):
+        rollup_store.write_bars("ES=F", "1m", make_minute_bars())
+        bars = await get_bars(db, ["ES=F"], interval="1m", columns=["close"])
+
+        assert len(bars) == 30
+        assert list(bars.columns) == ["symbol", "close"]
+
+    @pytest.mark.asyncio
+    async def test_rollup_is_cached_until_new_bars_arrive(self, rollup_store, db, monkeypatch):
+        rollup_store.write_bars("ES=F", "1m", make_minute_bars())
+        calls = []
+        rollup_symbol = bar_rollup._rollup_symbol
+        monkeypatch.setattr(bar_rollup, "_rollup_symbol", lambda *args: calls.append(args) or rollup_symbol(*args))
+
+        first = await get_bars(db, ["ES=F"], interval="15m")
+        second = await get_bars(db, ["ES=F"], interval="15m")
+        assert len(first) == 2 and len(calls) == 1
+        pd.testing.assert_frame_equal(first, second)
+
+        rollup_store.write_bars("ES=F", "1m", make_minute_bars(start="2024-07-01 13:30", periods=15))
+        third = await get_bars(db, ["ES=F"], interval="15m")
+        assert len(third) == 3 and len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_start_bound_keeps_whole_first_bucket(self, rollup_store, db):
+        rollup_store.write_bars("ES=F", "1m", make_minute_bars())
+        bars = await get_bars(db, ["ES=F"], start="2024-07-01 13:20", interval="15m")
+
+        assert bars.index[0] == pd.Timestamp("2024-07-01 13:15", tz="UTC")
+        assert bars["volume"].iloc[0] == 150
+
+    @pytest.mark.asyncio
+    async def test_coarser_only_history_cannot_be_rolled_down(self, rollup_store, db):
+        rollup_store.write_bars("ES=F", "1d", make_minute_bars(periods=3).set_axis(
+            pd.date_range("2024-07-01", periods=3, freq="D", tz="UTC"), axis=0
+        ))
+
+        with pytest.raises(ValueError):
+            await get_bars(db, ["ES=F"], interval="1h")
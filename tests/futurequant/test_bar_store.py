@@ -0,0 +1,91 @@
+"""
+Tests for the columnar bar store
+"""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.models.trading_models import Bar
+from app.services.futurequant import bar_store
+from app.services.futurequant.bar_store import BarStore, bars_to_wide, load_bars
+
+from .conftest import make_linear_bars
+
+
+def make_bars(start="2024-01-30", periods=5, freq="D", base=100.0):
+    return make_linear_bars(start, periods, freq=freq, base=base, name="Date")
+
+
+class TestBarStore:
+    """Partitions, merges and range reads"""
+
+    def test_writes_partitions_and_reads_range(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.write_bars("CL=F", "1d", make_bars())
+        store.write_bars("CL=F", "1m", make_bars(start="2024-01-31 23:58", freq="min"))
+
+        assert store.symbols() == ["CL=F"]
+        # Daily bars by year, intraday bars by month
+        assert store.get_stats() == {"CL=F": {"1m": 2, "1d": 1}}
+
+        bars = store.read_bars("CL=F", start="2024-01-31", end="2024-02-02", interval="1d", columns=["close", "volume"])
+        assert list(bars.columns) == ["symbol", "close", "volume"]
+        assert list(bars["close"]) == [101.0, 102.0, 103.0]
+        assert str(bars.index.tz) == "UTC"
+
+    def test_merge_replaces_duplicates(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.write_bars("ES=F", "1d", make_bars())
+        store.write_bars("ES=F", "1d", make_bars(start="2024-02-02", periods=3, base=500.0))
+
+        close = store.read_bars("ES=F")["close"]
+        assert list(close) == [100.0, 101.0, 102.0, 500.0, 501.0, 502.0]
+        assert close.index.is_monotonic_increasing
+
+    def test_multi_symbol_read_and_wide_layout(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.write_bars("ES=F", "1d", make_bars(base=100.0))
+        store.write_bars("GC=F", "1d", make_bars(base=200.0))
+
+        bars = store.read_bars(["ES=F", "GC=F", "ZC=F"])
+        assert len(bars) == 10
+        assert list(bars["symbol"].cat.categories) == ["ES=F", "GC=F"]
+
+        wide = bars_to_wide(bars, ["open", "close"])
+        assert list(wide.columns) == [("ES=F", "open"), ("ES=F", "close"), ("GC=F", "open"), ("GC=F", "close")]
+        assert wide[("GC=F", "close")].iloc[-1] == 204.0
+
+    def test_interval_defaults_to_finest(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.write_bars("ES=F", "1d", make_bars())
+        store.write_bars("ES=F", "1h", make_bars(freq="h"))
+
+        assert store.intervals("ES=F") == ["1h", "1d"]
+        assert len(store.read_bars("ES=F", start="2024-01-30", end="2024-01-30 02:00")) == 3
+
+    def test_unknown_symbol_returns_empty_frame(self, tmp_path):
+        bars = BarStore(str(tmp_path)).read_bars("NOPE", columns=["close"])
+        assert bars.empty
+        assert list(bars.columns) == ["symbol", "close"]
+
+
+class TestLoadBars:
+    """Store first, database for symbols it does not hold"""
+
+    def test_falls_back_to_database_then_uses_store(self, tmp_path, db, monkeypatch):
+        store = BarStore(str(tmp_path))
+        monkeypatch.setattr(bar_store, "get_bar_store", lambda: store)
+        for timestamp, row in make_bars().iterrows():
+            db.add(Bar(symbol_id=1, timestamp=timestamp.to_pydatetime(), open=row["Open"],
+                       high=row["High"], low=row["Low"], close=row["Close"], volume=int(row["Volume"]),
+                       interval="1d"))
+        db.commit()
+
+        from_db = load_bars(db, ["ES=F"], "2024-01-31", "2024-02-02")
+        assert list(from_db["close"]) == [101.0, 102.0, 103.0]
+
+        assert store.sync_from_database(db, "ES=F", "1d") == 5
+        from_store = load_bars(db, ["ES=F"], "2024-01-31", "2024-02-02")
+        pd.testing.assert_frame_equal(from_store, from_db, check_categorical=False, check_index_type=False,
+                                      check_freq=False, check_dtype=False)
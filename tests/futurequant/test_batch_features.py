@@ -0,0 +1,147 @@
+"""
+Tests for parallel batch feature computation
+"""
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.models.trading_models import FeatureState
+from app.services.futurequant import feature_service, feature_store
+from app.services.futurequant.feature_service import FutureQuantFeatureService
+from app.services.futurequant.feature_store import FeatureStore
+
+from .conftest import make_bars, make_session_factory
+
+pytest.importorskip("pyarrow")
+
+TICKERS = ["ES=F", "NQ=F", "GC=F", "CL=F"]
+
+
+@pytest.fixture
+def stores(rollup_store, tmp_path, monkeypatch):
+    bars, features = rollup_store, FeatureStore(str(tmp_path / "features"))
+    monkeypatch.setattr(settings, "feature_store_enabled", True)
+    monkeypatch.setattr(feature_store, "_feature_store", features)
+    for seed, ticker in enumerate(TICKERS):
+        bars.write_bars(ticker, "1d", make_bars(periods=160, seed=seed).iloc[:-5])
+    return bars, features
+
+
+@pytest.fixture
+def tickers():
+    return TICKERS
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # Workers run in threads here and each opens a session of its own
+    return make_session_factory(f"sqlite:///{tmp_path / 'batch.db'}")
+
+
+@pytest.fixture
+def db(db, stores, session_factory, registry, thread_executor, monkeypatch):
+    monkeypatch.setattr(feature_service, "SessionLocal", session_factory)
+    return db
+
+
+async def run_batch(service, symbol_ids, **kwargs):
+    return await service.batch_compute_features(symbol_ids, "volume", "2022-01-01", "2030-01-01", interval="1d",
+                                                **kwargs)
+
+
+class TestBatchComputeFeatures:
+    """Symbols fan out over the compute pool and match one-by-one computation"""
+
+    @pytest.mark.asyncio
+    async def test_matches_single_symbol_computation(self, db, stores):
+        _, features = stores
+        service = FutureQuantFeatureService()
+
+        batch = await run_batch(service, [1, 2, 3, 4])
+        batched = {ticker: features.read_features(ticker) for ticker in TICKERS}
+        for symbol_id in (1, 2, 3, 4):
+            await service.compute_features(symbol_id, "volume", "2022-01-01", "2030-01-01", interval="1d",
+                                           full_refresh=True)
+
+        assert (batch["successful"], batch["failed"]) == (4, 0)
+        assert [r["symbol_id"] for r in batch["results"]] == [1, 2, 3, 4]
+        assert all(r["result"]["stored_count"] == 155 for r in batch["results"])
+        for ticker in TICKERS:
+            pd.testing.assert_frame_equal(batched[ticker], features.read_features(ticker))
+        assert db.query(FeatureState).count() == 4
+
+    @pytest.mark.asyncio
+    async def test_second_batch_resumes_from_states(self, db, stores):
+        bars, features = stores
+        service = FutureQuantFeatureService()
+        await run_batch(service, [1, 2])
+        for seed, ticker in enumerate(TICKERS[:2]):
+            bars.write_bars(ticker, "1d", make_bars(periods=160, seed=seed))
+
+        batch = await run_batch(service, [1, 2])
+
+        assert [r["result"]["mode"] for r in batch["results"]] == ["incremental", "incremental"]
+        assert [r["result"]["stored_count"] for r in batch["results"]] == [6, 6]
+        assert len(features.read_features("NQ=F")) == 160
+
+    @pytest.mark.asyncio
+    async def test_worker_count_is_bounded(self, db, stores, monkeypatch):
+        active = {"now": 0, "max": 0}
+        run_method_cpu = feature_service.run_method_cpu
+
+        async def counting(*args, **kwargs):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            try:
+                return await run_method_cpu(*args, **kwargs)
+            finally:
+                active["now"] -= 1
+
+        monkeypatch.setattr(feature_service, "run_method_cpu", counting)
+        batch = await run_batch(FutureQuantFeatureService(), [1, 2, 3, 4], max_workers=2)
+
+        assert batch["successful"] == 4
+        assert active["max"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_closed(self, db, session_factory, monkeypatch):
+        opened = []
+
+        def tracking_session():
+            session = session_factory()
+            close = session.close
+            session.close = lambda: opened.remove(session) or close()
+            opened.append(session)
+            return session
+
+        monkeypatch.setattr(feature_service, "SessionLocal", tracking_session)
+        service = FutureQuantFeatureService()
+        await run_batch(service, [1, 2])
+        await service.compute_features(3, "volume", "2022-01-01", "2030-01-01", interval="1d")
+
+        assert opened == []
+
+
+class TestProgressFeed:
+    """One event per symbol, in completion order"""
+
+    @pytest.mark.asyncio
+    async def test_events(self, db, stores):
+        service = FutureQuantFeatureService()
+        progress = []
+
+        async def on_progress(done, total, symbol):
+            progress.append((done, total, symbol))
+
+        events = [event async for event in service.iter_batch_compute_features(
+            [3, 99, 1], "volume", "2022-01-01", "2030-01-01", interval="1d"
+        )]
+        batch = await run_batch(service, [1, 2], on_progress=on_progress)
+
+        assert [event["done"] for event in events] == [1, 2, 3]
+        assert {event["symbol_id"]: event["symbol"] for event in events} == {3: "GC=F", 99: None, 1: "ES=F"}
+        failed = [event for event in events if not event["result"]["success"]]
+        assert [event["symbol_id"] for event in failed] == [99]
+        assert batch["successful"] == 2
+        assert [(done, total) for done, total, _ in progress] == [(1, 2), (2, 2)]
+        assert sorted(symbol for _, _, symbol in progress) == ["ES=F", "NQ=F"]
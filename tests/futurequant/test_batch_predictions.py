@@ -0,0 +1,146 @@
+"""
+Tests for batched multi-symbol inference
+"""
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import event
+
+pytest.importorskip("torch")
+pytest.importorskip("pyarrow")
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import QuantileRegressor
+
+from app.core.config import settings
+from app.models.trading_models import Forecast, Model
+from app.services.futurequant import feature_store, model_cache, model_service
+from app.services.futurequant.feature_store import FeatureStore
+from app.services.futurequant.model_cache import ModelCache
+from app.services.futurequant.model_service import FutureQuantModelService
+
+TICKERS = ["ES=F", "NQ=F", "GC=F"]
+COLUMNS = ["rsi_14", "atr_14", "obv"]
+
+
+def make_features(periods=30, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-02", periods=periods, freq="D", tz="UTC", name="timestamp")
+    return pd.DataFrame(rng.normal(size=(periods, len(COLUMNS))), index=index, columns=COLUMNS)
+
+
+def save_models(tmp_path):
+    rng = np.random.default_rng(1)
+    X, y = rng.normal(size=(200, len(COLUMNS))), rng.normal(0, 0.01, 200)
+    quantile = {
+        "type": "quantile_regression",
+        "models": {q: QuantileRegressor(quantile=q, alpha=0.0, solver="highs").fit(X, y) for q in (0.1, 0.5, 0.9)},
+        "quantiles": [0.1, 0.5, 0.9],
+    }
+    forest = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+    paths = []
+    for name, model in (("quantile", quantile), ("forest", forest)):
+        path = str(tmp_path / f"{name}.joblib")
+        joblib.dump(model, path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def tickers():
+    return TICKERS
+
+
+@pytest.fixture
+def db(db, tmp_path, registry, thread_executor, monkeypatch):
+    store = FeatureStore(str(tmp_path / "features"))
+    monkeypatch.setattr(settings, "feature_store_enabled", True)
+    monkeypatch.setattr(feature_store, "_feature_store", store)
+    monkeypatch.setattr(model_cache, "_model_cache", ModelCache())
+    for seed, ticker in enumerate(TICKERS):
+        store.write_features(ticker, "full", "v1", make_features(seed=seed), replace=True)
+    for path in save_models(tmp_path):
+        db.add(Model(name=path, artifact_uri=path, params={"horizon_minutes": 1440}, status="completed"))
+    db.commit()
+    monkeypatch.setattr(model_service, "get_db", lambda: iter([db]))
+    monkeypatch.setattr(model_service, "SessionLocal", lambda: db)
+    return db
+
+
+class TestPredictBatch:
+    """One forward pass per model and one forecast insert per batch"""
+
+    @pytest.mark.asyncio
+    async def test_matches_single_predictions(self, db, monkeypatch):
+        service = FutureQuantModelService()
+        passes, commits = [], []
+        predict_matrix = service._predict_matrix
+        monkeypatch.setattr(service, "_predict_matrix", lambda model, X: passes.append(len(X)) or predict_matrix(model, X))
+        event.listen(db, "after_commit", lambda session: commits.append(1))
+
+        pairs = [(ticker, model_id) for ticker in TICKERS for model_id in (1, 2)]
+        result = await service.predict_batch(pairs + [("CL=F", 1), ("ES=F", 9)], "2024-01-01", "2024-12-31")
+
+        assert result["success"] and (result["successful"], result["failed"]) == (6, 2)
+        assert result["forecasts_stored"] == 180 and db.query(Forecast).count() == 180
+        assert passes == [90, 90] and len(commits) == 1
+        errors = {(r["symbol"], r["model_id"]): r["error"] for r in result["results"] if not r["success"]}
+        assert errors == {("CL=F", 1): "Symbol CL=F not found", ("ES=F", 9): "Model 9 not found"}
+
+        stored = db.query(Forecast).filter(Forecast.symbol_id == 2, Forecast.model_id == 1).order_by(
+            Forecast.timestamp).all()
+        features = await service._get_features_for_prediction(db, "NQ=F", "2024-01-01", "2024-12-31")
+        single = await service._make_distributional_predictions(joblib.load(db.get(Model, 1).artifact_uri),
+                                                                features, {})
+        assert [f.q50 for f in stored] == pytest.approx([p["q50"] for p in single])
+
+    @pytest.mark.asyncio
+    async def test_feature_width_mismatch_fails_only_that_pair(self, db):
+        feature_store.get_feature_store().write_features(
+            "GC=F", "full", "v2", make_features(seed=5).assign(extra=1.0), replace=True
+        )
+
+        result = await FutureQuantModelService().predict_batch(
+            [("ES=F", 1), ("GC=F", 1)], "2024-01-01", "2024-12-31"
+        )
+
+        assert [r["success"] for r in result["results"]] == [True, False]
+        assert "expects 3" in result["results"][1]["error"]
+        assert result["forecasts_stored"] == 30
+
+
+class TestArchivedModels:
+    """Old models are only archived when enabled, and archived ones fail clearly"""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_is_off_by_default(self, db, tmp_path, monkeypatch):
+        service = FutureQuantModelService()
+        paths = [str(tmp_path / f"old_{i}.joblib") for i in range(4)]
+        for path in paths:
+            joblib.dump({}, path)
+        db.add_all([Model(name="ES=F_quantile", artifact_uri=path, params={}, status="completed") for path in paths])
+        db.commit()
+
+        await service._update_model_status(db, 3, "completed")
+        assert db.query(Model).filter(Model.status == "archived").count() == 0
+
+        monkeypatch.setattr(settings, "training_keep_models", 1)
+        await service._update_model_status(db, 6, "completed")
+        archived = db.query(Model).filter(Model.status == "archived").all()
+        assert len(archived) == 3 and not any(os.path.exists(model.artifact_uri) for model in archived)
+
+    @pytest.mark.asyncio
+    async def test_archived_model_reports_archived(self, db):
+        db.get(Model, 2).status = "archived"
+        db.commit()
+        service = FutureQuantModelService()
+
+        single = await service.predict(2, "ES=F", "2024-01-01", "2024-12-31")
+        batch = await service.predict_batch([("ES=F", 1), ("ES=F", 2)], "2024-01-01", "2024-12-31")
+
+        assert single == {"success": False, "error": "Model 2 is archived; its artifact has been removed"}
+        assert [r["success"] for r in batch["results"]] == [True, False]
+        assert batch["results"][1]["error"] == single["error"]
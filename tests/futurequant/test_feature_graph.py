@@ -0,0 +1,101 @@
+"""
+Tests for the compiled feature graph
+"""
+import numpy as np
+import pandas as pd
+
+from app.services.futurequant import feature_graph
+from app.services.futurequant.feature_graph import HIGH, TRUE_RANGE, compile_recipe, rmax
+
+from .conftest import make_bars
+
+
+class TestCompile:
+    """Shared intermediates and output layout"""
+
+    def test_intermediates_are_shared(self):
+        plan = compile_recipe(["stoch", "williams_r", "donchian", "fibonacci", "atr", "adx"], [20])
+
+        assert len(plan.nodes) == len(set(plan.nodes))
+        assert plan.nodes.count(rmax(HIGH, 20)) == 1
+        assert plan.nodes.count(TRUE_RANGE) == 1
+        # Dependencies come before the nodes that use them
+        assert plan.nodes.index(TRUE_RANGE) < plan.nodes.index(("mean", TRUE_RANGE, 20))
+
+    def test_output_columns_follow_recipe_order(self):
+        plan = compile_recipe(["returns", "bbands", "returns"], [5, 20])
+
+        assert plan.columns == [
+            "return_5d", "return_20d",
+            "bb_upper_5", "bb_lower_5", "bb_width_5", "bb_position_5",
+            "bb_upper_20", "bb_lower_20", "bb_width_20", "bb_position_20",
+        ]
+
+    def test_unknown_feature_types_are_ignored(self):
+        assert compile_recipe(["price_range"], [5]).columns == []
+
+
+class TestEvaluate:
+    """Values match the pandas definitions"""
+
+    def test_matches_pandas(self):
+        bars = make_bars()
+        features = compile_recipe(["rsi", "atr", "bbands", "vwap"], [14]).evaluate(bars)
+
+        delta = bars["close"].diff()
+        gain = delta.where(delta > 0, 0).rolling(14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+        pd.testing.assert_series_equal(features["rsi_14"], 100 - 100 / (1 + gain / loss), check_names=False)
+
+        tr = pd.concat([
+            bars["high"] - bars["low"],
+            (bars["high"] - bars["close"].shift()).abs(),
+            (bars["low"] - bars["close"].shift()).abs(),
+        ], axis=1).max(axis=1)
+        pd.testing.assert_series_equal(features["atr_14"], tr.rolling(14).mean(), check_names=False)
+
+        typical = (bars["high"] + bars["low"] + bars["close"]) / 3
+        vwap = (typical * bars["volume"]).rolling(14).sum() / bars["volume"].rolling(14).sum()
+        pd.testing.assert_series_equal(features["vwap_14"], vwap, check_names=False)
+
+    def test_one_float_frame_indexed_like_bars(self):
+        bars = make_bars(periods=120)
+        features = compile_recipe(["macd", "obv", "money_flow", "volume_ratio"], [20]).evaluate(bars)
+
+        assert features.index.equals(bars.index)
+        assert set(features.dtypes) == {np.dtype("float64")}
+        assert features["mfi_20"].iloc[20:].notna().all()
+        assert features["volume_ratio_20"].iloc[19:].notna().all()
+
+    def test_each_node_is_evaluated_once(self, monkeypatch):
+        calls = []
+        rolling = feature_graph._rolling
+        monkeypatch.setattr(feature_graph, "_rolling", lambda op, values, window, *args: calls.append(
+            (op, window) + args) or rolling(op, values, window, *args))
+
+        compile_recipe(["stoch", "williams_r", "donchian", "support_resistance"], [20]).evaluate(make_bars())
+
+        assert len(calls) == len(set(calls))
+        assert calls.count(("max", 20)) == 1
+
+
+class TestWarmup:
+    """Bars of history each plan needs before a row"""
+
+    def test_lookbacks_add_along_dependencies(self):
+        # std of 1-bar returns needs p + 1 bars; its 2p rolling mean needs 2p - 1 more
+        assert compile_recipe(["volatility_regime"], [20]).warmup == 1 + 19 + 39
+        assert compile_recipe(["log_returns"], [5]).warmup == 5
+        # MACD signal: EMA(9) of EMA(26), both truncated after ten spans
+        assert compile_recipe(["macd"], []).warmup == 10 * 26 + 10 * 9
+
+    def test_values_after_warmup_match_full_history(self):
+        bars = make_bars(periods=500)
+        plan = compile_recipe(["cci", "adx", "tail_risk", "volatility_regime", "macd"], [14, 20])
+        window = bars.iloc[-(plan.warmup + 1):]
+
+        full, tail = plan.evaluate(bars).iloc[-1], plan.evaluate(window).iloc[-1]
+        pd.testing.assert_series_equal(tail, full, rtol=1e-7)
+
+    def test_obv_is_cumulative(self):
+        assert compile_recipe(["obv", "vwap"], [20]).cumulative_columns == ["obv"]
@@ -0,0 +1,201 @@
+"""
+Tests for the columnar feature store and its JSON row migration
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.models.trading_models import Bar, Feature
+from app.services.futurequant import feature_service, feature_store
+from app.services.futurequant.feature_service import FutureQuantFeatureService
+from app.services.futurequant.feature_store import FeatureStore, load_features
+
+pytest.importorskip("pyarrow")
+
+
+def make_features(periods=400, freq="D", start="2023-01-02", columns=("rsi_14", "atr_14", "obv"), seed=2):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq=freq, tz="UTC", name="timestamp")
+    return pd.DataFrame(rng.normal(size=(periods, len(columns))), index=index, columns=list(columns))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = FeatureStore(str(tmp_path / "features"))
+    monkeypatch.setattr(settings, "feature_store_enabled", True)
+    monkeypatch.setattr(feature_store, "_feature_store", store)
+    return store
+
+
+class TestFeatureStore:
+    """Feature matrices round-trip as column blocks"""
+
+    def test_round_trip_with_projection_and_range(self, store):
+        features = make_features()
+        store.write_features("ES=F", "full", "1d-abc", features.assign(close=1.0), replace=True)
+
+        df = store.read_features("ES=F", "2023-03-01", "2023-06-30", columns=["atr_14"])
+
+        expected = features.loc["2023-03-01":"2023-06-30", ["atr_14"]]
+        assert list(df.columns) == ["symbol", "atr_14"]
+        pd.testing.assert_frame_equal(df.drop(columns="symbol"), expected, check_freq=False)
+        # Daily data is one file per year, minute data one per month
+        assert store.get_stats()["ES=F"]["full"] == {"version": "1d-abc", "partitions": 2}
+        store.write_features("NQ=F", "full", "1m-abc", make_features(periods=5000, freq="min"), replace=True)
+        assert store.get_stats()["NQ=F"]["full"]["partitions"] == 1
+
+    def test_merge_keeps_newer_rows(self, store):
+        features = make_features(periods=100)
+        store.write_features("ES=F", "full", "v1", features.iloc[:60], replace=True)
+        update = features.iloc[50:] + 1.0
+        store.write_features("ES=F", "full", "v1", update)
+
+        df = store.read_features("ES=F").drop(columns="symbol")
+
+        pd.testing.assert_frame_equal(df, pd.concat([features.iloc[:50], update]), check_freq=False)
+
+    def test_replace_swaps_the_version_and_moves_current(self, store):
+        store.write_features("ES=F", "full", "v1", make_features(periods=100), replace=True)
+        store.write_features("ES=F", "full", "v1", make_features(periods=10, start="2024-06-03"), replace=True)
+        assert len(store.read_features("ES=F")) == 10
+
+        store.write_features("ES=F", "volume", "v1", make_features(periods=5, columns=["obv"]), replace=True)
+        store.write_features("ES=F", "full", "v2", make_features(periods=20), replace=True)
+        assert store.recipes("ES=F") == ["full", "volume"]
+        assert store.current_version("ES=F", "full") == "v2"
+        assert len(store.read_features("ES=F")) == 20
+        assert list(store.read_features("ES=F", recipe="volume").columns) == ["symbol", "obv"]
+
+    def test_multiple_symbols(self, store):
+        store.write_features("ES=F", "full", "v1", make_features(periods=30), replace=True)
+        store.write_features("GC=F", "full", "v1", make_features(periods=30, start="2023-01-10"), replace=True)
+
+        df = store.read_features(["ES=F", "GC=F", "CL=F"], columns=["rsi_14"])
+
+        assert list(df["symbol"].cat.categories) == ["ES=F", "GC=F"]
+        assert df.index.is_monotonic_increasing and len(df) == 60
+        with pytest.raises(ValueError):
+            store.read_features("ES=F", columns=["missing"])
+
+
+@pytest.fixture
+def tickers():
+    return ["ES=F", "GC=F"]
+
+
+@pytest.fixture
+def db(db, store, registry, thread_executor, monkeypatch):
+    monkeypatch.setattr(settings, "bar_store_enabled", False)
+    monkeypatch.setattr(feature_service, "SessionLocal", lambda: db)
+    return db
+
+
+def add_feature_rows(db):
+    start = datetime(2024, 1, 1)
+    for day in range(30):
+        timestamp = start + timedelta(days=day)
+        db.add(Feature(symbol_id=1, timestamp=timestamp,
+                       payload={"recipe_name": "momentum", "features": {"rsi_14": day, "cci_14": -day}}))
+        db.add(Feature(symbol_id=1, timestamp=timestamp,
+                       payload={"recipe_name": "volume", "features": {"obv": 10.0 * day}}))
+        # Legacy rows keep the values next to the metadata
+        db.add(Feature(symbol_id=2, timestamp=timestamp, payload={"feature_type": "technical_indicators", "rsi": day}))
+    db.commit()
+
+
+class TestMigration:
+    """JSON rows are flattened into the store layout"""
+
+    def test_fallback_reads_json_rows(self, db):
+        add_feature_rows(db)
+
+        df = load_features(db, ["ES=F", "GC=F"], "2024-01-10", "2024-01-19")
+
+        assert len(df) == 20 and set(df["symbol"]) == {"ES=F", "GC=F"}
+        # The most recently written recipe of each symbol; other recipes' keys are left out
+        assert list(df.columns) == ["symbol", "obv", "rsi"]
+        assert list(df.loc[df["symbol"] == "ES=F", "obv"]) == [10.0 * day for day in range(9, 19)]
+        momentum = load_features(db, ["ES=F"], recipe="momentum", columns=["cci_14"])
+        assert list(momentum.columns) == ["symbol", "cci_14"] and momentum["cci_14"].iloc[-1] == -29
+
+    def test_migrate_then_read_from_store(self, db, store):
+        add_feature_rows(db)
+        before = load_features(db, ["ES=F"], recipe="momentum")
+
+        migrated = store.migrate_from_database(db, delete_rows=True)
+
+        assert migrated == {"ES=F": 60, "GC=F": 30}
+        assert db.query(Feature).count() == 0
+        assert store.current_version("ES=F", "momentum") == "migrated"
+        pd.testing.assert_frame_equal(load_features(db, ["ES=F"], recipe="momentum"), before, check_freq=False)
+        assert list(load_features(db, ["GC=F"]).columns) == ["symbol", "rsi"]
+
+    def test_mixed_sources(self, db, store):
+        add_feature_rows(db)
+        store.migrate_from_database(db, ["ES=F"], delete_rows=True)
+
+        df = load_features(db, ["ES=F", "GC=F"], "2024-01-10", "2024-01-19")
+
+        # ES=F comes from the store, GC=F from its JSON rows
+        assert list(df["symbol"].cat.categories) == ["ES=F", "GC=F"]
+        assert df["symbol"].value_counts().to_dict() == {"ES=F": 10, "GC=F": 10}
+        assert df.index.is_monotonic_increasing
+        assert list(df.loc[df["symbol"] == "GC=F", "rsi"]) == list(range(9, 19))
+
+
+def add_bars(db, periods):
+    rng = np.random.default_rng(4)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    start = datetime(2022, 1, 3)
+    db.add_all([
+        Bar(symbol_id=1, timestamp=start + timedelta(days=day), interval="1d", open=c, high=c * 1.01, low=c * 0.99,
+            close=c, volume=1000 + day)
+        for day, c in enumerate(close)
+    ])
+    db.commit()
+
+
+class TestComputeFeatures:
+    """compute_features writes feature matrices to the store"""
+
+    @pytest.mark.asyncio
+    async def test_full_run_writes_one_block(self, db, store):
+        add_bars(db, 150)
+
+        result = await FutureQuantFeatureService().compute_features(1, "volume", "2022-01-01", "2030-01-01",
+                                                                    interval="1d")
+
+        assert result["stored_count"] == 150
+        assert db.query(Feature).count() == 0
+        stored = load_features(db, ["ES=F"], recipe="volume")
+        assert len(stored) == 150 and "obv" in stored.columns and "close" not in stored.columns
+
+    @pytest.mark.asyncio
+    async def test_update_merges_into_the_version(self, db, store):
+        service = FutureQuantFeatureService()
+        add_bars(db, 150)
+        await service.compute_features(1, "volume", "2022-01-01", "2022-05-20", interval="1d")
+        update = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d")
+        updated = store.read_features("ES=F")
+        await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d", full_refresh=True)
+        refreshed = store.read_features("ES=F")
+
+        assert update["mode"] == "incremental" and len(updated) == 150
+        raw = [c for c in refreshed.columns if c != "symbol" and not c.endswith("_normalized")]
+        pd.testing.assert_frame_equal(updated[raw], refreshed[raw], rtol=1e-7)
+
+    @pytest.mark.asyncio
+    async def test_state_from_json_rows_recomputes(self, db, store, monkeypatch):
+        service = FutureQuantFeatureService()
+        add_bars(db, 150)
+        monkeypatch.setattr(settings, "feature_store_enabled", False)
+        await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d")
+        monkeypatch.setattr(settings, "feature_store_enabled", True)
+
+        result = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d")
+
+        assert result["mode"] == "full"
+        assert len(store.read_features("ES=F")) == 150
@@ -0,0 +1,167 @@
+"""
+Tests for hyperparameter sweeps
+"""
+import signal
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.futurequant import hyperparam_sweep
+from app.services.futurequant.hyperparam_sweep import (
+    FutureQuantSweepService, TrialLimits, TrialTimedOut, halving_budgets, grid_points, mean_pinball_loss,
+    median_curve, run_trial, sample_params, validate_space
+)
+
+
+def make_data(rows=600, features=4, seed=3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    y = X[:, 0] * 0.02 + rng.normal(0, 0.01, rows)
+    return X, y
+
+
+class TestSpace:
+    """Declared spaces, sampling and the halving schedule"""
+
+    def test_grid_covers_every_combination(self):
+        points = grid_points({"alpha": [0.0, 0.1], "solver": {"values": ["highs", "highs-ds", "highs-ipm"]}})
+
+        assert len(points) == 6
+        assert {"alpha": 0.1, "solver": "highs-ipm"} in points
+
+    def test_invalid_spaces(self):
+        with pytest.raises(ValueError, match="Grid search needs a list"):
+            validate_space({"alpha": {"low": 0.0, "high": 1.0}}, "grid")
+        with pytest.raises(ValueError, match="low > 0"):
+            validate_space({"lr": {"low": 0.0, "high": 1.0, "log": True}}, "random")
+        with pytest.raises(ValueError, match="Invalid strategy"):
+            validate_space({"alpha": [0.1]}, "bayesian")
+
+    def test_samples_stay_in_range_and_repeat_with_seed(self):
+        space = {"lr": {"low": 1e-4, "high": 1e-1, "log": True}, "depth": {"low": 2, "high": 8, "type": "int"},
+                 "solver": ["highs", "highs-ds"]}
+
+        samples = [sample_params(space, np.random.default_rng(7)) for _ in range(2)]
+        many = [sample_params(space, np.random.default_rng(seed)) for seed in range(200)]
+
+        assert samples[0] == samples[1]
+        assert all(1e-4 <= s["lr"] <= 1e-1 and isinstance(s["depth"], int) and 2 <= s["depth"] <= 8 for s in many)
+        # Log-uniform: about a third of the samples fall in each decade
+        assert 40 < sum(s["lr"] < 1e-3 for s in many) < 95
+
+    def test_halving_budgets(self):
+        assert halving_budgets(27, 3) == pytest.approx([1 / 27, 1 / 9, 1 / 3, 1.0])
+        assert halving_budgets(8, 2) == pytest.approx([1 / 8, 1 / 4, 1 / 2, 1.0])
+        assert halving_budgets(1, 3) == [1.0]
+
+
+class TestScoring:
+    """Pinball loss and the pruning reference curve"""
+
+    def test_mean_pinball_loss(self):
+        y = np.array([1.0, 2.0])
+        outputs = {name: np.zeros(2) for name in ("q10", "q50", "q90")}
+
+        # Under-prediction by e costs q * e at each quantile
+        assert mean_pinball_loss(y, outputs) == pytest.approx(np.mean([0.1, 0.5, 0.9]) * 1.5)
+
+    def test_median_curve_needs_enough_trials(self):
+        curves = [[1.0, 0.8, 0.6], [2.0, 1.0], [3.0, 1.2, 0.9, 0.1]]
+
+        assert median_curve(curves) == [2.0, 1.0]
+        assert median_curve(curves[:2]) == []
+
+
+@pytest.fixture
+def service(thread_executor, monkeypatch):
+    pytest.importorskip("torch")
+    from app.services.futurequant.model_service import FutureQuantModelService
+    X, y = make_data()
+
+    async def prepare(self, db, symbol, start_date, end_date, horizon_minutes, test_size):
+        split = int(len(X) * (1 - test_size))
+        return X[:split], y[:split], X[split:], y[split:]
+
+    monkeypatch.setattr(FutureQuantModelService, "_prepare_training_data", prepare)
+    monkeypatch.setattr(hyperparam_sweep, "get_db", lambda: iter([SimpleNamespace(close=lambda: None)]))
+    return FutureQuantSweepService()
+
+
+class TestRunSweep:
+    """End-to-end sweeps over quantile regression"""
+
+    @pytest.mark.asyncio
+    async def test_successive_halving_promotes_the_best(self, service):
+        events = []
+
+        async def on_progress(summary):
+            events.append(summary)
+
+        result = await service.run_sweep(
+            "ES=F", "quantile_regression", {"alpha": {"low": 1e-4, "high": 1.0, "log": True}},
+            strategy="successive_halving", n_trials=9, eta=3, seed=0, on_progress=on_progress
+        )
+
+        assert result["success"], result.get("error")
+        assert result["trial_counts"] == {"completed": 1, "pruned": 8, "failed": 0, "timed_out": 0}
+        assert [e["rung"] for e in events].count(0) == 9 and len(events) == 13
+        assert events[-1]["done"] == events[-1]["total"] == 13
+        best = result["trials"][result["best_trial"]]
+        assert [rung["rows"] for rung in best["rungs"]] == [100, 128, 384]
+        # Each rung keeps the best third of the one before it
+        rung0 = sorted(result["trials"], key=lambda t: t["rungs"][0]["loss"])
+        assert {t["trial"] for t in rung0[:3]} == {t["trial"] for t in result["trials"] if len(t["rungs"]) > 1}
+        assert result["test_metrics"]["pinball_loss"] > 0 and result["mlflow_run_id"] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_trials_do_not_stop_the_grid(self, service):
+        result = await service.run_sweep(
+            "ES=F", "quantile_regression", {"alpha": [0.0, 0.01], "solver": ["highs", "no-such-solver"]},
+            strategy="grid", max_parallel=2
+        )
+
+        assert result["success"], result.get("error")
+        assert result["trial_counts"]["completed"] == 2 and result["trial_counts"]["failed"] == 2
+        assert result["best_params"]["solver"] == "highs"
+
+
+class TestPruning:
+    """Transformer trials stop once they fall behind the median curve"""
+
+    def test_trial_behind_the_median_is_pruned(self):
+        pytest.importorskip("torch")
+        X, y = make_data(rows=300)
+
+        result = run_trial("transformer", 1440, {"epochs": 20, "batch_size": 64, "d_model": 16, "n_heads": 2,
+                                                 "n_layers": 1, "patience": 50},
+                           X[:240], y[:240], X[240:], y[240:], prune_curve=[0.0] * 20)
+
+        assert result["status"] == "pruned" and len(result["curve"]) == hyperparam_sweep.PRUNE_WARMUP_EPOCHS
+
+
+class TestTimeouts:
+    """The trial budget is enforced inside the trial, from its start"""
+
+    @pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM timers")
+    def test_worker_timer_interrupts_the_trial(self, monkeypatch):
+        monkeypatch.setattr(hyperparam_sweep, "_in_worker_process", lambda: True)
+
+        started = time.perf_counter()
+        with pytest.raises(TrialTimedOut):
+            with hyperparam_sweep._trial_deadline(0.05):
+                while time.perf_counter() - started < 5:
+                    time.sleep(0.01)
+
+        assert time.perf_counter() - started < 1
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+    def test_trial_over_budget_is_timed_out(self):
+        pytest.importorskip("torch")
+        X, y = make_data(rows=300)
+
+        result = run_trial("quantile_regression", 1440, {"alpha": 0.0}, X[:240], y[:240], X[240:], y[240:],
+                           limits=TrialLimits(timeout=1e-9))
+
+        assert result["status"] == "timed_out" and result["loss"] is None
@@ -0,0 +1,125 @@
+"""
+Tests for incremental feature computation from a stored warm-up state
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.models.trading_models import Bar, Feature, FeatureState
+from app.services.futurequant import feature_service
+from app.services.futurequant.feature_service import FutureQuantFeatureService
+
+from .conftest import make_bars
+
+
+class TestFeatureUpdate:
+    """Updating from a state matches recomputing the whole history"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("recipe_name", ["full", "volume", "distribution"])
+    async def test_update_matches_full_computation(self, recipe_name):
+        service = FutureQuantFeatureService()
+        recipe, params = service.feature_recipes[recipe_name], dict(service.default_params)
+        bars = make_bars(periods=700)
+        _, state = await service._compute_feature_update(bars.iloc[:-5], recipe, params)
+
+        window = bars[bars.index >= pd.Timestamp(state["resume_from"])]
+        update, _ = await service._compute_feature_update(window, recipe, params, state)
+        full = await service._compute_feature_set(bars, recipe, params)
+
+        assert list(update.index) == list(bars.index[-6:])
+        raw = [c for c in update.columns if not c.endswith("_normalized")]
+        pd.testing.assert_frame_equal(update[raw], full[raw].iloc[-6:], rtol=1e-7)
+        # Normalized with the statistics of the first computation
+        for column, stats in state["normalization"].items():
+            expected = (update[column] - stats[0]) / stats[1] if stats else 0.0 * update[column]
+            np.testing.assert_allclose(update[f"{column}_normalized"], expected, rtol=1e-9, atol=1e-12)
+
+    @pytest.mark.asyncio
+    async def test_state_tracks_warmup_and_anchors(self):
+        service = FutureQuantFeatureService()
+        bars = make_bars(periods=400)
+        features, state = await service._compute_feature_update(
+            bars, service.feature_recipes["full"], dict(service.default_params)
+        )
+
+        assert state["warmup"] == 350
+        assert pd.Timestamp(state["resume_from"]) == bars.index[-351]
+        assert pd.Timestamp(state["last_timestamp"]) == bars.index[-1]
+        assert state["anchors"] == {"obv": pytest.approx(features["obv"].iloc[-2])}
+
+
+@pytest.fixture
+def db(db, registry, thread_executor, monkeypatch):
+    monkeypatch.setattr(settings, "bar_store_enabled", False)
+    monkeypatch.setattr(settings, "feature_store_enabled", False)
+    monkeypatch.setattr(feature_service, "SessionLocal", lambda: db)
+    return db
+
+
+def add_bars(db, bars):
+    db.add_all([
+        Bar(symbol_id=1, timestamp=timestamp.to_pydatetime(), interval="1d", open=row.open, high=row.high,
+            low=row.low, close=row.close, volume=int(row.volume))
+        for timestamp, row in bars.iterrows()
+    ])
+    db.commit()
+
+
+def stored_timestamps(db):
+    return [pd.Timestamp(t) for (t,) in db.query(Feature.timestamp).order_by(Feature.timestamp)]
+
+
+class TestComputeFeatures:
+    """compute_features resumes from the stored state"""
+
+    @pytest.mark.asyncio
+    async def test_second_run_only_computes_new_bars(self, db):
+        service = FutureQuantFeatureService()
+        bars = make_bars(periods=200)
+        add_bars(db, bars.iloc[:-3])
+
+        first = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d")
+        add_bars(db, bars.iloc[-3:])
+        second = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d")
+
+        assert (first["mode"], first["stored_count"]) == ("full", 197)
+        # The last computed bar is recomputed with the new ones
+        assert (second["mode"], second["stored_count"]) == ("incremental", 4)
+        timestamps = stored_timestamps(db)
+        assert len(timestamps) == 200 and len(set(timestamps)) == 200
+        state = db.query(FeatureState).one()
+        assert pd.Timestamp(state.state["last_timestamp"]) == bars.index[-1]
+
+    @pytest.mark.asyncio
+    async def test_changed_params_or_full_refresh_recompute_everything(self, db):
+        service = FutureQuantFeatureService()
+        add_bars(db, make_bars(periods=150))
+        await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d")
+
+        changed = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01",
+                                                 custom_params={"normalize_features": False}, interval="1d")
+        refreshed = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01", interval="1d",
+                                                   full_refresh=True)
+        earlier_start = await service.compute_features(1, "volume", "2021-01-01", "2030-01-01", interval="1d")
+
+        assert [changed["mode"], refreshed["mode"], earlier_start["mode"]] == ["full", "full", "full"]
+        assert db.query(FeatureState).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_native_interval_has_one_state_row(self, db):
+        service = FutureQuantFeatureService()
+        bars = make_bars(periods=150)
+        add_bars(db, bars.iloc[:-3])
+        await service.compute_features(1, "volume", "2022-01-01", "2030-01-01")
+        add_bars(db, bars.iloc[-3:])
+        second = await service.compute_features(1, "volume", "2022-01-01", "2030-01-01")
+
+        state = db.query(FeatureState).one()
+        assert (state.interval, second["mode"]) == ("native", "incremental")
+        db.add(FeatureState(symbol_id=1, recipe_name="volume", last_timestamp=state.last_timestamp, state={}))
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
@@ -0,0 +1,151 @@
+"""
+Tests for incremental, concurrent bar ingestion
+"""
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.models.trading_models import Symbol, Bar
+from app.services.futurequant import bar_ingest
+from app.services.futurequant.data_service import FutureQuantDataService
+from app.services.futurequant.ingest_scheduler import FileBarSource, IngestScheduler
+
+SYMBOLS = ["ES=F", "GC=F", "CL=F"]
+
+
+def write_daily_csv(root, symbol, days=10):
+    index = pd.date_range("2024-03-01", periods=days, freq="D", tz="UTC", name="timestamp")
+    close = 100.0 + np.arange(days)
+    pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000,
+    }, index=index).to_csv(root / f"{symbol}_1d.csv")
+
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "bar_store_enabled", False)
+    monkeypatch.setattr(bar_ingest, "_indexed_databases", set())
+    return session_factory
+
+
+@pytest.fixture
+def service(tmp_path, session_factory):
+    service = FutureQuantDataService(source=FileBarSource(str(tmp_path)), session_factory=session_factory)
+    db = session_factory()
+    for symbol in SYMBOLS:
+        write_daily_csv(tmp_path, symbol)
+        config = service.default_symbols[symbol]
+        db.add(Symbol(ticker=symbol, venue=config["venue"], asset_class=config["asset_class"],
+                      point_value=config["point_value"], tick_size=config["tick_size"]))
+    db.commit()
+    db.close()
+    return service
+
+
+class TestIncrementalIngest:
+    """Only missing tails are fetched"""
+
+    @pytest.mark.asyncio
+    async def test_second_run_fetches_nothing(self, service, session_factory):
+        first = await service.ingest_data(SYMBOLS, "2024-03-01", "2024-03-11")
+        requests = service.source.requests
+        second = await service.ingest_data(SYMBOLS, "2024-03-01", "2024-03-11")
+
+        assert all(r["inserted"] == 10 for r in first["results"].values())
+        assert all(r["status"] == "up_to_date" for r in second["results"].values())
+        assert service.source.requests == requests
+        assert session_factory().query(Bar).count() == 30
+
+    @pytest.mark.asyncio
+    async def test_extending_the_range_fetches_the_tail(self, service):
+        await service.ingest_data(["ES=F"], "2024-03-01", "2024-03-06")
+        result = (await service.ingest_data(["ES=F"], "2024-03-01", "2024-03-11"))["results"]["ES=F"]
+
+        assert result["fetched_from"].startswith("2024-03-05")
+        assert (result["bars_count"], result["inserted"], result["skipped"]) == (6, 5, 1)
+
+    @pytest.mark.asyncio
+    async def test_full_refresh_fetches_everything(self, service):
+        await service.ingest_data(["ES=F"], "2024-03-01", "2024-03-11")
+        result = await service.ingest_data(["ES=F"], "2024-03-01", "2024-03-11", full_refresh=True)
+
+        assert result["results"]["ES=F"]["skipped"] == 10
+
+
+class TestPlan:
+    """Which symbols are fetched, and from where"""
+
+    def test_last_bar_is_refetched_once_the_window_passes_it(self, service):
+        scheduler = IngestScheduler(service.source, service._store_symbol_bars,
+                                    session_factory=service._session_factory)
+        last = {"ES=F": pd.Timestamp("2024-03-10", tz="UTC")}
+
+        # The last daily bar ends at the window end: not fetched, even if it was partial
+        assert scheduler.plan(["ES=F"], "2024-03-01", "2024-03-11", "1d", last) == ([], ["ES=F"])
+        batches, up_to_date = scheduler.plan(["ES=F"], "2024-03-01", "2024-03-12", "1d", last)
+        assert [(b.symbols, b.start) for b in batches] == [(["ES=F"], last["ES=F"])] and up_to_date == []
+
+
+class SlowSource(FileBarSource):
+    """Records how many fetches overlap"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, symbols, start, end, interval):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return super().fetch(symbols, start, end, interval)
+
+
+class TestScheduling:
+    """Batches, concurrency cap and rate budget"""
+
+    @pytest.mark.asyncio
+    async def test_batches_symbols_per_request(self, service):
+        scheduler = IngestScheduler(service.source, service._store_symbol_bars,
+                                    session_factory=service._session_factory, batch_size=2)
+        await scheduler.run(SYMBOLS, "2024-03-01", "2024-03-11", "1d")
+
+        assert service.source.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self, tmp_path, session_factory):
+        symbols = [f"S{i}" for i in range(6)]
+        source = SlowSource(str(tmp_path))
+        stored = []
+
+        async def store(symbol, data, interval):
+            stored.append(symbol)
+            return {"inserted": len(data), "updated": 0, "skipped": 0}
+
+        for symbol in symbols:
+            write_daily_csv(tmp_path, symbol)
+        scheduler = IngestScheduler(source, store, session_factory=session_factory, concurrency=2,
+                                    requests_per_second=0, batch_size=1)
+        results = await scheduler.run(symbols, "2024-03-01", "2024-03-11", "1d")
+
+        assert source.peak == 2
+        assert sorted(stored) == symbols
+        assert all(r["status"] == "success" for r in results.values())
+
+    @pytest.mark.asyncio
+    async def test_rate_budget_spaces_requests(self, service):
+        scheduler = IngestScheduler(service.source, service._store_symbol_bars,
+                                    session_factory=service._session_factory, concurrency=3,
+                                    requests_per_second=20, batch_size=1)
+        started = time.monotonic()
+        await scheduler.run(SYMBOLS, "2024-03-01", "2024-03-11", "1d")
+
+        assert time.monotonic() - started >= 0.1
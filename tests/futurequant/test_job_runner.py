@@ -0,0 +1,118 @@
+"""
+Tests for the durable background job runner
+"""
+import asyncio
+
+import pytest
+
+from app.services.futurequant.job_runner import (
+    JobRunner, JobError, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED, JOB_PENDING, PRIORITY_HIGH, PRIORITY_LOW
+)
+
+from .conftest import make_session_factory
+
+
+class TestJobRunner:
+    """Jobs are persisted, prioritised, limited per kind and retried"""
+
+    @pytest.mark.asyncio
+    async def test_runs_jobs_with_progress_and_result(self):
+        runner = JobRunner(workers=2, session_factory=make_session_factory())
+
+        async def handler(ctx):
+            await ctx.progress(50, "halfway", samples_per_sec=10.0)
+            return {"success": True, "doubled": ctx.params["value"] * 2}
+
+        runner.register("double", handler)
+        job_id = await runner.submit("double", {"value": 21})
+        job = await runner.wait(job_id, timeout=5)
+        await runner.stop()
+
+        assert job["status"] == JOB_COMPLETED
+        assert job["result"]["doubled"] == 42
+        assert job["progress"] == 100.0
+        assert job["metrics"] == {"samples_per_sec": 10.0}
+        assert job["attempts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_priority(self):
+        runner = JobRunner(workers=4, concurrency={"train": 1}, session_factory=make_session_factory())
+        order = []
+        active = 0
+        peak = 0
+
+        async def handler(ctx):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            order.append(ctx.params["name"])
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        runner.register("train", handler)
+        normal = await runner.submit("train", {"name": "normal"})
+        low = await runner.submit("train", {"name": "low"}, priority=PRIORITY_LOW)
+        high = await runner.submit("train", {"name": "high"}, priority=PRIORITY_HIGH)
+        for job_id in (normal, low, high):
+            await runner.wait(job_id, timeout=5)
+        await runner.stop()
+
+        assert peak == 1
+        assert order == ["high", "normal", "low"]
+
+    @pytest.mark.asyncio
+    async def test_retries_then_fails(self):
+        runner = JobRunner(workers=1, max_retries=1, retry_backoff=0.01, session_factory=make_session_factory())
+        calls = []
+
+        async def flaky(ctx):
+            calls.append(ctx.attempt)
+            raise RuntimeError("data source down")
+
+        async def invalid(ctx):
+            raise JobError("bad symbol", retryable=False)
+
+        runner.register("flaky", flaky)
+        runner.register("invalid", invalid)
+        flaky_job = await runner.wait(await runner.submit("flaky"), timeout=5)
+        invalid_job = await runner.wait(await runner.submit("invalid"), timeout=5)
+        await runner.stop()
+
+        assert calls == [1, 2]
+        assert flaky_job["status"] == JOB_FAILED
+        assert flaky_job["error"] == "data source down"
+        assert invalid_job["status"] == JOB_FAILED
+        assert invalid_job["attempts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_resume_after_restart(self):
+        session_factory = make_session_factory()
+        runner = JobRunner(workers=1, session_factory=session_factory)
+        release = asyncio.Event()
+
+        async def blocking(ctx):
+            await release.wait()
+            return {"success": True}
+
+        runner.register("block", blocking)
+        running = await runner.submit("block")
+        queued = await runner.submit("block")
+        await asyncio.sleep(0.05)
+
+        assert await runner.cancel(queued) is True
+        assert runner.get_job(queued)["status"] == JOB_CANCELLED
+
+        # Shutting down leaves the running job pending for the next start
+        await runner.stop()
+        assert runner.get_job(running)["status"] == JOB_PENDING
+
+        restarted = JobRunner(workers=1, session_factory=session_factory)
+        restarted.register("block", blocking)
+        release.set()
+        await restarted.start()
+        job = await restarted.wait(running, timeout=5)
+        await restarted.stop()
+
+        assert job["status"] == JOB_COMPLETED
+        assert job["attempts"] == 2
+        assert restarted.get_job(queued)["status"] == JOB_CANCELLED
@@ -0,0 +1,110 @@
+"""
+Tests for the loaded-model cache
+"""
+import asyncio
+import os
+
+import joblib
+import pytest
+
+from app.models.trading_models import Model
+from app.services.futurequant import model_cache
+from app.services.futurequant.model_cache import ModelCache
+
+pytestmark = pytest.mark.usefixtures("thread_executor")
+
+
+def write_artifact(tmp_path, name, size=1000, mtime=None):
+    path = str(tmp_path / f"{name}.joblib")
+    joblib.dump({"type": "quantile_regression", "name": name, "weights": b"x" * size}, path)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+class TestModelCache:
+    """Artifacts stay loaded until evicted, replaced or invalidated"""
+
+    @pytest.mark.asyncio
+    async def test_hit_and_reload_on_new_mtime(self, tmp_path):
+        cache = ModelCache()
+        path = write_artifact(tmp_path, "a", mtime=1_000_000_000)
+
+        first = await cache.get(1, path)
+        assert await cache.get(1, path) is first
+        write_artifact(tmp_path, "a", mtime=2_000_000_000)
+        reloaded = await cache.get(1, path)
+
+        assert reloaded is not first and reloaded["name"] == "a"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["loads"]) == (1, 2, 2)
+        # The artifact at its old mtime is dropped, not left to age out
+        assert stats["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_byte_budget_evicts_least_recently_used(self, tmp_path):
+        paths = {model_id: write_artifact(tmp_path, str(model_id), size=4000) for model_id in (1, 2, 3)}
+        cache = ModelCache(max_bytes=os.path.getsize(paths[1]) * 2 + 100)
+
+        await cache.get(1, paths[1])
+        await cache.get(2, paths[2])
+        await cache.get(1, paths[1])
+        await cache.get(3, paths[3])
+        await cache.get(1, paths[1])
+        await cache.get(2, paths[2])
+
+        stats = cache.get_stats()
+        assert stats["evictions"] == 2
+        assert stats["loads"] == 4 and stats["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, tmp_path):
+        cache = ModelCache()
+        path = write_artifact(tmp_path, "a")
+
+        models = await asyncio.gather(*(cache.get(7, path) for _ in range(5)))
+
+        assert all(model is models[0] for model in models)
+        assert cache.loads == 1 and cache.get_stats()["coalesced"] == 4
+
+
+@pytest.fixture
+def tickers():
+    return []
+
+
+@pytest.fixture
+def db(db, session_factory, tmp_path, monkeypatch):
+    for name, status in (("old", "completed"), ("new", "active"), ("failed", "failed"), ("big", "completed")):
+        db.add(Model(name=name, artifact_uri=write_artifact(tmp_path, name, size=50_000 if name == "big" else 100),
+                     params={}, status=status))
+        db.commit()
+    monkeypatch.setattr(model_cache, "_model_cache", ModelCache(max_bytes=20_000))
+    return db, session_factory
+
+
+class TestRegistryIntegration:
+    """Warm-up from the models table and invalidation on ORM changes"""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_serving_models_that_fit(self, db):
+        session, sessions = db
+
+        loaded = await model_cache.get_model_cache().warm_up(session_factory=sessions)
+
+        assert loaded == 2
+        assert model_cache.get_model_cache().get_stats()["entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_status_change_invalidates(self, db):
+        session, _ = db
+        cache = model_cache.get_model_cache()
+        model = session.query(Model).filter(Model.name == "new").one()
+        await model_cache.load_model(model.id, model.artifact_uri)
+
+        model.status = "archived"
+        session.commit()
+
+        assert cache.get_stats()["entries"] == 0
+        await model_cache.load_model(model.id, model.artifact_uri)
+        assert cache.loads == 2
@@ -0,0 +1,118 @@
+"""
+Tests for the in-memory symbol registry and the loaders that use it
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.models.trading_models import Symbol, Bar, Feature, Forecast, Model, Strategy
+from app.services.futurequant import symbol_registry
+from app.services.futurequant.backtest_service import FutureQuantBacktestService
+from app.services.futurequant.symbol_registry import get_symbol_registry
+
+TICKERS = ["ES=F", "GC=F", "CL=F"]
+
+
+@pytest.fixture
+def tickers():
+    return TICKERS
+
+
+@pytest.fixture
+def symbol_attributes():
+    return {"asset_class": "Energy", "point_value": 1000, "tick_size": 0.01}
+
+
+@pytest.fixture
+def db(db, registry, monkeypatch):
+    monkeypatch.setattr(settings, "feature_store_enabled", False)
+    return db
+
+
+def count_statements(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestSymbolRegistry:
+    """Loaded once, invalidated on writes"""
+
+    def test_lookups_share_one_load(self, db, registry):
+        statements = count_statements(db)
+        es = registry.get(db, "ES=F")
+
+        assert registry.by_id(db, es.id).ticker == "ES=F"
+        assert registry.ids(db, ["CL=F", "NOPE"]) == {"CL=F": 3}
+        assert registry.tickers(db, [1, 2]) == {1: "ES=F", 2: "GC=F"}
+        assert list(registry.map_tickers(db, pd.Series([2, 2, 1]))) == ["GC=F", "GC=F", "ES=F"]
+        assert es.point_value == 1000
+        # One load up front; the unknown ticker right after it does not reload
+        assert registry.loads == 1
+        assert len(statements) == 1
+
+    def test_miss_reloads_are_rate_limited(self, db, registry, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(symbol_registry.time, "monotonic", lambda: clock[0])
+        registry.get(db, "ES=F")
+        # Written by another process: no ORM event reaches this registry
+        db.execute(text("INSERT INTO futurequant_symbols (ticker, venue, asset_class, point_value, tick_size) "
+                        "VALUES ('ZC=F', 'CME', 'Grains', 50, 0.25)"))
+        db.commit()
+
+        assert [registry.get(db, ticker) for ticker in ("ZC=F", "NOPE", "NOPE")] == [None, None, None]
+        assert registry.loads == 1
+        clock[0] += registry.miss_reload_interval
+        assert registry.get(db, "ZC=F").id == 4
+        assert registry.get(db, "NOPE") is None and registry.loads == 2
+
+    def test_symbol_writes_invalidate(self, db, registry):
+        registry.get(db, "ES=F")
+        db.add(Symbol(ticker="ZC=F", venue="CME", asset_class="Grains", point_value=50, tick_size=0.25))
+        db.commit()
+        loads = registry.loads
+
+        assert registry.ids(db, ["ZC=F"]) == {"ZC=F": 4}
+        assert registry.loads == loads + 1
+
+        db.query(Symbol).filter(Symbol.ticker == "ZC=F").first().tick_size = 0.5
+        db.commit()
+        assert registry.get(db, "ZC=F").tick_size == 0.5
+
+    def test_process_wide_instance(self, registry):
+        assert get_symbol_registry() is registry
+
+
+class TestBacktestData:
+    """Backtest loader maps symbols per column instead of per row"""
+
+    @pytest.mark.asyncio
+    async def test_no_per_row_symbol_queries(self, db):
+        strategy = Strategy(name="s", description="", params={})
+        model = Model(name="m", artifact_uri="memory://m", params={})
+        db.add_all([strategy, model])
+        db.commit()
+        start = datetime(2024, 1, 1)
+        for day in range(50):
+            for symbol_id in (1, 2, 3):
+                timestamp = start + timedelta(days=day)
+                db.add(Bar(symbol_id=symbol_id, timestamp=timestamp, open=1, high=1, low=1, close=1, volume=1,
+                           interval="1d"))
+                db.add(Feature(symbol_id=symbol_id, timestamp=timestamp,
+                               payload={"recipe_name": "full", "features": {"f": day}}))
+                db.add(Forecast(symbol_id=symbol_id, model_id=model.id, timestamp=timestamp, horizon_minutes=1440,
+                                q10=0.9, q50=1.0, q90=1.1, prob_up=0.5, volatility=0.1))
+        db.commit()
+        statements = count_statements(db)
+
+        data = await FutureQuantBacktestService()._get_enhanced_backtest_data(
+            db, strategy.id, "2024-01-01", "2024-12-31", symbols=["ES=F", "CL=F"]
+        )
+
+        assert len(data) == 100
+        assert set(data["symbol"]) == {"ES=F", "CL=F"}
+        assert data["f"].iloc[-1] == 49
+        assert len(statements) <= 6
@@ -0,0 +1,78 @@
+"""
+Tests for compiled FutureQuantTransformer inference artifacts
+"""
+import os
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.services.futurequant import transformer_export
+from app.core.config import settings
+from app.services.futurequant.model_service import FutureQuantTransformer, _train_model_job
+from app.services.futurequant.transformer_export import (
+    ONNXRUNTIME_AVAILABLE, TORCHSCRIPT, export_format, export_transformer, transformer_outputs
+)
+
+
+def make_model(features=6):
+    torch.manual_seed(0)
+    module = FutureQuantTransformer(input_dim=features, d_model=16, n_heads=2, n_layers=1, dropout=0.1)
+    return {"type": "transformer", "model": module, "input_dim": features}
+
+
+class TestExport:
+    """Compiled artifacts reproduce the eager module for any batch size"""
+
+    def test_torchscript_round_trip(self, tmp_path):
+        model = make_model()
+        model["compiled"] = export_transformer(model["model"], 6, str(tmp_path / "model"), fmt=TORCHSCRIPT)
+
+        assert model["compiled"] == {"format": TORCHSCRIPT, "path": str(tmp_path / "model.pt"), "input_dim": 6}
+        for rows in (1, 33):
+            X = np.random.default_rng(rows).normal(size=(rows, 6))
+            compiled = transformer_outputs(model, X)
+            eager = transformer_outputs({**model, "compiled": None}, X)
+            for a, e in zip(compiled, eager):
+                assert a.shape == e.shape
+                np.testing.assert_allclose(a, e, atol=1e-4)
+
+    def test_format_selection(self):
+        assert export_format("none") is None
+        assert export_format("auto") == ("onnx" if ONNXRUNTIME_AVAILABLE else TORCHSCRIPT)
+        if not ONNXRUNTIME_AVAILABLE:
+            assert export_format("onnx") == TORCHSCRIPT
+
+    def test_training_job_exports_next_to_the_artifact(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "transformer_export_format", TORCHSCRIPT)
+        rng = np.random.default_rng(0)
+        X, y = rng.normal(size=(240, 6)), rng.normal(0, 0.01, 240)
+
+        model, _ = _train_model_job("transformer", 1440, X[:200], y[:200], X[200:], y[200:],
+                                    {"epochs": 1, "d_model": 16, "n_heads": 2, "n_layers": 1},
+                                    export_stem=str(tmp_path / "model"))
+
+        assert model["compiled"]["path"] == str(tmp_path / "model.pt") and os.path.exists(model["compiled"]["path"])
+
+
+class TestFallback:
+    """The eager module answers when the compiled artifact cannot"""
+
+    def test_uses_compiled_artifact_when_it_fits(self, tmp_path, monkeypatch):
+        model = make_model()
+        model["compiled"] = export_transformer(model["model"], 6, str(tmp_path / "model"), fmt=TORCHSCRIPT)
+        monkeypatch.setattr(transformer_export, "_eager_outputs", lambda module, X: pytest.fail("eager path used"))
+
+        quantiles, prob_up, vol = transformer_outputs(model, np.zeros((5, 6)))
+
+        assert quantiles.shape == (5, 3) and prob_up.shape == vol.shape == (5, 1)
+
+    def test_missing_artifact_falls_back_to_eager(self, tmp_path):
+        model = make_model()
+        model["compiled"] = export_transformer(model["model"], 6, str(tmp_path / "model"), fmt=TORCHSCRIPT)
+        os.remove(model["compiled"]["path"])
+
+        quantiles, _, _ = transformer_outputs(model, np.zeros((3, 6)))
+
+        assert quantiles.shape == (3, 3)
@@ -0,0 +1,77 @@
+"""
+Tests for the mini-batch transformer training loop
+"""
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.services.futurequant.model_service import FutureQuantTransformer
+from app.services.futurequant.transformer_training import make_loader, pinball_loss, train_transformer
+
+
+def make_data(rows=600, features=8, seed=5):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    y = X[:, 0] * 0.02 + rng.normal(0, 0.01, rows)
+    return X, y
+
+
+def make_model(features=8):
+    return FutureQuantTransformer(input_dim=features, d_model=16, n_heads=2, n_layers=1, dropout=0.0)
+
+
+class TestLoader:
+    """Whole shuffled batches sliced from contiguous tensors"""
+
+    def test_batches_cover_every_row_once(self):
+        X, y = make_data(rows=70)
+        batches = list(make_loader(X, y, batch_size=32, seed=1))
+
+        assert [len(batch_y) for _, batch_y in batches] == [32, 32, 6]
+        seen = torch.cat([batch_y for _, batch_y in batches]).numpy()
+        np.testing.assert_allclose(np.sort(seen), np.sort(y.astype(np.float32)))
+        assert batches[0][0].dtype == torch.float32
+        assert not torch.equal(batches[0][1], torch.as_tensor(y[:32], dtype=torch.float32))
+
+    def test_pinball_loss(self):
+        y = torch.tensor([1.0, 2.0])
+        assert pinball_loss(y, torch.tensor([0.0, 0.0]), 0.9).item() == pytest.approx(1.35)
+        assert pinball_loss(y, torch.tensor([3.0, 3.0]), 0.9).item() == pytest.approx(0.15)
+
+
+class TestTrainTransformer:
+    """Epoch stats, early stopping and thread settings"""
+
+    def test_reports_each_epoch(self):
+        X, y = make_data()
+        events = []
+
+        history = train_transformer(make_model(), X, y, {
+            "lr": 0.001, "epochs": 3, "batch_size": 64, "val_fraction": 0.2, "seed": 0, "intra_op_threads": 2
+        }, on_epoch=events.append)
+
+        assert [event["epoch"] for event in events] == [1, 2, 3]
+        assert set(history) == {"loss", "val_loss", "samples_per_sec"}
+        assert all(event["samples_per_sec"] > 0 for event in events)
+        assert torch.get_num_threads() == 2
+
+    def test_stops_early_and_restores_best_weights(self):
+        X, y = make_data()
+        model = make_model()
+
+        # A learning rate this large makes the validation loss stop improving quickly
+        history = train_transformer(model, X, y, {
+            "lr": 1.0, "epochs": 50, "batch_size": 64, "val_fraction": 0.2, "patience": 2, "seed": 0
+        })
+
+        assert len(history["loss"]) < 50
+        best = min(history["val_loss"])
+        assert history["val_loss"].index(best) == len(history["val_loss"]) - 3
+        assert not model.training
+
+    def test_without_validation_runs_every_epoch(self):
+        X, y = make_data(rows=200)
+        history = train_transformer(make_model(), X, y, {"lr": 0.001, "epochs": 4, "batch_size": 50, "patience": 1})
+
+        assert len(history["loss"]) == 4 and "val_loss" not in history